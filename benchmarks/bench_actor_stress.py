@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark: concurrent button / network mutations, direct vs CommandActor
+Hammers the hardware from several threads - half cycling like the button
+(read current, write next) and half selecting absolute antennas like
+the network - and reports throughput and lost updates.
+
+A cycle always changes the antenna, so every cycle that doesn't show up
+as its own state change (or shows up with the wrong predecessor) was
+lost to a concurrent read-modify-write.
+
+Usage:
+  python3 benchmarks/bench_actor_stress.py [--threads N] [--ops N] [--write-delay S]
+"""
+
+import argparse
+import threading
+import time
+
+import bench_common
+bench_common.setup()
+
+from antenna_hardware import AntennaHardware
+from command_actor import CommandActor
+from gpio_backend import FakeChip, LineGroupBackend
+
+
+class SlowBackend(LineGroupBackend):
+    """Fake-chip backend whose writes take time (like a real bus write)"""
+    
+    def __init__(self, delay):
+        super().__init__([27, 22, 4], chip=FakeChip())
+        self.delay = delay
+    
+    def write(self, levels):
+        time.sleep(self.delay)
+        super().write(levels)
+
+
+def next_antenna(current):
+    """3-antenna button cycle"""
+    return current % 3 + 1
+
+
+def run(mode, threads, ops, delay):
+    """One stress run, returns (seconds, ops, lost, consistent)"""
+    hw = AntennaHardware(backend=SlowBackend(delay))
+    cycles = []
+    hw.add_listener(lambda prev, cur, source: source == 'button' and cycles.append((prev, cur)))
+    
+    actor = None
+    if mode == 'actor':
+        actor = CommandActor(hw, queue_size=256)
+        actor.start()
+    
+    def cycler():
+        for _ in range(ops):
+            if actor is not None:
+                actor.update(next_antenna, source='button')
+            else:
+                hw.set_antenna(next_antenna(hw.get_current_antenna()), source='button')
+    
+    def selector():
+        for i in range(ops):
+            if actor is not None:
+                actor.submit(i % 3 + 1, source='network')
+            else:
+                hw.set_antenna(i % 3 + 1, source='network')
+    
+    workers = [threading.Thread(target=cycler if i % 2 else selector) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    if actor is not None:
+        actor.stop()
+    elapsed = time.perf_counter() - start
+    
+    expected = threads // 2 * ops
+    good = sum(1 for prev, cur in cycles if cur == next_antenna(prev))
+    consistent = not hw.check_consistency()
+    return elapsed, threads * ops, expected - good, consistent
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='Concurrent mutation stress benchmark')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--ops', type=int, default=2000, help='Operations per thread')
+    parser.add_argument('--write-delay', type=float, default=0.0,
+                        help='Seconds per backend write (0 = fake chip speed)')
+    args = parser.parse_args()
+    
+    print(f"{args.threads} threads x {args.ops} ops, write delay {args.write_delay * 1e6:.0f}us")
+    for mode in ('direct', 'actor'):
+        elapsed, total, lost, consistent = run(mode, args.threads, args.ops, args.write_delay)
+        print(f"  {mode:<8} {total / elapsed:>10.0f} ops/s  lost updates {lost:>6}"
+              f"  pins consistent {'yes' if consistent else 'NO'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cost of auditing a state change on the switch path
+Times set_antenna with no listener, with the binary audit ring, and with
+a text line written (and optionally fsynced) per change - what logging
+straight from the switch path would cost. Then times draining the ring
+to disk in batches.
+
+Usage:
+  python3 benchmarks/bench_audit_log.py [--iterations N] [--fsync] [--dir DIR]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import bench_common
+bench_common.setup()
+
+from antenna_hardware import AntennaHardware
+from audit_log import AuditLog
+from gpio_backend import FakeChip, LineGroupBackend
+
+
+def time_switches(listener, iterations):
+    """set_antenna latency cycling A1..A3 with one listener attached"""
+    hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip()))
+    if listener is not None:
+        hw.add_listener(listener)
+    state = {'i': 0}
+    
+    def switch():
+        state['i'] += 1
+        hw.set_antenna(state['i'] % 3 + 1, source='network')
+    
+    bench_common.time_calls(switch, 100)  # warm up
+    return bench_common.time_calls(switch, iterations)
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='Audit log hot-path benchmark')
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--fsync', action='store_true', help='fsync each text line')
+    parser.add_argument('--dir', default=None, help='Directory for log files (e.g. on the SD card)')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmpdir:
+        print(f"set_antenna latency ({args.iterations} switches)")
+        bench_common.print_latency("no listener", time_switches(None, args.iterations))
+        
+        audit = AuditLog(os.path.join(tmpdir, 'audit.bin'), capacity=args.iterations + 200)
+        bench_common.print_latency("audit ring", time_switches(audit.record, args.iterations))
+        
+        text = open(os.path.join(tmpdir, 'audit.txt'), 'a')
+        
+        def text_listener(previous, current, source):
+            text.write(f"{time.time():.6f} {source} A{previous} -> A{current}\n")
+            text.flush()
+            if args.fsync:
+                os.fsync(text.fileno())
+        
+        label = "text + fsync" if args.fsync else "text + flush"
+        bench_common.print_latency(label, time_switches(text_listener, args.iterations))
+        text.close()
+        
+        start = time.perf_counter_ns()
+        written = audit.flush()
+        elapsed = time.perf_counter_ns() - start
+        print(f"Background flush: {written} records in {elapsed / 1e6:.2f}ms "
+              f"({elapsed / max(written, 1):.0f}ns/record)")
+        audit.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark: band follower CPU cost per frequency update
+Measures BandFollower.update() for repeated, in-band and band-hopping
+samples, then polls a local FakeRigctld at 10, 20 and 50 Hz and reports
+process CPU time per sample and as a share of one core.
+
+Usage:
+  python3 benchmarks/bench_band_follower.py [--seconds S]
+"""
+
+import argparse
+import random
+import time
+
+import bench_common
+bench_common.setup()
+
+from antenna_hardware import AntennaHardware
+from band_follower import BandFollower, BandTable, FakeRigctld, RigctldClient, BAND_EDGES
+from gpio_backend import FakeChip, LineGroupBackend
+
+
+def new_follower(source=None, interval=0.05):
+    """Follower on fake-chip hardware with every band mapped"""
+    hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip()))
+    spec = ','.join(f'{band}={i % 3 + 1}' for i, band in enumerate(BAND_EDGES))
+    return BandFollower(hw, BandTable.from_spec(spec), source, interval)
+
+
+def bench_update(label, samples):
+    """Time update() over a list of frequencies"""
+    follower = new_follower()
+    iterator = iter(samples)
+    timings = bench_common.time_calls(lambda: follower.update(next(iterator)), len(samples))
+    bench_common.print_latency(label, timings)
+    print(f"  {'':<28} switches {follower.switches}  cache hits {follower.cache_hits}")
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='Band follower CPU benchmark')
+    parser.add_argument('--seconds', type=float, default=3.0,
+                        help='Polling time per rate against the fake rigctld')
+    args = parser.parse_args()
+    
+    rng = random.Random(1)
+    count = 50000
+    print(f"BandFollower.update() ({count} samples)")
+    bench_update("identical frequency", [14074000] * count)
+    bench_update("tuning within 20m", [rng.randrange(14000000, 14350000) for _ in range(count)])
+    hops = [rng.randrange(*BAND_EDGES[rng.choice(list(BAND_EDGES))]) for _ in range(count)]
+    bench_update("random band hopping", hops)
+    
+    rig = FakeRigctld(frequency=14074000)
+    print(f"Polling fake rigctld ({args.seconds:.0f}s per rate)")
+    for rate in (10, 20, 50):
+        follower = new_follower(RigctldClient(rig.host, rig.port), interval=1.0 / rate)
+        cpu_start = time.process_time()
+        follower.start()
+        time.sleep(args.seconds)
+        follower.stop()
+        # Fake server threads share this process; its CPU is included
+        cpu = time.process_time() - cpu_start
+        print(f"  {rate:3d} Hz: {follower.samples} samples, "
+              f"{cpu / max(follower.samples, 1) * 1e6:7.1f}us CPU/sample, "
+              f"{cpu / args.seconds * 100:5.2f}% of one core (incl. fake server)")
+        follower.frequency_source.close()
+    rig.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark: batched / pipelined command throughput
+Compares commands per second for:
+  - handle_command() one at a time (in process)
+  - handle_batch() over a whole script (in process, with/without collapse)
+  - daemon, one round trip per command (TCP loopback)
+  - daemon, pipelined ';' batches (TCP loopback)
+
+Usage:
+  python3 benchmarks/bench_batch.py [--commands N]
+"""
+
+import argparse
+import random
+import socket
+import time
+
+import bench_common
+bench_common.setup()
+
+from antenna_hardware import AntennaHardware
+from gpio_backend import FakeChip, LineGroupBackend
+from ssh_command_handler import SSHCommandHandler
+from bench_daemon_latency import start_daemon, stop_daemon
+
+
+def make_script(count):
+    """Random contest-style burst of switches with occasional STAT"""
+    rng = random.Random(42)
+    choices = ['A1', 'A2', 'A3', 'A2', 'A3', 'OFF', 'STAT']
+    return [rng.choice(choices) for _ in range(count)]
+
+
+def report(label, count, elapsed_ns, chip=None):
+    """Print commands/second (and relay writes when known)"""
+    rate = count / (elapsed_ns / 1e9)
+    extra = f"  chip writes {chip.set_calls}" if chip is not None else ""
+    print(f"  {label:<30} {rate:12,.0f} cmd/s{extra}")
+
+
+def new_handler():
+    """Handler on fresh fake-chip hardware"""
+    chip = FakeChip()
+    hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=chip))
+    chip.set_calls = 0
+    return SSHCommandHandler(hw), chip
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='Batch command throughput benchmark')
+    parser.add_argument('--commands', type=int, default=20000)
+    args = parser.parse_args()
+    
+    script = make_script(args.commands)
+    buffer = ';'.join(script)
+    print(f"Command throughput ({args.commands} commands)")
+    
+    handler, chip = new_handler()
+    start = time.perf_counter_ns()
+    for command in script:
+        handler.handle_command(command)
+    report("handle_command one-at-a-time", len(script), time.perf_counter_ns() - start, chip)
+    
+    handler, chip = new_handler()
+    start = time.perf_counter_ns()
+    for _ in handler.handle_batch(buffer):
+        pass
+    report("handle_batch", len(script), time.perf_counter_ns() - start, chip)
+    
+    handler, chip = new_handler()
+    start = time.perf_counter_ns()
+    for _ in handler.handle_batch(buffer, collapse=True):
+        pass
+    report("handle_batch collapse", len(script), time.perf_counter_ns() - start, chip)
+    
+    daemon, loop = start_daemon()
+    sock = socket.create_connection(('127.0.0.1', daemon.port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    stream = sock.makefile('rb')
+    
+    start = time.perf_counter_ns()
+    for command in script:
+        sock.sendall(command.encode() + b'\n')
+        stream.readline()
+    report("daemon round trip per command", len(script), time.perf_counter_ns() - start)
+    
+    chunk = 100
+    start = time.perf_counter_ns()
+    for i in range(0, len(script), chunk):
+        part = script[i:i + chunk]
+        sock.sendall(';'.join(part).encode() + b'\n')
+        for _ in part:
+            stream.readline()
+    report(f"daemon pipelined batch ({chunk})", len(script), time.perf_counter_ns() - start)
+    
+    sock.close()
+    stop_daemon(daemon, loop)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark: button edge-to-action latency per debounce engine
+Drives ButtonHandler's edge thread with bouncy presses played into a
+FakeEdgeSource in real time (timestamped with time.monotonic_ns, like
+kernel edge events) and reports the latency from the first edge to cycle_antenna.
+
+The engine's own debounce delay is included: lockout acts on the first
+edge, integrator/stable wait for their window after the bounce ends.
+The adaptive engine also reports the lockout it learned from the presses.
+
+Usage:
+  python3 benchmarks/bench_button_latency.py [--presses N]
+"""
+
+import argparse
+import time
+from unittest.mock import Mock
+
+import bench_common
+bench_common.setup()
+
+from button_handler import ButtonHandler
+from debounce import DEBOUNCERS, make_debouncer
+from edge_source import FakeEdgeSource
+
+
+def play(source, edges):
+    """Push edges in real time, each when its timestamp comes due"""
+    for edge in edges:
+        delay = (edge.timestamp_ns - time.monotonic_ns()) / 1e9
+        if delay > 0:
+            time.sleep(delay)
+        source.push(edge.timestamp_ns, edge.active)
+
+
+def run(name, presses):
+    """Press presses times, return latency samples in ns"""
+    hw = Mock()
+    hw.get_current_antenna.return_value = 1
+    source = FakeEdgeSource()
+    handler = ButtonHandler(hw, edge_source=source, debouncer=make_debouncer(name))
+    script = FakeEdgeSource()
+    for i in range(presses):
+        script.press(time.monotonic_ns() + 1000000, 40000000, bounces=3)
+        play(source, script.wait(0))
+        deadline = time.monotonic() + 1
+        while handler.presses <= i and time.monotonic() < deadline:
+            time.sleep(0.0002)
+        time.sleep(0.06)  # release settles before the next press
+    samples = list(handler.latencies_ns)
+    handler.cleanup()
+    return samples, handler.debounce_status()[handler.button_pin]
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='Button edge-to-action latency benchmark')
+    parser.add_argument('--presses', type=int, default=50)
+    args = parser.parse_args()
+    
+    print(f"Edge to cycle_antenna latency ({args.presses} bouncy presses per engine)")
+    for name in DEBOUNCERS:
+        samples, status = run(name, args.presses)
+        bench_common.print_latency(name, samples)
+        if status.get('tail_ns') is not None:
+            print(f"  learned lockout {status['lockout_ns'] / 1e6:.2f}ms "
+                  f"(bounce tail {status['tail_ns'] / 1e6:.2f}ms over {status['bursts']} bursts)")
+
+
+if __name__ == '__main__':
+    main()
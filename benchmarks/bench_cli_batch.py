@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark: antenna_cli batch mode vs one process per command
+Process per command is what scripts did before --batch: pipe one command
+into the interactive CLI, which starts Python, imports the controller,
+initializes the relays (back to A1), runs the command and exits.
+Batch mode streams every command through one CLI process over a pipe.
+
+gpiozero is faked (bench_common) in the child processes, so process
+start-up here is cheaper than on a Pi where gpiozero and lgpio load.
+
+Usage:
+  python3 benchmarks/bench_cli_batch.py [--commands N] [--processes N]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import bench_common
+bench_common.setup()
+
+from bench_batch import make_script
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Child: fake gpiozero like the benchmarks do, then run the CLI's main()
+CHILD = (f"import sys; sys.path.insert(0, {BENCH_DIR!r}); import bench_common; bench_common.setup(); "
+         "import antenna_cli; sys.exit(antenna_cli.main(sys.argv[1:]))")
+
+
+def cli(*args, **kwargs):
+    """Run antenna_cli in a child process"""
+    return subprocess.run([sys.executable, '-c', CHILD, '--no-button', *args],
+                          capture_output=True, text=True, **kwargs)
+
+
+def per_process(script):
+    """One interactive CLI process per command; returns elapsed seconds"""
+    start = time.perf_counter()
+    for command in script:
+        cli(input=command + '\n')
+    return time.perf_counter() - start
+
+
+def batch(script, settle_ms):
+    """Every command through one --batch process; returns (elapsed s, responses)"""
+    start = time.perf_counter()
+    result = cli('--batch', '--settle-ms', str(settle_ms), input='\n'.join(script) + '\n')
+    elapsed = time.perf_counter() - start
+    return elapsed, result.stdout.count('\n')
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='antenna_cli batch mode throughput benchmark')
+    parser.add_argument('--commands', type=int, default=5000, help='Commands in the batch runs')
+    parser.add_argument('--processes', type=int, default=20, help='Commands in the per-process run')
+    args = parser.parse_args()
+    
+    print("antenna_cli throughput (commands/second, including process start-up)")
+    elapsed = per_process(make_script(args.processes))
+    print(f"  {'process per command':<30} {args.processes / elapsed:12,.1f} cmd/s  "
+          f"({elapsed * 1000 / args.processes:.0f}ms each)")
+    script = make_script(args.commands)
+    for settle_ms in (0, 10):
+        elapsed, responses = batch(script, settle_ms)
+        if responses != len(script):
+            print(f"  ✗ expected {len(script)} responses, got {responses}")
+        print(f"  {f'--batch, settle {settle_ms}ms':<30} {len(script) / elapsed:12,.1f} cmd/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: relay operations and time-to-final-state under command storms
+A band decoder and a human fire commands at the same time (two threads,
+random targets). Compares:
+  all           - every target written immediately (relays chatter)
+  all+settle    - every target written, each waiting for the relay to settle
+  latest        - last-writer-wins coalescing (CommandActor POLICY_LATEST)
+
+Reports relay writes per burst and the time from the first command until
+the relays have settled on the final target.
+
+Usage:
+  python3 benchmarks/bench_coalescing.py [--bursts N] [--burst-size N] [--settle-ms MS]
+"""
+
+import argparse
+import random
+import statistics
+import threading
+import time
+
+import bench_common
+bench_common.setup()
+
+from antenna_hardware import AntennaHardware
+from command_actor import CommandActor, POLICY_ALL, POLICY_LATEST
+from gpio_backend import FakeChip, LineGroupBackend
+
+
+class SettlingBackend(LineGroupBackend):
+    """Fake-chip backend that blocks until the relay contacts have settled"""
+    
+    def __init__(self, settle_time):
+        super().__init__([27, 22, 4], chip=FakeChip())
+        self.settle_time = settle_time
+    
+    def write(self, levels):
+        super().write(levels)
+        time.sleep(self.settle_time)
+
+
+def run_burst(mode, burst_size, settle_time, rng):
+    """One burst, returns (relay writes, seconds until settled on the final target)"""
+    if mode == 'all+settle':
+        hw = AntennaHardware(backend=SettlingBackend(settle_time))
+        actor = CommandActor(hw, policy=POLICY_ALL)
+    else:
+        hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip()))
+        policy = POLICY_LATEST if mode == 'latest' else POLICY_ALL
+        actor = CommandActor(hw, queue_size=burst_size * 2, policy=policy, settle_time=settle_time)
+    changes = []
+    hw.add_listener(lambda prev, cur, source: changes.append(time.perf_counter()))
+    actor.start()
+    
+    targets = [rng.randint(0, 3) for _ in range(burst_size)]
+    halves = [targets[0::2], targets[1::2]]
+    
+    def sender(commands, source):
+        for target in commands:
+            actor.submit(target, source=source)
+            time.sleep(0.0005)
+    
+    start = time.perf_counter()
+    threads = [threading.Thread(target=sender, args=(half, source))
+               for half, source in zip(halves, ('band', 'network'))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    actor.stop()
+    
+    if not changes:
+        return 0, 0.0
+    settled = changes[-1] - start
+    if mode != 'all+settle':
+        # Instant backend - contacts settle after the last write
+        settled += settle_time
+    return len(changes), settled
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='Relay coalescing benchmark')
+    parser.add_argument('--bursts', type=int, default=20)
+    parser.add_argument('--burst-size', type=int, default=20)
+    parser.add_argument('--settle-ms', type=float, default=10.0)
+    args = parser.parse_args()
+    settle_time = args.settle_ms / 1000
+    
+    print(f"{args.bursts} bursts of {args.burst_size} commands, relay settle {args.settle_ms:.0f}ms")
+    for mode in ('all', 'all+settle', 'latest'):
+        rng = random.Random(1)
+        results = [run_burst(mode, args.burst_size, settle_time, rng) for _ in range(args.bursts)]
+        writes = statistics.mean(r[0] for r in results)
+        settled = statistics.mean(r[1] for r in results)
+        print(f"  {mode:<12} relay writes/burst {writes:6.1f}   settled on final target {settled * 1e3:7.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
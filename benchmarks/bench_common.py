@@ -0,0 +1,67 @@
+# benchmarks/bench_common.py
+"""
+Shared helpers for the benchmark scripts
+Puts src/ on the path and fakes gpiozero when it is not installed,
+the same way the unit tests do, so benchmarks run off the Pi
+"""
+
+import os
+import sys
+import time
+from unittest.mock import Mock
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+
+def setup():
+    """Make src/ importable and stub gpiozero if it is missing"""
+    if SRC_DIR not in sys.path:
+        sys.path.insert(0, SRC_DIR)
+    try:
+        import gpiozero  # noqa: F401
+    except ImportError:
+        sys.modules['gpiozero'] = Mock()
+        sys.modules['gpiozero.pins'] = Mock()
+        sys.modules['gpiozero.pins.lgpio'] = Mock()
+
+
+def percentile(samples, pct):
+    """
+    Nearest-rank percentile of a list of samples
+    
+    Args:
+        samples (list): Numeric samples
+        pct (float): Percentile 0-100
+    
+    Returns:
+        float: Sample at that percentile (0 if empty)
+    """
+    if not samples:
+        return 0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def time_calls(func, iterations):
+    """
+    Time func() over a number of iterations
+    
+    Returns:
+        list: Per-call durations in nanoseconds
+    """
+    samples = []
+    clock = time.perf_counter_ns
+    for _ in range(iterations):
+        start = clock()
+        func()
+        samples.append(clock() - start)
+    return samples
+
+
+def print_latency(label, samples_ns):
+    """Print mean/p50/p99 for nanosecond samples in microseconds"""
+    mean = sum(samples_ns) / len(samples_ns) / 1000
+    p50 = percentile(samples_ns, 50) / 1000
+    p99 = percentile(samples_ns, 99) / 1000
+    print(f"  {label:<28} mean {mean:8.2f}us  p50 {p50:8.2f}us  p99 {p99:8.2f}us")
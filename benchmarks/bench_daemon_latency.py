@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark: antenna daemon round-trip latency
+Starts AntennaDaemon on loopback with fake-chip hardware and measures
+warm-connection command round trips, compared with starting a fresh
+interpreter per command (the old per-session CLI path, minus SSH).
+
+Usage:
+  python3 benchmarks/bench_daemon_latency.py [--iterations N] [--cold N]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import bench_common
+bench_common.setup()
+
+from antenna_daemon import AntennaDaemon
+from antenna_hardware import AntennaHardware
+from gpio_backend import FakeChip, LineGroupBackend
+from ssh_command_handler import SSHCommandHandler
+
+
+def start_daemon(daemon=None):
+    """Run a daemon on a background event loop, return (daemon, loop)"""
+    if daemon is None:
+        hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip()))
+        daemon = AntennaDaemon(SSHCommandHandler(hw), port=0)
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(daemon.start())
+        ready.set()
+        loop.run_forever()
+    
+    threading.Thread(target=run, daemon=True).start()
+    ready.wait()
+    return daemon, loop
+
+
+def stop_daemon(daemon, loop):
+    """Close the daemon and its clients, then stop the background loop"""
+    asyncio.run_coroutine_threadsafe(daemon.stop(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+
+
+def bench_warm(port, iterations):
+    """Round trips on one persistent connection"""
+    sock = socket.create_connection(('127.0.0.1', port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    stream = sock.makefile('rb')
+    commands = [b'A1\n', b'A2\n', b'STAT\n', b'A3\n']
+    state = {'i': 0}
+    
+    def round_trip():
+        state['i'] += 1
+        sock.sendall(commands[state['i'] % 4])
+        stream.readline()
+    
+    bench_common.time_calls(round_trip, 200)  # warm up
+    samples = bench_common.time_calls(round_trip, iterations)
+    sock.close()
+    return samples
+
+
+def bench_cold(iterations):
+    """Fresh interpreter + imports + hardware init per command"""
+    script = (
+        "import sys; from unittest.mock import Mock; "
+        "sys.modules.setdefault('gpiozero', Mock()); "
+        "from antenna_hardware import AntennaHardware; "
+        "from gpio_backend import FakeChip, LineGroupBackend; "
+        "from ssh_command_handler import SSHCommandHandler; "
+        "hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip())); "
+        "print(SSHCommandHandler(hw).handle_command('A2'))"
+    )
+    env = dict(os.environ, PYTHONPATH=bench_common.SRC_DIR)
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        subprocess.run([sys.executable, '-c', script], env=env, check=True,
+                       stdout=subprocess.DEVNULL)
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='Daemon round-trip latency benchmark')
+    parser.add_argument('--iterations', type=int, default=5000)
+    parser.add_argument('--cold', type=int, default=5,
+                        help='Per-command process starts to time (0 to skip)')
+    args = parser.parse_args()
+    
+    daemon, loop = start_daemon()
+    print(f"Daemon round trip ({args.iterations} commands, warm TCP connection)")
+    bench_common.print_latency("warm connection", bench_warm(daemon.port, args.iterations))
+    
+    if args.cold:
+        print(f"Per-command interpreter start ({args.cold} runs, no SSH)")
+        bench_common.print_latency("cold process", bench_cold(args.cold))
+    
+    stop_daemon(daemon, loop)
+
+
+if __name__ == '__main__':
+    main()
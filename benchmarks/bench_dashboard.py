@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark: terminal output per switch, dashboard vs. status block
+Counts the characters written for one antenna switch by:
+  - AntennaControllerCLI.print_status (full block after every command)
+  - dashboard.Renderer (changed fields only, before curses' own diffing)
+and times the dashboard's per-event work (listener + field update).
+
+Usage:
+  python3 benchmarks/bench_dashboard.py [--switches N]
+"""
+
+import argparse
+import contextlib
+import io
+
+import bench_common
+bench_common.setup()
+
+from antenna_cli import AntennaControllerCLI
+from antenna_hardware import AntennaHardware
+from dashboard import Dashboard
+from gpio_backend import FakeChip, LineGroupBackend
+from ssh_command_handler import SSHCommandHandler
+
+PINS = [27, 22, 4]
+
+
+def status_block_chars(switches):
+    """Mean characters printed by print_status per switch"""
+    cli = AntennaControllerCLI(antenna_count=3, settle_time=0, button=False, log=io.StringIO())
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        for i in range(switches):
+            cli.ssh_handler.handle_command(f"A{i % 3 + 1}")
+            cli.print_status()
+    cli.cleanup()
+    return len(out.getvalue()) / switches
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='Dashboard redraw benchmark')
+    parser.add_argument('--switches', type=int, default=5000)
+    args = parser.parse_args()
+    
+    hw = AntennaHardware(backend=LineGroupBackend(PINS, chip=FakeChip()))
+    dashboard = Dashboard(hw, SSHCommandHandler(hw, source='local'))
+    dashboard.start()
+    dashboard.renderer.changes(dashboard.fields(dashboard.clock()))
+    targets = iter([2, 3, 1] * (args.switches // 3 + 1))
+    written = []
+    
+    def switch():
+        hw.set_antenna(next(targets), source='button')
+        writes = dashboard.renderer.changes(dashboard.fields(dashboard.clock()))
+        written.append(sum(len(text) for row, col, text in writes))
+    
+    samples = bench_common.time_calls(switch, args.switches)
+    dashboard.stop()
+    
+    print(f"Characters written per switch ({args.switches} switches)")
+    print(f"  {'print_status block':<24} {status_block_chars(min(args.switches, 500)):8.0f}")
+    print(f"  {'dashboard fields':<24} {sum(written) / len(written):8.0f}")
+    bench_common.print_latency('switch + field update', samples)
+
+
+if __name__ == '__main__':
+    main()
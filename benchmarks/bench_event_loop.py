@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark: threaded input model vs one asyncio event loop
+Threaded (default daemon): ButtonHandler edge thread -> CommandActor
+thread -> relays, next to the daemon's asyncio network loop.
+Event loop (--event-loop): the edge fd is a loop reader and LoopActor
+applies the switch on the loop thread - one wake-up per edge.
+
+Measures:
+  wake-up latency - edge pushed (timestamped like a kernel edge) to the
+                    relay write, as seen by a hardware listener
+  idle CPU        - process CPU time while nothing happens (periodic
+                    thread wake-ups show up here)
+
+Usage:
+  python3 benchmarks/bench_event_loop.py [--presses N] [--idle S]
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+
+import bench_common
+bench_common.setup()
+
+from antenna_hardware import AntennaHardware
+from button_handler import ButtonHandler
+from command_actor import CommandActor, LoopActor
+from debounce import LockoutDebouncer
+from edge_source import FakeEdgeSource
+from gpio_backend import FakeChip, LineGroupBackend
+
+
+class Model:
+    """Button + actor + (idle) network loop, threaded or loop-driven"""
+    
+    def __init__(self, event_loop):
+        """Build the model; event_loop=True for the single-loop variant"""
+        self.hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip()))
+        self.switched = threading.Event()
+        self.switch_ns = 0
+        self.hw.add_listener(self._on_change)
+        self.source = FakeEdgeSource()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        if event_loop:
+            self.actor = LoopActor(self.hw)
+            self.button = ButtonHandler(self.hw, edge_source=self.source, actor=self.actor,
+                                        debouncer=LockoutDebouncer(lockout_ns=1000000), edge_thread=False)
+            self._call(lambda: (self.actor.start(self.loop), self.button.attach(self.loop)))
+        else:
+            self.actor = CommandActor(self.hw)
+            self.actor.start()
+            self.button = ButtonHandler(self.hw, edge_source=self.source, actor=self.actor,
+                                        debouncer=LockoutDebouncer(lockout_ns=1000000))
+    
+    def _call(self, func):
+        """Run func on the loop thread and wait"""
+        done = threading.Event()
+        self.loop.call_soon_threadsafe(lambda: (func(), done.set()))
+        done.wait()
+    
+    def _on_change(self, previous, current, source):
+        """Hardware listener - time of the relay write"""
+        self.switch_ns = time.monotonic_ns()
+        self.switched.set()
+    
+    def press(self):
+        """One clean press; returns edge-to-relay latency in ns"""
+        self.switched.clear()
+        t = time.monotonic_ns()
+        self.source.push(t, True)
+        self.switched.wait(1)
+        latency = self.switch_ns - t
+        time.sleep(0.003)
+        self.source.push(time.monotonic_ns(), False)
+        time.sleep(0.003)
+        return latency
+    
+    def close(self):
+        """Stop every thread of the model"""
+        if self.button.loop is not None:
+            self._call(self.button.detach)
+        self.button.cleanup()
+        self.actor.stop()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+def idle_cpu(model, seconds):
+    """CPU seconds used by the whole process while idle"""
+    start = time.process_time()
+    time.sleep(seconds)
+    return time.process_time() - start
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='Threaded vs event-loop input benchmark')
+    parser.add_argument('--presses', type=int, default=300)
+    parser.add_argument('--idle', type=float, default=5.0, help='Idle measurement in seconds')
+    args = parser.parse_args()
+    
+    print(f"Edge to relay write ({args.presses} presses), idle CPU over {args.idle:g}s")
+    for name, event_loop in (('threaded', False), ('event loop', True)):
+        model = Model(event_loop)
+        try:
+            samples = [model.press() for _ in range(args.presses)]
+            cpu = idle_cpu(model, args.idle)
+            threads = threading.active_count() - 1
+        finally:
+            model.close()
+        bench_common.print_latency(name, samples)
+        print(f"  {name + ' idle CPU':<24} {cpu * 1000 / args.idle:9.2f}ms per s  ({threads} extra threads)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark: gesture timeouts on one timer wheel vs a thread per gesture
+1. Cost of arming and cancelling a gesture timeout: TimerWheel vs
+   threading.Timer (what gpiozero hold_time / ad-hoc timers amount to)
+2. Resolution lag of long presses through ButtonHandler's edge thread:
+   time from the gesture's scheduled deadline to its action
+
+Usage:
+  python3 benchmarks/bench_gestures.py [--iterations N] [--presses N]
+"""
+
+import argparse
+import threading
+import time
+from unittest.mock import Mock
+
+import bench_common
+bench_common.setup()
+
+from button_handler import ButtonHandler
+from edge_source import FakeEdgeSource
+from timer_wheel import TimerWheel
+
+
+def bench_arm_cancel(iterations):
+    """Schedule + cancel one timeout, wheel vs threading.Timer"""
+    wheel = TimerWheel(start_ns=time.monotonic_ns())
+    noop = lambda: None
+    
+    def wheel_arm():
+        wheel.cancel(wheel.schedule(time.monotonic_ns() + 800000000, noop))
+    
+    def thread_arm():
+        timer = threading.Timer(0.8, noop)
+        timer.start()
+        timer.cancel()
+    
+    bench_common.print_latency("timer wheel", bench_common.time_calls(wheel_arm, iterations))
+    bench_common.print_latency("threading.Timer", bench_common.time_calls(thread_arm, iterations // 10))
+
+
+def bench_long_press_lag(presses):
+    """Deadline-to-action lag of long presses on the real edge thread"""
+    hw = Mock()
+    hw.get_current_antenna.return_value = 1
+    source = FakeEdgeSource()
+    handler = ButtonHandler(hw, edge_source=source, gestures=True,
+                            long_press_time=0.02, double_press_time=0.05)
+    lags = []
+    on_gesture = handler.gestures.on_gesture
+    
+    def timed(button, gesture, origin_ns, decided_ns):
+        lags.append(time.monotonic_ns() - decided_ns)
+        on_gesture(button, gesture, origin_ns, decided_ns)
+    
+    handler.gestures.on_gesture = timed
+    for i in range(presses):
+        source.push(time.monotonic_ns(), True)
+        time.sleep(0.03)
+        source.push(time.monotonic_ns(), False)
+        time.sleep(0.03)
+    handler.cleanup()
+    bench_common.print_latency("long press lag", lags)
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='Gesture timer benchmark')
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--presses', type=int, default=50)
+    args = parser.parse_args()
+    
+    print("Arm + cancel one gesture timeout")
+    bench_arm_cancel(args.iterations)
+    print(f"Long press resolution lag ({args.presses} presses, 1ms wheel tick)")
+    bench_long_press_lag(args.presses)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cost of the metrics instrumentation
+Times set_antenna and handle_command on a fake chip with and without
+ControllerMetrics attached, and how long one /metrics render takes.
+
+Usage:
+  python3 benchmarks/bench_metrics.py [--iterations N]
+"""
+
+import argparse
+
+import bench_common
+bench_common.setup()
+
+from antenna_hardware import AntennaHardware
+from gpio_backend import FakeChip, LineGroupBackend
+from metrics import ControllerMetrics
+from ssh_command_handler import SSHCommandHandler
+
+
+def build(instrumented):
+    """Fake-chip hardware and handler, optionally instrumented"""
+    hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip()))
+    handler = SSHCommandHandler(hw)
+    metrics = None
+    if instrumented:
+        metrics = ControllerMetrics()
+        metrics.instrument(hardware=hw, handler=handler)
+    return hw, handler, metrics
+
+
+def time_switches(hw, iterations):
+    """set_antenna latency cycling A1..A3"""
+    targets = iter([1, 2, 3] * (iterations // 3 + 200))
+    bench_common.time_calls(lambda: hw.set_antenna(next(targets), source='network'), 100)
+    return bench_common.time_calls(lambda: hw.set_antenna(next(targets), source='network'), iterations)
+
+
+def time_commands(handler, iterations):
+    """handle_command latency cycling A1..A3"""
+    commands = iter(['A1', 'A2', 'A3'] * (iterations // 3 + 200))
+    bench_common.time_calls(lambda: handler.handle_command(next(commands)), 100)
+    return bench_common.time_calls(lambda: handler.handle_command(next(commands)), iterations)
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='Metrics instrumentation overhead benchmark')
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+    
+    print(f"set_antenna latency ({args.iterations} switches)")
+    plain = time_switches(build(False)[0], args.iterations)
+    hw, handler, metrics = build(True)
+    instrumented = time_switches(hw, args.iterations)
+    bench_common.print_latency('no metrics', plain)
+    bench_common.print_latency('with metrics', instrumented)
+    print(f"  overhead p50: {bench_common.percentile(instrumented, 50) - bench_common.percentile(plain, 50):.0f}ns")
+    
+    print(f"handle_command latency ({args.iterations} commands)")
+    plain = time_commands(build(False)[1], args.iterations)
+    instrumented = time_commands(handler, args.iterations)
+    bench_common.print_latency('no metrics', plain)
+    bench_common.print_latency('with metrics', instrumented)
+    print(f"  overhead p50: {bench_common.percentile(instrumented, 50) - bench_common.percentile(plain, 50):.0f}ns")
+    
+    print("Scrape")
+    bench_common.print_latency('registry.render()', bench_common.time_calls(metrics.registry.render, 1000))
+
+
+if __name__ == '__main__':
+    main()
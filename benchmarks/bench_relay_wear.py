@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: relay wear accounting under a sustained switch storm
+Switches A1..A3 back to back on a fake chip for a fixed time and reports:
+  - set_antenna latency with and without the in-memory wear counters
+  - file writes and bytes written by WearMonitor (batched, one atomic
+    rewrite per flush interval) during the storm
+  - the same for persisting on every switch, what batching avoids
+
+Usage:
+  python3 benchmarks/bench_relay_wear.py [--seconds S] [--interval S] [--dir DIR]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import bench_common
+bench_common.setup()
+
+from antenna_hardware import AntennaHardware
+from gpio_backend import FakeChip, LineGroupBackend
+from relay_wear import WearMonitor
+
+PINS = [27, 22, 4]
+
+
+class UncountedHardware(AntennaHardware):
+    """AntennaHardware with the wear accounting taken out of _write"""
+    
+    def _write(self, levels):
+        self.backend.write(levels)
+        self.shadow.update(levels)
+
+
+def switch_samples(cls, iterations):
+    """set_antenna latency cycling A1..A3"""
+    hw = cls(backend=LineGroupBackend(PINS, chip=FakeChip()))
+    targets = iter([1, 2, 3] * (iterations // 3 + 200))
+    bench_common.time_calls(lambda: hw.set_antenna(next(targets)), 100)
+    return bench_common.time_calls(lambda: hw.set_antenna(next(targets)), iterations)
+
+
+def storm(path, seconds, interval, per_switch):
+    """
+    Switch as fast as possible for seconds with wear persistence
+    
+    Returns:
+        tuple: (switches, file writes, bytes written)
+    """
+    hw = AntennaHardware(backend=LineGroupBackend(PINS, chip=FakeChip()))
+    wear = WearMonitor(hw, path, flush_interval=interval)
+    wear.restore()
+    if per_switch:
+        hw.add_listener(lambda previous, current, source: wear.flush(force=True))
+    else:
+        wear.start()
+    switches = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        switches += 1
+        hw.set_antenna(switches % 3 + 1)
+    wear.stop()
+    return switches, wear.writes, wear.writes * os.path.getsize(path)
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='Relay wear persistence benchmark')
+    parser.add_argument('--seconds', type=float, default=5.0, help='Length of each storm')
+    parser.add_argument('--interval', type=float, default=1.0, help='WearMonitor flush interval')
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--dir', default=None, help='Directory for the counter files (e.g. on the SD card)')
+    args = parser.parse_args()
+    
+    print(f"set_antenna latency ({args.iterations} switches)")
+    bench_common.print_latency('no wear counters', switch_samples(UncountedHardware, args.iterations))
+    bench_common.print_latency('wear counters', switch_samples(AntennaHardware, args.iterations))
+    
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        print(f"Switch storm ({args.seconds:g}s each)")
+        for label, per_switch in ((f'batched ({args.interval:g}s)', False), ('every switch', True)):
+            switches, writes, written = storm(os.path.join(directory, f'wear-{per_switch}.json'),
+                                              args.seconds, args.interval, per_switch)
+            print(f"  {label:<20} {switches / args.seconds:9.0f} switches/s  "
+                  f"{writes:7d} writes  {written / 1024:9.1f} KiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: set_antenna switch latency and GPIO call count
+Compares the per-device path (one OutputDevice call per relay) with the
+grouped-line backend (one set_values call per write) on a FakeChip.
+
+Also measures repeat selects and relay state polling, which are served
+from the shadow register without touching the chip.
+
+Both paths write to the same fake chip, so the numbers show Python-side
+overhead and the number of chip calls per switch. On the Pi each chip
+call is also a trip through gpiozero/lgpio and the kernel.
+
+Usage:
+  python3 benchmarks/bench_set_antenna.py [--iterations N]
+"""
+
+import argparse
+
+import bench_common
+bench_common.setup()
+
+from antenna_hardware import AntennaHardware
+from gpio_backend import FakeChip, LineGroupBackend, OutputDeviceBackend
+
+
+class FakeOutputDevice:
+    """OutputDevice stand-in: every on()/off() is one single-line chip write"""
+    
+    def __init__(self, chip, pin):
+        self.request = chip.request_lines([pin], 'bench')
+        self.pin = pin
+    
+    def on(self):
+        self.request.set_values({self.pin: True})
+    
+    def off(self):
+        self.request.set_values({self.pin: False})
+    
+    @property
+    def is_active(self):
+        return self.request.get_values([self.pin])[0]
+    
+    def close(self):
+        self.request.release()
+
+
+def run(label, hw, chip, iterations):
+    """Cycle A1→A2→A3 and report latency, calls per switch and transients"""
+    targets = [1, 2, 3]
+    state = {'i': 0}
+    
+    def switch():
+        state['i'] += 1
+        hw.set_antenna(targets[state['i'] % 3])
+    
+    chip.set_calls = 0
+    chip.history = []
+    samples = bench_common.time_calls(switch, iterations)
+    # Intermediate states with no relay energized between two selections
+    transients = sum(1 for levels in chip.history if not any(levels.values()))
+    bench_common.print_latency(label, samples)
+    print(f"  {'':<28} chip calls/switch {chip.set_calls / iterations:.1f}"
+          f"  transient states/switch {transients / iterations:.1f}")
+
+
+def run_polling(label, hw, chip, iterations):
+    """Repeat-select the current antenna and poll relay state (STAT load)"""
+    current = hw.get_current_antenna()
+    
+    def poll():
+        hw.set_antenna(current)
+        hw.get_relay_state(1)
+        hw.get_relay_state(2)
+        hw.get_relay_state(3)
+    
+    chip.set_calls = 0
+    chip.get_calls = 0
+    samples = bench_common.time_calls(poll, iterations)
+    bench_common.print_latency(label, samples)
+    print(f"  {'':<28} chip calls/poll {(chip.set_calls + chip.get_calls) / iterations:.1f}")
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='set_antenna backend benchmark')
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+    
+    pins = [27, 22, 4]
+    print(f"set_antenna benchmark ({args.iterations} switches)")
+    
+    chip = FakeChip()
+    backend = OutputDeviceBackend(pins, device_factory=lambda pin, **kw: FakeOutputDevice(chip, pin))
+    hw = AntennaHardware(backend=backend)
+    run("per-device (OutputDevice)", hw, chip, args.iterations)
+    run_polling("per-device repeat+poll", hw, chip, args.iterations)
+    
+    chip = FakeChip()
+    hw = AntennaHardware(backend=LineGroupBackend(pins, chip=chip))
+    run("line group (set_values)", hw, chip, args.iterations)
+    run_polling("line group repeat+poll", hw, chip, args.iterations)
+
+
+if __name__ == '__main__':
+    main()
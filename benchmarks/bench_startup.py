@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold-start time of the controller entry points
+Starts a fresh interpreter per run (like a script or cron job would) and
+reports the median wall time to import each entry point, next to a bare
+interpreter. -X importtime then lists the slowest imports of each one.
+
+With --budget-ms the run fails (exit 1) if the thin client's median
+start-up exceeds the budget, so CI catches an import that drags
+hardware modules back into it.
+
+Usage:
+  python3 benchmarks/bench_startup.py [--runs N] [--top N] [--budget-ms MS]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import bench_common
+
+# Entry points: label -> statement run in the fresh interpreter
+ENTRY_POINTS = [
+    ('python (bare)', 'pass'),
+    ('antenna_client', 'import antenna_client'),
+    ('antenna_cli', 'import antenna_cli'),
+    ('antenna_daemon', 'import antenna_daemon'),
+]
+
+
+def run(statement, *options):
+    """Run statement in a fresh interpreter with src/ on the path"""
+    env = dict(os.environ, PYTHONPATH=os.path.abspath(bench_common.SRC_DIR))
+    return subprocess.run([sys.executable, *options, '-c', statement],
+                          capture_output=True, text=True, env=env, check=True)
+
+
+def cold_start(statement, runs):
+    """Median wall time in ms of runs fresh interpreters"""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter_ns()
+        run(statement)
+        samples.append(time.perf_counter_ns() - start)
+    return bench_common.percentile(samples, 50) / 1e6
+
+
+def slowest_imports(module, top):
+    """(cumulative us, name) of the slowest modules imported directly by module"""
+    children = []
+    for line in run(f'import {module}', '-X', 'importtime').stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        fields = line[len('import time:'):].split('|')
+        name = fields[2].rstrip()
+        # Children are listed before their parent, two spaces deeper
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 0:
+            if name.strip() == module:
+                return sorted(children, reverse=True)[:top]
+            children = []
+        elif depth == 1:
+            children.append((int(fields[1]), name.strip()))
+    return []
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='Entry point cold-start benchmark')
+    parser.add_argument('--runs', type=int, default=15, help='Fresh interpreters per entry point')
+    parser.add_argument('--top', type=int, default=5, help='Slowest imports listed per entry point')
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help='Fail if antenna_client starts slower than this (median)')
+    args = parser.parse_args()
+    
+    print(f"Cold start, median of {args.runs} fresh interpreters")
+    results = {}
+    for label, statement in ENTRY_POINTS:
+        results[label] = cold_start(statement, args.runs)
+        print(f"  {label:<20} {results[label]:8.1f}ms")
+    for label, _ in ENTRY_POINTS[1:]:
+        print(f"Slowest imports: {label}")
+        for cumulative, name in slowest_imports(label, args.top):
+            print(f"  {name:<28} {cumulative / 1000:8.1f}ms")
+    
+    if args.budget_ms is not None:
+        client = results['antenna_client']
+        if client > args.budget_ms:
+            print(f"✗ antenna_client cold start {client:.1f}ms exceeds the {args.budget_ms:g}ms budget")
+            return 1
+        print(f"✓ antenna_client cold start {client:.1f}ms within the {args.budget_ms:g}ms budget")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cost of persisting the antenna state on every switch
+Compares set_antenna on a fake chip with:
+  - no persistence
+  - state_file.StateFile listener (shared mmap, no syscall)
+  - write() + fsync() of the same record per switch (what it avoids)
+
+Then measures startup restore: open + load the state file and attach
+AntennaHardware to the lines (no relay writes when the state matches).
+
+Usage:
+  python3 benchmarks/bench_state_file.py [--switches N] [--restores N] [--dir DIR]
+"""
+
+import argparse
+import os
+import tempfile
+
+import bench_common
+bench_common.setup()
+
+from antenna_hardware import AntennaHardware
+from gpio_backend import FakeChip, LineGroupBackend
+from state_file import StateFile
+
+PINS = [27, 22, 4]
+
+
+class FsyncState:
+    """Listener that writes and fsyncs a small record per switch"""
+    
+    def __init__(self, path):
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    
+    def record(self, previous, current, source):
+        os.pwrite(self.fd, current.to_bytes(4, 'little'), 0)
+        os.fsync(self.fd)
+    
+    def close(self):
+        os.close(self.fd)
+
+
+def switch_samples(listener, switches):
+    """Per-switch latency (ns) with an optional state listener"""
+    hw = AntennaHardware(backend=LineGroupBackend(PINS, chip=FakeChip()))
+    if listener is not None:
+        hw.add_listener(listener)
+    targets = iter([1, 2, 3] * (switches // 3 + 1))
+    return bench_common.time_calls(lambda: hw.set_antenna(next(targets)), switches)
+
+
+def restore_once(path, chip):
+    """Open the state file and attach to the chip as a restarted controller"""
+    state = StateFile(path)
+    saved = state.load()
+    hw = AntennaHardware(backend=LineGroupBackend(PINS, chip=chip, attach=True), attach=True,
+                         initial=saved.antenna if saved else None)
+    state.close()
+    return hw
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='State persistence benchmark')
+    parser.add_argument('--switches', type=int, default=20000)
+    parser.add_argument('--restores', type=int, default=2000)
+    parser.add_argument('--dir', default=None, help='Directory for the state files (default: temp)')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        path = os.path.join(directory, 'state')
+        print(f"Per switch ({args.switches} switches, fake chip)")
+        bench_common.print_latency('no persistence', switch_samples(None, args.switches))
+        state = StateFile(path)
+        bench_common.print_latency('StateFile (mmap)', switch_samples(state.record, args.switches))
+        state.close()
+        fsync = FsyncState(os.path.join(directory, 'fsync'))
+        count = min(args.switches, 2000)
+        bench_common.print_latency('write + fsync', switch_samples(fsync.record, count))
+        fsync.close()
+        
+        chip = FakeChip()
+        hw = AntennaHardware(backend=LineGroupBackend(PINS, chip=chip))
+        state = StateFile(path)
+        hw.add_listener(state.record)
+        hw.set_antenna(2)
+        hw.cleanup(hold=True)
+        state.close()
+        writes = chip.set_calls
+        print(f"Startup restore ({args.restores} restarts)")
+        bench_common.print_latency('open + load + attach',
+                                   bench_common.time_calls(lambda: restore_once(path, chip), args.restores))
+        print(f"  relay writes during restores: {chip.set_calls - writes}")
+
+
+if __name__ == '__main__':
+    main()
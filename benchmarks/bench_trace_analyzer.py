@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark: vectorized analysis of a day-long edge trace
+Synthesizes a multi-million-edge trace with NumPy (bouncy presses, RF
+spikes that cluster while a PTT line is active) in the edge_trace
+format and runs trace_analyzer.analyze over it.
+
+Reports the synthesis size, analysis wall time and the peak resident
+memory of a fresh process that only runs the analysis (the trace itself
+is memory-mapped and only paged in as it is scanned).
+
+Usage:
+  python3 benchmarks/bench_trace_analyzer.py [--hours H] [--spikes-per-s N] [--trace FILE]
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+import bench_common
+bench_common.setup()
+
+import trace_analyzer
+from edge_trace import FLAG_ACTIVE, FLAG_SNAPSHOT, HEADER, MAGIC, RECORD, VERSION
+from trace_analyzer import analyze, format_analysis, np
+
+MS = 1000000
+BUTTON_PIN = 17
+TX_PIN = 24
+
+
+def synthesize(path, hours, spikes_per_s, seed=1):
+    """Write a trace of presses, RF spikes and PTT periods; return edge count"""
+    rng = np.random.default_rng(seed)
+    end = int(hours * 3600e9)
+    
+    # Transmit 2 minutes in every 10
+    tx_starts = np.arange(0, end, 10 * 60000 * MS, dtype=np.int64)
+    tx_ends = tx_starts + 2 * 60000 * MS
+    
+    # Presses every ~20s, each with a few 0.2ms bounce pairs on make and break
+    press = np.arange(1000 * MS, end, 20000 * MS, dtype=np.int64)
+    bounce = 200000 * np.arange(1, 7, dtype=np.int64)
+    make = (press[:, None] + np.concatenate(([0], bounce))).ravel()
+    release = (press[:, None] + 150 * MS + np.concatenate(([0], bounce))).ravel()
+    make_level = np.tile(np.arange(7) % 2 == 0, len(press))
+    release_level = ~make_level
+    
+    # RF spikes of 10-500us, five times denser while transmitting
+    count = int(spikes_per_s * hours * 3600)
+    spikes = np.sort(rng.integers(0, end, count))
+    idx = np.searchsorted(tx_starts, spikes, side='right') - 1
+    in_tx = spikes < tx_ends[idx]
+    spikes = spikes[in_tx | (rng.random(count) < 0.2)]
+    widths = rng.integers(10000, 500000, len(spikes))
+    
+    times = np.concatenate((make, release, spikes, spikes + widths, tx_starts, tx_ends))
+    pins = np.concatenate((np.full(len(make) + len(release) + 2 * len(spikes), BUTTON_PIN),
+                           np.full(2 * len(tx_starts), TX_PIN))).astype(np.uint8)
+    active = np.concatenate((make_level, release_level, np.ones(len(spikes), bool),
+                             np.zeros(len(spikes), bool), np.ones(len(tx_starts), bool),
+                             np.zeros(len(tx_ends), bool)))
+    order = np.argsort(times, kind='stable')
+    
+    dtype = np.dtype([('timestamp_ns', '<u8'), ('pin', 'u1'), ('flags', 'u1')])
+    records = np.empty(2 + len(times), dtype)
+    records[:2] = [(0, BUTTON_PIN, FLAG_SNAPSHOT), (0, TX_PIN, FLAG_SNAPSHOT)]
+    records['timestamp_ns'][2:] = times[order]
+    records['pin'][2:] = pins[order]
+    records['flags'][2:] = np.where(active[order], FLAG_ACTIVE, 0)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, time.time_ns(), 0))
+        records.tofile(f)
+    return len(times)
+
+
+def run_analysis(path):
+    """Analyze and print (runs in its own process for a clean peak RSS)"""
+    start = time.perf_counter()
+    analysis = analyze(path, BUTTON_PIN, tx_pin=TX_PIN)
+    elapsed = time.perf_counter() - start
+    for line in format_analysis(analysis):
+        print(line)
+    print(f"Analysis: {elapsed:.2f}s ({analysis.edges / elapsed / 1e6:.1f}M edges/s), "
+          f"peak RSS {peak_rss_kib() / 1024:.0f} MiB")
+
+
+def peak_rss_kib():
+    """Peak RSS of this process (VmHWM; ru_maxrss survives fork+exec)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='Edge trace analyzer benchmark')
+    parser.add_argument('--hours', type=float, default=24.0, help='Synthetic trace length')
+    parser.add_argument('--spikes-per-s', type=float, default=50.0, help='Mean RF spikes per second')
+    parser.add_argument('--trace', help='Analyze this recorded trace instead of a synthetic one')
+    args = parser.parse_args()
+    trace_analyzer._require_numpy()
+    
+    path = args.trace
+    if path is None:
+        fd, path = tempfile.mkstemp(suffix='.trace')
+        os.close(fd)
+        count = synthesize(path, args.hours, args.spikes_per_s)
+        print(f"Synthetic trace: {count:,} edges over {args.hours:g}h "
+              f"({os.path.getsize(path) / 1048576:.0f} MiB)")
+    try:
+        child = multiprocessing.get_context('spawn').Process(target=run_analysis, args=(path,))
+        child.start()
+        child.join()
+    finally:
+        if args.trace is None:
+            os.unlink(path)
+
+
+if __name__ == '__main__':
+    main()
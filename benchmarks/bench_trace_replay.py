@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark: score every debounce engine against a long noisy edge trace
+Synthesizes a field-like trace (presses with random contact bounce plus
+RF spikes on the idle line), writes it with edge_trace.TraceWriter and
+replays it on the virtual clock through ButtonHandler per engine.
+
+Reports missed presses, double triggers, spurious presses and latency
+per engine, and how much faster than real time the replay ran.
+
+Usage:
+  python3 benchmarks/bench_trace_replay.py [--hours H] [--press-every S] [--trace FILE]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+
+import bench_common
+bench_common.setup()
+
+from debounce import DEBOUNCERS, make_debouncer
+from edge_source import Edge
+from edge_trace import TraceWriter, format_report, read_trace, replay
+
+MS = 1000000
+
+
+def synthesize(path, hours, press_every, seed=1):
+    """Write a trace of bouncy presses with RF spikes in between"""
+    rng = random.Random(seed)
+    edges = []
+    t = 100 * MS
+    end = int(hours * 3600e9)
+    while t < end:
+        # Press: make bounce, hold, break bounce (tail up to ~6ms)
+        for level, hold in ((True, rng.randint(60, 400) * MS), (False, 0)):
+            bounces = rng.randint(0, 6)
+            for _ in range(bounces):
+                edges.append(Edge(t, level, 17))
+                t += rng.randint(50000, 1000000)
+                edges.append(Edge(t, not level, 17))
+                t += rng.randint(50000, 1000000)
+            edges.append(Edge(t, level, 17))
+            t += hold
+        # Idle line with a few RF spikes (10-500us) before the next press
+        idle_end = t + int(rng.expovariate(1 / press_every) * 1e9) + 200 * MS
+        for _ in range(rng.randint(0, 3)):
+            spike = rng.randint(t + 50 * MS, idle_end - 50 * MS)
+            edges.append(Edge(spike, True, 17))
+            edges.append(Edge(spike + rng.randint(10000, 500000), False, 17))
+        edges.sort()
+        t = idle_end
+    writer = TraceWriter(path, {17: False})
+    writer.write(edges)
+    writer.close()
+    return len(edges)
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='Debounce engine trace replay benchmark')
+    parser.add_argument('--hours', type=float, default=1.0, help='Synthetic trace length')
+    parser.add_argument('--press-every', type=float, default=5.0, help='Mean seconds between presses')
+    parser.add_argument('--trace', help='Replay this recorded trace instead of a synthetic one')
+    args = parser.parse_args()
+    
+    path = args.trace
+    if path is None:
+        fd, path = tempfile.mkstemp(suffix='.trace')
+        os.close(fd)
+        count = synthesize(path, args.hours, args.press_every)
+        print(f"Synthetic trace: {count} edges over {args.hours:g}h "
+              f"({os.path.getsize(path) / 1024:.0f} KiB)")
+    try:
+        trace = read_trace(path)
+        for name in DEBOUNCERS:
+            report = replay(trace, make_debouncer(name))
+            speedup = report.duration_ns / 1e9 / report.elapsed_s
+            print(f"  {format_report(name, report)}  {report.elapsed_s:.2f}s ({speedup:,.0f}x real time)")
+    finally:
+        if args.trace is None:
+            os.unlink(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cost of the tracing hooks
+Times handle_command (with its set_antenna) on a fake chip with tracing
+off, and with a tracer feeding each exporter: in-memory ring, JSON lines
+and Chrome trace events.
+
+Usage:
+  python3 benchmarks/bench_tracing.py [--iterations N] [--dir DIR]
+"""
+
+import argparse
+import os
+import tempfile
+
+import bench_common
+bench_common.setup()
+
+from antenna_hardware import AntennaHardware
+from gpio_backend import FakeChip, LineGroupBackend
+from ssh_command_handler import SSHCommandHandler
+from tracing import ChromeTraceExporter, JsonLinesExporter, RingExporter, Tracer
+
+
+def time_commands(tracer, iterations):
+    """handle_command latency cycling A1..A3 with an optional tracer"""
+    hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip()))
+    handler = SSHCommandHandler(hw)
+    hw.tracer = handler.tracer = tracer
+    commands = iter(['A1', 'A2', 'A3'] * (iterations // 3 + 200))
+    bench_common.time_calls(lambda: handler.handle_command(next(commands)), 100)
+    samples = bench_common.time_calls(lambda: handler.handle_command(next(commands)), iterations)
+    if tracer is not None:
+        tracer.close()
+    return samples
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='Tracing hook benchmark')
+    parser.add_argument('--iterations', type=int, default=20000)
+    parser.add_argument('--dir', default=None, help='Directory for trace files (e.g. on the SD card)')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmpdir:
+        print(f"handle_command latency ({args.iterations} commands)")
+        off = time_commands(None, args.iterations)
+        bench_common.print_latency('tracing off', off)
+        for label, exporter in (
+            ('ring', RingExporter()),
+            ('JSON lines', JsonLinesExporter(os.path.join(tmpdir, 'trace.jsonl'))),
+            ('Chrome trace', ChromeTraceExporter(os.path.join(tmpdir, 'trace.json'))),
+        ):
+            bench_common.print_latency(label, time_commands(Tracer(exporter), args.iterations))
+        print(f"  trace files: JSON lines {os.path.getsize(os.path.join(tmpdir, 'trace.jsonl')) // 1024} KiB, "
+              f"Chrome {os.path.getsize(os.path.join(tmpdir, 'trace.json')) // 1024} KiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark: UDP datagram-to-relay latency
+Sends OP_SELECT datagrams to the daemon's UDP endpoint on loopback and
+measures the time from sendto() until the relay write lands (seen by a
+hardware state-change listener) and until the reply arrives.
+
+Usage:
+  python3 benchmarks/bench_udp.py [--iterations N]
+"""
+
+import argparse
+import time
+
+import bench_common
+bench_common.setup()
+
+from antenna_daemon import AntennaDaemon
+from antenna_hardware import AntennaHardware
+from gpio_backend import FakeChip, LineGroupBackend
+from ssh_command_handler import SSHCommandHandler
+from udp_protocol import UDPControlClient
+import bench_daemon_latency
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='UDP datagram-to-relay latency benchmark')
+    parser.add_argument('--iterations', type=int, default=5000)
+    args = parser.parse_args()
+    
+    hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip()))
+    daemon = AntennaDaemon(SSHCommandHandler(hw), port=0, udp_port=0)
+    daemon, loop = bench_daemon_latency.start_daemon(daemon)
+    
+    switched = []
+    hw.add_listener(lambda previous, current, source: switched.append(time.perf_counter_ns()))
+    
+    client = UDPControlClient('127.0.0.1', daemon.udp_port, timeout=1)
+    to_relay = []
+    round_trip = []
+    for i in range(args.iterations):
+        switched.clear()
+        start = time.perf_counter_ns()
+        # A2, A3, A1, ... - hardware starts on A1, so every request switches
+        client.select((i + 1) % 3 + 1)
+        done = time.perf_counter_ns()
+        round_trip.append(done - start)
+        if switched:
+            to_relay.append(switched[0] - start)
+    
+    print(f"UDP control latency ({args.iterations} datagrams, loopback)")
+    bench_common.print_latency("datagram -> relay write", to_relay)
+    bench_common.print_latency("datagram -> reply", round_trip)
+    for pct in (50, 90, 99, 99.9):
+        print(f"  p{pct:<5} to relay {bench_common.percentile(to_relay, pct) / 1000:8.2f}us")
+    
+    client.close()
+    bench_daemon_latency.stop_daemon(daemon, loop)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Unix domain socket control vs TCP vs the SSH path
+Starts AntennaDaemon with fake-chip hardware and times warm round trips
+on the Unix socket and on loopback TCP. The per-command SSH path is
+bounded from below by a fresh interpreter per command; pass --ssh to
+also time a real 'ssh TARGET STAT' (key auth, ForceCommand setup).
+
+Usage:
+  python3 benchmarks/bench_unix_socket.py [--iterations N] [--cold N] [--ssh user@host]
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import tempfile
+import time
+
+import bench_common
+bench_common.setup()
+
+from antenna_daemon import AntennaDaemon
+from antenna_hardware import AntennaHardware
+from bench_daemon_latency import bench_cold, bench_warm, start_daemon, stop_daemon
+from gpio_backend import FakeChip, LineGroupBackend
+from ssh_command_handler import SSHCommandHandler
+
+
+def bench_unix(path, iterations):
+    """Round trips on one persistent Unix socket connection"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(path)
+    stream = sock.makefile('rb')
+    commands = [b'A1\n', b'A2\n', b'STAT\n', b'A3\n']
+    state = {'i': 0}
+    
+    def round_trip():
+        state['i'] += 1
+        sock.sendall(commands[state['i'] % 4])
+        stream.readline()
+    
+    bench_common.time_calls(round_trip, 200)  # warm up
+    samples = bench_common.time_calls(round_trip, iterations)
+    sock.close()
+    return samples
+
+
+def bench_ssh(target, iterations):
+    """One ssh session per command (the original control path)"""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter_ns()
+        subprocess.run(['ssh', '-o', 'BatchMode=yes', target, 'STAT'], check=True,
+                       stdout=subprocess.DEVNULL)
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='Unix socket control latency benchmark')
+    parser.add_argument('--iterations', type=int, default=5000)
+    parser.add_argument('--cold', type=int, default=5,
+                        help='Per-command process starts to time (0 to skip)')
+    parser.add_argument('--ssh', metavar='TARGET', default=None,
+                        help='Also time real SSH sessions to this target')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'antenna.sock')
+        hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip()))
+        daemon, loop = start_daemon(AntennaDaemon(SSHCommandHandler(hw), port=0, unix_path=path))
+        
+        print(f"Warm round trips ({args.iterations} commands)")
+        bench_common.print_latency("unix socket", bench_unix(path, args.iterations))
+        bench_common.print_latency("tcp loopback", bench_warm(daemon.port, args.iterations))
+        
+        if args.cold:
+            print(f"Per-command interpreter start ({args.cold} runs, SSH path lower bound)")
+            bench_common.print_latency("cold process", bench_cold(args.cold))
+        
+        if args.ssh:
+            print(f"SSH session per command ({args.cold or 5} runs)")
+            bench_common.print_latency("ssh", bench_ssh(args.ssh, args.cold or 5))
+        
+        stop_daemon(daemon, loop)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark: WATCH fan-out vs STAT polling
+Measures the cost that subscribers add to the relay switch (set_antenna
+on the button thread) and how long events take to reach every subscriber,
+then compares daemon work against clients polling STAT.
+
+Subscribers are reader threads in this same process, so their GIL
+contention shows up in the "N watchers" set_antenna numbers; on the Pi
+the subscribers are remote and the switch path only pays for one
+call_soon_threadsafe().
+
+Usage:
+  python3 benchmarks/bench_watch.py [--subscribers N] [--switches N]
+"""
+
+import argparse
+import socket
+import threading
+import time
+
+import bench_common
+bench_common.setup()
+
+from bench_daemon_latency import start_daemon, stop_daemon
+
+
+def connect(port):
+    """Open a loopback connection with a line reader"""
+    sock = socket.create_connection(('127.0.0.1', port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock, sock.makefile('rb')
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='WATCH fan-out benchmark')
+    parser.add_argument('--subscribers', type=int, default=50)
+    parser.add_argument('--switches', type=int, default=500)
+    args = parser.parse_args()
+    
+    daemon, loop = start_daemon()
+    hw = daemon.handler.hardware
+    
+    # Switch cost with no subscribers
+    targets = [1, 2, 3]
+    baseline = []
+    for i in range(args.switches):
+        start = time.perf_counter_ns()
+        hw.set_antenna(targets[i % 3], source='button')
+        baseline.append(time.perf_counter_ns() - start)
+    
+    subscribers = [connect(daemon.port) for _ in range(args.subscribers)]
+    for sock, stream in subscribers:
+        sock.sendall(b'WATCH\n')
+        stream.readline()
+    
+    # Every subscriber records when it sees each event
+    arrivals = [[] for _ in subscribers]
+    
+    def reader(index, stream):
+        for _ in range(args.switches):
+            stream.readline()
+            arrivals[index].append(time.perf_counter_ns())
+    
+    threads = [threading.Thread(target=reader, args=(i, s[1])) for i, s in enumerate(subscribers)]
+    for thread in threads:
+        thread.start()
+    
+    switch_times = []
+    sent = []
+    for i in range(args.switches):
+        start = time.perf_counter_ns()
+        hw.set_antenna(targets[i % 3], source='button')
+        switch_times.append(time.perf_counter_ns() - start)
+        sent.append(start)
+        time.sleep(0.001)
+    
+    for thread in threads:
+        thread.join()
+    
+    delivery = [arrival[i] - sent[i] for arrival in arrivals for i in range(args.switches)]
+    
+    print(f"WATCH fan-out ({args.subscribers} subscribers, {args.switches} switches)")
+    bench_common.print_latency("set_antenna, 0 watchers", baseline)
+    bench_common.print_latency(f"set_antenna, {args.subscribers} watchers", switch_times)
+    bench_common.print_latency("event delivery", delivery)
+    print(f"  dropped events: {daemon.dropped_events}")
+    
+    # Equivalent polling load: every client polls STAT every 100 ms
+    sock, stream = connect(daemon.port)
+    polls = []
+    for _ in range(1000):
+        start = time.perf_counter_ns()
+        sock.sendall(b'STAT\n')
+        stream.readline()
+        polls.append(time.perf_counter_ns() - start)
+    mean_poll = sum(polls) / len(polls)
+    print(f"  polling STAT at 10 Hz from {args.subscribers} clients: "
+          f"{args.subscribers * 10} requests/s, ~{args.subscribers * 10 * mean_poll / 1e7:.1f}% "
+          f"of one core in round trips; WATCH sends only on change")
+    
+    stop_daemon(daemon, loop)
+
+
+if __name__ == '__main__':
+    main()
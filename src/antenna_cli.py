@@ -2,62 +2,110 @@
 """
 Antenna Controller - Interactive CLI Interface
 Simple command-line interface for testing antenna control system
+
+Batch mode (--batch) is for scripts: commands are read from a file or
+stdin and run in one hardware session, and each command gets one JSON
+line on stdout instead of the banner and status box:
+  {"command": "A2", "ok": true, "response": "Status: A2", "antenna": 2}
+The last selected antenna stays selected when the batch ends; Ctrl+C
+stops the batch with exit status 130.
+
+Dashboard mode (--dashboard) is a full-screen live view that also shows
+button presses and switch statistics (see dashboard.py).
+
+Usage:
+  python3 antenna_cli.py --mode 3
+  python3 antenna_cli.py --dashboard
+  printf 'A2\nSTAT\n' | python3 antenna_cli.py --batch
+  python3 antenna_cli.py --batch contest.txt --no-button
 """
 
 import sys
+import json
 import signal
 import argparse
 from antenna_hardware import AntennaHardware
+from command_actor import CommandActor, POLICY_ALL, POLICY_LATEST
 from ssh_command_handler import SSHCommandHandler
 from button_handler import ButtonHandler
 
-# Use modern lgpio
-from gpiozero import Device
-from gpiozero.pins.lgpio import LGPIOFactory
-Device.pin_factory = LGPIOFactory()
+
+# Commands that end the interactive prompt or a batch
+QUIT_COMMANDS = ('QUIT', 'EXIT', 'Q')
 
 
 class AntennaControllerCLI:
     """Interactive CLI for antenna control"""
     
-    def __init__(self, antenna_count=3):
+    def __init__(self, antenna_count=3, settle_time=0.01, hardware=None, button=True, log=None,
+                 signals=True):
         """Initialize hardware and handlers
         
         Args:
             antenna_count (int): Number of antennas to cycle through (2 or 3)
+            settle_time (float): Relay settle time in seconds - targets that
+                                 arrive within it are coalesced (0 = off)
+            hardware: AntennaHardware to use (default: the GPIO relays)
+            button (bool): Claim the physical button GPIO
+            log: Stream for progress messages (default: stdout; batch
+                 mode uses stderr so stdout carries only responses)
+            signals (bool): Clean up and exit on SIGINT/SIGTERM (batch mode
+                            handles KeyboardInterrupt itself instead)
         """
         self.antenna_count = antenna_count
-        print("Initializing Antenna Controller...")
+        self.log = log or sys.stdout
+        self.button_handler = None
+        self._cleaned_up = False
+        print("Initializing Antenna Controller...", file=self.log)
         
         try:
-            self.hw = AntennaHardware()
-            self.ssh_handler = SSHCommandHandler(self.hw)
-            self.button_handler = ButtonHandler(self.hw, antenna_count=antenna_count)
+            self.hw = hardware if hardware is not None else AntennaHardware()
+            # Button and typed commands are both applied by the actor thread
+            self.actor = CommandActor(self.hw,
+                                      policy=POLICY_LATEST if settle_time > 0 else POLICY_ALL,
+                                      settle_time=settle_time)
+            self.actor.start()
+            self.ssh_handler = SSHCommandHandler(self.actor)
+            if button:
+                self.button_handler = ButtonHandler(self.hw, antenna_count=antenna_count,
+                                                    actor=self.actor)
             
             # Setup signal handler for clean shutdown
-            signal.signal(signal.SIGINT, self._signal_handler)
-            signal.signal(signal.SIGTERM, self._signal_handler)
-            
-            print("✓ Hardware initialized")
-            print("✓ Button handler active (GPIO 17)")
-            print("✓ Ready for commands\n")
+            if signals:
+                signal.signal(signal.SIGINT, self._signal_handler)
+                signal.signal(signal.SIGTERM, self._signal_handler)
             
+            print("✓ Hardware initialized", file=self.log)
+            if self.button_handler is not None:
+                print("✓ Button handler active (GPIO 17)", file=self.log)
+            print("✓ Ready for commands\n", file=self.log)
+        
         except Exception as e:
-            print(f"✗ Initialization failed: {e}")
+            print(f"✗ Initialization failed: {e}", file=self.log)
             sys.exit(1)
     
     def _signal_handler(self, sig, frame):
         """Handle Ctrl+C and termination signals"""
-        print("\n\nShutting down...")
+        print("\n\nShutting down...", file=self.log)
         self.cleanup()
         sys.exit(0)
     
-    def cleanup(self):
-        """Clean up resources"""
-        print("Cleaning up GPIO...")
-        self.button_handler.cleanup()
-        self.hw.cleanup()
-        print("✓ Cleanup complete")
+    def cleanup(self, hold=False):
+        """
+        Clean up resources (only the first call does anything)
+        
+        Args:
+            hold (bool): Leave the selected antenna's relay energized
+        """
+        if self._cleaned_up:
+            return
+        self._cleaned_up = True
+        print("Cleaning up GPIO...", file=self.log)
+        if self.button_handler is not None:
+            self.button_handler.cleanup()
+        self.actor.stop()
+        self.hw.cleanup(hold=hold)
+        print("✓ Cleanup complete", file=self.log)
     
     def print_banner(self):
         """Print welcome banner"""
@@ -88,7 +136,7 @@ class AntennaControllerCLI:
     
     def print_status(self):
         """Print current system status"""
-        current = self.hw.get_current_antenna()
+        current = self.actor.get_current_antenna()
         
         print("\n" + "─" * 40)
         print("Current Status:")
@@ -136,7 +184,7 @@ class AntennaControllerCLI:
                 # Check for local commands first
                 cmd_upper = command.upper()
                 
-                if cmd_upper in ['QUIT', 'EXIT', 'Q']:
+                if cmd_upper in QUIT_COMMANDS:
                     print("\nExiting...")
                     self.cleanup()
                     break
@@ -161,7 +209,7 @@ class AntennaControllerCLI:
                 # Show status after state changes (not for STAT query)
                 if cmd_upper != 'STAT':
                     self.print_status()
-                
+            
             except EOFError:
                 # Handle Ctrl+D
                 print("\nExiting...")
@@ -170,9 +218,65 @@ class AntennaControllerCLI:
             
             except Exception as e:
                 print(f"  ✗ Error: {e}")
+    
+    def run_dashboard(self):
+        """Full-screen live dashboard until 'q' (see dashboard.py)"""
+        from dashboard import Dashboard, curses
+        if curses is None:
+            raise RuntimeError("the dashboard needs the curses module")
+        dashboard = Dashboard(self.actor, self.ssh_handler, self.button_handler, self.antenna_count)
+        curses.wrapper(dashboard.run)
+        self.cleanup()
+    
+    def run_batch(self, stream, out=None):
+        """
+        Non-interactive loop: run every command in stream, one JSON line each
+        
+        Lines may hold several ';'-separated commands; blank lines and
+        lines starting with '#' are skipped and QUIT ends the batch.
+        Responses are flushed per input line when reading a pipe, so a
+        script can drive the CLI as a co-process.
+        
+        Args:
+            stream: Text stream of commands (file or sys.stdin)
+            out: Text stream for the JSON lines (default: stdout)
+        
+        Returns:
+            int: Exit status - 0 if every command succeeded, 1 otherwise
+        """
+        out = out or sys.stdout
+        try:
+            interactive = not stream.seekable()
+        except (AttributeError, OSError):
+            interactive = True
+        failed = False
+        
+        for line in stream:
+            text = line.strip()
+            if not text or text.startswith('#'):
+                continue
+            for command in text.split(';'):
+                command = command.strip()
+                if not command:
+                    continue
+                if command.upper() in QUIT_COMMANDS:
+                    out.flush()
+                    return 1 if failed else 0
+                try:
+                    response = self.ssh_handler.handle_command(command)
+                except Exception as e:
+                    response = f"ERROR: {e}"
+                ok = not response.startswith('ERROR')
+                failed = failed or not ok
+                out.write(json.dumps({'command': command, 'ok': ok, 'response': response,
+                                      'antenna': self.actor.get_current_antenna()}) + '\n')
+            if interactive:
+                out.flush()
+        out.flush()
+        return 1 if failed else 0
 
 
-def main():
+def main(argv=None):
     """Entry point"""
     # Parse command-line arguments
     parser = argparse.ArgumentParser(
@@ -186,11 +290,41 @@ def main():
         default=3,
         help='Number of antennas to cycle through with button (default: 3)'
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        '--settle-ms',
+        type=float,
+        default=10.0,
+        help='Relay settle time; newer targets within it replace older ones (0 = off)'
+    )
+    parser.add_argument(
+        '--batch',
+        nargs='?',
+        const='-',
+        metavar='FILE',
+        help='Run commands from FILE (default: stdin), one JSON response line each'
+    )
+    parser.add_argument(
+        '--dashboard',
+        action='store_true',
+        help='Full-screen live status, updated on every change'
+    )
+    parser.add_argument(
+        '--no-button',
+        action='store_true',
+        help='Do not claim the physical button GPIO'
+    )
+    args = parser.parse_args(argv)
+    
+    if args.batch is not None:
+        return _batch_main(args)
     
     try:
-        cli = AntennaControllerCLI(antenna_count=args.mode)
-        cli.run()
+        cli = AntennaControllerCLI(antenna_count=args.mode, settle_time=args.settle_ms / 1000,
+                                   button=not args.no_button)
+        if args.dashboard:
+            cli.run_dashboard()
+        else:
+            cli.run()
     except KeyboardInterrupt:
         print("\n\nInterrupted. Exiting...")
     except Exception as e:
@@ -198,5 +332,25 @@ def main():
         sys.exit(1)
 
 
+def _batch_main(args):
+    """Batch mode: one hardware session, JSON lines on stdout, logs on stderr"""
+    try:
+        stream = sys.stdin if args.batch == '-' else open(args.batch)
+    except OSError as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 2
+    cli = AntennaControllerCLI(antenna_count=args.mode, settle_time=args.settle_ms / 1000,
+                               button=not args.no_button, log=sys.stderr, signals=False)
+    try:
+        return cli.run_batch(stream)
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        # A script's last selection is its result - keep it on the relays
+        cli.cleanup(hold=True)
+        if stream is not sys.stdin:
+            stream.close()
+
+
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    sys.exit(main())
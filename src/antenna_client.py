@@ -0,0 +1,89 @@
+# src/antenna_client.py
+"""
+Antenna Client - Thin Command-Line Client for a Running Controller
+Sends commands to antenna_daemon.py over TCP or its Unix socket and
+prints the responses
+
+Only the standard library's socket and argparse are imported - no
+gpiozero, no hardware modules, no asyncio - so a call from a script,
+cron job or shell alias costs little more than interpreter start-up.
+The commands are written in one go followed by QUIT, and the responses
+are read until the daemon closes the connection: one round trip.
+
+Usage:
+  python3 antenna_client.py A2
+  python3 antenna_client.py --host pi-antenna.local A1 STAT
+  python3 antenna_client.py --unix /run/antenna-controller.sock OFF
+
+Exit status: 0 on success, 1 if any response is an ERROR, 2 if the
+daemon could not be reached.
+"""
+
+import argparse
+import socket
+import sys
+
+# Same defaults as antenna_daemon.py (not imported from there: it pulls
+# in asyncio and the hardware modules' import chain)
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 4550
+
+
+def send(commands, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None, timeout=5.0):
+    """
+    Run commands on the daemon in one round trip
+    
+    Args:
+        commands: Command strings (each may be a ';' batch)
+        host (str): Daemon address (TCP)
+        port (int): Daemon TCP port
+        unix_path (str): Daemon Unix socket path (used instead of TCP)
+        timeout (float): Seconds to wait for the connection and responses
+    
+    Returns:
+        list: Response lines, in command order
+    
+    Raises:
+        OSError: Daemon not reachable or connection timed out
+    """
+    if unix_path is not None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    else:
+        sock = socket.create_connection((host, port), timeout=timeout)
+    with sock:
+        if unix_path is not None:
+            sock.settimeout(timeout)
+            sock.connect(unix_path)
+        sock.sendall(''.join(f"{command}\n" for command in commands).encode('utf-8') + b'QUIT\n')
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return b''.join(chunks).decode('utf-8', 'replace').splitlines()
+
+
+def main(argv=None):
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='Send commands to a running antenna controller')
+    parser.add_argument('commands', nargs='*', metavar='COMMAND',
+                        help='A1..An, OFF, STAT, DEBOUNCE or a ";" batch (default: STAT)')
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'Daemon address (default: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Daemon port (default: {DEFAULT_PORT})')
+    parser.add_argument('--unix', metavar='PATH', default=None, help='Daemon Unix socket instead of TCP')
+    parser.add_argument('--timeout', type=float, default=5.0, help='Seconds to wait (default: 5)')
+    args = parser.parse_args(argv)
+    
+    try:
+        responses = send(args.commands or ['STAT'], args.host, args.port, args.unix, args.timeout)
+    except OSError as e:
+        print(f"✗ Cannot reach the antenna controller: {e}", file=sys.stderr)
+        return 2
+    for response in responses:
+        print(response)
+    return 1 if any(response.startswith('ERROR') for response in responses) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,569 @@
+# src/antenna_daemon.py
+"""
+Antenna Controller Daemon - Persistent Control Server
+Owns AntennaHardware once and serves SSHCommandHandler commands over TCP
+
+Avoids the per-session cost of SSH login + interpreter start + gpiozero
+import + AntennaHardware() init (which also snapped the relays to A1).
+
+Line protocol (UTF-8, newline terminated):
+  client: A2\\n
+  server: Status: A2\\n
+  client: A1;A2;STAT\\n     (batch - one response line per command)
+  server: Status: A1\\nStatus: A2\\nStatus: A2\\n
+  client: QUIT\\n           (server closes the connection)
+
+Clients may pipeline: send many lines without waiting for each response.
+
+Subscriptions (instead of polling STAT):
+  client: WATCH\\n
+  server: Status: A1\\n                  (current state)
+  server: EVENT 7 A2 button\\n           (pushed on every antenna change)
+  client: UNWATCH\\n
+  server: OK\\n
+Events carry a daemon-wide sequence number; a gap means events were
+dropped because that subscriber was not reading fast enough.
+
+Button debounce status (one line per button):
+  client: DEBOUNCE\\n
+  server: Debounce: GPIO17 adaptive window=3.0ms tail=2.0ms bursts=41\\n
+
+Relay wear (one line per relay, see relay_wear.py):
+  client: WEAR\\n
+  server: Wear: A1 cycles=1234 on=812.4h\\n
+  server: Wear: A2 cycles=100512 on=95.0h ALERT cycles\\n
+
+Binary UDP control (see udp_protocol.py) is served on --udp-port.
+
+On-box scripts (cron, lightning detector, band decoder) can use the same
+line protocol on a Unix domain socket (--unix PATH) without claiming any
+GPIO themselves. The caller is identified from the kernel peer
+credentials (SO_PEERCRED); --allow-uid restricts who may connect, and
+changes are reported to WATCH subscribers with source 'unix:<uid>'.
+
+Switches are applied on the daemon's asyncio loop (command_actor.LoopActor),
+so a network command never blocks the loop while the relays settle and a
+burst of network commands is coalesced like button presses are.
+
+Event loop mode (--event-loop): button edges (the GPIO edge fd) and
+debounce/gesture deadlines are dispatched on that loop too. No edge
+thread, no locks and no cross-thread wake-ups on the button or network
+path; only the band follower and gpiozero fallback hand commands over
+from a thread.
+
+Metrics (--metrics-port PORT): switch counts, set_antenna, button and
+command latency histograms in the Prometheus text format on
+http://127.0.0.1:PORT/metrics (see metrics.py).
+
+Tracing (--trace PATH): one span per request line with child spans for
+the command and the relay writes, written as Chrome trace events
+(PATH ending in .json) or JSON lines (see tracing.py).
+
+Usage:
+  python3 antenna_daemon.py [--host 127.0.0.1] [--port 4550] [--udp-port 4551]
+                            [--unix /run/antenna-controller.sock] [--mode 3]
+
+Client example:
+  printf 'A2\\nSTAT\\n' | nc -q1 pi-antenna.local 4550
+"""
+
+import argparse
+import asyncio
+import copy
+import os
+import signal
+import socket
+import struct
+import threading
+
+from udp_protocol import UDPControlProtocol
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 4550
+DEFAULT_UDP_PORT = 4551
+DEFAULT_UNIX_PATH = '/run/antenna-controller.sock'
+
+# struct ucred from SO_PEERCRED: pid, uid, gid
+_UCRED = struct.Struct('3i')
+
+
+class AntennaDaemon:
+    """asyncio TCP server wrapping an SSHCommandHandler"""
+    
+    # Connection-level commands handled by the daemon itself
+    QUIT_COMMANDS = ('QUIT', 'EXIT')
+    
+    # Unsent bytes allowed per subscriber before its events are dropped
+    WATCH_BUFFER_LIMIT = 16384
+    
+    def __init__(self, handler, host=DEFAULT_HOST, port=DEFAULT_PORT, collapse=False,
+                 udp_port=None, unix_path=None, allowed_uids=None, button=None, tracer=None,
+                 wear=None):
+        """
+        Initialize daemon with a command handler
+        
+        Args:
+            handler: SSHCommandHandler instance (owns the hardware)
+            host (str): Address to listen on ('0.0.0.0' for all interfaces)
+            port (int): TCP port (0 = pick a free port, see self.port)
+            collapse (bool): Collapse redundant switches inside ';' batches
+            udp_port (int): UDP port for the binary protocol
+                            (None = disabled, 0 = pick a free port)
+            unix_path (str): Unix domain socket path (None = disabled)
+            allowed_uids: Iterable of uids allowed on the Unix socket
+                          (None = anyone the socket file mode lets in)
+            button: Optional ButtonHandler reported by DEBOUNCE
+            tracer: Optional tracing.Tracer (one span per request line)
+            wear: Optional relay_wear.WearMonitor reported by WEAR
+        """
+        self.handler = handler
+        self.host = host
+        self.port = port
+        self.collapse = collapse
+        self.server = None
+        self.clients = set()
+        self.udp_port = udp_port
+        self.udp_transport = None
+        self.udp_protocol = None
+        self.unix_path = unix_path
+        self.allowed_uids = None if allowed_uids is None else set(allowed_uids)
+        self.unix_server = None
+        self.unix_handlers = {}  # uid -> SSHCommandHandler reporting 'unix:<uid>'
+        self.button = button
+        self.tracer = tracer
+        self.wear = wear
+        
+        # WATCH subscribers and event counters
+        self.loop = None
+        self._loop_thread = None
+        self.watchers = set()
+        self.event_seq = 0
+        self.dropped_events = 0
+    
+    async def start(self):
+        """Start listening (returns once the socket is bound)"""
+        self.loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self.handler.hardware.add_listener(self._on_state_change)
+        self.server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        # Resolve the real port when started with port 0
+        self.port = self.server.sockets[0].getsockname()[1]
+        
+        if self.udp_port is not None:
+            self.udp_transport, self.udp_protocol = await self.loop.create_datagram_endpoint(
+                lambda: UDPControlProtocol(self.handler),
+                local_addr=(self.host, self.udp_port)
+            )
+            self.udp_port = self.udp_transport.get_extra_info('sockname')[1]
+        
+        if self.unix_path is not None:
+            # Remove a stale socket left by a previous run
+            if os.path.exists(self.unix_path):
+                os.unlink(self.unix_path)
+            # Create the socket without world access so there is no window
+            # before the chmod in which any local user could connect
+            old_umask = os.umask(0o117)
+            try:
+                self.unix_server = await asyncio.start_unix_server(self._handle_unix_client, self.unix_path)
+            finally:
+                os.umask(old_umask)
+            os.chmod(self.unix_path, 0o660)
+    
+    async def serve_forever(self):
+        """Start (if needed) and serve until stop() is called"""
+        if self.server is None:
+            await self.start()
+        try:
+            await self.server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+    
+    async def stop(self):
+        """Stop accepting and close every client connection"""
+        self.handler.hardware.remove_listener(self._on_state_change)
+        if self.udp_transport is not None:
+            self.udp_transport.close()
+        for server in (self.server, self.unix_server):
+            if server is not None:
+                server.close()
+        for writer in list(self.clients):
+            writer.close()
+        for server in (self.server, self.unix_server):
+            if server is not None:
+                await server.wait_closed()
+        if self.unix_server is not None and os.path.exists(self.unix_path):
+            os.unlink(self.unix_path)
+    
+    async def _handle_client(self, reader, writer):
+        """Serve one TCP client connection"""
+        sock = writer.get_extra_info('socket')
+        if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+            # Responses are tiny - send immediately instead of waiting on Nagle
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        await self._serve(reader, writer, self.handler)
+    
+    async def _handle_unix_client(self, reader, writer):
+        """Serve one Unix socket client, identified by its peer credentials"""
+        sock = writer.get_extra_info('socket')
+        pid, uid, gid = _UCRED.unpack(
+            sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, _UCRED.size)
+        )
+        
+        if self.allowed_uids is not None and uid not in self.allowed_uids:
+            writer.write(f"ERROR: Permission denied for uid {uid}\n".encode('utf-8'))
+            writer.close()
+            return
+        
+        # One handler per uid so state changes are attributed to the caller
+        handler = self.unix_handlers.get(uid)
+        if handler is None:
+            handler = copy.copy(self.handler)
+            handler.source = f'unix:{uid}'
+            self.unix_handlers[uid] = handler
+        await self._serve(reader, writer, handler)
+    
+    async def _serve(self, reader, writer, handler):
+        """Run the line protocol on one persistent connection"""
+        self.clients.add(writer)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    # Longer than the stream limit - the rest of the line
+                    # can't be framed, so answer once and hang up
+                    writer.write(b'ERROR: line too long\n')
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                
+                command = line.decode('utf-8', 'replace')
+                cmd_upper = command.strip().upper()
+                if cmd_upper in self.QUIT_COMMANDS:
+                    break
+                tracer = self.tracer
+                if tracer is not None:
+                    span = tracer.start('request', line=command.strip())
+                try:
+                    responses = self._responses(command, cmd_upper, writer, handler)
+                    payload = ''.join(r + '\n' for r in responses).encode('utf-8')
+                    if tracer is not None:
+                        tracer.mark(span, 'handled')
+                    writer.write(payload)
+                    await writer.drain()
+                except BaseException as e:
+                    if tracer is not None:
+                        tracer.finish(span, error=repr(e))
+                    raise
+                if tracer is not None:
+                    tracer.finish(span)
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            self.watchers.discard(writer)
+            self.clients.discard(writer)
+            writer.close()
+    
+    def _responses(self, command, cmd_upper, writer, handler):
+        """Response lines for one request line (iterable)"""
+        if cmd_upper == 'WATCH':
+            self.watchers.add(writer)
+            return (handler.handle_command('STAT'),)
+        if cmd_upper == 'UNWATCH':
+            self.watchers.discard(writer)
+            return ('OK',)
+        if cmd_upper == 'DEBOUNCE':
+            return self._debounce_status()
+        if cmd_upper == 'WEAR':
+            return self._wear_status()
+        if ';' in command:
+            return handler.handle_batch(command, collapse=self.collapse)
+        return (handler.handle_command(command),)
+    
+    def _debounce_status(self):
+        """DEBOUNCE response lines (one per button)"""
+        if self.button is None:
+            return ('ERROR: No button handler',)
+        lines = []
+        for pin, status in self.button.debounce_status().items():
+            line = f"Debounce: GPIO{pin} {status['engine']} window={status['window_ns'] / 1e6:.1f}ms"
+            if 'bursts' in status:
+                tail = 'learning' if status['tail_ns'] is None else f"{status['tail_ns'] / 1e6:.1f}ms"
+                line += f" tail={tail} bursts={status['bursts']}"
+            lines.append(line)
+        return lines
+    
+    def _wear_status(self):
+        """WEAR response lines (one per relay)"""
+        if self.wear is None:
+            return ('ERROR: No wear accounting',)
+        lines = []
+        for num, status in self.wear.status().items():
+            line = f"Wear: A{num} cycles={status['cycles']} on={status['on_ns'] / 3.6e12:.1f}h"
+            if status['alerts']:
+                line += ' ALERT ' + ','.join(status['alerts'])
+            lines.append(line)
+        return lines
+    
+    def _on_state_change(self, previous, current, source):
+        """
+        Hardware state-change listener
+        May run on the button callback thread, so it only hands the event
+        to the event loop and returns - it never waits on a subscriber.
+        Changes applied on the loop thread itself are broadcast directly.
+        """
+        if self.watchers:
+            if threading.get_ident() == self._loop_thread:
+                self._broadcast(current, source)
+            else:
+                self.loop.call_soon_threadsafe(self._broadcast, current, source)
+    
+    def _broadcast(self, current, source):
+        """Push one EVENT line to every subscriber without blocking"""
+        self.event_seq += 1
+        state = 'OFF' if current == 0 else f'A{current}'
+        line = f"EVENT {self.event_seq} {state} {source}\n".encode('utf-8')
+        
+        for writer in self.watchers:
+            # A slow subscriber gets events dropped rather than buffered forever
+            if writer.transport.get_write_buffer_size() > self.WATCH_BUFFER_LIMIT:
+                self.dropped_events += 1
+                continue
+            writer.write(line)
+
+
+async def _run(daemon, on_start=None, on_stop=None):
+    """
+    Serve until SIGINT/SIGTERM
+    
+    Args:
+        daemon (AntennaDaemon): Daemon to run
+        on_start: Called with the loop once serving (binds loop-driven parts)
+        on_stop: Called on the loop before the daemon stops
+    """
+    loop = asyncio.get_running_loop()
+    await daemon.start()
+    if on_start is not None:
+        on_start(loop)
+    task = asyncio.ensure_future(daemon.serve_forever())
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, task.cancel)
+    print(f"✓ Listening on {daemon.host}:{daemon.port}")
+    if daemon.udp_port is not None:
+        print(f"✓ UDP control on {daemon.host}:{daemon.udp_port}")
+    if daemon.unix_path is not None:
+        print(f"✓ Unix socket control on {daemon.unix_path}")
+    await task
+    if on_stop is not None:
+        on_stop()
+    await daemon.stop()
+
+
+def main():
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='Antenna Controller Daemon')
+    parser.add_argument('--host', default=DEFAULT_HOST,
+                        help=f'Address to listen on (default: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help=f'TCP port (default: {DEFAULT_PORT})')
+    parser.add_argument('--udp-port', type=int, default=None,
+                        help=f'Serve the binary UDP protocol on this port (e.g. {DEFAULT_UDP_PORT})')
+    parser.add_argument('--unix', metavar='PATH', default=None,
+                        help=f'Serve commands on a Unix domain socket (e.g. {DEFAULT_UNIX_PATH})')
+    parser.add_argument('--allow-uid', type=int, action='append', default=None,
+                        help='Only accept Unix socket clients with this uid (repeatable)')
+    parser.add_argument('--rig', metavar='HOST:PORT', default=None,
+                        help='Follow the radio frequency from rigctld (e.g. 127.0.0.1:4532)')
+    parser.add_argument('--band-map', default='160m=1,80m=1,40m=2,20m=3,15m=3,10m=3',
+                        help='Band to antenna map used with --rig')
+    parser.add_argument('--mode', type=int, choices=[2, 3], default=3,
+                        help='Number of antennas to cycle through with button (default: 3)')
+    parser.add_argument('--collapse', action='store_true',
+                        help='Collapse redundant intermediate switches in batches')
+    parser.add_argument('--settle-ms', type=float, default=10.0,
+                        help='Relay settle time; newer targets arriving within it replace '
+                             'older ones (0 = apply every target, default: 10)')
+    parser.add_argument('--audit-log', metavar='PATH', default=None,
+                        help='Record every antenna change to a binary audit log')
+    parser.add_argument('--state-file', metavar='PATH', default=None,
+                        help='Keep the selected antenna across restarts and attach to the '
+                             'relays without switching them')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help='Serve Prometheus metrics at http://127.0.0.1:PORT/metrics (e.g. 9108)')
+    parser.add_argument('--trace', metavar='PATH', default=None,
+                        help='Trace every request (receive, command, relay writes, response) to PATH: '
+                             'Chrome trace events for *.json, JSON lines otherwise')
+    parser.add_argument('--wear-file', metavar='PATH', default=None,
+                        help='Keep relay cycle and on-time counters across restarts')
+    parser.add_argument('--wear-interval', type=float, default=300.0,
+                        help='Seconds between wear counter writes (default: 300)')
+    parser.add_argument('--wear-cycles', type=int, default=None,
+                        help='Alert when a relay reaches this many switch cycles')
+    parser.add_argument('--wear-hours', type=float, default=None,
+                        help='Alert when a relay has been energized this many hours')
+    parser.add_argument('--debounce', choices=['lockout', 'integrator', 'stable', 'adaptive', 'gpiozero'],
+                        default='lockout',
+                        help='Button debounce engine on kernel-timestamped edges (default: lockout)')
+    parser.add_argument('--record-edges', metavar='PATH', default=None,
+                        help='Record raw button edges to a trace file (replay with edge_trace.py)')
+    parser.add_argument('--gestures', action='store_true',
+                        help='Long press = OFF/recall, double press = A1 on the cycle button')
+    parser.add_argument('--off-button', type=int, metavar='PIN', default=None,
+                        help='GPIO of a second OFF/recall button (e.g. 23)')
+    parser.add_argument('--event-loop', action='store_true',
+                        help='Dispatch button edges and debounce timers on the asyncio loop thread too')
+    parser.add_argument('--no-button', action='store_true',
+                        help='Do not claim the physical button GPIO')
+    args = parser.parse_args()
+    
+    from antenna_hardware import AntennaHardware
+    from command_actor import LoopActor, POLICY_ALL, POLICY_LATEST
+    from ssh_command_handler import SSHCommandHandler
+    
+    # Reject a bad band map before the relays are claimed
+    band_table = None
+    if args.rig:
+        from band_follower import BandTable
+        try:
+            band_table = BandTable.from_spec(args.band_map,
+                                             antenna_count=len(AntennaHardware.DEFAULT_RELAY_PINS))
+        except ValueError as e:
+            parser.error(f"--band-map: {e}")
+    
+    print("Initializing Antenna Controller Daemon...")
+    state = None
+    if args.state_file:
+        from state_file import StateFile
+        state = StateFile(args.state_file)
+        saved = state.load()
+        # Restore the saved antenna, or keep whatever the relays show now
+        hw = AntennaHardware(attach=True, initial=saved.antenna if saved else None)
+        hw.add_listener(state.record)
+        current = hw.get_current_antenna()
+        state.store(current)
+        print(f"✓ State file {args.state_file} "
+              f"({'restored' if saved else 'attached at'} {f'A{current}' if current else 'OFF'})")
+    else:
+        hw = AntennaHardware()
+    audit = None
+    if args.audit_log:
+        from audit_log import AuditLog
+        audit = AuditLog(args.audit_log)
+        audit.start()
+        hw.add_listener(audit.record)
+        print(f"✓ Audit log {args.audit_log}")
+    from relay_wear import WearMonitor
+    
+    def on_wear_alert(antenna, kind, value, limit):
+        """Print a relay wear alert"""
+        what = f"{value} cycles" if kind == 'cycles' else f"{value:.0f} hours energized"
+        print(f"⚠ Relay A{antenna}: {what} reached the limit of {limit:g} - plan a replacement")
+    
+    wear = WearMonitor(hw, args.wear_file, flush_interval=args.wear_interval,
+                       cycle_limit=args.wear_cycles, on_hours_limit=args.wear_hours,
+                       on_alert=on_wear_alert)
+    wear.restore()
+    wear.start()
+    if args.wear_file:
+        print(f"✓ Relay wear counters {args.wear_file}")
+    # Every input source submits to one writer on the event loop - network
+    # handlers run on the loop and must never wait for the relays to settle
+    actor = LoopActor(hw, policy=POLICY_LATEST if args.settle_ms > 0 else POLICY_ALL,
+                      settle_time=args.settle_ms / 1000)
+    handler = SSHCommandHandler(actor)
+    button_handler = None
+    if not args.no_button:
+        from button_handler import ButtonHandler
+        edge_source = debouncer = None
+        if args.debounce != 'gpiozero':
+            from edge_source import GpiodEdgeSource, gpiod
+            if gpiod is None:
+                print("⚠ gpiod not installed - falling back to gpiozero debounce")
+            else:
+                from debounce import make_debouncer
+                pins = [17] if args.off_button is None else [17, args.off_button]
+                edge_source = GpiodEdgeSource(pins)
+                if args.record_edges:
+                    from edge_trace import RecordingEdgeSource
+                    edge_source = RecordingEdgeSource(edge_source, args.record_edges)
+                    print(f"✓ Recording button edges to {args.record_edges}")
+                debouncer = make_debouncer(args.debounce, active=edge_source.level())
+        if edge_source is None and (args.gestures or args.off_button is not None):
+            print("⚠ Gestures and the OFF button need kernel edge capture - disabled")
+        button_handler = ButtonHandler(hw, antenna_count=args.mode, actor=actor,
+                                       edge_source=edge_source, debouncer=debouncer,
+                                       gestures=args.gestures and edge_source is not None,
+                                       off_button_pin=args.off_button if edge_source else None,
+                                       edge_thread=not args.event_loop)
+        print(f"✓ Button handler active (GPIO 17, {debouncer.name if debouncer else 'gpiozero'} debounce)")
+    
+    metrics_server = None
+    if args.metrics_port is not None:
+        from metrics import ControllerMetrics, MetricsServer
+        metrics = ControllerMetrics()
+        metrics.instrument(hardware=hw, button=button_handler, handler=handler, actor=actor)
+        metrics_server = MetricsServer(metrics.registry, port=args.metrics_port)
+        metrics_server.start()
+        print(f"✓ Metrics on http://{metrics_server.host}:{metrics_server.port}/metrics")
+    
+    tracer = None
+    if args.trace:
+        from tracing import ChromeTraceExporter, JsonLinesExporter, Tracer
+        exporter = ChromeTraceExporter if args.trace.endswith('.json') else JsonLinesExporter
+        tracer = Tracer(exporter(args.trace))
+        hw.tracer = handler.tracer = tracer
+        print(f"✓ Tracing requests to {args.trace}")
+    
+    follower = None
+    if args.rig:
+        from band_follower import BandFollower, RigctldClient
+        rig_host, rig_port = args.rig.rsplit(':', 1)
+        follower = BandFollower(actor, band_table, RigctldClient(rig_host, int(rig_port)))
+    
+    def on_start(loop):
+        """Bind the actor (and in event loop mode the button edge fd) to the daemon's loop"""
+        actor.start(loop)
+        # The actor rejects commands until it is bound, so poll only now
+        if follower is not None:
+            follower.start()
+            print(f"✓ Following rigctld at {args.rig}")
+        if args.event_loop:
+            if button_handler is not None and button_handler.edge_source is not None:
+                button_handler.attach(loop)
+            print("✓ Button, network and timers on one event loop")
+    
+    def on_stop():
+        """Unregister the button and apply pending switches before the loop closes"""
+        if args.event_loop and button_handler is not None:
+            button_handler.detach()
+        actor.stop()
+    
+    try:
+        asyncio.run(_run(AntennaDaemon(handler, args.host, args.port, collapse=args.collapse,
+                                       udp_port=args.udp_port, unix_path=args.unix,
+                                       allowed_uids=args.allow_uid, button=button_handler,
+                                       tracer=tracer, wear=wear),
+                         on_start, on_stop))
+    finally:
+        if follower is not None:
+            follower.stop()
+        if metrics_server is not None:
+            metrics_server.stop()
+        if tracer is not None:
+            tracer.close()
+        print("Cleaning up GPIO...")
+        if button_handler is not None:
+            button_handler.cleanup()
+        actor.stop()
+        # With a state file the relays stay as they are for the next start
+        hw.cleanup(hold=state is not None)
+        wear.stop()
+        if state is not None:
+            state.close()
+        if audit is not None:
+            audit.stop()
+
+
+if __name__ == '__main__':
+    main()
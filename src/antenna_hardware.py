@@ -3,79 +3,307 @@
 Antenna Hardware Control - 2 Antenna System
 Controls relays and LEDs for antenna selection on Pi Zero 2W
 LEDs are wired in parallel with relay drivers (same GPIO pins)
+
+Relay levels are tracked in a shadow register (the level last written to
+each pin). Switches only write pins that actually change and state queries
+are answered from memory; hardware read-back is an optional periodic check.
+
+State-change listeners are called after every change of antenna with
+(previous, current, source), where source says who asked for the change
+('button', 'network', 'schedule', ...). Listeners run on the caller's
+thread after the relays have switched, so they must not block.
+
+Glitch-free attach (attach=True): the relay lines are taken over at their
+current levels and the shadow register starts from them, so a restarted
+controller only writes the pins that differ from initial (None = keep
+whatever is selected). Pair it with state_file.StateFile and
+cleanup(hold=True) and a restart never switches a relay.
+
+Relay wear: every relay write updates per-relay make cycles and
+cumulative energized time in memory (relay_wear()); persistence and
+wear thresholds are in relay_wear.py.
 """
 
-from gpiozero import OutputDevice
+import time
+
+from gpio_backend import OutputDeviceBackend, load_gpiozero
+
+# gpiozero.OutputDevice, imported when the first default backend is built
+OutputDevice = None
+
+
+def _output_device():
+    """gpiozero.OutputDevice, imported on first use"""
+    global OutputDevice
+    if OutputDevice is None:
+        OutputDevice = load_gpiozero().OutputDevice
+    return OutputDevice
 
 
 class AntennaHardware:
     """Hardware abstraction for antenna control system"""
     
-    def __init__(self):
-        """Initialize GPIO pins and set default state"""
-        # GPIO pin mappings - 3 antenna system
-        # Relays and LEDs share same pins (LEDs in parallel with relay drivers)
-        self.relay_pins = {1: 27, 2: 22, 3: 4}
-        self.led_pins = {1: 27, 2: 22, 3: 4}  # Same as relay pins (hardware parallel)
-        
-        # Initialize GPIO devices
-        # Only create ONE device per pin (relay OutputDevice controls both relay and LED)
-        self.relays = {}
-        
-        # Setup relays (active high) - this also drives the LEDs
-        for antenna_num, pin in self.relay_pins.items():
-            self.relays[antenna_num] = OutputDevice(pin, active_high=True, initial_value=False)
-        
-        # Set default state (A1 on startup)
+    # Default GPIO pin mappings - 3 antenna system
+    DEFAULT_RELAY_PINS = {1: 27, 2: 22, 3: 4}
+    
+    def __init__(self, backend=None, readback_interval=None, relay_pins=None, initial=1, attach=False):
+        """
+        Initialize GPIO pins and set default state
+        
+        Args:
+            backend: Output backend (see gpio_backend.py). Default is one
+                     gpiozero OutputDevice per relay. Pass a LineGroupBackend
+                     to drive all relay lines as one group.
+            readback_interval (float): Seconds between hardware read-back
+                     consistency checks during state queries.
+                     None (default) = never read back automatically.
+            relay_pins (dict): {antenna_num: pin} mapping, antennas numbered
+                     from 1. Default is the 3-antenna GPIO mapping; use
+                     SwitchMatrix.port_map() for large switch matrices.
+            initial (int): Antenna selected at startup (0 = OFF, None =
+                     keep the attached state)
+            attach (bool): Start from the relay lines' current levels
+                     instead of driving them low (the default backend
+                     is opened in attach mode; pass an attached backend
+                     otherwise)
+        """
+        # Pin mappings - relays and LEDs share same pins (LEDs in parallel with relay drivers)
+        if relay_pins is None:
+            relay_pins = self.DEFAULT_RELAY_PINS
+        self.relay_pins = dict(relay_pins)
+        self.led_pins = dict(relay_pins)  # Same as relay pins (hardware parallel)
+        self.antenna_count = len(self.relay_pins)
+        
+        # Initialize GPIO output backend
+        # Only ONE output per pin (relay output drives both relay and LED)
+        # Relays are active high - this also drives the LEDs
+        if backend is None:
+            backend = OutputDeviceBackend(self.relay_pins.values(), device_factory=_output_device(),
+                                          attach=attach)
+        self.backend = backend
+        
+        # Shadow register - level last written to each relay pin
+        # Outputs are created inactive, so every pin starts low - unless
+        # attached, when the lines keep the levels they were found at
+        if attach:
+            self.shadow = self.backend.read(list(self.relay_pins.values()))
+        else:
+            self.shadow = {pin: False for pin in self.relay_pins.values()}
+        
+        # Relay wear - make cycles and energized time per relay pin
+        self.relay_cycles = dict.fromkeys(self.shadow, 0)
+        self.relay_on_ns = dict.fromkeys(self.shadow, 0)
+        now = time.monotonic_ns()
+        self._energized_since = {pin: now for pin, level in self.shadow.items() if level}
+        
+        # Optional periodic read-back of the real line levels
+        self.readback_interval = readback_interval
+        self.last_readback = time.monotonic()
+        self.mismatch_count = 0
+        
+        # State-change listeners: callback(previous, current, source)
+        self.listeners = []
+        
+        # Optional metrics.ControllerMetrics (times every set_antenna)
+        self.metrics = None
+        
+        # Optional tracing.Tracer (one span per set_antenna)
+        self.tracer = None
+        
+        # Startup state (A1 by default)
         self.current_antenna = 0
-        self.set_antenna(1)
+        if attach:
+            active = [num for num, pin in self.relay_pins.items() if self.shadow[pin]]
+            self.current_antenna = active[0] if active else 0
+            if initial is None and len(active) > 1:
+                # More than one relay energized - keep the first only
+                initial = self.current_antenna
+        if initial is not None:
+            self.set_antenna(initial, source='startup')
+    
+    def add_listener(self, callback):
+        """
+        Register a state-change listener
+        
+        Args:
+            callback: Called as callback(previous, current, source) after
+                      every antenna change. Must return quickly.
+        """
+        self.listeners.append(callback)
     
-    def set_antenna(self, antenna_num):
+    def remove_listener(self, callback):
+        """Unregister a state-change listener (ignored if not registered)"""
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+    
+    def set_antenna(self, antenna_num, source='local'):
         """
-        Set active antenna (1, 2, 3) or OFF (0)
+        Set active antenna (1..antenna_count) or OFF (0)
         Ensures exclusive selection - only one antenna active at a time
+        Only pins whose level changes are written; re-selecting the
+        current antenna is a no-op
         
         Args:
-            antenna_num (int): Antenna to activate (1, 2, 3) or 0 for OFF
+            antenna_num (int): Antenna to activate (1..antenna_count) or 0 for OFF
+            source (str): Origin of the change, passed to listeners
         """
-        # Validate input - now 0, 1, 2, 3 valid
-        if antenna_num not in [0, 1, 2, 3]:
+        # Validate input - 0 (OFF) or any configured antenna
+        if antenna_num != 0 and antenna_num not in self.relay_pins:
             return
         
-        # Turn off all relays (and LEDs) first
-        for i in [1, 2, 3]:
-            self.relays[i].off()
+        metrics = self.metrics
+        if metrics is not None:
+            start = time.perf_counter_ns()
+        tracer = self.tracer
+        if tracer is not None:
+            span = tracer.start('set_antenna', antenna=antenna_num, source=source)
+        
+        try:
+            # Target level for every relay (only the selected one is high)
+            target_pin = self.relay_pins.get(antenna_num)
+            
+            # Minimal set of changes against the shadow register
+            breaks = {}
+            makes = {}
+            for pin, level in self.shadow.items():
+                wanted = (pin == target_pin)
+                if level != wanted:
+                    if wanted:
+                        makes[pin] = True
+                    else:
+                        breaks[pin] = False
+            
+            # Break before make: turn off relays (and LEDs) first, then turn on
+            if breaks:
+                self._write(breaks)
+            if makes:
+                self._write(makes)
+            
+            # Update current state
+            previous = self.current_antenna
+            self.current_antenna = antenna_num
+            if metrics is not None:
+                metrics.switch_ns.observe(time.perf_counter_ns() - start)
+            if tracer is not None:
+                tracer.mark(span, 'written')
+            
+            # Notify listeners (relays have already switched)
+            if previous != antenna_num:
+                for listener in self.listeners:
+                    listener(previous, antenna_num, source)
+        except BaseException as e:
+            if tracer is not None:
+                tracer.finish(span, error=repr(e))
+            raise
+        if tracer is not None:
+            tracer.finish(span, previous=previous)
+    
+    def _write(self, levels):
+        """
+        Write levels to the backend and record them in the shadow register
+        
+        Args:
+            levels (dict): {pin: bool} levels to write
+        """
+        self.backend.write(levels)
+        self.shadow.update(levels)
+        
+        # Wear accounting: a make starts a cycle, a break ends its on-time
+        now = time.monotonic_ns()
+        energized = self._energized_since
+        for pin, level in levels.items():
+            if level:
+                self.relay_cycles[pin] += 1
+                energized[pin] = now
+            elif pin in energized:
+                self.relay_on_ns[pin] += now - energized.pop(pin)
+    
+    def relay_wear(self):
+        """
+        Switch cycles and energized time of every relay
         
-        # Turn on selected antenna (if not OFF)
-        if antenna_num != 0:
-            self.relays[antenna_num].on()
+        Returns:
+            dict: {antenna_num: {'cycles': int, 'on_ns': int}} - on_ns
+                  includes the current period of an energized relay
+        """
+        now = time.monotonic_ns()
+        energized = dict(self._energized_since)
+        return {
+            num: {'cycles': self.relay_cycles[pin],
+                  'on_ns': self.relay_on_ns[pin] + (now - energized[pin] if pin in energized else 0)}
+            for num, pin in self.relay_pins.items()
+        }
+    
+    def restore_wear(self, wear):
+        """
+        Add counts carried over from earlier runs
         
-        # Update current state
-        self.current_antenna = antenna_num
+        Args:
+            wear (dict): relay_wear() layout; unknown antennas are ignored
+        """
+        for num, counts in wear.items():
+            pin = self.relay_pins.get(num)
+            if pin is not None:
+                self.relay_cycles[pin] += counts['cycles']
+                self.relay_on_ns[pin] += counts['on_ns']
     
     def get_current_antenna(self):
         """
-        Get currently selected antenna
+        Get currently selected antenna (from memory, no GPIO access)
         
         Returns:
-            int: Current antenna (1, 2, 3) or 0 for OFF
+            int: Current antenna (1..antenna_count) or 0 for OFF
         """
+        self._maybe_readback()
         return self.current_antenna
     
     def get_relay_state(self, antenna_num):
         """
         Get relay state for specific antenna
+        Answered from the shadow register, not by reading the pin
         
         Args:
-            antenna_num (int): Antenna number (1, 2, 3)
-            
+            antenna_num (int): Antenna number (1..antenna_count)
+        
         Returns:
             bool: True if relay is active, False otherwise
         """
-        if antenna_num not in [1, 2, 3]:
+        if antenna_num not in self.relay_pins:
             return False
         
-        return self.relays[antenna_num].is_active
+        self._maybe_readback()
+        return self.shadow[self.relay_pins[antenna_num]]
+    
+    def check_consistency(self):
+        """
+        Read every relay pin back from hardware and compare with the shadow
+        Any pin that disagrees is rewritten to its shadow level, breaks
+        before makes as in set_antenna
+        
+        Returns:
+            list: Pins whose hardware level did not match the shadow register
+        """
+        self.last_readback = time.monotonic()
+        actual = self.backend.read(self.shadow.keys())
+        mismatched = [pin for pin, level in self.shadow.items() if actual[pin] != level]
+        
+        if mismatched:
+            self.mismatch_count += len(mismatched)
+            breaks = {pin: False for pin in mismatched if not self.shadow[pin]}
+            makes = {pin: True for pin in mismatched if self.shadow[pin]}
+            if breaks:
+                self._write(breaks)
+            if makes:
+                self._write(makes)
+        
+        return mismatched
+    
+    def _maybe_readback(self):
+        """Run check_consistency() if the read-back interval has elapsed"""
+        if self.readback_interval is None:
+            return
+        if time.monotonic() - self.last_readback >= self.readback_interval:
+            self.check_consistency()
     
     def get_led_state(self, antenna_num):
         """
@@ -83,20 +311,25 @@ class AntennaHardware:
         Since LEDs are wired parallel to relays, LED state = relay state
         
         Args:
-            antenna_num (int): Antenna number (1, 2, 3)
-            
+            antenna_num (int): Antenna number (1..antenna_count)
+        
         Returns:
             bool: True if LED is on, False otherwise
         """
         # LED state is same as relay state (hardware parallel connection)
         return self.get_relay_state(antenna_num)
     
-    def cleanup(self):
-        """Clean up GPIO resources"""
-        # Turn off all outputs
-        for i in [1, 2, 3]:
-            self.relays[i].off()
-        
-        # Close GPIO devices
-        for relay in self.relays.values():
-            relay.close()
+    def cleanup(self, hold=False):
+        """
+        Clean up GPIO resources
+        
+        Args:
+            hold (bool): Release the lines without turning the relays off,
+                         so a restarted controller can attach to them
+        """
+        # Turn off all outputs (every pin, regardless of shadow state)
+        if not hold:
+            self._write({pin: False for pin in self.relay_pins.values()})
+        
+        # Release GPIO lines
+        self.backend.close()
@@ -0,0 +1,233 @@
+# src/audit_log.py
+"""
+Audit Log - Binary Ring Buffer of Antenna State Changes
+Records every change (when, where from, previous and new antenna)
+without putting file I/O on the relay switching path
+
+The hardware listener only packs one fixed-size record into a
+preallocated in-memory ring. A background thread copies committed
+records out in batches and appends them to a rotating binary file.
+
+File layout (little endian):
+  header  magic:8s  version:u32  record_size:u32  wall_ns:i64  mono_ns:u64
+  record  mono_ns:u64  seq:u32  uid:u32  previous:u8  current:u8  source:u8  pad:u8
+
+Timestamps are time.monotonic_ns(); the header pairs one monotonic
+reading with the wall clock so readers can convert. Each rotated file
+starts with a fresh header, as does every process start (an existing
+file is rotated rather than appended to). Decode with audit_reader.py.
+
+Usage:
+  audit = AuditLog('/var/log/antenna/audit.bin')
+  audit.start()
+  hw.add_listener(audit.record)
+"""
+
+import itertools
+import os
+import struct
+import threading
+import time
+
+MAGIC = b'ANTAUDIT'
+VERSION = 1
+
+HEADER = struct.Struct('<8sIIqQ')
+RECORD = struct.Struct('<QIIBBBx')
+
+# Source codes - 'unix:<uid>' is stored as SOURCE_UNIX plus the uid field
+SOURCES = ('other', 'startup', 'local', 'button', 'network', 'band', 'schedule', 'unix')
+SOURCE_CODES = {name: code for code, name in enumerate(SOURCES)}
+SOURCE_OTHER = SOURCE_CODES['other']
+SOURCE_UNIX = SOURCE_CODES['unix']
+
+_SEQ_MASK = 0xFFFFFFFF
+
+
+def encode_source(source):
+    """
+    Map a listener source string to (code, uid)
+    
+    Args:
+        source (str): e.g. 'button', 'network', 'unix:1000'
+    
+    Returns:
+        tuple: (source code, uid) - uid is 0 unless the source is unix:<uid>
+    """
+    code = SOURCE_CODES.get(source)
+    if code is not None:
+        return code, 0
+    if source.startswith('unix:'):
+        try:
+            return SOURCE_UNIX, int(source[5:])
+        except ValueError:
+            pass
+    return SOURCE_OTHER, 0
+
+
+def decode_source(code, uid):
+    """Inverse of encode_source"""
+    if code == SOURCE_UNIX:
+        return f'unix:{uid}'
+    return SOURCES[code] if code < len(SOURCES) else 'other'
+
+
+class AuditRing:
+    """Fixed-size binary records in a preallocated ring buffer"""
+    
+    def __init__(self, capacity=4096):
+        """
+        Args:
+            capacity (int): Records held before unflushed ones are overwritten
+        """
+        self.capacity = capacity
+        self.buffer = bytearray(capacity * RECORD.size)
+        self._slots = itertools.count()
+        self.tail = 0      # next slot the consumer will read
+        self.dropped = 0   # records overwritten before they were read
+    
+    def record(self, previous, current, source):
+        """
+        Append one state change (hardware listener signature)
+        Safe from any thread: the slot comes from an atomic counter and the
+        record's seq field marks it committed for the consumer.
+        """
+        slot = next(self._slots)
+        code, uid = encode_source(source)
+        RECORD.pack_into(self.buffer, (slot % self.capacity) * RECORD.size,
+                         time.monotonic_ns(), (slot + 1) & _SEQ_MASK, uid,
+                         previous, current, code)
+    
+    def drain(self):
+        """
+        Copy out every committed record since the last drain (consumer side)
+        
+        Returns:
+            bytes: Concatenated records, oldest first
+        """
+        size = RECORD.size
+        out = bytearray()
+        slot = self.tail
+        while True:
+            offset = (slot % self.capacity) * size
+            # Copy first, then check - the copy can't be torn by a producer
+            data = self.buffer[offset:offset + size]
+            seq = struct.unpack_from('<I', data, 8)[0]
+            expected = (slot + 1) & _SEQ_MASK
+            if seq != expected:
+                # Lapped by the producer - jump to the oldest slot that can
+                # still hold its own record and re-check from there
+                lead = (seq - expected) & _SEQ_MASK
+                if 0 < lead < 0x80000000 and lead % self.capacity == 0:
+                    skip = lead - self.capacity + 1
+                    self.dropped += skip
+                    slot += skip
+                    continue
+                break  # not written yet
+            out += data
+            slot += 1
+        self.tail = slot
+        return bytes(out)
+
+
+class AuditLog:
+    """Audit ring plus a background flusher writing a rotating file"""
+    
+    def __init__(self, path, capacity=4096, max_bytes=1 << 20, backups=3, flush_interval=1.0):
+        """
+        Args:
+            path (str): Audit file (rotated to path.1 .. path.<backups>)
+            capacity (int): Ring size in records
+            max_bytes (int): Rotate once the file would grow beyond this
+            backups (int): Rotated files kept
+            flush_interval (float): Seconds between background flushes
+        """
+        self.path = path
+        self.ring = AuditRing(capacity)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+        
+        self.flushes = 0
+        self.records_written = 0
+        
+        self._file = None
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def record(self, previous, current, source):
+        """Hardware state-change listener - hot path, memory only"""
+        self.ring.record(previous, current, source)
+    
+    def start(self):
+        """Start the background flusher"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='audit-flush', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop the flusher, write out anything pending and close the file"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def _run(self):
+        """Flush loop"""
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+    
+    def flush(self):
+        """
+        Append every pending record to the file in one write
+        
+        Returns:
+            int: Records written
+        """
+        with self._flush_lock:
+            data = self.ring.drain()
+            if not data:
+                return 0
+            if self._file is None:
+                self._open()
+            elif self._file.tell() + len(data) > self.max_bytes:
+                self._rotate()
+            self._file.write(data)
+            self._file.flush()
+            count = len(data) // RECORD.size
+            self.records_written += count
+            self.flushes += 1
+            return count
+    
+    def _open(self):
+        """
+        Start a new file with a header
+        An existing file is rotated away - its monotonic timestamps
+        belong to another boot or process
+        """
+        if os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            self._shift()
+        self._file = open(self.path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size,
+                                     time.time_ns(), time.monotonic_ns()))
+    
+    def _rotate(self):
+        """Close the current file and start the next one"""
+        self._file.close()
+        self._open()
+    
+    def _shift(self):
+        """Shift path -> path.1 -> ... path.<backups> (oldest discarded)"""
+        for index in range(self.backups - 1, 0, -1):
+            older = f'{self.path}.{index}'
+            if os.path.exists(older):
+                os.replace(older, f'{self.path}.{index + 1}')
+        if self.backups > 0:
+            os.replace(self.path, f'{self.path}.1')
+        else:
+            os.unlink(self.path)
@@ -0,0 +1,126 @@
+# src/audit_reader.py
+"""
+Audit Reader - Decode and Filter Binary Audit Logs
+Reads files written by audit_log.AuditLog
+
+Usage:
+  python3 audit_reader.py /var/log/antenna/audit.bin.1 /var/log/antenna/audit.bin
+  python3 audit_reader.py audit.bin --source button --antenna 2
+  python3 audit_reader.py audit.bin --since 2026-10-01T18:00 --json
+"""
+
+import argparse
+import json
+import sys
+from collections import namedtuple
+from datetime import datetime
+
+from audit_log import HEADER, MAGIC, RECORD, decode_source
+
+AuditRecord = namedtuple('AuditRecord', ['seq', 'mono_ns', 'wall_ns', 'previous', 'current', 'source'])
+
+
+def _state(antenna):
+    """Antenna number as a status string"""
+    return 'OFF' if antenna == 0 else f'A{antenna}'
+
+
+def read_records(path):
+    """
+    Decode one audit file
+    
+    Args:
+        path (str): Audit file
+    
+    Yields:
+        AuditRecord: Records in file order
+    
+    Raises:
+        ValueError: Not an audit file or unsupported record size
+    """
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            return
+        magic, version, record_size, wall0, mono0 = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not an audit log")
+        if record_size != RECORD.size:
+            raise ValueError(f"{path}: unsupported record size {record_size}")
+        
+        data = f.read()
+    # A trailing partial record (power loss mid-write) is ignored
+    for offset in range(0, len(data) - record_size + 1, record_size):
+        mono_ns, seq, uid, previous, current, code = RECORD.unpack_from(data, offset)
+        yield AuditRecord(seq, mono_ns, wall0 + (mono_ns - mono0),
+                          previous, current, decode_source(code, uid))
+
+
+def filter_records(records, source=None, antenna=None, since_ns=None, until_ns=None):
+    """
+    Filter decoded records
+    
+    Args:
+        records: Iterable of AuditRecord
+        source (str): Keep only this source ('unix' matches any unix:<uid>)
+        antenna (int): Keep changes to or from this antenna
+        since_ns (int): Keep records at or after this wall time (ns)
+        until_ns (int): Keep records before this wall time (ns)
+    
+    Yields:
+        AuditRecord
+    """
+    for record in records:
+        if source is not None and record.source != source:
+            if not (source == 'unix' and record.source.startswith('unix:')):
+                continue
+        if antenna is not None and antenna not in (record.previous, record.current):
+            continue
+        if since_ns is not None and record.wall_ns < since_ns:
+            continue
+        if until_ns is not None and record.wall_ns >= until_ns:
+            continue
+        yield record
+
+
+def format_record(record):
+    """One human-readable line"""
+    when = datetime.fromtimestamp(record.wall_ns / 1e9).isoformat(timespec='milliseconds')
+    return f"{when}  #{record.seq:<8} {_state(record.previous):>3} -> {_state(record.current):<3}  {record.source}"
+
+
+def _parse_time(text):
+    """ISO-8601 timestamp to wall-clock ns"""
+    return int(datetime.fromisoformat(text).timestamp() * 1e9)
+
+
+def main(argv=None):
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='Decode antenna audit logs')
+    parser.add_argument('files', nargs='+', help='Audit files, oldest first')
+    parser.add_argument('--source', help='Only changes from this source (button, network, unix, ...)')
+    parser.add_argument('--antenna', type=int, help='Only changes to or from this antenna (0 = OFF)')
+    parser.add_argument('--since', help='Only changes at or after this time (ISO-8601)')
+    parser.add_argument('--until', help='Only changes before this time (ISO-8601)')
+    parser.add_argument('--json', action='store_true', help='Print JSON lines')
+    args = parser.parse_args(argv)
+    
+    since_ns = _parse_time(args.since) if args.since else None
+    until_ns = _parse_time(args.until) if args.until else None
+    
+    for path in args.files:
+        try:
+            records = filter_records(read_records(path), args.source, args.antenna, since_ns, until_ns)
+            for record in records:
+                if args.json:
+                    print(json.dumps(record._asdict()))
+                else:
+                    print(format_record(record))
+        except (OSError, ValueError) as e:
+            print(f"✗ {e}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,323 @@
+# src/band_follower.py
+"""
+Band Follower - Automatic Antenna Selection from Radio Frequency
+Polls a rigctld-compatible frequency source and selects the antenna
+mapped to the current band
+
+The band map is precomputed into a sorted interval table searched with
+bisect, and repeated samples are cheap: an identical frequency, or one
+inside the band already selected, never reaches the lookup or
+AntennaHardware.set_antenna. The hardware is only switched when the
+radio moves to a different band, so a manual change made on the same
+band (button, SSH) is left alone.
+
+Usage (inside the daemon):
+  table = BandTable.from_spec('160m=1,80m=1,40m=2,20m=3,15m=3,10m=3')
+  follower = BandFollower(hw, table, RigctldClient('127.0.0.1', 4532))
+  follower.start()
+"""
+
+import bisect
+import socket
+import socketserver
+import threading
+
+# Amateur band edges in Hz (IARU Region 2)
+BAND_EDGES = {
+    '160m': (1800000, 2000000),
+    '80m': (3500000, 4000000),
+    '60m': (5330000, 5410000),
+    '40m': (7000000, 7300000),
+    '30m': (10100000, 10150000),
+    '20m': (14000000, 14350000),
+    '17m': (18068000, 18168000),
+    '15m': (21000000, 21450000),
+    '12m': (24890000, 24990000),
+    '10m': (28000000, 29700000),
+    '6m': (50000000, 54000000),
+    '2m': (144000000, 148000000),
+}
+
+
+class BandTable:
+    """Sorted, non-overlapping frequency intervals mapped to antennas"""
+    
+    def __init__(self, entries):
+        """
+        Build the lookup table
+        
+        Args:
+            entries: Iterable of (low_hz, high_hz, antenna), high exclusive
+        
+        Raises:
+            ValueError: Intervals overlap or are empty
+        """
+        entries = sorted(entries)
+        self.starts = []
+        self.ends = []
+        self.antennas = []
+        for low, high, antenna in entries:
+            if high <= low:
+                raise ValueError(f"empty interval {low}-{high}")
+            if self.ends and low < self.ends[-1]:
+                raise ValueError(f"interval {low}-{high} overlaps {self.starts[-1]}-{self.ends[-1]}")
+            self.starts.append(low)
+            self.ends.append(high)
+            self.antennas.append(antenna)
+    
+    @classmethod
+    def from_spec(cls, spec, antenna_count=None):
+        """
+        Build a table from 'band=antenna' pairs
+        
+        Args:
+            spec (str): e.g. '160m=1,80m=1,40m=2,20m=3' (bands from BAND_EDGES)
+            antenna_count (int): Highest valid antenna (0 = OFF is always
+                                 valid; None = not checked)
+        
+        Returns:
+            BandTable
+        
+        Raises:
+            ValueError: Malformed item, unknown band, antenna out of range
+                        or a band given twice
+        """
+        entries = []
+        for item in spec.split(','):
+            band, sep, antenna = item.strip().partition('=')
+            band = band.strip().lower()
+            try:
+                antenna = int(antenna)
+            except ValueError:
+                antenna = None
+            if not sep or antenna is None:
+                raise ValueError(f"malformed band map item '{item.strip()}' (expected band=antenna)")
+            if band not in BAND_EDGES:
+                raise ValueError(f"unknown band '{band}' (valid: {', '.join(BAND_EDGES)})")
+            if antenna_count is not None and antenna not in range(0, antenna_count + 1):
+                raise ValueError(f"antenna {antenna} for band '{band}' out of range (0..{antenna_count})")
+            low, high = BAND_EDGES[band]
+            entries.append((low, high, antenna))
+        return cls(entries)
+    
+    def find(self, freq):
+        """
+        Find the interval containing freq
+        
+        Args:
+            freq (int): Frequency in Hz
+        
+        Returns:
+            int: Interval index, or -1 if freq is outside every band
+        """
+        index = bisect.bisect_right(self.starts, freq) - 1
+        if index >= 0 and freq < self.ends[index]:
+            return index
+        return -1
+    
+    def lookup(self, freq):
+        """
+        Antenna for a frequency
+        
+        Returns:
+            int: Antenna number, or None outside every band
+        """
+        index = self.find(freq)
+        return self.antennas[index] if index >= 0 else None
+
+
+class RigctldClient:
+    """Persistent connection to rigctld (hamlib) - reads VFO frequency"""
+    
+    def __init__(self, host='127.0.0.1', port=4532, timeout=1.0):
+        """
+        Args:
+            host (str): rigctld address
+            port (int): rigctld port (hamlib default 4532)
+            timeout (float): Socket timeout in seconds
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.sock = None
+        self.stream = None
+    
+    def _connect(self):
+        """Open the connection (lazily, and again after errors)"""
+        self.sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.stream = self.sock.makefile('rb')
+    
+    def get_frequency(self):
+        """
+        Query the current frequency ('f' command)
+        
+        Returns:
+            int: Frequency in Hz
+        
+        Raises:
+            OSError: Connection failed (reconnects on next call)
+            ValueError: rigctld returned an error (RPRT <n>)
+        """
+        if self.sock is None:
+            self._connect()
+        try:
+            self.sock.sendall(b'f\n')
+            line = self.stream.readline()
+        except OSError:
+            self.close()
+            raise
+        if not line:
+            self.close()
+            raise ConnectionError("rigctld closed the connection")
+        text = line.decode('ascii', 'replace').strip()
+        if text.startswith('RPRT'):
+            raise ValueError(f"rigctld error: {text}")
+        return int(float(text))
+    
+    def close(self):
+        """Close the connection"""
+        if self.sock is not None:
+            self.sock.close()
+        self.sock = None
+        self.stream = None
+
+
+class BandFollower:
+    """Selects the antenna for the radio's current band"""
+    
+    # Source reported to AntennaHardware state-change listeners
+    SOURCE = 'band'
+    
+    def __init__(self, hardware, table, frequency_source=None, interval=0.05):
+        """
+        Args:
+            hardware: AntennaHardware instance
+            table (BandTable): Band to antenna map
+            frequency_source: Object with get_frequency() (e.g. RigctldClient)
+            interval (float): Poll period in seconds (0.05 = 20 Hz)
+        """
+        self.hardware = hardware
+        self.table = table
+        self.frequency_source = frequency_source
+        self.interval = interval
+        
+        # Cache: last sample and the band interval it fell in
+        self.last_freq = None
+        self.band_index = -1
+        self.band_low = 0
+        self.band_high = 0
+        
+        # Counters
+        self.samples = 0
+        self.cache_hits = 0
+        self.switches = 0
+        self.errors = 0
+        
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def update(self, freq):
+        """
+        Process one frequency sample
+        
+        Args:
+            freq (int): Frequency in Hz
+        
+        Returns:
+            bool: True if the antenna was switched
+        """
+        self.samples += 1
+        
+        # Same frequency, or still inside the current band - nothing to do
+        if freq == self.last_freq or self.band_low <= freq < self.band_high:
+            self.last_freq = freq
+            self.cache_hits += 1
+            return False
+        self.last_freq = freq
+        
+        index = self.table.find(freq)
+        if index == self.band_index:
+            # Still out of band (no interval to cache)
+            return False
+        
+        self.band_index = index
+        if index < 0:
+            # Out of band - keep the current antenna
+            self.band_low = self.band_high = 0
+            return False
+        
+        self.band_low = self.table.starts[index]
+        self.band_high = self.table.ends[index]
+        self.hardware.set_antenna(self.table.antennas[index], source=self.SOURCE)
+        self.switches += 1
+        return True
+    
+    def poll_once(self):
+        """Read one sample from the frequency source and process it"""
+        try:
+            freq = self.frequency_source.get_frequency()
+        except (OSError, ValueError):
+            self.errors += 1
+            return False
+        return self.update(freq)
+    
+    def start(self):
+        """Start polling on a background thread"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='band-follower', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop polling and wait for the thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def _run(self):
+        """Poll loop"""
+        while not self._stop.wait(self.interval):
+            self.poll_once()
+
+
+class FakeRigctld:
+    """
+    Minimal rigctld stand-in for tests and benchmarks
+    Answers 'f' with the current frequency, 'F <hz>' sets it.
+    """
+    
+    def __init__(self, frequency=14074000, host='127.0.0.1', port=0):
+        self.frequency = frequency
+        self.requests = 0
+        fake = self
+        
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    parts = line.decode('ascii', 'replace').split()
+                    if not parts:
+                        continue
+                    fake.requests += 1
+                    if parts[0] == 'f':
+                        self.wfile.write(f"{fake.frequency}\n".encode('ascii'))
+                    elif parts[0] == 'F' and len(parts) == 2:
+                        fake.frequency = int(parts[1])
+                        self.wfile.write(b'RPRT 0\n')
+                    else:
+                        self.wfile.write(b'RPRT -1\n')
+                    self.wfile.flush()
+        
+        class Server(socketserver.ThreadingTCPServer):
+            allow_reuse_address = True
+            daemon_threads = True
+        
+        self.server = Server((host, port), Handler)
+        self.host, self.port = self.server.server_address
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+    
+    def close(self):
+        """Stop serving"""
+        self.server.shutdown()
+        self.server.server_close()
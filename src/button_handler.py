@@ -3,19 +3,64 @@
 Button Handler - 3 Antenna System
 Handles physical button input with debouncing for antenna cycling
 Debounce: 20ms now.  Was 200ms which was missing short presses
+
+With an edge_source (edge_source.py) the button bypasses gpiozero: edges
+carry kernel timestamps and run through a selectable debounce engine
+(debounce.py), and the latency from the physical edge to cycle_antenna
+is measured for every press (latency_stats()).
+
+Gestures (edge_source only, gestures=True) on the cycle button:
+  press       - cycle antenna (decided after the double-press window)
+  double      - select A1
+  long press  - OFF, or back to the previous antenna when already OFF
+An optional second button (off_button_pin) does the same OFF/recall
+toggle on a single press. All gesture timeouts for both buttons run on
+one TimerWheel driven by the edge thread.
+
+Event loop (edge_source only): with edge_thread=False and attach(loop)
+the edge source's fd is registered in an asyncio loop and debounce and
+gesture deadlines are loop timers, so button edges are dispatched on the
+same thread as the daemon's network servers - no edge thread at all.
+
+Adaptive debounce (edge_source only, adaptive=True): each button learns
+its own bounce tail and shortens its lockout to match (AdaptiveDebouncer
+in debounce.py); debounce_status() reports the current estimate.
 """
 
-from gpiozero import Button, Device
-from gpiozero.pins.lgpio import LGPIOFactory
+import copy
+import threading
+import time
+from collections import deque
+
+from gesture import GestureEngine, GESTURE_DOUBLE, GESTURE_LONG
+from gpio_backend import load_gpiozero
+from timer_wheel import TimerWheel
+
+# gpiozero.Button, imported (with the lgpio pin factory) the first time a
+# gpiozero Button is created - kernel edge capture and replay never need it
+Button = None
+
 
-# Use modern lgpio pin factory
-Device.pin_factory = LGPIOFactory()
+def _gpiozero_button():
+    """gpiozero.Button, imported on first use"""
+    global Button
+    if Button is None:
+        Button = load_gpiozero().Button
+    return Button
 
 
 class ButtonHandler:
     """Handles physical button control for antenna toggling"""
     
-    def __init__(self, hardware, button_pin=17, debounce_time=0.02, antenna_count=3):
+    # Source reported to AntennaHardware state-change listeners
+    SOURCE = 'button'
+    
+    # Edge-to-action latency samples kept for latency_stats()
+    LATENCY_SAMPLES = 256
+    
+    def __init__(self, hardware, button_pin=17, debounce_time=0.02, antenna_count=3, actor=None,
+                 edge_source=None, debouncer=None, gestures=False, long_press_time=0.8,
+                 double_press_time=0.3, off_button_pin=None, adaptive=False, edge_thread=True):
         """
         Initialize button handler with hardware reference
         
@@ -25,14 +70,75 @@ class ButtonHandler:
             debounce_time: Debounce delay in seconds (0.02s = 20ms)
                           Optimized for short pushes
             antenna_count: Number of antennas to cycle through (2 or 3)
+            actor: Optional CommandActor - presses are then applied on the
+                   actor thread instead of the gpiozero callback thread
+            edge_source: Optional edge source (e.g. GpiodEdgeSource) - replaces
+                         the gpiozero Button
+            debouncer: Debounce engine for edge_source (default: lockout
+                       engine with debounce_time)
+            gestures (bool): Enable long-press OFF and double-press A1
+                             (edge_source only)
+            long_press_time (float): Hold time for a long press in seconds
+            double_press_time (float): Window for a second press in seconds
+            off_button_pin: Optional second button (OFF/recall), must be one
+                            of edge_source's lines
+            adaptive (bool): Default debouncer learns the bounce tail of each
+                             button and tunes its lockout (edge_source only)
+            edge_thread (bool): Read edge_source on a thread; False leaves it
+                                to attach(loop) or to a caller driving
+                                process_edges() (trace replay)
         """
         self.hardware = hardware
         self.button_pin = button_pin
         self.debounce_time = debounce_time
         self.antenna_count = antenna_count
+        self.actor = actor
+        
+        self.edge_source = edge_source
+        self.debouncer = debouncer
+        self.latencies_ns = deque(maxlen=self.LATENCY_SAMPLES)
+        self.presses = 0
+        self.metrics = None  # optional metrics.ControllerMetrics
+        self.off_button_pin = off_button_pin
+        self.recall_antenna = 1
+        self.gestures = None
+        self.last_gesture = None
+        self._stop = threading.Event()
+        self._thread = None
+        self.loop = None
+        self._timer = None     # loop TimerHandle for the next deadline
+        self._timer_ns = None
+        
+        if edge_source is not None:
+            # Kernel-timestamped edges through our own debounce engine
+            self.button = None
+            if self.debouncer is None:
+                from debounce import AdaptiveDebouncer, LockoutDebouncer
+                engine = AdaptiveDebouncer if adaptive else LockoutDebouncer
+                self.debouncer = engine(edge_source.level(), int(debounce_time * 1e9))
+            self.debouncers = {button_pin: self.debouncer}
+            if off_button_pin is not None:
+                off_debouncer = copy.deepcopy(self.debouncer)
+                off_debouncer.state = off_debouncer.raw = edge_source.level(off_button_pin)
+                self.debouncers[off_button_pin] = off_debouncer
+            
+            if gestures or off_button_pin is not None:
+                self.wheel = TimerWheel(start_ns=time.monotonic_ns())
+                self.gestures = GestureEngine(self.wheel, self._on_gesture)
+                if gestures:
+                    self.gestures.add_button(button_pin, int(long_press_time * 1e9),
+                                             int(double_press_time * 1e9))
+                else:
+                    self.gestures.add_button(button_pin)
+                if off_button_pin is not None:
+                    self.gestures.add_button(off_button_pin)
+            if edge_thread:
+                self._thread = threading.Thread(target=self._edge_loop, name='button-edges', daemon=True)
+                self._thread.start()
+            return
         
         # Initialize button with pull-up resistor and debouncing
-        self.button = Button(
+        self.button = _gpiozero_button()(
             button_pin,
             pull_up=True,
             bounce_time=debounce_time
@@ -45,6 +151,168 @@ class ButtonHandler:
         """Callback for button press events"""
         self.cycle_antenna()
     
+    def _edge_loop(self):
+        """Wait for edges, sleeping no longer than the next debounce or gesture deadline"""
+        while not self._stop.is_set():
+            deadline = self.next_deadline()
+            if deadline is None:
+                timeout = 0.1
+            else:
+                timeout = max(0.0, (deadline - time.monotonic_ns()) / 1e9)
+            self.process_edges(self.edge_source.wait(timeout), time.monotonic_ns())
+    
+    def attach(self, loop):
+        """
+        Serve edge_source from an asyncio event loop (edge_thread=False)
+        Must be called on the loop's thread; edges and deadlines are then
+        processed there
+        
+        Args:
+            loop: Running asyncio event loop
+        """
+        self.loop = loop
+        loop.add_reader(self.edge_source.fileno(), self._on_readable)
+        self._schedule()
+    
+    def detach(self):
+        """Unregister from the event loop"""
+        if self.loop is None:
+            return
+        self.loop.remove_reader(self.edge_source.fileno())
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self.loop = None
+    
+    def _on_readable(self):
+        """Loop reader callback - edges are pending"""
+        self.process_edges(self.edge_source.read(), time.monotonic_ns())
+        self._schedule()
+    
+    def _on_timer(self):
+        """Loop timer callback - a debounce or gesture deadline is due"""
+        self._timer = None
+        # The loop may run a timer a clock tick early; it is due regardless
+        self.process_edges((), max(time.monotonic_ns(), self._timer_ns))
+        self._schedule()
+    
+    def _schedule(self):
+        """Keep one loop timer armed for the next deadline"""
+        deadline = self.next_deadline()
+        if self._timer is not None:
+            if deadline == self._timer_ns:
+                return
+            self._timer.cancel()
+            self._timer = None
+        if deadline is not None:
+            # loop.time() is time.monotonic(), the clock of the edge timestamps
+            self._timer_ns = deadline
+            self._timer = self.loop.call_at(deadline / 1e9, self._on_timer)
+    
+    def next_deadline(self):
+        """
+        Earliest pending debounce or gesture decision
+        
+        Returns:
+            int: Monotonic ns time, or None when nothing is pending
+        """
+        deadlines = [d.deadline() for d in self.debouncers.values()]
+        if self.gestures is not None:
+            deadlines.append(self.wheel.next_deadline())
+        deadlines = [d for d in deadlines if d is not None]
+        return min(deadlines) if deadlines else None
+    
+    def process_edges(self, edges, now_ns):
+        """
+        Run edges through the debounce engine and act on presses
+        
+        Args:
+            edges: Iterable of Edge from the edge source
+            now_ns (int): Current monotonic time (decides pending timeouts)
+        """
+        for edge in edges:
+            pin = self.button_pin if edge.pin is None else edge.pin
+            debouncer = self.debouncers.get(pin)
+            if debouncer is None:
+                continue
+            for event in debouncer.feed(edge):
+                self._dispatch(event, pin)
+        for pin, debouncer in self.debouncers.items():
+            for event in debouncer.advance(now_ns):
+                self._dispatch(event, pin)
+        if self.gestures is not None:
+            self.wheel.advance(now_ns)
+    
+    def _dispatch(self, event, pin):
+        """Act on one debounced event and record edge-to-action latency"""
+        if self.gestures is not None:
+            if event.pressed:
+                self.presses += 1
+                self.gestures.press(pin, event.decided_ns, event.edge_ns)
+            else:
+                self.gestures.release(pin, event.decided_ns, event.edge_ns)
+            return
+        if not event.pressed:
+            return
+        self._record_latency(time.monotonic_ns() - event.edge_ns)
+        self.presses += 1
+        self._on_button_press()
+    
+    def _on_gesture(self, pin, gesture, origin_ns, decided_ns):
+        """Gesture engine callback (edge thread)"""
+        self._record_latency(time.monotonic_ns() - origin_ns)
+        self.last_gesture = (pin, gesture)
+        if pin == self.off_button_pin or gesture == GESTURE_LONG:
+            self.toggle_off()
+        elif gesture == GESTURE_DOUBLE:
+            self.select_antenna(1)
+        else:
+            self.cycle_antenna()
+    
+    def _record_latency(self, latency_ns):
+        """Keep one edge-to-action latency sample"""
+        self.latencies_ns.append(latency_ns)
+        if self.metrics is not None:
+            self.metrics.button_ns.observe(latency_ns)
+    
+    def latency_stats(self):
+        """
+        Edge-to-cycle_antenna latency over recent presses
+        
+        Returns:
+            dict: count, last, mean, p50, p99, max in nanoseconds (None
+                  values when no press has been measured)
+        """
+        samples = sorted(self.latencies_ns)
+        if not samples:
+            return {'count': 0, 'last': None, 'mean': None, 'p50': None, 'p99': None, 'max': None}
+        return {
+            'count': len(samples),
+            'last': self.latencies_ns[-1],
+            'mean': sum(samples) // len(samples),
+            'p50': samples[len(samples) // 2],
+            'p99': samples[min(len(samples) - 1, len(samples) * 99 // 100)],
+            'max': samples[-1],
+        }
+    
+    def debounce_status(self):
+        """
+        Debounce engine and current window of every button
+        
+        Returns:
+            dict: pin -> {'engine', 'window_ns'} plus the AdaptiveDebouncer
+                  estimate (lockout_ns, tail_ns, bursts, rejected) for
+                  adaptive engines; gpiozero reports engine 'gpiozero'
+        """
+        if self.edge_source is None:
+            return {self.button_pin: {'engine': 'gpiozero', 'window_ns': int(self.debounce_time * 1e9)}}
+        status = {}
+        for pin, debouncer in self.debouncers.items():
+            status[pin] = {'engine': debouncer.name, 'window_ns': debouncer.window_ns}
+            if hasattr(debouncer, 'estimate'):
+                status[pin].update(debouncer.estimate())
+        return status
+    
     def cycle_antenna(self):
         """
         Cycle through antennas based on antenna_count configuration
@@ -54,8 +322,39 @@ class ButtonHandler:
         
         Note: Button does NOT cycle through OFF state (OFF only via SSH)
         """
+        if self.actor is not None:
+            # Read and write happen together on the actor thread
+            self.actor.update(self._next_antenna, source=self.SOURCE)
+            return
+        
         current = self.hardware.get_current_antenna()
+        self.hardware.set_antenna(self._next_antenna(current), source=self.SOURCE)
+    
+    def toggle_off(self):
+        """OFF, or back to the antenna selected before OFF (recall)"""
+        if self.actor is not None:
+            self.actor.update(self._toggle_off_target, source=self.SOURCE)
+            return
         
+        current = self.hardware.get_current_antenna()
+        self.hardware.set_antenna(self._toggle_off_target(current), source=self.SOURCE)
+    
+    def _toggle_off_target(self, current):
+        """Target of the OFF/recall toggle (remembers the antenna turned off)"""
+        if current == 0:
+            return self.recall_antenna
+        self.recall_antenna = current
+        return 0
+    
+    def select_antenna(self, antenna_num):
+        """Select one antenna directly (double-press A1)"""
+        if self.actor is not None:
+            self.actor.submit(antenna_num, source=self.SOURCE)
+        else:
+            self.hardware.set_antenna(antenna_num, source=self.SOURCE)
+    
+    def _next_antenna(self, current):
+        """Antenna after current in the button cycle"""
         # Use modulo arithmetic for clean cycling
         if current == 0:
             # From OFF → A1
@@ -66,9 +365,16 @@ class ButtonHandler:
             # 3-antenna: 1→2, 2→3, 3→1
             next_antenna = (current % self.antenna_count) + 1
         
-        self.hardware.set_antenna(next_antenna)
+        return next_antenna
     
     def cleanup(self):
         """Clean up button resources"""
+        self.detach()
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        if self.edge_source is not None:
+            self.edge_source.close()
         if self.button:
             self.button.close()
@@ -0,0 +1,346 @@
+# src/command_actor.py
+"""
+Command Actor - Single Writer for Antenna State
+Serializes every mutation (button, network, band follower) through one
+thread so AntennaHardware.set_antenna is never called concurrently
+
+Every submission gets a monotonically increasing sequence number and is
+applied in that order from a bounded queue. Read-modify-write operations
+(button cycling) are submitted as a function of the current antenna and
+evaluated on the actor thread, so a concurrent A3 can't be lost between
+the read and the write.
+
+State reads never take a lock: the actor publishes an immutable
+ActorState snapshot after each applied command.
+
+Relay coalescing (policy=POLICY_LATEST): a switch is applied as soon as
+it arrives, but anything submitted while the relays are still settling
+is folded - absolute targets and update() functions are evaluated in
+sequence order - and only the final target is written once settle_time
+has passed. A burst of N commands costs at most two relay operations.
+
+The actor exposes the same set_antenna / get_current_antenna /
+add_listener interface as AntennaHardware, so it can be handed to
+SSHCommandHandler, BandFollower or AntennaDaemon in place of the hardware.
+
+LoopActor applies the same commands on an asyncio event loop instead of
+a thread: a command submitted on the loop thread is applied right away
+(or folded into the pending settle flush, a loop timer), and threads
+off the loop hand theirs over with call_soon_threadsafe. Commands
+submitted before start() or after stop() fail with RuntimeError rather
+than reaching the hardware from an arbitrary thread.
+
+Usage:
+  actor = CommandActor(hw)
+  actor.start()
+  handler = SSHCommandHandler(actor)
+  button = ButtonHandler(hw, actor=actor)
+"""
+
+import asyncio
+import contextvars
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future
+
+# Immutable snapshot published after every applied command
+ActorState = namedtuple('ActorState', ['seq', 'antenna', 'source'])
+
+# Switch policies
+POLICY_ALL = 'all'        # apply every target in order
+POLICY_LATEST = 'latest'  # last-writer-wins while the relays settle
+
+_SET = 0
+_UPDATE = 1
+_STOP = 2
+
+
+class CommandActor:
+    """Owns AntennaHardware mutations on a single thread"""
+    
+    def __init__(self, hardware, queue_size=64, policy=POLICY_ALL, settle_time=0.01):
+        """
+        Initialize actor with hardware reference
+        
+        Args:
+            hardware: AntennaHardware instance
+            queue_size (int): Commands allowed to wait before submit() blocks
+            policy (str): POLICY_ALL or POLICY_LATEST
+            settle_time (float): Seconds a relay needs to settle after a
+                                 switch (POLICY_LATEST only)
+        """
+        if policy not in (POLICY_ALL, POLICY_LATEST):
+            raise ValueError(f"unknown switch policy '{policy}'")
+        self.hardware = hardware
+        self.policy = policy
+        self.settle_time = settle_time
+        self._settle_until = 0.0
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.state = ActorState(0, hardware.get_current_antenna(), 'startup')
+        
+        # Sequence numbers are assigned and enqueued under one lock so
+        # queue order always matches sequence order
+        self._submit_lock = threading.Lock()
+        self._next_seq = 0
+        self._thread = None
+        
+        # Counters
+        self.applied = 0     # commands completed
+        self.switches = 0    # relay writes that changed the antenna
+        self.coalesced = 0   # targets superseded before reaching the relays
+        self.errors = 0
+    
+    def start(self):
+        """Start the actor thread"""
+        self._thread = threading.Thread(target=self._run, name='command-actor', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Apply everything already queued, then stop the actor thread"""
+        if self._thread is not None:
+            self._submit(_STOP, None, None)
+            self._thread.join()
+            self._thread = None
+    
+    def pending(self):
+        """Commands waiting for the actor thread"""
+        return self.queue.qsize()
+    
+    def _submit(self, kind, arg, source, timeout=None):
+        """Assign a sequence number and enqueue, return a Future"""
+        future = Future()
+        with self._submit_lock:
+            self._next_seq += 1
+            future.seq = self._next_seq
+            self.queue.put((self._next_seq, kind, arg, source, future), timeout=timeout)
+        return future
+    
+    def submit(self, antenna_num, source='local', timeout=None):
+        """
+        Queue an absolute antenna selection
+        
+        Args:
+            antenna_num (int): Antenna number (0 = OFF)
+            source (str): Source reported to state-change listeners
+            timeout (float): Seconds to wait for queue space (None = forever)
+        
+        Returns:
+            Future: Resolves to the resulting ActorState (future.seq is the
+                    command's sequence number)
+        
+        Raises:
+            queue.Full: Queue still full after timeout
+        """
+        return self._submit(_SET, antenna_num, source, timeout)
+    
+    def update(self, func, source='local', timeout=None):
+        """
+        Queue a read-modify-write evaluated atomically on the actor thread
+        
+        Args:
+            func: Called with the current antenna, returns the antenna to select
+            source (str): Source reported to state-change listeners
+            timeout (float): Seconds to wait for queue space (None = forever)
+        
+        Returns:
+            Future: Resolves to the resulting ActorState
+        """
+        return self._submit(_UPDATE, func, source, timeout)
+    
+    def _run(self):
+        """Actor loop - the only caller of hardware.set_antenna"""
+        while True:
+            batch = [self.queue.get()]
+            if self.policy == POLICY_LATEST:
+                # Let the relays settle, then take everything that arrived meanwhile
+                remaining = self._settle_until - time.monotonic()
+                if remaining > 0:
+                    time.sleep(remaining)
+                while True:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+            if not self._apply(batch):
+                return
+    
+    def _apply(self, batch):
+        """
+        Fold a batch of commands into one target and write it once
+        
+        Returns:
+            bool: False once the stop command has been processed
+        """
+        current = self.state.antenna
+        target = current
+        source = self.state.source
+        seq = self.state.seq
+        changes = 0
+        done = []
+        stop = None
+        
+        for item_seq, kind, arg, item_source, future in batch:
+            if stop is not None:
+                future.set_exception(RuntimeError("command actor stopped"))
+                continue
+            if kind == _STOP:
+                stop = future
+                continue
+            try:
+                wanted = arg(target) if kind == _UPDATE else arg
+            except Exception as e:
+                self.errors += 1
+                future.set_exception(e)
+                continue
+            # Invalid targets are ignored, as AntennaHardware.set_antenna does
+            if wanted != target and (wanted == 0 or wanted in self.hardware.relay_pins):
+                target = wanted
+                source = item_source
+                changes += 1
+            seq = item_seq
+            done.append(future)
+        
+        written = target != current
+        if written:
+            try:
+                self.hardware.set_antenna(target, source=source)
+            except Exception as e:
+                self.errors += 1
+                for future in done:
+                    future.set_exception(e)
+                done = []
+            else:
+                self.switches += 1
+                self._settle_until = time.monotonic() + self.settle_time
+        # Targets that never reached the relays: every change but the one
+        # written (all of them when the batch returned to the current antenna)
+        self.coalesced += changes - 1 if written else changes
+        
+        if done:
+            self.state = ActorState(seq, self.hardware.get_current_antenna(), source)
+            self.applied += len(done)
+            for future in done:
+                future.set_result(self.state)
+        if stop is not None:
+            stop.set_result(self.state)
+            return False
+        return True
+    
+    # AntennaHardware-compatible interface
+    
+    def set_antenna(self, antenna_num, source='local'):
+        """
+        Select an antenna through the actor and wait until it is applied
+        Exceptions raised by the hardware are re-raised here
+        """
+        self.submit(antenna_num, source).result()
+    
+    def get_current_antenna(self):
+        """Current antenna from the latest snapshot (no lock)"""
+        return self.state.antenna
+    
+    def add_listener(self, callback):
+        """Register a hardware state-change listener"""
+        self.hardware.add_listener(callback)
+    
+    def remove_listener(self, callback):
+        """Unregister a hardware state-change listener"""
+        self.hardware.remove_listener(callback)
+
+
+class LoopActor(CommandActor):
+    """CommandActor whose single writer is an asyncio event loop thread"""
+    
+    def __init__(self, hardware, policy=POLICY_ALL, settle_time=0.01):
+        """
+        Initialize actor with hardware reference
+        
+        Args:
+            hardware: AntennaHardware instance
+            policy (str): POLICY_ALL or POLICY_LATEST
+            settle_time (float): Seconds a relay needs to settle after a
+                                 switch (POLICY_LATEST only)
+        """
+        super().__init__(hardware, policy=policy, settle_time=settle_time)
+        self.loop = None
+        self._loop_thread = None
+        self._pending = []
+        self._flush = None  # loop TimerHandle applying _pending when settled
+    
+    def start(self, loop=None):
+        """
+        Bind to an event loop (call on the loop thread)
+        
+        Args:
+            loop: Event loop (default: the running loop)
+        """
+        self.loop = loop or asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+    
+    def stop(self):
+        """Apply anything still waiting for the relays to settle and unbind"""
+        if self._flush is not None:
+            self._flush.cancel()
+            self._flush_pending()
+        self.loop = None
+        self._loop_thread = None
+    
+    def pending(self):
+        """Targets waiting for the relays to settle"""
+        return len(self._pending)
+    
+    def _on_loop(self):
+        """True on the loop thread"""
+        return threading.get_ident() == self._loop_thread
+    
+    def _submit(self, kind, arg, source, timeout=None):
+        """Apply (or queue) on the loop thread, return a Future"""
+        future = Future()
+        loop = self.loop
+        if loop is None:
+            future.set_exception(RuntimeError("loop actor is not running"))
+        elif self._on_loop():
+            self._enqueue(kind, arg, source, future)
+        else:
+            # future.seq is assigned once the command reaches the loop
+            loop.call_soon_threadsafe(self._enqueue, kind, arg, source, future)
+        return future
+    
+    def _enqueue(self, kind, arg, source, future):
+        """Loop thread: apply now, or fold into the pending settle flush"""
+        if self.loop is None:
+            # Handed over by another thread just before stop()
+            future.set_exception(RuntimeError("loop actor is not running"))
+            return
+        self._next_seq += 1
+        future.seq = self._next_seq
+        self._pending.append((self._next_seq, kind, arg, source, future))
+        if self._flush is not None:
+            return
+        remaining = self._settle_until - time.monotonic()
+        if self.policy == POLICY_LATEST and remaining > 0:
+            # A fresh context: the flush must not inherit the (by then
+            # finished) trace span of the command that armed it
+            self._flush = self.loop.call_later(remaining, self._flush_pending,
+                                               context=contextvars.Context())
+        else:
+            self._flush_pending()
+    
+    def _flush_pending(self):
+        """Apply every pending command as one batch"""
+        self._flush = None
+        batch, self._pending = self._pending, []
+        self._apply(batch)
+    
+    def set_antenna(self, antenna_num, source='local'):
+        """
+        Select an antenna through the actor
+        Waits for the result off the loop; on the loop thread (which must
+        never block) it returns once the command is applied or folded
+        into the pending settle flush
+        """
+        future = self.submit(antenna_num, source)
+        if not self._on_loop() or future.done():
+            future.result()
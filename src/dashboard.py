@@ -0,0 +1,330 @@
+# src/dashboard.py
+"""
+Dashboard - Live Full-Screen Status for antenna_cli
+Shows the active antenna, who changed it last, switch rate and latency
+statistics, updated as changes happen (button presses included)
+
+Changes arrive through the hardware state-change listener, which only
+updates counters and wakes the UI through a pipe. The UI thread sleeps
+in select() on the keyboard and that pipe, with a once-a-second tick for
+the clock and the "ago" timer, so an idle dashboard costs almost no CPU.
+
+Each screen field is compared with what is already on screen and only
+the characters that changed are written, so curses has almost nothing
+to send. A switch rewrites a handful of cells instead of the whole
+status block, which keeps the dashboard usable over a slow SSH link.
+
+Keys:
+  1..9  select antenna    0 / o  OFF    q  quit
+
+Usage:
+  python3 antenna_cli.py --dashboard
+"""
+
+import os
+import select
+import sys
+import time
+from collections import Counter, deque
+
+try:
+    import curses
+except ImportError:
+    # Not available on every platform; only run() needs it
+    curses = None
+
+RATE_WINDOW_NS = 60 * 1000000000
+WIDTH = 64
+
+
+class DashboardState:
+    """Switch statistics fed by the hardware state-change listener"""
+    
+    def __init__(self, antenna, clock=time.monotonic_ns):
+        """
+        Args:
+            antenna (int): Antenna selected when the dashboard starts
+            clock: Monotonic nanosecond clock
+        """
+        self.clock = clock
+        self.antenna = antenna
+        self.previous = None
+        self.source = None
+        self.changed_ns = None
+        self.switches = 0
+        self.sources = Counter()
+        self.recent = deque(maxlen=4096)  # change times for the switch rate
+        self.command_ns = deque(maxlen=256)  # keypress-to-applied latencies
+        self.on_change = None  # called after every change (any thread)
+    
+    def record(self, previous, current, source):
+        """AntennaHardware state-change listener"""
+        now = self.clock()
+        self.previous, self.antenna, self.source, self.changed_ns = previous, current, source, now
+        self.switches += 1
+        self.sources[source] += 1
+        self.recent.append(now)
+        if self.on_change is not None:
+            self.on_change()
+    
+    def rate_per_minute(self, now_ns):
+        """Switches during the last minute"""
+        recent = list(self.recent)
+        return sum(1 for t in recent if now_ns - t <= RATE_WINDOW_NS)
+
+
+class Renderer:
+    """Turns field texts into the minimal list of screen writes"""
+    
+    def __init__(self, layout):
+        """
+        Args:
+            layout (dict): field name -> (row, col, width)
+        """
+        self.layout = layout
+        self.shown = {}
+    
+    def changes(self, fields):
+        """
+        Fields whose text differs from what is on screen
+        
+        Args:
+            fields (dict): field name -> text
+        
+        Returns:
+            list: (row, col, text) writes covering only the changed
+            characters of each field (a new field is written padded)
+        """
+        writes = []
+        for name, text in fields.items():
+            row, col, width = self.layout[name]
+            text = text[:width].ljust(width)
+            shown = self.shown.get(name)
+            if shown == text:
+                continue
+            self.shown[name] = text
+            if shown is None:
+                writes.append((row, col, text))
+                continue
+            first = 0
+            while shown[first] == text[first]:
+                first += 1
+            last = width
+            while shown[last - 1] == text[last - 1]:
+                last -= 1
+            writes.append((row, col + first, text[first:last]))
+        return writes
+    
+    def invalidate(self):
+        """Forget the screen contents (after a resize or clear)"""
+        self.shown.clear()
+
+
+def make_layout(antenna_count):
+    """Field positions for a dashboard of antenna_count ports"""
+    layout = {
+        'title': (0, 1, WIDTH - 10),
+        'clock': (0, WIDTH - 8, 8),
+        'active': (2, 2, 14),
+        'last': (4, 2, WIDTH - 2),
+        'switches': (5, 2, WIDTH - 2),
+        'sources': (6, 2, WIDTH - 2),
+        'button': (8, 2, WIDTH - 2),
+        'command': (9, 2, WIDTH - 2),
+        'help': (11, 2, WIDTH - 2),
+        'message': (12, 2, WIDTH - 2),
+    }
+    # One box per port on the first row (large matrices show the count only)
+    for num in range(1, min(antenna_count, 8) + 1):
+        layout[f'port{num}'] = (2, 10 + 6 * num, 5)
+    return layout
+
+
+def _name(antenna):
+    """A<n> or OFF"""
+    return f"A{antenna}" if antenna else "OFF"
+
+
+def _ago(ns):
+    """Coarse age (changes at most once a second)"""
+    seconds = int(ns // 1000000000)
+    if seconds < 60:
+        return f"{seconds}s ago"
+    if seconds < 3600:
+        return f"{seconds // 60}m ago"
+    return f"{seconds // 3600}h ago"
+
+
+def _latency(label, stats, unit):
+    """One latency line from a latency_stats()-style dict"""
+    if not stats['count']:
+        return f"{label}: no {unit} yet"
+    ms = {key: stats[key] / 1e6 for key in ('last', 'p50', 'p99', 'max')}
+    return (f"{label}: last {ms['last']:.2f}ms  p50 {ms['p50']:.2f}ms  p99 {ms['p99']:.2f}ms  "
+            f"max {ms['max']:.2f}ms  ({stats['count']} {unit})")
+
+
+def latency_stats(samples_ns):
+    """count/last/p50/p99/max of samples, like ButtonHandler.latency_stats"""
+    ordered = sorted(samples_ns)
+    if not ordered:
+        return {'count': 0}
+    return {
+        'count': len(ordered),
+        'last': samples_ns[-1],
+        'p50': ordered[len(ordered) // 2],
+        'p99': ordered[min(len(ordered) - 1, len(ordered) * 99 // 100)],
+        'max': ordered[-1],
+    }
+
+
+class Dashboard:
+    """Full-screen live view and single-key control"""
+    
+    def __init__(self, hardware, handler, button=None, antenna_count=3, clock=time.monotonic_ns):
+        """
+        Args:
+            hardware: AntennaHardware or CommandActor (listener source)
+            handler: SSHCommandHandler used for key commands
+            button: Optional ButtonHandler (latency statistics)
+            antenna_count (int): Number of antennas
+            clock: Monotonic nanosecond clock
+        """
+        self.hardware = hardware
+        self.handler = handler
+        self.button = button
+        self.antenna_count = antenna_count
+        self.clock = clock
+        self.state = DashboardState(hardware.get_current_antenna(), clock)
+        self.renderer = Renderer(make_layout(antenna_count))
+        self.message = ''
+        self._wake_r = self._wake_w = None
+        self._wake_pending = False
+    
+    def start(self):
+        """Subscribe to state changes"""
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self.state.on_change = self._wake
+        self.hardware.add_listener(self.state.record)
+    
+    def stop(self):
+        """Unsubscribe and close the wake-up pipe"""
+        self.hardware.remove_listener(self.state.record)
+        self.state.on_change = None
+        if self._wake_r is not None:
+            os.close(self._wake_r)
+            os.close(self._wake_w)
+            self._wake_r = self._wake_w = None
+    
+    def _wake(self):
+        """Listener thread: wake the UI (one byte per burst of changes)"""
+        if not self._wake_pending:
+            self._wake_pending = True
+            try:
+                os.write(self._wake_w, b'x')
+            except OSError:
+                pass
+    
+    def _drain_wake(self):
+        """UI thread: empty the wake-up pipe, then re-arm _wake"""
+        # Clearing the flag first would let a _wake between the two steps
+        # have its byte drained here while the flag stays set, and every
+        # later _wake would be skipped
+        try:
+            os.read(self._wake_r, 4096)
+        except BlockingIOError:
+            pass
+        self._wake_pending = False
+    
+    def fields(self, now_ns):
+        """Text of every screen field"""
+        state = self.state
+        fields = {
+            'title': f"ANTENNA CONTROLLER - {self.antenna_count}-antenna dashboard",
+            'clock': time.strftime('%H:%M:%S'),
+            'active': f"Active: {_name(state.antenna)}",
+            'switches': f"Switches: {state.switches} total, {state.rate_per_minute(now_ns)} in the last minute",
+            'sources': "Sources: " + ('  '.join(f"{source} {count}"
+                                               for source, count in state.sources.most_common())
+                                     or 'none yet'),
+            'command': _latency("Key to relay", latency_stats(state.command_ns), 'commands'),
+            'help': f"1-{min(self.antenna_count, 9)} select   0/o OFF   q quit",
+            'message': self.message,
+        }
+        for num in range(1, min(self.antenna_count, 8) + 1):
+            fields[f'port{num}'] = f"{'●' if num == state.antenna else '○'} A{num}"
+        if state.changed_ns is None:
+            fields['last'] = "Last change: none since start"
+        else:
+            fields['last'] = (f"Last change: {_name(state.previous)} → {_name(state.antenna)} "
+                              f"by {state.source}, {_ago(now_ns - state.changed_ns)}")
+        if self.button is None:
+            fields['button'] = "Button latency: no button"
+        else:
+            fields['button'] = _latency("Button latency", self.button.latency_stats(), 'presses')
+        return fields
+    
+    def key(self, ch):
+        """
+        Handle one key press
+        
+        Returns:
+            bool: False to quit
+        """
+        char = chr(ch).upper() if 0 <= ch < 256 else ''
+        if char == 'Q':
+            return False
+        if char in ('0', 'O'):
+            command = 'OFF'
+        elif char.isdigit() and int(char) <= self.antenna_count:
+            command = f"A{char}"
+        else:
+            return True
+        start = self.clock()
+        self.message = self.handler.handle_command(command)
+        self.state.command_ns.append(self.clock() - start)
+        return True
+    
+    def draw(self, screen):
+        """Write the changed fields and refresh"""
+        for row, col, text in self.renderer.changes(self.fields(self.clock())):
+            try:
+                screen.addstr(row, col, text)
+            except curses.error:
+                pass  # terminal smaller than the dashboard
+        screen.refresh()
+    
+    def run(self, screen, tick=1.0):
+        """
+        Main loop (pass to curses.wrapper)
+        
+        Args:
+            screen: curses window
+            tick (float): Seconds between clock/age updates when idle
+        """
+        try:
+            curses.curs_set(0)
+        except curses.error:
+            pass
+        screen.nodelay(True)
+        self.start()
+        stdin = sys.stdin.fileno()
+        try:
+            while True:
+                self.draw(screen)
+                readable, _, _ = select.select([stdin, self._wake_r], [], [], tick)
+                if self._wake_r in readable:
+                    self._drain_wake()
+                while True:
+                    ch = screen.getch()
+                    if ch == -1:
+                        break
+                    if ch == curses.KEY_RESIZE:
+                        screen.clear()
+                        self.renderer.invalidate()
+                    elif not self.key(ch):
+                        return
+        finally:
+            self.stop()
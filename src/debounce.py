@@ -0,0 +1,383 @@
+# src/debounce.py
+"""
+Debounce Engines - Turn Raw Button Edges into Press/Release Events
+Pluggable state machines fed with kernel-timestamped edges (edge_source.py)
+
+Engines:
+  lockout     - act on the first edge, ignore the line for lockout_ns
+                (lowest latency; a release bounce can't re-trigger)
+  integrator  - counter runs up while the line is active and down while
+                inactive; output flips at the bounds (rejects short spikes)
+  stable      - output follows the line once it has held one level for
+                samples * sample_ns (classic "stable for N samples")
+  adaptive    - lockout whose window tracks the measured bounce tail of
+                the switch (BounceHistogram), so it is only as long as
+                this switch in this RF environment needs
+
+Every engine works in timestamp space, not wall time, so the same edges
+always produce the same events (tests, trace replay):
+  feed(edge)      - process one edge, return events decided up to it
+  advance(now_ns) - return events decided by now_ns with no new edge
+  deadline()      - ns time of the next pending decision, or None
+
+DebounceEvent.edge_ns is the first raw edge of the transition, so
+decided_ns - edge_ns is the debounce delay and (dispatch time - edge_ns)
+the edge-to-action latency.
+"""
+
+from collections import namedtuple
+
+DebounceEvent = namedtuple('DebounceEvent', ['edge_ns', 'decided_ns', 'pressed'])
+
+
+class Debouncer:
+    """Shared bookkeeping: debounced state, raw level, transition start"""
+    
+    name = None
+    
+    def __init__(self, active=False):
+        """
+        Args:
+            active (bool): Initial level (debounced and raw)
+        """
+        self.state = active
+        self.raw = active
+        self.transition_ns = None  # first raw edge of the pending transition
+        self.last_raw_ns = None
+        self.window_ns = 0         # engine's settle window (set by subclasses)
+        self.edges = 0
+        self.events = 0
+    
+    def _decide(self, decided_ns):
+        """Flip the debounced state and build the event"""
+        self.state = not self.state
+        event = DebounceEvent(self.transition_ns if self.transition_ns is not None else decided_ns,
+                              decided_ns, self.state)
+        self.transition_ns = None
+        self.events += 1
+        return event
+    
+    def feed(self, edge):
+        """
+        Process one raw edge
+        
+        Args:
+            edge: Edge(timestamp_ns, active)
+        
+        Returns:
+            list: DebounceEvents decided up to and including this edge
+        """
+        events = self.advance(edge.timestamp_ns)
+        self.edges += 1
+        if edge.active != self.state:
+            # A transition starts at the first edge after a quiet line, so a
+            # rejected spike doesn't become the origin of a later press
+            quiet = self.last_raw_ns is None or edge.timestamp_ns - self.last_raw_ns > self.window_ns
+            if self.transition_ns is None or quiet:
+                self.transition_ns = edge.timestamp_ns
+        self.last_raw_ns = edge.timestamp_ns
+        events.extend(self._edge(edge))
+        return events
+    
+    def advance(self, now_ns):
+        """Events decided by now_ns (no new edge)"""
+        raise NotImplementedError
+    
+    def deadline(self):
+        """Timestamp of the next pending decision, or None"""
+        raise NotImplementedError
+    
+    def _edge(self, edge):
+        """Engine-specific edge handling (time already advanced to the edge)"""
+        raise NotImplementedError
+
+
+class LockoutDebouncer(Debouncer):
+    """First edge wins, then the line is ignored for lockout_ns"""
+    
+    name = 'lockout'
+    
+    def __init__(self, active=False, lockout_ns=20000000):
+        """
+        Args:
+            active (bool): Initial level
+            lockout_ns (int): Ignore period after each accepted edge (20ms)
+        """
+        super().__init__(active)
+        self.lockout_ns = lockout_ns
+        self.lockout_until = 0
+        self.window_ns = lockout_ns
+    
+    def _edge(self, edge):
+        self.raw = edge.active
+        if edge.timestamp_ns < self.lockout_until or edge.active == self.state:
+            return []
+        self.lockout_until = edge.timestamp_ns + self.lockout_ns
+        return [self._decide(edge.timestamp_ns)]
+    
+    def advance(self, now_ns):
+        # A transition hidden by the lockout (very short press) is caught
+        # up when the lockout ends
+        if self.raw != self.state and now_ns >= self.lockout_until:
+            decided_ns = self.lockout_until
+            self.lockout_until = decided_ns + self.lockout_ns
+            return [self._decide(decided_ns)]
+        return []
+    
+    def deadline(self):
+        return self.lockout_until if self.raw != self.state else None
+
+
+class IntegratorDebouncer(Debouncer):
+    """Saturating integrator - the line must be active for threshold samples net"""
+    
+    name = 'integrator'
+    
+    def __init__(self, active=False, sample_ns=1000000, threshold=5):
+        """
+        Args:
+            active (bool): Initial level
+            sample_ns (int): Integration step (1ms)
+            threshold (int): Steps to reach either bound
+        """
+        super().__init__(active)
+        self.limit = sample_ns * threshold
+        self.window_ns = self.limit
+        self.level = self.limit if active else 0  # integrator value in ns
+        self.last_ns = None
+    
+    def _edge(self, edge):
+        self.raw = edge.active
+        return []
+    
+    def advance(self, now_ns):
+        if self.last_ns is None:
+            self.last_ns = now_ns
+            return []
+        elapsed = now_ns - self.last_ns
+        if elapsed <= 0:
+            return []
+        events = []
+        if self.raw:
+            if not self.state and self.level + elapsed >= self.limit:
+                events.append(self._decide(self.last_ns + self.limit - self.level))
+            self.level = min(self.limit, self.level + elapsed)
+        else:
+            if self.state and self.level - elapsed <= 0:
+                events.append(self._decide(self.last_ns + self.level))
+            self.level = max(0, self.level - elapsed)
+        self.last_ns = now_ns
+        return events
+    
+    def deadline(self):
+        if self.last_ns is None:
+            return None
+        if self.raw and not self.state:
+            return self.last_ns + self.limit - self.level
+        if not self.raw and self.state:
+            return self.last_ns + self.level
+        return None
+
+
+class StableDebouncer(Debouncer):
+    """Output follows the line once it has been stable for N samples"""
+    
+    name = 'stable'
+    
+    def __init__(self, active=False, sample_ns=1000000, samples=5):
+        """
+        Args:
+            active (bool): Initial level
+            sample_ns (int): Sample period (1ms)
+            samples (int): Consecutive equal samples required
+        """
+        super().__init__(active)
+        self.stable_ns = sample_ns * samples
+        self.window_ns = self.stable_ns
+        self.last_edge_ns = 0
+    
+    def _edge(self, edge):
+        self.raw = edge.active
+        self.last_edge_ns = edge.timestamp_ns
+        return []
+    
+    def advance(self, now_ns):
+        if self.raw != self.state and now_ns >= self.last_edge_ns + self.stable_ns:
+            return [self._decide(self.last_edge_ns + self.stable_ns)]
+        return []
+    
+    def deadline(self):
+        return self.last_edge_ns + self.stable_ns if self.raw != self.state else None
+
+
+class BounceHistogram:
+    """
+    Streaming log-linear histogram of bounce burst lengths (ns)
+    
+    Bins are 1/8 of a power of two wide (12.5% resolution) from 0 to
+    max_ns; longer values land in the last bin. Once `window` samples have
+    been counted every bin is halved, so old bursts fade out and the
+    estimate follows a switch that wears or a noisier RF environment.
+    """
+    
+    SUB_BITS = 3
+    
+    def __init__(self, max_ns=50000000, window=256):
+        """
+        Args:
+            max_ns (int): Largest value resolved
+            window (int): Samples between halvings
+        """
+        self.window = window
+        self.counts = [0] * (self._index(max_ns) + 1)
+        self.total = 0
+        self.samples = 0  # every sample ever added (not decayed)
+    
+    def _index(self, value):
+        """Bin of one value"""
+        sub = 1 << self.SUB_BITS
+        if value < sub:
+            return value
+        shift = value.bit_length() - self.SUB_BITS - 1
+        return (shift + 1) * sub + (value >> shift) - sub
+    
+    def _upper(self, index):
+        """Largest value that falls in a bin"""
+        sub = 1 << self.SUB_BITS
+        if index < sub:
+            return index
+        shift = index // sub - 1
+        return ((index % sub + sub + 1) << shift) - 1
+    
+    def add(self, value):
+        """Count one sample"""
+        self.counts[min(self._index(max(0, value)), len(self.counts) - 1)] += 1
+        self.total += 1
+        self.samples += 1
+        if self.total >= self.window:
+            self.counts = [count // 2 for count in self.counts]
+            self.total = sum(self.counts)
+    
+    def quantile(self, q):
+        """
+        Upper edge of the bin holding the q quantile
+        
+        Returns:
+            int: ns value, or None when empty
+        """
+        if not self.total:
+            return None
+        wanted = q * self.total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= wanted:
+                return self._upper(index)
+        return self._upper(len(self.counts) - 1)
+
+
+class AdaptiveDebouncer(LockoutDebouncer):
+    """Lockout debouncer that sizes its lockout from the switch's own bounce"""
+    
+    name = 'adaptive'
+    
+    def __init__(self, active=False, lockout_ns=20000000, min_ns=1000000, max_ns=30000000,
+                 quantile=0.99, margin=1.5, min_bursts=16):
+        """
+        Args:
+            active (bool): Initial level
+            lockout_ns (int): Lockout until enough bursts were measured (20ms)
+            min_ns (int): Shortest lockout ever used (1ms)
+            max_ns (int): Longest lockout; a quiet gap longer than this ends
+                          a burst (30ms)
+            quantile (float): Share of bursts the lockout must cover
+            margin (float): Multiplier on the measured tail
+            min_bursts (int): Bursts measured before the lockout adapts
+        """
+        super().__init__(active, lockout_ns)
+        self.min_ns = min_ns
+        self.max_ns = max_ns
+        self.quantile = quantile
+        self.margin = margin
+        self.min_bursts = min_bursts
+        self.histogram = BounceHistogram(max_ns)
+        self.tail_ns = None         # measured bounce tail (quantile of burst lengths)
+        self.burst_start = None     # first edge of the current burst
+        self.burst_level = None     # level that edge went to
+        self.burst_last = None      # (timestamp, level) of the latest edge in it
+        self.rejected_bursts = 0
+    
+    def _edge(self, edge):
+        if self.burst_start is not None and edge.timestamp_ns - self.burst_last[0] > self.max_ns:
+            self._end_burst()
+        if self.burst_start is None:
+            self.burst_start = edge.timestamp_ns
+            self.burst_level = edge.active
+        self.burst_last = (edge.timestamp_ns, edge.active)
+        return super()._edge(edge)
+    
+    def advance(self, now_ns):
+        if self.burst_start is not None and now_ns - self.burst_last[0] > self.max_ns:
+            self._end_burst()
+        return super().advance(now_ns)
+    
+    def deadline(self):
+        deadline = super().deadline()
+        if self.burst_start is not None:
+            # Wake up to close the burst even when no decision is pending
+            end = self.burst_last[0] + self.max_ns + 1
+            deadline = end if deadline is None else min(deadline, end)
+        return deadline
+    
+    def _end_burst(self):
+        """Measure a finished burst and re-size the lockout"""
+        last_ns, last_level = self.burst_last
+        self.burst_start, start_ns = None, self.burst_start
+        if last_level != self.burst_level:
+            # Ended on the other level: a tap shorter than max_ns or a
+            # spike, not contact bounce - keep it out of the estimate
+            self.rejected_bursts += 1
+            return
+        self.histogram.add(last_ns - start_ns)
+        if self.histogram.samples < self.min_bursts:
+            return
+        self.tail_ns = self.histogram.quantile(self.quantile)
+        self.lockout_ns = min(self.max_ns, max(self.min_ns, int(self.tail_ns * self.margin)))
+        self.window_ns = self.lockout_ns
+    
+    def estimate(self):
+        """
+        Current bounce estimate
+        
+        Returns:
+            dict: lockout_ns, tail_ns (None until min_bursts were measured),
+                  bursts measured and bursts rejected
+        """
+        return {
+            'lockout_ns': self.lockout_ns,
+            'tail_ns': self.tail_ns,
+            'bursts': self.histogram.samples,
+            'rejected': self.rejected_bursts,
+        }
+
+
+DEBOUNCERS = {cls.name: cls for cls in (LockoutDebouncer, IntegratorDebouncer, StableDebouncer,
+                                        AdaptiveDebouncer)}
+
+
+def make_debouncer(name, **kwargs):
+    """
+    Build a debounce engine by name
+    
+    Args:
+        name (str): 'lockout', 'integrator', 'stable' or 'adaptive'
+        **kwargs: Engine parameters
+    
+    Raises:
+        ValueError: Unknown engine
+    """
+    try:
+        engine = DEBOUNCERS[name]
+    except KeyError:
+        raise ValueError(f"unknown debounce engine '{name}' (valid: {', '.join(DEBOUNCERS)})") from None
+    return engine(**kwargs)
@@ -0,0 +1,188 @@
+# src/edge_source.py
+"""
+Button Edge Sources - Kernel-Timestamped Input Edges
+Edge events for ButtonHandler's debounce engines (see debounce.py)
+
+Sources:
+  GpiodEdgeSource - edge events from the GPIO character device; the
+                    kernel timestamps each edge in the interrupt handler
+                    (CLOCK_MONOTONIC, same clock as time.monotonic_ns)
+  FakeEdgeSource  - scripted edges for tests and trace replay
+
+Every source exposes:
+  level(pin)     - current logical level (True = pressed)
+  wait(timeout)  - block up to timeout seconds, return a list of Edge
+  fileno()       - fd that turns readable when edges are pending, for
+                   registering the source in an event loop (add_reader)
+  read()         - pending edges without blocking, once fileno() is readable
+  close()        - release the line
+"""
+
+import os
+import queue
+from collections import namedtuple
+
+try:
+    import gpiod
+    from gpiod.line import Bias, Clock, Edge as LineEdge, Value
+except ImportError:
+    # libgpiod v2 bindings not installed (dev machine / CI) - FakeEdgeSource only
+    gpiod = None
+
+# One input transition: kernel timestamp (monotonic ns), new logical level
+# and the line it happened on (None = the source's only/first pin)
+Edge = namedtuple('Edge', ['timestamp_ns', 'active', 'pin'], defaults=(None,))
+
+
+class GpiodEdgeSource:
+    """Both-edge event stream for the button lines (one request, one fd)"""
+    
+    def __init__(self, pin, chip_path='/dev/gpiochip0', active_low=True, pull_up=True,
+                 consumer='antenna-button'):
+        """
+        Request the button lines with edge detection
+        
+        Args:
+            pin: BCM pin number, or a list of pins (e.g. cycle + OFF buttons)
+            chip_path (str): GPIO character device path
+            active_low (bool): Pressed pulls the line low (button to GND)
+            pull_up (bool): Enable the internal pull-up
+            consumer (str): Consumer label shown by gpioinfo
+        """
+        if gpiod is None:
+            raise RuntimeError("libgpiod python bindings (gpiod) are not installed")
+        self.pins = list(pin) if isinstance(pin, (list, tuple)) else [pin]
+        self.pin = self.pins[0]
+        settings = gpiod.LineSettings(
+            edge_detection=LineEdge.BOTH,
+            bias=Bias.PULL_UP if pull_up else Bias.AS_IS,
+            active_low=active_low,
+            event_clock=Clock.MONOTONIC,
+        )
+        self.request = gpiod.request_lines(chip_path, consumer=consumer, config={tuple(self.pins): settings})
+    
+    def level(self, pin=None):
+        """Current logical level (active_low already applied)"""
+        return self.request.get_value(self.pin if pin is None else pin) == Value.ACTIVE
+    
+    def wait(self, timeout):
+        """
+        Wait for edges
+        
+        Args:
+            timeout (float): Seconds to wait (0 = poll)
+        
+        Returns:
+            list: Edge events in kernel order (empty on timeout)
+        """
+        if not self.request.wait_edge_events(timeout):
+            return []
+        return self.read()
+    
+    def fileno(self):
+        """Line request fd (readable when edge events are queued in the kernel)"""
+        return self.request.fd
+    
+    def read(self):
+        """Edge events queued in the kernel (blocks if there are none)"""
+        return [
+            Edge(event.timestamp_ns, event.event_type == event.Type.RISING_EDGE, event.line_offset)
+            for event in self.request.read_edge_events()
+        ]
+    
+    def close(self):
+        """Release the line"""
+        self.request.release()
+
+
+class FakeEdgeSource:
+    """Scripted edge source (test double for GpiodEdgeSource)"""
+    
+    def __init__(self, active=False, levels=None):
+        """
+        Args:
+            active (bool): Initial logical level
+            levels (dict): Initial level of other pins (default: active)
+        """
+        self._levels = dict(levels or {})
+        self._levels[None] = active
+        self.edges = queue.Queue()
+        self.closed = False
+        self._pipe = None  # (read fd, write fd) once fileno() was called
+    
+    def push(self, timestamp_ns, active, pin=None):
+        """Queue one edge"""
+        self._levels[pin] = active
+        self.edges.put(Edge(timestamp_ns, active, pin))
+        if self._pipe is not None:
+            self._wake()
+    
+    def _wake(self):
+        """Make fileno() readable"""
+        try:
+            os.write(self._pipe[1], b'\0')
+        except BlockingIOError:
+            pass  # pipe already full of wake-ups
+    
+    def press(self, start_ns, duration_ns, bounces=3, bounce_ns=300000, pin=None):
+        """
+        Queue a bouncy press: the contact chatters on make and on break
+        
+        Args:
+            start_ns (int): Timestamp of the first falling contact
+            duration_ns (int): Time from first make to first break
+            bounces (int): Extra open/close pairs at each transition
+            bounce_ns (int): Spacing of the bounce edges
+            pin (int): Line the press happens on (None = primary)
+        """
+        for t0, level in ((start_ns, True), (start_ns + duration_ns, False)):
+            t = t0
+            for _ in range(bounces):
+                self.push(t, level, pin)
+                self.push(t + bounce_ns // 2, not level, pin)
+                t += bounce_ns
+            self.push(t, level, pin)
+    
+    def level(self, pin=None):
+        """Logical level after the last queued edge"""
+        return self._levels.get(pin, self._levels[None])
+    
+    def wait(self, timeout):
+        """Return every queued edge, waiting up to timeout for the first"""
+        try:
+            edges = [self.edges.get(timeout=timeout) if timeout > 0 else self.edges.get_nowait()]
+        except queue.Empty:
+            return []
+        while True:
+            try:
+                edges.append(self.edges.get_nowait())
+            except queue.Empty:
+                return edges
+    
+    def fileno(self):
+        """Pipe that turns readable when edges are queued (created on first use)"""
+        if self._pipe is None:
+            self._pipe = os.pipe()
+            for fd in self._pipe:
+                os.set_blocking(fd, False)
+            if not self.edges.empty():
+                self._wake()
+        return self._pipe[0]
+    
+    def read(self):
+        """Every queued edge without waiting"""
+        if self._pipe is not None:
+            try:
+                while os.read(self._pipe[0], 4096):
+                    pass
+            except BlockingIOError:
+                pass
+        return self.wait(0)
+    
+    def close(self):
+        """Mark closed"""
+        self.closed = True
+        if self._pipe is not None:
+            for fd in self._pipe:
+                os.close(fd)
+            self._pipe = None
@@ -0,0 +1,423 @@
+# src/edge_trace.py
+"""
+Edge Traces - Record Raw Button Edges, Replay Them Through ButtonHandler
+Reproduces field reports (missed presses, double triggers) on the bench
+and compares debounce settings against the same recorded edges
+
+Recording wraps any edge source (edge_source.py), so the daemon can
+capture exactly what its debounce engine saw (--record-edges PATH):
+  source = RecordingEdgeSource(GpiodEdgeSource([17, 23]), 'button.trace')
+
+Replay feeds a trace into a ButtonHandler driving AntennaHardware on a
+FakeChip backend and scores every antenna change against the presses
+found in the raw edges:
+  virtual (default) - the replayer steps the handler through edge
+                      timestamps and debounce/gesture deadlines; hours of
+                      trace replay in seconds and results are repeatable
+  realtime          - edges are played into the handler's own edge thread
+                      at their recorded pace (includes thread wake-up)
+
+A true press is an active period of at least min_press_ns once inactive
+gaps shorter than glitch_ns (contact bounce) are bridged; shorter active
+periods are noise. Each antenna change is matched to the latest true
+press started at most max_latency_ns before it:
+  missed   - true press with no change
+  double   - true press with more than one change
+  spurious - change with no true press (noise got through)
+  latency  - change time minus the first edge of its press
+
+File layout (little endian):
+  header  magic:8s  version:u32  record_size:u32  wall_ns:i64  mono_ns:u64
+  record  timestamp_ns:u64  pin:u8  flags:u8
+Flags: bit 0 active, bit 1 snapshot (the level of a pin when recording
+started, written before any edge). Pin 255 is the source's default pin.
+
+Usage:
+  python3 edge_trace.py record button.trace --pin 17 --pin 23
+  python3 edge_trace.py replay button.trace --debounce lockout --debounce adaptive
+  python3 edge_trace.py replay button.trace --debounce stable --realtime
+"""
+
+import argparse
+import struct
+import sys
+import time
+from collections import namedtuple
+
+from edge_source import Edge
+
+MAGIC = b'ANTEDGES'
+VERSION = 1
+
+HEADER = struct.Struct('<8sIIqQ')
+RECORD = struct.Struct('<QBB')
+
+FLAG_ACTIVE = 1
+FLAG_SNAPSHOT = 2
+PIN_DEFAULT = 255
+
+Trace = namedtuple('Trace', ['wall_ns', 'mono_ns', 'levels', 'edges'])
+
+ReplayReport = namedtuple('ReplayReport', ['presses', 'actions', 'missed', 'double', 'spurious',
+                                           'latencies_ns', 'duration_ns', 'elapsed_s'])
+
+
+class TraceWriter:
+    """Append-only binary edge trace"""
+    
+    def __init__(self, path, levels=None, flush_interval=1.0):
+        """
+        Create the trace file and write its header
+        
+        Args:
+            path (str): Trace file (overwritten)
+            levels (dict): {pin: level} snapshot at the start of recording
+            flush_interval (float): Seconds between flushes to the file
+        """
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, time.time_ns(), time.monotonic_ns()))
+        now_ns = time.monotonic_ns()
+        for pin, level in (levels or {}).items():
+            self.file.write(RECORD.pack(now_ns, _encode_pin(pin),
+                                        FLAG_SNAPSHOT | (FLAG_ACTIVE if level else 0)))
+        self.flush_interval = flush_interval
+        self.last_flush = time.monotonic()
+        self.edges = 0
+    
+    def write(self, edges):
+        """Append edges (buffered; flushed every flush_interval)"""
+        for edge in edges:
+            self.file.write(RECORD.pack(edge.timestamp_ns, _encode_pin(edge.pin),
+                                        FLAG_ACTIVE if edge.active else 0))
+        self.edges += len(edges)
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.file.flush()
+            self.last_flush = time.monotonic()
+    
+    def close(self):
+        """Flush and close the file"""
+        self.file.close()
+
+
+class RecordingEdgeSource:
+    """Edge source wrapper that records every edge it hands out"""
+    
+    def __init__(self, source, path):
+        """
+        Args:
+            source: Edge source to wrap (GpiodEdgeSource, FakeEdgeSource)
+            path (str): Trace file to write
+        """
+        self.source = source
+        self.pins = getattr(source, 'pins', None)
+        levels = {pin: source.level(pin) for pin in (self.pins or [None])}
+        self.writer = TraceWriter(path, levels)
+    
+    def level(self, pin=None):
+        """Current level of the wrapped source"""
+        return self.source.level(pin)
+    
+    def wait(self, timeout):
+        """Wait on the wrapped source and record what it returns"""
+        edges = self.source.wait(timeout)
+        if edges:
+            self.writer.write(edges)
+        return edges
+    
+    def fileno(self):
+        """Event loop fd of the wrapped source"""
+        return self.source.fileno()
+    
+    def read(self):
+        """Read pending edges from the wrapped source and record them"""
+        edges = self.source.read()
+        if edges:
+            self.writer.write(edges)
+        return edges
+    
+    def close(self):
+        """Close the trace and the wrapped source"""
+        self.writer.close()
+        self.source.close()
+
+
+def _encode_pin(pin):
+    """Pin number as stored (None = PIN_DEFAULT)"""
+    return PIN_DEFAULT if pin is None else pin
+
+
+def _decode_pin(value):
+    """Stored pin back to a pin number"""
+    return None if value == PIN_DEFAULT else value
+
+
+def read_trace(path):
+    """
+    Load a trace file
+    
+    Args:
+        path (str): Trace file
+    
+    Returns:
+        Trace: wall/mono header pairing, {pin: level} snapshot, edges
+    
+    Raises:
+        ValueError: Not an edge trace or unsupported record size
+    """
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"{path}: truncated header")
+        magic, version, record_size, wall_ns, mono_ns = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not an edge trace")
+        if record_size != RECORD.size:
+            raise ValueError(f"{path}: unsupported record size {record_size}")
+        data = f.read()
+    
+    levels = {}
+    edges = []
+    # A trailing partial record (power loss mid-write) is ignored
+    for timestamp_ns, pin, flags in RECORD.iter_unpack(data[:len(data) - len(data) % RECORD.size]):
+        if flags & FLAG_SNAPSHOT:
+            levels[_decode_pin(pin)] = bool(flags & FLAG_ACTIVE)
+        else:
+            edges.append(Edge(timestamp_ns, bool(flags & FLAG_ACTIVE), _decode_pin(pin)))
+    return Trace(wall_ns, mono_ns, levels, edges)
+
+
+def true_presses(edges, levels=None, glitch_ns=10000000, min_press_ns=30000000, end_ns=None):
+    """
+    Reference presses in raw edges (hindsight, independent of any engine)
+    
+    Args:
+        edges: Edges in time order (any mix of pins)
+        levels (dict): {pin: level} before the first edge (default released)
+        glitch_ns (int): Inactive gaps shorter than this are bounce
+        min_press_ns (int): Shortest active period that is a press
+        end_ns (int): End of the trace (closes a press still held)
+    
+    Returns:
+        list: (start_ns, end_ns, pin) in start order
+    """
+    levels = dict(levels or {})
+    if end_ns is None:
+        end_ns = edges[-1].timestamp_ns if edges else 0
+    presses = []
+    open_press = {}  # pin -> [start, end of last active period or None while active]
+    
+    def close(pin):
+        start, end = open_press.pop(pin)
+        if end - start >= min_press_ns:
+            presses.append((start, end, pin))
+    
+    for edge in edges:
+        pin = edge.pin
+        current = open_press.get(pin)
+        if edge.active == levels.get(pin, False):
+            continue
+        levels[pin] = edge.active
+        if edge.active:
+            if current is not None and edge.timestamp_ns - current[1] < glitch_ns:
+                current[1] = None  # bounce - same press continues
+                continue
+            if current is not None:
+                close(pin)
+            open_press[pin] = [edge.timestamp_ns, None]
+        elif current is not None:
+            current[1] = edge.timestamp_ns
+    for pin, current in list(open_press.items()):
+        if current[1] is None:
+            current[1] = end_ns
+        close(pin)
+    presses.sort()
+    return presses
+
+
+def score(presses, actions, max_latency_ns=1500000000):
+    """
+    Match antenna changes to true presses
+    
+    Args:
+        presses: (start_ns, end_ns, pin) from true_presses()
+        actions: Change times (ns) in order
+        max_latency_ns (int): Longest press-to-change time accepted
+    
+    Returns:
+        tuple: (missed, double, spurious, latencies_ns)
+    """
+    counts = [0] * len(presses)
+    latencies = []
+    spurious = 0
+    index = -1
+    for t in actions:
+        while index + 1 < len(presses) and presses[index + 1][0] <= t:
+            index += 1
+        if index < 0 or t - presses[index][0] > max_latency_ns:
+            spurious += 1
+            continue
+        counts[index] += 1
+        if counts[index] == 1:
+            latencies.append(t - presses[index][0])
+    missed = sum(1 for count in counts if count == 0)
+    double = sum(1 for count in counts if count > 1)
+    return missed, double, spurious, latencies
+
+
+def replay(trace, debouncer=None, realtime=False, handler_kwargs=None, glitch_ns=10000000,
+           min_press_ns=30000000, max_latency_ns=1500000000):
+    """
+    Replay a trace through ButtonHandler and AntennaHardware (FakeChip)
+    
+    Args:
+        trace (Trace): From read_trace()
+        debouncer: Debounce engine for the handler (None = handler default)
+        realtime (bool): Play edges at their recorded pace into the edge
+                         thread instead of stepping a virtual clock
+        handler_kwargs (dict): Extra ButtonHandler arguments
+        glitch_ns, min_press_ns: Reference press detection (true_presses)
+        max_latency_ns (int): Longest press-to-change time accepted
+    
+    Returns:
+        ReplayReport
+    """
+    from antenna_hardware import AntennaHardware
+    from button_handler import ButtonHandler
+    from edge_source import FakeEdgeSource
+    from gpio_backend import FakeChip, LineGroupBackend
+    
+    hw = AntennaHardware(backend=LineGroupBackend(AntennaHardware.DEFAULT_RELAY_PINS.values(),
+                                                  chip=FakeChip()))
+    actions = []
+    clock = [0]
+    if realtime:
+        hw.add_listener(lambda previous, current, source: actions.append(time.monotonic_ns()))
+    else:
+        hw.add_listener(lambda previous, current, source: actions.append(clock[0]))
+    
+    handler_kwargs = dict(handler_kwargs or {})
+    levels = dict(trace.levels)
+    source = FakeEdgeSource(levels.pop(None, levels.get(handler_kwargs.get('button_pin', 17), False)),
+                            levels)
+    handler = ButtonHandler(hw, edge_source=source, debouncer=debouncer, edge_thread=realtime,
+                            **handler_kwargs)
+    
+    # Rebase recorded timestamps onto this process's monotonic clock
+    first_ns = trace.edges[0].timestamp_ns if trace.edges else 0
+    base_ns = time.monotonic_ns() + 1000000
+    edges = [edge._replace(timestamp_ns=edge.timestamp_ns - first_ns + base_ns) for edge in trace.edges]
+    end_ns = (edges[-1].timestamp_ns if edges else base_ns) + max_latency_ns
+    
+    started = time.monotonic()
+    try:
+        if realtime:
+            for edge in edges:
+                delay = (edge.timestamp_ns - time.monotonic_ns()) / 1e9
+                if delay > 0:
+                    time.sleep(delay)
+                source.push(edge.timestamp_ns, edge.active, edge.pin)
+            time.sleep(max(0.0, (end_ns - time.monotonic_ns()) / 1e9))
+        else:
+            for edge in edges:
+                _run_deadlines(handler, clock, edge.timestamp_ns)
+                clock[0] = edge.timestamp_ns
+                handler.process_edges((edge,), edge.timestamp_ns)
+            _run_deadlines(handler, clock, end_ns)
+    finally:
+        handler.cleanup()
+    elapsed = time.monotonic() - started
+    
+    presses = true_presses(edges, trace.levels, glitch_ns, min_press_ns,
+                           edges[-1].timestamp_ns if edges else base_ns)
+    missed, double, spurious, latencies = score(presses, actions, max_latency_ns)
+    return ReplayReport(len(presses), len(actions), missed, double, spurious, latencies,
+                        end_ns - base_ns - max_latency_ns, elapsed)
+
+
+def _run_deadlines(handler, clock, until_ns):
+    """Step the handler through every decision due up to until_ns"""
+    while True:
+        deadline = handler.next_deadline()
+        if deadline is None or deadline > until_ns:
+            return
+        # Never step backwards or stall on a deadline that is already due
+        clock[0] = max(deadline, clock[0] + 1)
+        handler.process_edges((), clock[0])
+
+
+def format_report(name, report):
+    """One summary line for a replay"""
+    if report.latencies_ns:
+        samples = sorted(report.latencies_ns)
+        latency = (f"p50 {samples[len(samples) // 2] / 1e6:7.2f}ms  "
+                   f"p99 {samples[min(len(samples) - 1, len(samples) * 99 // 100)] / 1e6:7.2f}ms")
+    else:
+        latency = 'no presses matched'
+    return (f"{name:<12} presses {report.presses:<6} missed {report.missed:<5} "
+            f"double {report.double:<5} spurious {report.spurious:<5} {latency}")
+
+
+def _record(args):
+    """record subcommand - capture edges until Ctrl+C"""
+    from edge_source import GpiodEdgeSource
+    source = RecordingEdgeSource(GpiodEdgeSource(args.pin or [17]), args.trace)
+    print(f"Recording edges on GPIO {', '.join(map(str, source.pins))} to {args.trace} (Ctrl+C to stop)")
+    try:
+        while True:
+            source.wait(0.5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        source.close()
+    print(f"✓ {source.writer.edges} edges recorded")
+    return 0
+
+
+def _replay(args):
+    """replay subcommand - score each debounce setting against the trace"""
+    from debounce import make_debouncer
+    trace = read_trace(args.trace)
+    primary = trace.levels.get(None, trace.levels.get(17, False))
+    span_s = (trace.edges[-1].timestamp_ns - trace.edges[0].timestamp_ns) / 1e9 if trace.edges else 0
+    print(f"{args.trace}: {len(trace.edges)} edges over {span_s:.1f}s")
+    for name in args.debounce or ['lockout']:
+        kwargs = {}
+        if args.debounce_ms is not None and name in ('lockout', 'adaptive'):
+            kwargs['lockout_ns'] = int(args.debounce_ms * 1e6)
+        report = replay(trace, make_debouncer(name, active=primary, **kwargs), realtime=args.realtime,
+                        glitch_ns=int(args.glitch_ms * 1e6), min_press_ns=int(args.min_press_ms * 1e6))
+        print(format_report(name, report) + f"  ({report.elapsed_s:.2f}s)")
+    return 0
+
+
+def main(argv=None):
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='Record and replay button edge traces')
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    record = commands.add_parser('record', help='Capture raw button edges (needs gpiod)')
+    record.add_argument('trace', help='Trace file to write')
+    record.add_argument('--pin', type=int, action='append', help='Button GPIO (repeatable, default 17)')
+    
+    play = commands.add_parser('replay', help='Replay a trace through ButtonHandler')
+    play.add_argument('trace', help='Trace file to read')
+    play.add_argument('--debounce', action='append',
+                      help='Debounce engine to score (repeatable, default lockout)')
+    play.add_argument('--debounce-ms', type=float, default=None,
+                      help='Lockout of the lockout/adaptive engines in ms (default 20)')
+    play.add_argument('--realtime', action='store_true', help='Replay at recorded pace')
+    play.add_argument('--glitch-ms', type=float, default=10.0,
+                      help='Reference presses: bridge inactive gaps shorter than this')
+    play.add_argument('--min-press-ms', type=float, default=30.0,
+                      help='Reference presses: shortest real press')
+    args = parser.parse_args(argv)
+    
+    try:
+        return _record(args) if args.command == 'record' else _replay(args)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,142 @@
+# src/gesture.py
+"""
+Gesture Engine - Single, Double and Long Presses for Every Button
+Turns debounced press/release events into gestures using one shared
+TimerWheel for all pending timeouts (no thread or timer per gesture)
+
+Per button:
+  single - press and release; with double-press enabled it is decided
+           double_press_ns after the release if no second press came
+  double - second press within double_press_ns of the first release
+  long   - held for long_press_ns; decided while still held
+
+Decisions happen at exact timer deadlines, so the latency of every
+gesture is fixed by its configuration: long = long_press_ns after the
+press, single = double_press_ns after the release (at the release when
+only long-press is enabled, at the press when neither is).
+
+Usage:
+  engine = GestureEngine(wheel, on_gesture)
+  engine.add_button(17, long_press_ns=800000000, double_press_ns=300000000)
+  engine.press(17, t_ns)
+  engine.release(17, t_ns)
+  # on_gesture(button, gesture, origin_ns, decided_ns)
+"""
+
+GESTURE_SINGLE = 'single'
+GESTURE_DOUBLE = 'double'
+GESTURE_LONG = 'long'
+
+# Per-button states
+_IDLE = 0
+_DOWN = 1
+_WAIT_SECOND = 2
+_SECOND_DOWN = 3
+_LONG_FIRED = 4
+
+
+class _ButtonState:
+    """Gesture state for one button"""
+    
+    __slots__ = ('long_press_ns', 'double_press_ns', 'state', 'origin_ns', 'timer')
+    
+    def __init__(self, long_press_ns, double_press_ns):
+        self.long_press_ns = long_press_ns
+        self.double_press_ns = double_press_ns
+        self.state = _IDLE
+        self.origin_ns = 0
+        self.timer = None
+
+
+class GestureEngine:
+    """Gesture state machines for any number of buttons on one timer wheel"""
+    
+    def __init__(self, wheel, on_gesture):
+        """
+        Args:
+            wheel (TimerWheel): Shared timer wheel (advanced by the caller)
+            on_gesture: Called as on_gesture(button, gesture, origin_ns, decided_ns)
+        """
+        self.wheel = wheel
+        self.on_gesture = on_gesture
+        self.buttons = {}
+    
+    def add_button(self, button, long_press_ns=None, double_press_ns=None):
+        """
+        Register a button
+        
+        Args:
+            button: Any hashable id (e.g. the GPIO pin)
+            long_press_ns (int): Hold time for 'long' (None = disabled)
+            double_press_ns (int): Window for 'double' (None = disabled)
+        """
+        self.buttons[button] = _ButtonState(long_press_ns, double_press_ns)
+    
+    def _emit(self, button, gesture, origin_ns, decided_ns):
+        """Report one recognized gesture"""
+        self.on_gesture(button, gesture, origin_ns, decided_ns)
+    
+    def press(self, button, t_ns, origin_ns=None):
+        """
+        Debounced press
+        
+        Args:
+            button: Button id
+            t_ns (int): Time the press was decided
+            origin_ns (int): First raw edge of the press (default t_ns)
+        """
+        st = self.buttons[button]
+        if st.state == _WAIT_SECOND:
+            self.wheel.cancel(st.timer)
+            st.timer = None
+            st.state = _SECOND_DOWN
+            return
+        st.origin_ns = t_ns if origin_ns is None else origin_ns
+        if st.long_press_ns is None and st.double_press_ns is None:
+            # Plain button - nothing to wait for
+            self._emit(button, GESTURE_SINGLE, st.origin_ns, t_ns)
+            return
+        st.state = _DOWN
+        if st.long_press_ns is not None:
+            st.timer = self.wheel.schedule(t_ns + st.long_press_ns, self._long_timeout,
+                                           button, t_ns + st.long_press_ns)
+    
+    def release(self, button, t_ns, origin_ns=None):
+        """
+        Debounced release
+        
+        Args:
+            button: Button id
+            t_ns (int): Time the release was decided
+            origin_ns (int): Unused, for symmetry with press()
+        """
+        st = self.buttons[button]
+        if st.state == _DOWN:
+            self.wheel.cancel(st.timer)
+            st.timer = None
+            if st.double_press_ns is not None:
+                st.state = _WAIT_SECOND
+                st.timer = self.wheel.schedule(t_ns + st.double_press_ns, self._double_timeout,
+                                               button, t_ns + st.double_press_ns)
+            else:
+                st.state = _IDLE
+                self._emit(button, GESTURE_SINGLE, st.origin_ns, t_ns)
+        elif st.state == _SECOND_DOWN:
+            st.state = _IDLE
+            self._emit(button, GESTURE_DOUBLE, st.origin_ns, t_ns)
+        elif st.state == _LONG_FIRED:
+            st.state = _IDLE
+    
+    def _long_timeout(self, button, deadline_ns):
+        """Still held at long_press_ns"""
+        st = self.buttons[button]
+        st.timer = None
+        st.state = _LONG_FIRED
+        self._emit(button, GESTURE_LONG, st.origin_ns, deadline_ns)
+    
+    def _double_timeout(self, button, deadline_ns):
+        """No second press inside the window - it was a single press"""
+        st = self.buttons[button]
+        st.timer = None
+        st.state = _IDLE
+        self._emit(button, GESTURE_SINGLE, st.origin_ns, deadline_ns)
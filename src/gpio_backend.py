@@ -0,0 +1,256 @@
+# src/gpio_backend.py
+"""
+GPIO Output Backends - Relay Line Drivers
+Pluggable output paths used by AntennaHardware to drive the relay lines
+
+Backends:
+  OutputDeviceBackend - one gpiozero OutputDevice per relay (original path)
+  LineGroupBackend    - all relay lines requested as ONE line group on the
+                        GPIO character device, written with bulk set_values()
+  FakeChip            - in-memory chip test double for LineGroupBackend
+
+Every backend exposes the same three calls:
+  write(levels)  - levels is {pin: bool}, applied as one bulk operation
+  read(pins)     - returns {pin: bool} for the requested pins
+  close()        - release the lines
+
+Opened with attach=True, a backend takes the lines over at the levels
+they already have (left by a previous controller process) instead of
+driving them inactive, so a restart does not switch any relay.
+
+gpiozero is only imported by load_gpiozero(), when the first gpiozero
+device is created, so clients and tools that never touch a pin start
+without it.
+"""
+
+try:
+    import gpiod
+    from gpiod.line import Direction, Value
+    ACTIVE = Value.ACTIVE
+    INACTIVE = Value.INACTIVE
+except ImportError:
+    # libgpiod v2 bindings not installed (dev machine / CI) - FakeChip only
+    gpiod = None
+    ACTIVE = True
+    INACTIVE = False
+
+# gpiozero module once load_gpiozero() has run
+_gpiozero = None
+
+
+def load_gpiozero():
+    """
+    Import gpiozero and install the lgpio pin factory (first call only)
+    
+    Returns:
+        module: gpiozero
+    """
+    global _gpiozero
+    if _gpiozero is None:
+        import gpiozero
+        from gpiozero.pins.lgpio import LGPIOFactory
+        # Use modern lgpio pin factory
+        gpiozero.Device.pin_factory = LGPIOFactory()
+        _gpiozero = gpiozero
+    return _gpiozero
+
+
+class OutputDeviceBackend:
+    """Per-device backend - one OutputDevice (gpiozero) per relay pin"""
+    
+    def __init__(self, pins, device_factory, attach=False):
+        """
+        Create one output device per relay pin
+        
+        Args:
+            pins: Iterable of BCM pin numbers
+            device_factory: Callable like gpiozero.OutputDevice
+            attach (bool): Leave each pin at its current level
+                           (initial_value=None) instead of driving it low
+        """
+        initial = None if attach else False
+        self.devices = {}
+        for pin in pins:
+            self.devices[pin] = device_factory(pin, active_high=True, initial_value=initial)
+    
+    def write(self, levels):
+        """
+        Drive pins one device at a time
+        
+        Args:
+            levels (dict): {pin: bool} levels to apply
+        """
+        for pin, level in levels.items():
+            if level:
+                self.devices[pin].on()
+            else:
+                self.devices[pin].off()
+    
+    def read(self, pins):
+        """
+        Read pin levels back from the devices
+        
+        Args:
+            pins: Iterable of pin numbers
+        
+        Returns:
+            dict: {pin: bool}
+        """
+        return {pin: self.devices[pin].is_active for pin in pins}
+    
+    def close(self):
+        """Close all output devices"""
+        for device in self.devices.values():
+            device.close()
+
+
+class GpiodChip:
+    """Thin wrapper around a libgpiod v2 chip so it can be swapped for FakeChip"""
+    
+    def __init__(self, path='/dev/gpiochip0'):
+        """
+        Args:
+            path (str): GPIO character device path
+        """
+        if gpiod is None:
+            raise RuntimeError("libgpiod python bindings (gpiod) are not installed")
+        self.path = path
+    
+    def request_lines(self, pins, consumer, attach=False):
+        """
+        Request all pins as one output line group
+        
+        Args:
+            pins: Iterable of BCM pin numbers
+            consumer (str): Consumer label shown by gpioinfo
+            attach (bool): Keep each line's current level instead of
+                           starting inactive
+        
+        Returns:
+            gpiod.LineRequest: Request supporting set_values/get_values/release
+        """
+        pins = tuple(pins)
+        if not attach:
+            settings = gpiod.LineSettings(direction=Direction.OUTPUT, output_value=INACTIVE)
+            return gpiod.request_lines(self.path, consumer=consumer, config={pins: settings})
+        
+        # Claim the lines without touching them, read their levels, then
+        # make them outputs driving those same levels
+        request = gpiod.request_lines(self.path, consumer=consumer,
+                                      config={pins: gpiod.LineSettings(direction=Direction.AS_IS)})
+        values = request.get_values(list(pins))
+        config = {}
+        for value in (ACTIVE, INACTIVE):
+            group = tuple(pin for pin, level in zip(pins, values) if level == value)
+            if group:
+                config[group] = gpiod.LineSettings(direction=Direction.OUTPUT, output_value=value)
+        request.reconfigure_lines(config)
+        return request
+
+
+class LineGroupBackend:
+    """Bulk backend - all relay lines held in one line request"""
+    
+    def __init__(self, pins, chip=None, consumer='antenna-controller', attach=False):
+        """
+        Request every relay pin together as a single line group
+        
+        Args:
+            pins: Iterable of BCM pin numbers
+            chip: GpiodChip or FakeChip (default: GpiodChip('/dev/gpiochip0'))
+            consumer (str): Consumer label shown by gpioinfo
+            attach (bool): Keep the lines at their current levels
+        """
+        self.pins = list(pins)
+        if chip is None:
+            chip = GpiodChip()
+        self.chip = chip
+        self.request = chip.request_lines(self.pins, consumer, attach=attach)
+    
+    def write(self, levels):
+        """
+        Apply all levels in ONE set_values() call
+        
+        Args:
+            levels (dict): {pin: bool} levels to apply
+        """
+        if not levels:
+            return
+        self.request.set_values(
+            {pin: ACTIVE if level else INACTIVE for pin, level in levels.items()}
+        )
+    
+    def read(self, pins):
+        """
+        Read pin levels in ONE get_values() call
+        
+        Args:
+            pins: Iterable of pin numbers
+        
+        Returns:
+            dict: {pin: bool}
+        """
+        pins = list(pins)
+        values = self.request.get_values(pins)
+        return {pin: value == ACTIVE for pin, value in zip(pins, values)}
+    
+    def close(self):
+        """Release the line group"""
+        self.request.release()
+
+
+class FakeLineRequest:
+    """In-memory stand-in for gpiod.LineRequest"""
+    
+    def __init__(self, chip, pins):
+        self.chip = chip
+        self.pins = list(pins)
+        self.released = False
+    
+    def set_values(self, values):
+        """Apply {pin: Value} and record the resulting chip state"""
+        if self.released:
+            raise RuntimeError("line request already released")
+        for pin, value in values.items():
+            if pin not in self.pins:
+                raise ValueError(f"pin {pin} not in this request")
+            self.chip.levels[pin] = (value == ACTIVE)
+        self.chip.set_calls += 1
+        self.chip.history.append(dict(self.chip.levels))
+    
+    def get_values(self, pins=None):
+        """Return Values for pins (all requested pins if None)"""
+        if pins is None:
+            pins = self.pins
+        self.chip.get_calls += 1
+        return [ACTIVE if self.chip.levels[pin] else INACTIVE for pin in pins]
+    
+    def release(self):
+        """Release the request"""
+        self.released = True
+
+
+class FakeChip:
+    """
+    Fake GPIO chip for tests and benchmarks
+    
+    Tracks line levels, number of set/get calls and the chip state after
+    every write (history), so tests can check that no in-between state
+    ever had two relays energized.
+    """
+    
+    def __init__(self):
+        self.levels = {}
+        self.set_calls = 0
+        self.get_calls = 0
+        self.history = []
+        self.requests = []
+    
+    def request_lines(self, pins, consumer, attach=False):
+        """Request pins as outputs, initially inactive (attach: as they are)"""
+        for pin in pins:
+            if not attach or pin not in self.levels:
+                self.levels[pin] = False
+        request = FakeLineRequest(self, pins)
+        self.requests.append(request)
+        return request
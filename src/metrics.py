@@ -0,0 +1,277 @@
+# src/metrics.py
+"""
+Metrics - In-Process Counters and Latency Histograms
+Counts antenna selections, button presses and commands, and times
+set_antenna, button edge-to-action and command handling, exposed in the
+Prometheus text format on a local HTTP port
+
+Instrumented objects hold an optional metrics attribute (None = off) and
+only do integer work on their hot path: a counter increment, or a
+bisect into fixed bucket bounds and two additions for a histogram.
+Formatting happens when /metrics is scraped. Each metric has a single
+writer thread (the actor for switches, the edge thread for the button,
+the daemon loop for commands); a scrape may see a histogram one sample
+ahead in a bucket, which Prometheus tolerates.
+
+Usage:
+  metrics = ControllerMetrics()
+  metrics.instrument(hardware=hw, button=button_handler, handler=handler, actor=actor)
+  server = MetricsServer(metrics.registry, port=9108)
+  server.start()
+"""
+
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_METRICS_HOST = '127.0.0.1'
+DEFAULT_METRICS_PORT = 9108
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Bucket upper bounds in nanoseconds
+SWITCH_BUCKETS_NS = (10000, 25000, 50000, 100000, 250000, 500000,
+                     1000000, 2500000, 5000000, 10000000, 25000000)
+BUTTON_BUCKETS_NS = (100000, 250000, 500000, 1000000, 2500000, 5000000, 10000000,
+                     25000000, 50000000, 100000000, 250000000, 500000000, 1000000000)
+COMMAND_BUCKETS_NS = SWITCH_BUCKETS_NS
+
+
+def _labels(names, values):
+    """{name="value",...} label set (empty string without labels)"""
+    if not names:
+        return ''
+    pairs = ','.join(f'{name}="{value}"' for name, value in zip(names, values))
+    return '{' + pairs + '}'
+
+
+def _seconds(ns):
+    """Nanoseconds as a Prometheus float in seconds"""
+    return repr(ns / 1e9)
+
+
+class Counter:
+    """Monotonic counter, optionally split by label values"""
+    
+    kind = 'counter'
+    
+    def __init__(self, name, help_text, labels=()):
+        """
+        Args:
+            name (str): Metric name (e.g. antenna_switches_total)
+            help_text (str): HELP line
+            labels (tuple): Label names; inc() then takes one value per label
+        """
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.values = {}
+    
+    def inc(self, *label_values, amount=1):
+        """Add amount to the counter for these label values"""
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+    
+    def samples(self):
+        """(suffix, labels, value) lines for the exposition"""
+        for key, value in sorted(self.values.items()):
+            yield '', _labels(self.labels, key), str(value)
+
+
+class Gauge:
+    """Value read when the registry is scraped (no hot-path cost)"""
+    
+    kind = 'gauge'
+    
+    def __init__(self, name, help_text, read):
+        """
+        Args:
+            name (str): Metric name
+            help_text (str): HELP line
+            read: Callable returning the current value
+        """
+        self.name = name
+        self.help = help_text
+        self.read = read
+    
+    def samples(self):
+        """(suffix, labels, value) lines for the exposition"""
+        yield '', '', str(self.read())
+
+
+class CounterReader(Gauge):
+    """Monotonic count kept elsewhere, read when the registry is scraped"""
+    
+    kind = 'counter'
+
+
+class Histogram:
+    """Fixed-bucket histogram of nanosecond durations, exposed in seconds"""
+    
+    kind = 'histogram'
+    
+    def __init__(self, name, help_text, buckets_ns):
+        """
+        Args:
+            name (str): Metric name (e.g. antenna_set_seconds)
+            help_text (str): HELP line
+            buckets_ns (tuple): Increasing bucket upper bounds in ns
+        """
+        self.name = name
+        self.help = help_text
+        self.bounds = tuple(buckets_ns)
+        self.counts = [0] * (len(self.bounds) + 1)  # last slot is +Inf
+        self.sum_ns = 0
+    
+    def observe(self, ns):
+        """Record one duration in nanoseconds"""
+        self.counts[bisect.bisect_left(self.bounds, ns)] += 1
+        self.sum_ns += ns
+    
+    @property
+    def count(self):
+        """Samples recorded so far"""
+        return sum(self.counts)
+    
+    def samples(self):
+        """(suffix, labels, value) lines for the exposition"""
+        counts = list(self.counts)
+        total = 0
+        for bound, count in zip(self.bounds, counts):
+            total += count
+            yield '_bucket', f'{{le="{bound / 1e9:g}"}}', str(total)
+        total += counts[-1]
+        yield '_bucket', '{le="+Inf"}', str(total)
+        yield '_sum', '', _seconds(self.sum_ns)
+        yield '_count', '', str(total)
+
+
+class Registry:
+    """Ordered set of metrics rendered together"""
+    
+    def __init__(self):
+        self.metrics = []
+    
+    def add(self, metric):
+        """Register a metric and return it"""
+        self.metrics.append(metric)
+        return metric
+    
+    def render(self):
+        """
+        All metrics in the Prometheus text exposition format
+        
+        Returns:
+            str: Exposition text (HELP, TYPE and sample lines)
+        """
+        lines = []
+        for metric in self.metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for suffix, labels, value in metric.samples():
+                lines.append(f'{metric.name}{suffix}{labels} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+class ControllerMetrics:
+    """The controller's metrics and the hooks that feed them"""
+    
+    def __init__(self):
+        self.registry = registry = Registry()
+        self.switches = registry.add(Counter(
+            'antenna_switches_total', 'Antenna changes by new antenna and source', ('antenna', 'source')))
+        self.switch_ns = registry.add(Histogram(
+            'antenna_set_seconds', 'Time spent in AntennaHardware.set_antenna', SWITCH_BUCKETS_NS))
+        self.button_ns = registry.add(Histogram(
+            'antenna_button_latency_seconds', 'Button edge to antenna action latency', BUTTON_BUCKETS_NS))
+        self.commands = registry.add(Counter(
+            'antenna_commands_total', 'Commands handled by command and result', ('command', 'result')))
+        self.command_ns = registry.add(Histogram(
+            'antenna_command_seconds', 'Time spent handling one command', COMMAND_BUCKETS_NS))
+    
+    def record(self, previous, current, source):
+        """AntennaHardware state-change listener"""
+        self.switches.inc(f'A{current}' if current else 'OFF', source)
+    
+    def instrument(self, hardware=None, button=None, handler=None, actor=None):
+        """
+        Hook the metrics into the controller objects (all optional)
+        
+        Args:
+            hardware: AntennaHardware (switch counts and set_antenna time)
+            button: ButtonHandler (press count and edge-to-action latency)
+            handler: SSHCommandHandler (command counts and handling time)
+            actor: CommandActor or LoopActor (queue and coalescing gauges)
+        """
+        registry = self.registry
+        if hardware is not None:
+            hardware.metrics = self
+            hardware.add_listener(self.record)
+            # The cached selection - get_current_antenna() may run a GPIO
+            # read-back, which must not happen on the HTTP thread
+            registry.add(Gauge('antenna_selected', 'Selected antenna (0 = OFF)',
+                               lambda: hardware.current_antenna))
+        if button is not None:
+            button.metrics = self
+            registry.add(CounterReader('antenna_button_presses_total', 'Debounced button presses since start',
+                                       lambda: button.presses))
+        if handler is not None:
+            handler.metrics = self
+        if actor is not None:
+            registry.add(Gauge('antenna_actor_applied', 'Commands applied by the actor',
+                               lambda: actor.applied))
+            registry.add(Gauge('antenna_actor_coalesced', 'Targets superseded before reaching the relays',
+                               lambda: actor.coalesced))
+            registry.add(Gauge('antenna_actor_pending', 'Commands waiting for the actor',
+                               actor.pending))
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    """GET /metrics -> registry.render()"""
+    
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass  # scraped every few seconds - keep the console quiet
+
+
+class MetricsServer:
+    """Serves a registry at http://host:port/metrics on a background thread"""
+    
+    def __init__(self, registry, host=DEFAULT_METRICS_HOST, port=DEFAULT_METRICS_PORT):
+        """
+        Args:
+            registry (Registry): Metrics to serve
+            host (str): Address to listen on (local only by default)
+            port (int): TCP port (0 = any free port, see .port)
+        """
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+    
+    def start(self):
+        """Bind and start serving"""
+        self._server = ThreadingHTTPServer((self.host, self.port), _MetricsRequestHandler)
+        self._server.daemon_threads = True
+        self._server.registry = self.registry
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='metrics-http', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop serving and close the socket"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = self._thread = None
@@ -0,0 +1,195 @@
+# src/relay_wear.py
+"""
+Relay Wear - Persisted Cycle and On-Time Counters With Alerts
+Keeps AntennaHardware's per-relay make cycles and energized time across
+restarts and warns when a relay reaches its rated life
+
+AntennaHardware counts in memory on every relay write. A background
+thread snapshots the counters every flush_interval seconds and rewrites
+one small file (temporary file + fsync + rename, so a crash leaves the
+old or the new file, never a torn one). A burst of a thousand switches
+costs one write; an idle controller writes only when a relay's on-time
+has grown by an hour since the last write. Up to one interval of counts
+can be lost on a power cut.
+
+File layout (JSON):
+  {"version": 1, "updated": <unix time>,
+   "relays": {"1": {"cycles": 1234, "on_ns": 45000000000000}, ...}}
+
+Usage:
+  wear = WearMonitor(hw, '/var/lib/antenna-controller/wear.json', cycle_limit=100000)
+  wear.restore()
+  wear.start()
+  ...
+  wear.stop()
+"""
+
+import json
+import os
+import threading
+import time
+
+VERSION = 1
+
+HOUR_NS = 3600 * 1000000000
+
+# Idle on-time growth that is worth a write on its own
+ON_TIME_RESOLUTION_NS = HOUR_NS
+
+
+class WearMonitor:
+    """Batched persistence and wear thresholds for AntennaHardware's counters"""
+    
+    def __init__(self, hardware, path=None, flush_interval=300.0, cycle_limit=None, on_hours_limit=None,
+                 on_alert=None):
+        """
+        Args:
+            hardware: AntennaHardware whose relay_wear() is persisted
+            path (str): Counter file (None = not persisted, limits are
+                        still checked every flush_interval)
+            flush_interval (float): Seconds between background flushes
+            cycle_limit (int): Alert once a relay reaches this many cycles
+            on_hours_limit (float): Alert once a relay has been energized
+                                    this many hours
+            on_alert: Called as on_alert(antenna, kind, value, limit) once
+                      per relay and kind ('cycles' or 'on_hours')
+        """
+        self.hardware = hardware
+        self.path = path
+        self.flush_interval = flush_interval
+        self.limits = {'cycles': cycle_limit, 'on_hours': on_hours_limit}
+        self.on_alert = on_alert
+        
+        self.writes = 0
+        self.alerted = set()  # (antenna, kind) already reported
+        
+        self._written = None  # snapshot in the file
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def load(self):
+        """
+        Read the counter file
+        
+        Returns:
+            dict: relay_wear() layout, empty if there is no usable file
+        """
+        if self.path is None:
+            return {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != VERSION:
+                return {}
+            return {int(num): {'cycles': int(counts['cycles']), 'on_ns': int(counts['on_ns'])}
+                    for num, counts in data['relays'].items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return {}
+    
+    def restore(self):
+        """
+        Add the stored counts to the hardware (call once at startup)
+        
+        Returns:
+            dict: Counts that were restored
+        """
+        saved = self.load()
+        self.hardware.restore_wear(saved)
+        self._written = saved or None
+        self._check(self.hardware.relay_wear())
+        return saved
+    
+    def start(self):
+        """Start the background flusher"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='wear-flush', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop the flusher and write the final counts"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush(force=True)
+    
+    def _run(self):
+        """Flush loop"""
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+    
+    def flush(self, force=False):
+        """
+        Check the thresholds and write the counters if they changed
+        
+        Args:
+            force (bool): Write even if only on-time grew a little
+        
+        Returns:
+            bool: True if the file was written
+        """
+        with self._flush_lock:
+            snapshot = self.hardware.relay_wear()
+            self._check(snapshot)
+            if self.path is None or not (force or self._changed(snapshot)):
+                return False
+            if snapshot == self._written:
+                return False
+            self._write(snapshot)
+            self._written = snapshot
+            self.writes += 1
+            return True
+    
+    def _changed(self, snapshot):
+        """True if a cycle happened or on-time grew enough since the last write"""
+        if self._written is None:
+            return True
+        for num, counts in snapshot.items():
+            written = self._written.get(num)
+            if written is None or counts['cycles'] != written['cycles']:
+                return True
+            if counts['on_ns'] - written['on_ns'] >= ON_TIME_RESOLUTION_NS:
+                return True
+        return False
+    
+    def _write(self, snapshot):
+        """Replace the file atomically"""
+        data = {
+            'version': VERSION,
+            'updated': round(time.time()),
+            'relays': {str(num): counts for num, counts in snapshot.items()},
+        }
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+    
+    def _over(self, counts):
+        """Kinds whose limit these counts have reached, with value and limit"""
+        values = {'cycles': counts['cycles'], 'on_hours': counts['on_ns'] / HOUR_NS}
+        return [(kind, values[kind], limit) for kind, limit in self.limits.items()
+                if limit is not None and values[kind] >= limit]
+    
+    def _check(self, snapshot):
+        """Report every relay newly over a limit"""
+        for num, counts in snapshot.items():
+            for kind, value, limit in self._over(counts):
+                if (num, kind) not in self.alerted:
+                    self.alerted.add((num, kind))
+                    if self.on_alert is not None:
+                        self.on_alert(num, kind, value, limit)
+    
+    def status(self):
+        """
+        Current counters and alerts of every relay
+        
+        Returns:
+            dict: {antenna_num: {'cycles', 'on_ns', 'alerts': [kind, ...]}}
+        """
+        status = {}
+        for num, counts in self.hardware.relay_wear().items():
+            status[num] = dict(counts, alerts=[kind for kind, value, limit in self._over(counts)])
+        return status
@@ -2,8 +2,17 @@
 """
 SSH Command Handler - 2 Antenna System
 Parses and executes antenna control commands via SSH
+
+Commands can be sent one at a time (handle_command) or as a pipelined
+batch such as "A2;STAT" or a whole script (handle_batch).
 """
 
+import re
+import time
+
+# Batch separators: ';' or newline
+_BATCH_SPLIT = re.compile(r'[;\r\n]')
+
 
 class SSHCommandHandler:
     """Handles SSH command parsing and execution"""
@@ -11,14 +20,28 @@ class SSHCommandHandler:
     # Valid commands for 3-antenna system
     VALID_COMMANDS = ['A1', 'A2', 'A3', 'OFF', 'STAT']
     
-    def __init__(self, hardware):
+    def __init__(self, hardware, antenna_count=3, source='network'):
         """
         Initialize command handler with hardware reference
         
         Args:
             hardware: AntennaHardware instance
+            antenna_count (int): Number of antennas (A1..A<count> accepted)
+            source (str): Source reported to hardware state-change listeners
         """
         self.hardware = hardware
+        self.antenna_count = antenna_count
+        self.source = source
+        self.metrics = None  # optional metrics.ControllerMetrics
+        self.tracer = None   # optional tracing.Tracer
+        
+        # Commands for this port count (same as VALID_COMMANDS for 3 antennas)
+        self.valid_commands = [f'A{i}' for i in range(1, antenna_count + 1)] + ['OFF', 'STAT']
+        self._valid_set = frozenset(self.valid_commands)
+        if antenna_count <= 8:
+            self._valid_text = ', '.join(self.valid_commands)
+        else:
+            self._valid_text = f"A1..A{antenna_count}, OFF, STAT"
     
     def handle_command(self, command):
         """
@@ -26,10 +49,34 @@ class SSHCommandHandler:
         
         Args:
             command (str): Command string from SSH input
-            
+        
         Returns:
             str: Response message with current state or error
         """
+        tracer = self.tracer
+        if tracer is not None:
+            span = tracer.start('command', command=command.strip(), source=self.source)
+        try:
+            metrics = self.metrics
+            if metrics is None:
+                response = self._execute(command)
+            else:
+                start = time.perf_counter_ns()
+                response = self._execute(command)
+                metrics.command_ns.observe(time.perf_counter_ns() - start)
+                cmd = command.strip().upper()
+                metrics.commands.inc(cmd if cmd in self._valid_set else 'invalid',
+                                     'error' if response.startswith('ERROR') else 'ok')
+        except BaseException as e:
+            if tracer is not None:
+                tracer.finish(span, error=repr(e))
+            raise
+        if tracer is not None:
+            tracer.finish(span, response=response)
+        return response
+    
+    def _execute(self, command):
+        """Run one command (handle_command without the metrics)"""
         # Strip whitespace and convert to uppercase
         cmd = command.strip().upper()
         
@@ -38,24 +85,20 @@ class SSHCommandHandler:
             return "ERROR: Empty command"
         
         # Validate command
-        if cmd not in self.VALID_COMMANDS:
-            return f"ERROR: Invalid command '{command}'. Valid: A1, A2, A3, OFF, STAT"
+        if cmd not in self._valid_set:
+            return f"ERROR: Invalid command '{command}'. Valid: {self._valid_text}"
         
         # Execute command
         if cmd == 'STAT':
             return self._get_status()
         elif cmd == 'OFF':
-            self.hardware.set_antenna(0)
+            self.hardware.set_antenna(0, source=self.source)
             return "Status: OFF"
-        elif cmd == 'A1':
-            self.hardware.set_antenna(1)
-            return "Status: A1"
-        elif cmd == 'A2':
-            self.hardware.set_antenna(2)
-            return "Status: A2"
-        elif cmd == 'A3':
-            self.hardware.set_antenna(3)
-            return "Status: A3"
+        else:
+            # A1..A<antenna_count>
+            antenna_num = int(cmd[1:])
+            self.hardware.set_antenna(antenna_num, source=self.source)
+            return f"Status: {cmd}"
     
     def _get_status(self):
         """
@@ -69,4 +112,47 @@ class SSHCommandHandler:
         if current == 0:
             return "Status: OFF"
         else:
-            return f"Status: A{current}"
\ No newline at end of file
+            return f"Status: A{current}"
+    
+    def handle_batch(self, buffer, collapse=False):
+        """
+        Parse a buffer of commands and run them in order in one pass
+        Yields one response per command as it is executed
+        
+        Args:
+            buffer (str): Commands separated by ';' or newlines
+            collapse (bool): Skip redundant intermediate switches - in each
+                             run of switch commands (A<n>/OFF) not separated
+                             by STAT, only the last one drives the relays
+        
+        Yields:
+            str: Response for each command, in order
+        """
+        commands = [c for c in _BATCH_SPLIT.split(buffer) if c.strip()]
+        
+        if not collapse:
+            for command in commands:
+                yield self.handle_command(command)
+            return
+        
+        # Index of the switch that ends each run (runs are broken by STAT)
+        final_switch = set()
+        last_switch = None
+        for index, command in enumerate(commands):
+            cmd = command.strip().upper()
+            if cmd == 'STAT':
+                if last_switch is not None:
+                    final_switch.add(last_switch)
+                last_switch = None
+            elif cmd in self._valid_set:
+                last_switch = index
+        if last_switch is not None:
+            final_switch.add(last_switch)
+        
+        for index, command in enumerate(commands):
+            cmd = command.strip().upper()
+            if cmd in self._valid_set and cmd != 'STAT' and index not in final_switch:
+                # Superseded before the relays would have settled - not applied
+                yield f"Status: {cmd} (collapsed)"
+            else:
+                yield self.handle_command(command)
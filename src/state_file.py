@@ -0,0 +1,102 @@
+# src/state_file.py
+"""
+State File - Memory-Mapped Antenna State Across Restarts
+Keeps the selected antenna in a small file so a restarted controller can
+attach to the relays without switching them
+
+The hardware listener packs one fixed-size record straight into a shared
+file mapping: no write() or fsync() on the switch path. The page cache
+holds the record, so it survives a crash, kill or upgrade of the
+controller process; the kernel writes it back to storage on its own
+schedule (a power cut can lose the last few seconds of changes) and
+close() flushes it.
+
+File layout (little endian, one record):
+  magic:8s  version:u32  antenna:i32  seq:u64  wall_ns:i64  crc32:u32
+
+The CRC covers the bytes before it, so a torn or foreign file reads as
+no state and the controller falls back to the live relay levels.
+
+Usage:
+  state = StateFile('/var/lib/antenna-controller/state')
+  saved = state.load()
+  hw = AntennaHardware(attach=True, initial=saved.antenna if saved else None)
+  hw.add_listener(state.record)
+"""
+
+import mmap
+import os
+import struct
+import time
+import zlib
+from collections import namedtuple
+
+MAGIC = b'ANTSTATE'
+VERSION = 1
+
+RECORD = struct.Struct('<8sIiQq')
+CRC = struct.Struct('<I')
+FILE_SIZE = 64  # record + CRC, padded
+
+# Last stored state: antenna (0 = OFF), store counter, wall-clock time
+SavedState = namedtuple('SavedState', ['antenna', 'seq', 'wall_ns'])
+
+
+class StateFile:
+    """Selected antenna in a shared file mapping"""
+    
+    def __init__(self, path):
+        """
+        Open (or create) the state file and map it
+        
+        Args:
+            path (str): State file path (its directory must exist)
+        """
+        self.path = path
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < FILE_SIZE:
+                os.ftruncate(fd, FILE_SIZE)
+            self.map = mmap.mmap(fd, FILE_SIZE, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        finally:
+            os.close(fd)
+        saved = self.load()
+        self.seq = saved.seq if saved is not None else 0
+    
+    def load(self):
+        """
+        Read the stored state
+        
+        Returns:
+            SavedState: or None if the file is new, torn or not a state file
+        """
+        magic, version, antenna, seq, wall_ns = RECORD.unpack_from(self.map, 0)
+        crc, = CRC.unpack_from(self.map, RECORD.size)
+        if magic != MAGIC or version != VERSION or crc != zlib.crc32(self.map[:RECORD.size]):
+            return None
+        return SavedState(antenna, seq, wall_ns)
+    
+    def store(self, antenna):
+        """
+        Store the selected antenna (page cache only, no syscall)
+        
+        Args:
+            antenna (int): Antenna number (0 = OFF)
+        """
+        self.seq += 1
+        RECORD.pack_into(self.map, 0, MAGIC, VERSION, antenna, self.seq, time.time_ns())
+        CRC.pack_into(self.map, RECORD.size, zlib.crc32(self.map[:RECORD.size]))
+    
+    def record(self, previous, current, source):
+        """AntennaHardware state-change listener"""
+        self.store(current)
+    
+    def flush(self):
+        """Write the mapping back to storage (msync)"""
+        self.map.flush()
+    
+    def close(self):
+        """Flush and unmap"""
+        if not self.map.closed:
+            self.map.flush()
+            self.map.close()
@@ -0,0 +1,225 @@
+# src/switch_matrix.py
+"""
+Antenna Switch Matrix - Large Port Counts
+Drives 16-64+ relay ports through serial port expanders instead of GPIOs
+
+The matrix keeps a port-state image (one bit per port) and writes the
+WHOLE image to the bus in one transaction per write, instead of one
+transaction per relay. It is an output backend for AntennaHardware
+(same write/read/close calls as gpio_backend.py), with ports numbered
+from 0 and mapped to antennas 1..N by port_map().
+
+Buses:
+  ShiftRegisterBus - 74HC595 chain on SPI (spidev), CE0 wired to RCLK latch
+  MCP23017Bus      - MCP23017 expanders on I2C (smbus2), 16 ports per chip
+  SimulatedBus     - in-memory bus for tests and benchmarks
+
+Example:
+  matrix = SwitchMatrix(ShiftRegisterBus(), port_count=32)
+  hw = AntennaHardware(backend=matrix, relay_pins=matrix.port_map())
+"""
+
+
+class ShiftRegisterBus:
+    """Chain of 74HC595 shift registers on the SPI bus"""
+    
+    # Ports the bus can drive (None = as long as the chain is)
+    port_capacity = None
+    
+    def __init__(self, bus=0, device=0, speed_hz=1000000):
+        """
+        Open the SPI device
+        
+        Args:
+            bus (int): SPI bus number (/dev/spidev<bus>.<device>)
+            device (int): SPI chip select, wired to the 595 RCLK latch
+            speed_hz (int): SPI clock
+        """
+        import spidev
+        self.spi = spidev.SpiDev()
+        self.spi.open(bus, device)
+        self.spi.max_speed_hz = speed_hz
+        self.spi.mode = 0
+        self.transactions = 0
+    
+    def write_image(self, image):
+        """
+        Shift the full image out in one SPI transfer
+        The first byte shifted ends up in the LAST register of the chain,
+        so the image is sent in reverse (port 0 lands in the first 595).
+        CE rising at the end of the transfer latches all outputs at once.
+        
+        Args:
+            image (bytes): Port-state image, port 0 = bit 0 of byte 0
+        """
+        self.spi.xfer2(list(reversed(image)))
+        self.transactions += 1
+    
+    def read_image(self, size):
+        """74HC595 outputs cannot be read back - None means use the image"""
+        return None
+    
+    def close(self):
+        """Close the SPI device"""
+        self.spi.close()
+
+
+class MCP23017Bus:
+    """MCP23017 16-bit I2C port expanders (up to 8 chips, 0x20-0x27)"""
+    
+    # Register addresses (IOCON.BANK = 0, sequential addressing)
+    IODIRA = 0x00
+    OLATA = 0x14
+    
+    def __init__(self, bus=1, base_address=0x20, chip_count=1):
+        """
+        Open the I2C bus and configure every expander pin as an output
+        
+        Args:
+            bus (int): I2C bus number (/dev/i2c-<bus>)
+            base_address (int): Address of the first chip
+            chip_count (int): Number of chained expanders (16 ports each)
+        """
+        from smbus2 import SMBus
+        self.i2c = SMBus(bus)
+        self.addresses = [base_address + i for i in range(chip_count)]
+        self.port_capacity = 16 * chip_count
+        self.transactions = 0
+        self.last_image = None
+        
+        # IODIRA/IODIRB = 0x00 -> all 16 pins outputs (one block write per chip)
+        for address in self.addresses:
+            self.i2c.write_i2c_block_data(address, self.IODIRA, [0x00, 0x00])
+    
+    def write_image(self, image):
+        """
+        Write OLATA+OLATB of every chip whose bytes changed
+        One 2-byte block write per chip (I2C needs one transaction per
+        address), so 64 ports cost at most 4 transactions instead of 64.
+        
+        Args:
+            image (bytes): Port-state image, port 0 = bit 0 of byte 0
+        """
+        chunks = []
+        for index in range(len(self.addresses)):
+            chunk = list(image[index * 2:index * 2 + 2])
+            chunks.append(chunk + [0] * (2 - len(chunk)))
+        
+        for index, address in enumerate(self.addresses):
+            if self.last_image is not None and self.last_image[index] == chunks[index]:
+                continue
+            self.i2c.write_i2c_block_data(address, self.OLATA, chunks[index])
+            self.transactions += 1
+        self.last_image = chunks
+    
+    def read_image(self, size):
+        """
+        Read OLATA+OLATB back from every chip
+        
+        Returns:
+            bytes: Port-state image as latched in the expanders
+        """
+        image = bytearray()
+        for address in self.addresses:
+            image += bytes(self.i2c.read_i2c_block_data(address, self.OLATA, 2))
+        return bytes(image[:size])
+    
+    def close(self):
+        """Close the I2C bus"""
+        self.i2c.close()
+
+
+class SimulatedBus:
+    """In-memory bus - records every transaction for tests and benchmarks"""
+    
+    port_capacity = None
+    
+    def __init__(self):
+        self.image = b''
+        self.transactions = 0
+        self.history = []
+        self.closed = False
+    
+    def write_image(self, image):
+        """Latch the full image in one transaction"""
+        self.image = bytes(image)
+        self.transactions += 1
+        self.history.append(self.image)
+    
+    def read_image(self, size):
+        """Return the latched image"""
+        return self.image[:size]
+    
+    def close(self):
+        """Mark the bus closed"""
+        self.closed = True
+
+
+class SwitchMatrix:
+    """Port-state image for N relay ports behind a serial bus"""
+    
+    def __init__(self, bus, port_count):
+        """
+        Create the matrix with every port off and latch that image
+        
+        Args:
+            bus: ShiftRegisterBus, MCP23017Bus or SimulatedBus
+            port_count (int): Number of relay ports (antennas)
+        
+        Raises:
+            ValueError: port_count is below 1 or above the bus's port_capacity
+        """
+        if port_count < 1:
+            raise ValueError("port_count must be at least 1")
+        if bus.port_capacity is not None and port_count > bus.port_capacity:
+            raise ValueError(f"port_count {port_count} exceeds the bus capacity of {bus.port_capacity} ports")
+        self.bus = bus
+        self.port_count = port_count
+        self.image = bytearray((port_count + 7) // 8)
+        self.bus.write_image(bytes(self.image))
+    
+    def port_map(self):
+        """
+        Antenna number to port mapping for AntennaHardware(relay_pins=...)
+        
+        Returns:
+            dict: {1: 0, 2: 1, ..., N: N-1}
+        """
+        return {port + 1: port for port in range(self.port_count)}
+    
+    def write(self, levels):
+        """
+        Update the image and write it in ONE bus transaction
+        
+        Args:
+            levels (dict): {port: bool} levels to apply
+        """
+        if not levels:
+            return
+        for port, level in levels.items():
+            if not 0 <= port < self.port_count:
+                raise ValueError(f"port {port} out of range")
+            if level:
+                self.image[port >> 3] |= (1 << (port & 7))
+            else:
+                self.image[port >> 3] &= ~(1 << (port & 7)) & 0xFF
+        self.bus.write_image(bytes(self.image))
+    
+    def read(self, ports):
+        """
+        Read port levels (from the bus if it supports read-back)
+        
+        Args:
+            ports: Iterable of port numbers
+        
+        Returns:
+            dict: {port: bool}
+        """
+        image = self.bus.read_image(len(self.image))
+        if image is None:
+            image = self.image
+        return {port: bool(image[port >> 3] & (1 << (port & 7))) for port in ports}
+    
+    def close(self):
+        """Close the bus"""
+        self.bus.close()
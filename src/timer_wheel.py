@@ -0,0 +1,178 @@
+# src/timer_wheel.py
+"""
+Hierarchical Timer Wheel - Every Pending Timeout on One Thread
+Used by the gesture engine (gesture.py) for long-press and double-press
+timeouts on every button, driven from ButtonHandler's edge thread
+
+Levels of `slots` buckets each; a level-k bucket spans slots**k ticks.
+A timer goes into the lowest level whose span covers its distance and is
+cascaded down as the wheel turns, so schedule/cancel are O(1) and a
+timer fires on the exact tick of its deadline - never early, and at most
+one tick late for the caller that advances the wheel.
+
+The wheel has no clock of its own: advance(now_ns) is called with the
+current time, so tests drive it with VirtualClock.
+
+Usage:
+  wheel = TimerWheel(tick_ns=1000000)
+  timer = wheel.schedule(now_ns + 800000000, on_long_press)
+  wheel.cancel(timer)
+  wheel.advance(time.monotonic_ns())
+"""
+
+
+class Timer:
+    """Handle for one scheduled callback"""
+    
+    __slots__ = ('deadline_ns', 'tick', 'callback', 'args', 'bucket', 'cancelled')
+    
+    def __init__(self, deadline_ns, tick, callback, args):
+        self.deadline_ns = deadline_ns
+        self.tick = tick
+        self.callback = callback
+        self.args = args
+        self.bucket = None
+        self.cancelled = False
+
+
+class TimerWheel:
+    """Hierarchical timing wheel with a fixed tick"""
+    
+    def __init__(self, tick_ns=1000000, slots=64, levels=4, start_ns=0):
+        """
+        Args:
+            tick_ns (int): Resolution (1ms)
+            slots (int): Buckets per level (power of two)
+            levels (int): Wheel levels (64**4 ticks of 1ms is ~4.6 hours)
+            start_ns (int): Time the wheel starts at
+        """
+        if slots & (slots - 1):
+            raise ValueError("slots must be a power of two")
+        self.tick_ns = tick_ns
+        self.slots = slots
+        self.bits = slots.bit_length() - 1
+        self.mask = slots - 1
+        self.levels = [[[] for _ in range(slots)] for _ in range(levels)]
+        self.overflow = []  # beyond the top level - re-checked on top-level cascades
+        self.current_tick = start_ns // tick_ns
+        self.pending = 0
+        self.fired = 0
+    
+    def _tick_for(self, deadline_ns):
+        """Deadline rounded up to a whole tick (never fire early)"""
+        return -(-deadline_ns // self.tick_ns)
+    
+    def schedule(self, deadline_ns, callback, *args):
+        """
+        Run callback(*args) once deadline_ns has been reached
+        
+        Returns:
+            Timer: Handle for cancel()
+        """
+        timer = Timer(deadline_ns, max(self._tick_for(deadline_ns), self.current_tick + 1),
+                      callback, args)
+        self._insert(timer)
+        self.pending += 1
+        return timer
+    
+    def cancel(self, timer):
+        """Cancel a pending timer (no-op if it already fired or was cancelled)"""
+        if timer is None or timer.cancelled or timer.bucket is None:
+            return
+        timer.bucket.remove(timer)
+        timer.bucket = None
+        timer.cancelled = True
+        self.pending -= 1
+    
+    def _insert(self, timer):
+        """Place a timer in the level that covers its distance"""
+        delta = timer.tick - self.current_tick
+        for level, buckets in enumerate(self.levels):
+            if delta < 1 << (self.bits * (level + 1)):
+                bucket = buckets[(timer.tick >> (self.bits * level)) & self.mask]
+                break
+        else:
+            bucket = self.overflow
+        bucket.append(timer)
+        timer.bucket = bucket
+    
+    def _cascade(self, level):
+        """Move the current bucket of a higher level down"""
+        if level == len(self.levels):
+            timers, self.overflow = self.overflow, []
+        else:
+            index = (self.current_tick >> (self.bits * level)) & self.mask
+            timers = self.levels[level][index]
+            self.levels[level][index] = []
+        for timer in timers:
+            self._insert(timer)
+    
+    def advance(self, now_ns):
+        """
+        Turn the wheel up to now_ns, firing due timers in deadline order
+        
+        Returns:
+            int: Timers fired
+        """
+        target = now_ns // self.tick_ns
+        fired = 0
+        while self.current_tick < target:
+            if not self.pending:
+                # Nothing scheduled - jump straight to now
+                self.current_tick = target
+                break
+            self.current_tick += 1
+            # Cascade every level whose lower index wrapped to zero, highest
+            # first so timers can fall through more than one level
+            wrapped = 0
+            while wrapped < len(self.levels) and \
+                    (self.current_tick & ((1 << (self.bits * (wrapped + 1))) - 1)) == 0:
+                wrapped += 1
+            for level in range(wrapped, 0, -1):
+                self._cascade(level)
+            bucket = self.levels[0][self.current_tick & self.mask]
+            if bucket:
+                self.levels[0][self.current_tick & self.mask] = []
+                for timer in sorted(bucket, key=lambda t: t.deadline_ns):
+                    timer.bucket = None
+                    self.pending -= 1
+                    self.fired += 1
+                    fired += 1
+                    timer.callback(*timer.args)
+        return fired
+    
+    def next_deadline(self):
+        """
+        Earliest pending deadline
+        
+        Returns:
+            int: ns time of the earliest timer's tick, or None when idle
+        """
+        if not self.pending:
+            return None
+        ticks = [timer.tick for buckets in self.levels for bucket in buckets for timer in bucket]
+        ticks.extend(timer.tick for timer in self.overflow)
+        return min(ticks) * self.tick_ns
+
+
+class VirtualClock:
+    """Manually advanced clock driving a TimerWheel (tests, trace replay)"""
+    
+    def __init__(self, wheel, now_ns=0):
+        """
+        Args:
+            wheel (TimerWheel): Wheel to drive
+            now_ns (int): Start time
+        """
+        self.wheel = wheel
+        self.now_ns = now_ns
+    
+    def advance(self, delta_ns):
+        """Move time forward and fire due timers"""
+        self.now_ns += delta_ns
+        return self.wheel.advance(self.now_ns)
+    
+    def advance_to(self, now_ns):
+        """Move time to an absolute value and fire due timers"""
+        self.now_ns = max(self.now_ns, now_ns)
+        return self.wheel.advance(self.now_ns)
@@ -0,0 +1,402 @@
+# src/trace_analyzer.py
+"""
+Trace Analyzer - Vectorized Glitch and RF-Noise Analysis of Edge Traces
+Offline statistics over edge traces (edge_trace.py) that are too long to
+replay edge by edge, e.g. a day recorded while transmitting
+
+The trace file is memory-mapped as a NumPy structured array (no parsing
+loop, the page cache holds the data) and every step is a whole-array
+operation. Transition detection works on one-byte flags and only
+copies out the timestamps it keeps; peak heap is about 35 bytes per
+edge of the analyzed pin, so a 5M-edge day fits in a Pi Zero 2W's 512 MB.
+
+Active periods are bridged across inactive gaps shorter than glitch_ns
+(contact bounce) - the same reference as edge_trace.true_presses:
+  press   - bridged active period of at least min_press_ns
+  glitch  - shorter bridged period (RF pickup, ESD, a brushed contact)
+  bounce  - per press, the longer of its make and break bounce tails
+  failure - a glitch (a lockout debouncer accepts it as a press) or a
+            press whose bounce outlasts lockout_ns (double trigger)
+
+Transmit periods come from a PTT line recorded in the same trace
+(--tx-pin, active = transmitting) or a CSV of wall-clock start,end Unix
+times (--tx-file); glitch and failure rates are compared inside and
+outside them and correlated with each minute's transmit duty cycle.
+
+Usage:
+  python3 trace_analyzer.py field.trace --pin 17 --tx-pin 24
+  python3 trace_analyzer.py field.trace --tx-file tx.csv --per-minute minutes.csv
+"""
+
+import argparse
+import os
+import sys
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:
+    # Analysis needs NumPy; the rest of the controller does not
+    np = None
+
+from edge_trace import FLAG_ACTIVE, FLAG_SNAPSHOT, HEADER, MAGIC, PIN_DEFAULT, RECORD
+
+MINUTE_NS = 60 * 1000000000
+
+Analysis = namedtuple('Analysis', [
+    'edges', 'span_ns', 'press_starts', 'press_intervals_ns', 'bounce_ns',
+    'glitch_starts', 'glitch_widths_ns', 'minutes', 'tx',
+])
+
+# Per-minute counts (arrays indexed by minute since the first edge)
+Minutes = namedtuple('Minutes', ['presses', 'glitches', 'failures', 'tx_fraction'])
+
+# Rates per minute inside/outside transmit periods, duty-cycle correlation
+TxStats = namedtuple('TxStats', ['tx_ns', 'glitch_rate_tx', 'glitch_rate_idle',
+                                 'failure_rate_tx', 'failure_rate_idle', 'correlation'])
+
+
+def _require_numpy():
+    """Raise a clear error when NumPy is missing"""
+    if np is None:
+        raise RuntimeError("trace analysis needs NumPy (pip install numpy)")
+
+
+def open_trace(path):
+    """
+    Memory-map an edge trace
+    
+    Args:
+        path (str): Trace written by edge_trace.TraceWriter
+    
+    Returns:
+        tuple: (wall_ns, mono_ns, records) - records is a read-only
+               structured memmap with timestamp_ns, pin and flags
+    
+    Raises:
+        ValueError: Not an edge trace or unsupported record size
+    """
+    _require_numpy()
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError(f"{path}: truncated header")
+    magic, version, record_size, wall_ns, mono_ns = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"{path}: not an edge trace")
+    if record_size != RECORD.size:
+        raise ValueError(f"{path}: unsupported record size {record_size}")
+    
+    dtype = np.dtype([('timestamp_ns', '<u8'), ('pin', 'u1'), ('flags', 'u1')])
+    # A trailing partial record (power loss mid-write) is ignored
+    count = (os.path.getsize(path) - HEADER.size) // RECORD.size
+    if count == 0:
+        return wall_ns, mono_ns, np.zeros(0, dtype)
+    return wall_ns, mono_ns, np.memmap(path, dtype=dtype, mode='r', offset=HEADER.size, shape=(count,))
+
+
+def _snapshot_count(records):
+    """Number of level-snapshot records (written first, at most one per pin)"""
+    head = records['flags'][:PIN_DEFAULT + 1] & FLAG_SNAPSHOT
+    return int(np.argmin(head)) if len(head) and not head.all() else len(head)
+
+
+def _pulses(records, pin, end_ns=None):
+    """
+    Active periods of one pin
+    
+    Returns:
+        tuple: (starts, ends) int64 arrays; a period still active at the
+               end of the trace ends at end_ns (or the last edge)
+    """
+    code = PIN_DEFAULT if pin is None else pin
+    count = _snapshot_count(records)
+    snapshots, records = records[:count], records[count:]
+    initial = bool(np.any(snapshots['flags'][snapshots['pin'] == code] & FLAG_ACTIVE))
+    
+    select = records['pin'] == code
+    active = (records['flags'][select] & FLAG_ACTIVE) != 0
+    
+    # Keep real transitions only (levels then alternate). The work is on
+    # one-byte flags; only the kept timestamps are copied out of the map.
+    previous = np.empty_like(active)
+    previous[0:1] = initial
+    previous[1:] = active[:-1]
+    changed = active != previous
+    del previous
+    mask = np.zeros(len(records), dtype=bool)
+    mask[select] = changed & active
+    starts = records['timestamp_ns'][mask].view(np.int64)
+    mask[select] = changed & ~active
+    ends = records['timestamp_ns'][mask].view(np.int64)
+    del select, active, changed, mask
+    
+    if initial and len(ends):
+        # Held when recording started - no start to measure from
+        ends = ends[1:]
+    if len(starts) > len(ends):
+        last = end_ns if end_ns is not None else starts[-1]
+        ends = np.append(ends, max(last, starts[-1]))
+    return starts, ends
+
+
+def _bridge(starts, ends, glitch_ns):
+    """
+    Merge active periods separated by gaps shorter than glitch_ns
+    
+    Returns:
+        tuple: (segment starts, segment ends, first pulse index per segment)
+    """
+    new_segment = np.empty(len(starts), dtype=bool)
+    new_segment[0:1] = True
+    new_segment[1:] = (starts[1:] - ends[:-1]) >= glitch_ns
+    first = np.flatnonzero(new_segment)
+    last = np.empty_like(first)
+    last[:-1] = first[1:] - 1
+    last[-1:] = len(starts) - 1
+    return starts[first], ends[last], first
+
+
+def _bounce_tails(starts, ends, seg_starts, seg_ends, first, max_bounce_ns):
+    """Per segment: longer of the make and break bounce tails"""
+    if len(first) == 0:
+        return np.zeros(0, dtype=np.int64)
+    segment = np.zeros(len(starts), dtype=np.int64)
+    segment[first[1:]] = 1
+    segment = np.cumsum(segment)
+    # Make: last pulse start within max_bounce_ns of the segment start
+    make = seg_starts[segment]
+    np.subtract(starts, make, out=make)
+    make[make > max_bounce_ns] = 0
+    # Break: first pulse end within max_bounce_ns of the segment end
+    brk = seg_ends[segment]
+    del segment
+    brk -= ends
+    brk[brk > max_bounce_ns] = 0
+    return np.maximum(np.maximum.reduceat(make, first), np.maximum.reduceat(brk, first))
+
+
+def _intervals_inside(times, tx_starts, tx_ends):
+    """Boolean mask: times that fall inside a transmit period"""
+    index = np.searchsorted(tx_starts, times, side='right') - 1
+    inside = index >= 0
+    inside[inside] = times[inside] < tx_ends[index[inside]]
+    return inside
+
+
+def _tx_per_minute(tx_starts, tx_ends, t0, minutes):
+    """Transmit duty cycle of each minute (0..1)"""
+    edges = t0 + np.arange(minutes + 1, dtype=np.int64) * MINUTE_NS
+    # Transmit time before each minute boundary: whole periods ended
+    # before it plus the part of the one in progress
+    done = np.concatenate(([0], np.cumsum(tx_ends - tx_starts)))
+    index = np.searchsorted(tx_starts, edges, side='right')
+    before = done[index]
+    running = index > 0
+    overrun = np.zeros(len(edges), dtype=np.int64)
+    overrun[running] = np.maximum(0, tx_ends[index[running] - 1] - edges[running])
+    before -= overrun
+    return np.diff(before) / MINUTE_NS
+
+
+def analyze(path, pin=17, tx_pin=None, tx_periods=None, glitch_ns=10000000, min_press_ns=30000000,
+            lockout_ns=20000000, max_bounce_ns=30000000):
+    """
+    Analyze one edge trace
+    
+    Args:
+        path (str): Trace file
+        pin: Button pin in the trace (None = the source's default pin)
+        tx_pin: Pin recording the transmitter PTT line (active = TX)
+        tx_periods: Iterable of (start, end) wall-clock ns transmit periods
+        glitch_ns (int): Inactive gaps shorter than this are bounce
+        min_press_ns (int): Shortest real press
+        lockout_ns (int): Lockout evaluated for failures
+        max_bounce_ns (int): Longest bounce tail counted per press
+    
+    Returns:
+        Analysis
+    """
+    wall_ns, mono_ns, records = open_trace(path)
+    # Minutes count from the first edge on any pin (edges are in time order)
+    edge_times = records['timestamp_ns'][_snapshot_count(records):]
+    t0 = int(edge_times[0]) if len(edge_times) else 0
+    span_end = int(edge_times[-1]) if len(edge_times) else 0
+    starts, ends = _pulses(records, pin, span_end)
+    edges = 2 * len(starts)
+    
+    if len(starts):
+        seg_starts, seg_ends, first = _bridge(starts, ends, glitch_ns)
+        widths = seg_ends - seg_starts
+        press = widths >= min_press_ns
+        bounce = _bounce_tails(starts, ends, seg_starts, seg_ends, first, max_bounce_ns)[press]
+        press_starts = seg_starts[press]
+        glitch_starts = seg_starts[~press]
+        glitch_widths = widths[~press]
+    else:
+        press_starts = glitch_starts = glitch_widths = bounce = np.zeros(0, dtype=np.int64)
+    del starts, ends
+    
+    # Per-minute counts
+    minutes = int((span_end - t0) // MINUTE_NS) + 1
+    failing = press_starts[bounce > lockout_ns]
+    counts = [np.bincount((times - t0) // MINUTE_NS, minlength=minutes)[:minutes]
+              for times in (press_starts, glitch_starts)]
+    failures = counts[1] + np.bincount((failing - t0) // MINUTE_NS, minlength=minutes)[:minutes]
+    
+    tx = None
+    tx_fraction = np.zeros(minutes)
+    if tx_pin is not None or tx_periods is not None:
+        if tx_pin is not None:
+            tx_starts, tx_ends = _pulses(records, tx_pin, span_end)
+        else:
+            periods = np.array(sorted(tx_periods), dtype=np.int64).reshape(-1, 2)
+            # Wall clock to the trace's monotonic clock
+            tx_starts = periods[:, 0] - wall_ns + mono_ns
+            tx_ends = periods[:, 1] - wall_ns + mono_ns
+        tx_fraction = _tx_per_minute(tx_starts, tx_ends, t0, minutes)
+        tx = _tx_stats(tx_starts, tx_ends, tx_fraction, glitch_starts,
+                       np.concatenate((glitch_starts, failing)), counts[1], span_end - t0)
+    
+    return Analysis(edges, span_end - t0, press_starts, np.diff(press_starts), bounce,
+                    glitch_starts, glitch_widths,
+                    Minutes(counts[0], counts[1], failures, tx_fraction), tx)
+
+
+def _tx_stats(tx_starts, tx_ends, tx_fraction, glitch_starts, failure_times, glitches_per_minute,
+              span_ns):
+    """Glitch and failure rates inside vs outside transmit periods"""
+    tx_ns = int(np.sum(tx_fraction) * MINUTE_NS)
+    idle_ns = max(0, span_ns - tx_ns)
+    
+    def rates(times):
+        inside = int(np.count_nonzero(_intervals_inside(times, tx_starts, tx_ends)))
+        return (inside * MINUTE_NS / tx_ns if tx_ns else 0.0,
+                (len(times) - inside) * MINUTE_NS / idle_ns if idle_ns else 0.0)
+    
+    glitch_tx, glitch_idle = rates(glitch_starts)
+    failure_tx, failure_idle = rates(failure_times)
+    correlation = float('nan')
+    if len(tx_fraction) > 1 and np.std(tx_fraction) > 0 and np.std(glitches_per_minute) > 0:
+        correlation = float(np.corrcoef(tx_fraction, glitches_per_minute)[0, 1])
+    return TxStats(tx_ns, glitch_tx, glitch_idle, failure_tx, failure_idle, correlation)
+
+
+def histogram(values_ns, bins=12, low_ns=10000, high_ns=None):
+    """
+    Log-spaced histogram
+    
+    Args:
+        values_ns: Array of ns durations
+        bins (int): Number of bins
+        low_ns (int): Lowest bin edge (smaller values go in the first bin)
+        high_ns (int): Highest bin edge (default: largest value)
+    
+    Returns:
+        tuple: (counts, edges_ns)
+    """
+    _require_numpy()
+    values = np.asarray(values_ns, dtype=np.int64)
+    if high_ns is None:
+        high_ns = max(int(values.max()) if len(values) else 0, low_ns * 10)
+    edges = np.geomspace(low_ns, high_ns, bins + 1)
+    counts, edges = np.histogram(np.clip(values, low_ns, high_ns), bins=edges)
+    return counts, edges
+
+
+def _duration(ns):
+    """Short human duration"""
+    if ns >= 1e9:
+        return f"{ns / 1e9:.2f}s"
+    if ns >= 1e6:
+        return f"{ns / 1e6:.2f}ms"
+    return f"{ns / 1e3:.0f}us"
+
+
+def format_histogram(title, values_ns, **kwargs):
+    """Text histogram lines"""
+    lines = [f"{title} ({len(values_ns)})"]
+    if not len(values_ns):
+        return lines
+    counts, edges = histogram(values_ns, **kwargs)
+    peak = max(1, int(counts.max()))
+    for count, low, high in zip(counts, edges[:-1], edges[1:]):
+        bar = '#' * int(40 * count / peak)
+        lines.append(f"  {_duration(low):>9} - {_duration(high):<9} {count:>9}  {bar}")
+    return lines
+
+
+def format_analysis(analysis, lockout_ns=20000000):
+    """Report lines for an Analysis"""
+    minutes = analysis.minutes
+    lines = [f"{analysis.edges} edges over {_duration(analysis.span_ns)}: "
+             f"{len(analysis.press_starts)} presses, {len(analysis.glitch_starts)} glitches"]
+    lines += format_histogram('Press intervals', analysis.press_intervals_ns, low_ns=10000000)
+    lines += format_histogram('Glitch widths', analysis.glitch_widths_ns, low_ns=1000)
+    lines += format_histogram('Bounce tails', analysis.bounce_ns, low_ns=10000)
+    if len(analysis.bounce_ns):
+        lines.append(f"  p99 bounce {_duration(np.percentile(analysis.bounce_ns, 99))}, "
+                     f"{int(np.count_nonzero(analysis.bounce_ns > lockout_ns))} presses longer "
+                     f"than the {_duration(lockout_ns)} lockout")
+    worst = np.argsort(minutes.failures)[::-1][:5]
+    worst = worst[minutes.failures[worst] > 0]
+    if len(worst):
+        lines.append("Worst minutes (minute: failures / presses)")
+        for m in worst:
+            lines.append(f"  +{m:<6} {minutes.failures[m]:>6} / {minutes.presses[m]}")
+    if analysis.tx is not None:
+        tx = analysis.tx
+        lines.append(f"Transmitting {_duration(tx.tx_ns)} "
+                     f"({100 * tx.tx_ns / max(1, analysis.span_ns):.1f}% of the trace)")
+        lines.append(f"  glitches/min  TX {tx.glitch_rate_tx:8.2f}  idle {tx.glitch_rate_idle:8.2f}")
+        lines.append(f"  failures/min  TX {tx.failure_rate_tx:8.2f}  idle {tx.failure_rate_idle:8.2f}")
+        lines.append(f"  correlation of glitches/min with TX duty cycle: {tx.correlation:+.2f}")
+    return lines
+
+
+def write_per_minute(path, analysis):
+    """CSV of the per-minute counts"""
+    minutes = analysis.minutes
+    table = np.column_stack((np.arange(len(minutes.presses)), minutes.presses, minutes.glitches,
+                             minutes.failures, minutes.tx_fraction))
+    np.savetxt(path, table, delimiter=',', fmt=['%d', '%d', '%d', '%d', '%.3f'],
+               header='minute,presses,glitches,failures,tx_fraction', comments='')
+
+
+def _read_tx_file(path):
+    """start,end Unix-time seconds per line -> (start_ns, end_ns) pairs"""
+    periods = np.loadtxt(path, delimiter=',', ndmin=2)
+    return (periods * 1e9).astype(np.int64)
+
+
+def main(argv=None):
+    """Entry point"""
+    parser = argparse.ArgumentParser(description='Glitch and RF-noise analysis of edge traces')
+    parser.add_argument('trace', help='Edge trace (edge_trace.py record / --record-edges)')
+    parser.add_argument('--pin', type=int, default=17, help='Button GPIO in the trace (default: 17)')
+    parser.add_argument('--tx-pin', type=int, default=None, help='PTT GPIO recorded in the same trace')
+    parser.add_argument('--tx-file', default=None, help='CSV of start,end Unix times of transmissions')
+    parser.add_argument('--glitch-ms', type=float, default=10.0, help='Bounce gap bridged (default: 10)')
+    parser.add_argument('--min-press-ms', type=float, default=30.0, help='Shortest press (default: 30)')
+    parser.add_argument('--lockout-ms', type=float, default=20.0, help='Lockout evaluated (default: 20)')
+    parser.add_argument('--per-minute', metavar='CSV', default=None, help='Write per-minute counts')
+    args = parser.parse_args(argv)
+    
+    try:
+        _require_numpy()
+        tx_periods = _read_tx_file(args.tx_file) if args.tx_file else None
+        analysis = analyze(args.trace, args.pin, args.tx_pin, tx_periods,
+                           glitch_ns=int(args.glitch_ms * 1e6), min_press_ns=int(args.min_press_ms * 1e6),
+                           lockout_ns=int(args.lockout_ms * 1e6))
+        for line in format_analysis(analysis, int(args.lockout_ms * 1e6)):
+            print(line)
+        if args.per_minute:
+            write_per_minute(args.per_minute, analysis)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,228 @@
+# src/tracing.py
+"""
+Tracing - Per-Command Spans With Stage Timestamps
+Answers "which stage was slow": the daemon opens a span when a request
+line is received, SSHCommandHandler.handle_command opens a child span for
+the command and AntennaHardware.set_antenna a grandchild around the relay
+writes, each with time.monotonic_ns() marks for their stages.
+
+Spans nest through a context variable, so a request handled on the
+daemon's loop (or by direct hardware) links command -> set_antenna by
+parent id. When a CommandActor applies the switch on its own thread, or
+a LoopActor's settle timer applies a coalesced burst, the set_antenna
+span has no parent; it still sits on the writer thread's track at the
+right time in a Chrome trace, and the gap shows queueing.
+
+Instrumented objects hold an optional tracer attribute (None = off); a
+disabled hook is one attribute check. Finished spans go to every
+exporter:
+  RingExporter         last N spans in memory
+  JsonLinesExporter    one JSON object per span
+  ChromeTraceExporter  trace-event file for chrome://tracing or Perfetto
+
+Usage:
+  tracer = Tracer(ChromeTraceExporter('/tmp/antenna-trace.json'))
+  hw.tracer = handler.tracer = daemon.tracer = tracer
+  ...
+  tracer.close()
+"""
+
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# Innermost open span of the running thread or asyncio task
+_current = contextvars.ContextVar('antenna_trace_span', default=None)
+
+
+class Span:
+    """One timed operation with stage marks"""
+    
+    __slots__ = ('name', 'span_id', 'parent_id', 'tid', 'start_ns', 'end_ns', 'marks', 'args', '_token')
+    
+    def __init__(self, name, span_id, parent_id, tid, start_ns, args):
+        self.name = name
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.tid = tid
+        self.start_ns = start_ns
+        self.end_ns = None
+        self.marks = []  # (stage, monotonic ns)
+        self.args = args
+        self._token = None
+    
+    def to_dict(self):
+        """
+        JSON-ready form with stage marks as offsets from the start
+        
+        Returns:
+            dict: name, id, parent, tid, start_ns, dur_ns, marks, args
+        """
+        return {
+            'name': self.name,
+            'id': self.span_id,
+            'parent': self.parent_id,
+            'tid': self.tid,
+            'start_ns': self.start_ns,
+            'dur_ns': self.end_ns - self.start_ns,
+            'marks': {stage: ns - self.start_ns for stage, ns in self.marks},
+            'args': self.args,
+        }
+
+
+class Tracer:
+    """Opens, marks and finishes spans and hands them to the exporters"""
+    
+    def __init__(self, *exporters, clock=time.monotonic_ns):
+        """
+        Args:
+            exporters: RingExporter, JsonLinesExporter, ChromeTraceExporter...
+            clock: Monotonic nanosecond clock
+        """
+        self.exporters = list(exporters)
+        self.clock = clock
+        self._ids = itertools.count(1)
+    
+    def start(self, name, **args):
+        """
+        Open a span as a child of the current one
+        
+        Args:
+            name (str): Span name (request, command, set_antenna, ...)
+            args: Extra fields recorded with the span
+        
+        Returns:
+            Span: Pass it to mark() and finish()
+        """
+        parent = _current.get()
+        span = Span(name, next(self._ids), parent.span_id if parent is not None else None,
+                    threading.get_native_id(), self.clock(), args)
+        span._token = _current.set(span)
+        return span
+    
+    def mark(self, span, stage):
+        """Timestamp one stage of an open span"""
+        span.marks.append((stage, self.clock()))
+    
+    def finish(self, span, **args):
+        """
+        Close a span (in the thread or task that opened it) and export it
+        
+        Args:
+            span (Span): Span returned by start()
+            args: Extra fields known only at the end (e.g. the response)
+        """
+        span.end_ns = self.clock()
+        _current.reset(span._token)
+        span._token = None
+        if args:
+            span.args.update(args)
+        for exporter in self.exporters:
+            exporter.export(span)
+    
+    def close(self):
+        """Close every exporter"""
+        for exporter in self.exporters:
+            exporter.close()
+
+
+class RingExporter:
+    """Keeps the most recent finished spans in memory"""
+    
+    def __init__(self, capacity=1024):
+        """
+        Args:
+            capacity (int): Spans kept (oldest dropped first)
+        """
+        self.ring = deque(maxlen=capacity)
+    
+    def export(self, span):
+        """Keep one finished span"""
+        self.ring.append(span)
+    
+    def spans(self):
+        """Snapshot of the kept spans, oldest first"""
+        return list(self.ring)
+    
+    def close(self):
+        """Nothing to release"""
+
+
+class JsonLinesExporter:
+    """Appends one JSON object per span to a file (Span.to_dict layout)"""
+    
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Output file (appended to)
+        """
+        self.path = path
+        self.file = open(path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+    
+    def export(self, span):
+        """Append one finished span"""
+        line = json.dumps(span.to_dict(), separators=(',', ':')) + '\n'
+        with self._lock:
+            self.file.write(line)
+    
+    def close(self):
+        """Close the file"""
+        with self._lock:
+            if not self.file.closed:
+                self.file.close()
+
+
+class ChromeTraceExporter:
+    """
+    Writes the Chrome trace-event format (JSON array)
+    
+    Each span is a complete ('X') event with its marks as thread-scoped
+    instant ('i') events; timestamps are in microseconds. The array is
+    closed by close(), but chrome://tracing and Perfetto also load a file
+    cut short by a crash.
+    """
+    
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Output file (overwritten)
+        """
+        self.path = path
+        self.pid = os.getpid()
+        self.file = open(path, 'w', encoding='utf-8')
+        self.file.write('[')
+        self._first = True
+        self._threads = set()
+        self._lock = threading.Lock()
+    
+    def _events(self, span):
+        """Trace events for one span"""
+        if span.tid not in self._threads:
+            self._threads.add(span.tid)
+            yield {'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': span.tid,
+                   'args': {'name': threading.current_thread().name}}
+        yield {'name': span.name, 'cat': 'antenna', 'ph': 'X', 'pid': self.pid, 'tid': span.tid,
+               'ts': span.start_ns / 1000, 'dur': (span.end_ns - span.start_ns) / 1000,
+               'args': dict(span.args, id=span.span_id, parent=span.parent_id)}
+        for stage, ns in span.marks:
+            yield {'name': stage, 'cat': 'antenna', 'ph': 'i', 's': 't', 'pid': self.pid,
+                   'tid': span.tid, 'ts': ns / 1000}
+    
+    def export(self, span):
+        """Append the events of one finished span"""
+        with self._lock:
+            for event in self._events(span):
+                self.file.write(('\n' if self._first else ',\n') + json.dumps(event, separators=(',', ':')))
+                self._first = False
+    
+    def close(self):
+        """Close the JSON array and the file"""
+        with self._lock:
+            if not self.file.closed:
+                self.file.write('\n]\n')
+                self.file.close()
@@ -0,0 +1,249 @@
+# src/udp_protocol.py
+"""
+UDP Control Protocol - Compact Binary Datagrams
+Fast antenna control for contest loggers and band decoders
+
+Every request and reply is one fixed-size 8-byte datagram (network order):
+
+  Request:  version:u8  opcode:u8  antenna:u8  session:u8  seq:u32
+  Reply:    version:u8  opcode:u8  status:u8   antenna:u8  seq:u32
+
+Opcodes map onto SSHCommandHandler.VALID_COMMANDS:
+  OP_STAT   (0x00)            -> STAT
+  OP_OFF    (0x01)            -> OFF
+  OP_SELECT (0x02, antenna=N) -> AN
+
+The reply carries the antenna selected by the request (0 = OFF) - the
+target, even if a coalescing actor writes it to the relays a few ms later.
+
+Sequence numbers are per sender (address, port) and session, and are
+compared with serial number arithmetic so they may wrap. A client picks a
+random non-zero session byte when it starts; a request with a different
+session than the last one from that address starts a fresh sequence, so
+a logger restarted on the same fixed port with its seq back at 1 is not
+answered STALE. Handling is idempotent:
+  - duplicate seq   -> the cached reply is re-sent, nothing is re-executed
+  - older seq       -> STATUS_STALE with the current antenna, not executed
+                       (an out-of-order packet never undoes a newer switch)
+  - newer seq       -> executed
+"""
+
+import asyncio
+import random
+import socket
+import struct
+from collections import OrderedDict
+
+PROTOCOL_VERSION = 1
+
+REQUEST = struct.Struct('!BBBBI')
+REPLY = struct.Struct('!BBBBI')
+
+# Opcodes
+OP_STAT = 0x00
+OP_OFF = 0x01
+OP_SELECT = 0x02
+
+# Reply status codes
+STATUS_OK = 0
+STATUS_ERROR = 1
+STATUS_STALE = 2
+STATUS_BAD_REQUEST = 3
+
+_SEQ_MOD = 1 << 32
+_SEQ_HALF = 1 << 31
+
+
+def encode_request(opcode, seq, antenna=0, session=0):
+    """
+    Build a request datagram
+    
+    Args:
+        opcode (int): OP_STAT, OP_OFF or OP_SELECT
+        seq (int): Sequence number (wraps at 2**32)
+        antenna (int): Antenna number for OP_SELECT
+        session (int): Client session byte (0..255)
+    
+    Returns:
+        bytes: 8-byte datagram
+    """
+    return REQUEST.pack(PROTOCOL_VERSION, opcode, antenna, session, seq % _SEQ_MOD)
+
+
+def decode_reply(data):
+    """
+    Parse a reply datagram
+    
+    Returns:
+        tuple: (opcode, status, antenna, seq)
+    """
+    version, opcode, status, antenna, seq = REPLY.unpack(data)
+    return opcode, status, antenna, seq
+
+
+class UDPCommandServer:
+    """Decodes datagrams, runs them through SSHCommandHandler, builds replies"""
+    
+    # Senders remembered for duplicate / reorder detection
+    MAX_PEERS = 256
+    
+    def __init__(self, handler):
+        """
+        Initialize server with a command handler
+        
+        Args:
+            handler: SSHCommandHandler instance
+        """
+        self.handler = handler
+        self.peers = OrderedDict()  # addr -> (session, last_seq, last_reply)
+        self.duplicates = 0
+        self.stale = 0
+        self.restarts = 0
+        self.bad_requests = 0
+    
+    def _command_for(self, opcode, antenna):
+        """Map an opcode onto a SSHCommandHandler command string"""
+        if opcode == OP_STAT:
+            return 'STAT'
+        if opcode == OP_OFF:
+            return 'OFF'
+        if opcode == OP_SELECT:
+            return f'A{antenna}'
+        return None
+    
+    def handle_datagram(self, data, addr):
+        """
+        Process one request datagram
+        
+        Args:
+            data (bytes): Received datagram
+            addr: Sender address (used as the sequence-number key)
+        
+        Returns:
+            bytes: Reply datagram, or None to send nothing
+        """
+        if len(data) != REQUEST.size:
+            self.bad_requests += 1
+            return None
+        version, opcode, antenna, session, seq = REQUEST.unpack(data)
+        
+        if version != PROTOCOL_VERSION:
+            self.bad_requests += 1
+            return REPLY.pack(PROTOCOL_VERSION, opcode, STATUS_BAD_REQUEST, 0, seq)
+        
+        peer = self.peers.get(addr)
+        if peer is not None and peer[0] != session:
+            # The client restarted - its old sequence space no longer applies
+            self.restarts += 1
+            peer = None
+        if peer is not None:
+            last_session, last_seq, last_reply = peer
+            delta = (seq - last_seq) % _SEQ_MOD
+            if delta == 0:
+                # Retransmission - answer again without re-executing
+                self.duplicates += 1
+                return last_reply
+            if delta >= _SEQ_HALF:
+                # Older than something already executed - never apply it
+                self.stale += 1
+                current = self.handler.hardware.get_current_antenna()
+                return REPLY.pack(PROTOCOL_VERSION, opcode, STATUS_STALE, current, seq)
+        
+        command = self._command_for(opcode, antenna)
+        if command is None:
+            self.bad_requests += 1
+            status = STATUS_BAD_REQUEST
+        else:
+            response = self.handler.handle_command(command)
+            status = STATUS_ERROR if response.startswith('ERROR') else STATUS_OK
+        
+        if status == STATUS_OK and opcode != OP_STAT:
+            # The target - a coalescing actor may not have written it yet
+            selected = antenna if opcode == OP_SELECT else 0
+        else:
+            selected = self.handler.hardware.get_current_antenna()
+        reply = REPLY.pack(PROTOCOL_VERSION, opcode, status, selected, seq)
+        
+        # Remember the newest request per sender (bounded, least recent evicted)
+        self.peers[addr] = (session, seq, reply)
+        self.peers.move_to_end(addr)
+        if len(self.peers) > self.MAX_PEERS:
+            self.peers.popitem(last=False)
+        
+        return reply
+
+
+class UDPControlProtocol(asyncio.DatagramProtocol):
+    """asyncio datagram endpoint serving a UDPCommandServer"""
+    
+    def __init__(self, handler):
+        """
+        Args:
+            handler: SSHCommandHandler instance
+        """
+        self.server = UDPCommandServer(handler)
+        self.transport = None
+    
+    def connection_made(self, transport):
+        self.transport = transport
+    
+    def datagram_received(self, data, addr):
+        reply = self.server.handle_datagram(data, addr)
+        if reply is not None:
+            self.transport.sendto(reply, addr)
+
+
+class UDPControlClient:
+    """Blocking client for loggers and scripts"""
+    
+    def __init__(self, host, port, timeout=0.05, retries=3):
+        """
+        Args:
+            host (str): Controller address
+            port (int): Controller UDP port
+            timeout (float): Seconds to wait for each reply
+            retries (int): Retransmissions (same seq) before giving up
+        """
+        self.addr = (host, port)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.settimeout(timeout)
+        self.retries = retries
+        self.session = random.randrange(1, 256)
+        self.seq = 0
+    
+    def request(self, opcode, antenna=0):
+        """
+        Send a request and wait for its reply (retransmitting on timeout)
+        
+        Returns:
+            tuple: (opcode, status, antenna, seq)
+        
+        Raises:
+            TimeoutError: No reply after all retries
+        """
+        self.seq = (self.seq + 1) % _SEQ_MOD
+        datagram = encode_request(opcode, self.seq, antenna, self.session)
+        for _ in range(self.retries + 1):
+            self.sock.sendto(datagram, self.addr)
+            try:
+                while True:
+                    reply = decode_reply(self.sock.recv(REPLY.size))
+                    if reply[3] == self.seq:
+                        return reply
+            except socket.timeout:
+                continue
+        raise TimeoutError(f"no reply for seq {self.seq}")
+    
+    def select(self, antenna):
+        """Select antenna N (0 = OFF)"""
+        if antenna == 0:
+            return self.request(OP_OFF)
+        return self.request(OP_SELECT, antenna)
+    
+    def status(self):
+        """Query current antenna"""
+        return self.request(OP_STAT)
+    
+    def close(self):
+        """Close the socket"""
+        self.sock.close()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Unit tests for antenna_cli.py
+Tests the non-interactive batch mode on fake-chip hardware
+"""
+
+import io
+import json
+import os
+import signal
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+import sys
+
+# Mock gpiozero before any imports
+sys.modules['gpiozero'] = Mock()
+sys.modules['gpiozero.pins'] = Mock()
+sys.modules['gpiozero.pins.lgpio'] = Mock()
+
+from antenna_cli import AntennaControllerCLI, main
+from antenna_hardware import AntennaHardware
+from gpio_backend import FakeChip, LineGroupBackend
+
+
+class TestBatchMode(unittest.TestCase):
+    """Test run_batch JSON-lines output"""
+    
+    def setUp(self):
+        """Create a CLI on fake hardware without the button"""
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            self.addCleanup(signal.signal, sig, signal.getsignal(sig))
+        self.log = io.StringIO()
+        self.hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip()))
+        self.cli = AntennaControllerCLI(hardware=self.hw, button=False, log=self.log)
+        self.addCleanup(self.cli.cleanup)
+    
+    def run_batch(self, text):
+        """Run text through batch mode, return (status, decoded lines)"""
+        out = io.StringIO()
+        status = self.cli.run_batch(io.StringIO(text), out)
+        return status, [json.loads(line) for line in out.getvalue().splitlines()]
+    
+    def test_one_json_line_per_command(self):
+        """Test each command gets a response with the resulting antenna"""
+        status, lines = self.run_batch("A2\nstat\nA3;OFF\n")
+        self.assertEqual(status, 0)
+        self.assertEqual([line['command'] for line in lines], ['A2', 'stat', 'A3', 'OFF'])
+        self.assertEqual([line['antenna'] for line in lines], [2, 2, 3, 0])
+        self.assertEqual(lines[0], {'command': 'A2', 'ok': True, 'response': 'Status: A2', 'antenna': 2})
+        self.assertEqual(self.hw.get_current_antenna(), 0)
+    
+    def test_errors_set_exit_status(self):
+        """Test invalid commands are reported and fail the batch"""
+        status, lines = self.run_batch("A9\nA1\n")
+        self.assertEqual(status, 1)
+        self.assertFalse(lines[0]['ok'])
+        self.assertTrue(lines[0]['response'].startswith('ERROR'))
+        self.assertTrue(lines[1]['ok'])
+    
+    def test_comments_blank_lines_and_quit(self):
+        """Test comments and blank lines are skipped and QUIT ends the batch"""
+        status, lines = self.run_batch("# contest start\n\nA2;quit\nA3\n")
+        self.assertEqual(status, 0)
+        self.assertEqual([line['command'] for line in lines], ['A2'])
+        self.assertEqual(self.hw.get_current_antenna(), 2)
+    
+    def test_no_banner_on_stdout(self):
+        """Test progress messages go to the log stream"""
+        self.assertIn("Hardware initialized", self.log.getvalue())
+        self.assertNotIn("Button handler", self.log.getvalue())
+
+
+
+class TestBatchMain(unittest.TestCase):
+    """Test the --batch entry point"""
+    
+    def setUp(self):
+        """Fake-chip hardware in place of the GPIO relays"""
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            self.addCleanup(signal.signal, sig, signal.getsignal(sig))
+        self.chip = FakeChip()
+        self.hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=self.chip))
+        patcher = patch('antenna_cli.AntennaHardware', return_value=self.hw)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.path = os.path.join(tmpdir.name, 'batch.txt')
+    
+    def batch(self, text):
+        """Run main(--batch) on text, return the exit status"""
+        with open(self.path, 'w') as f:
+            f.write(text)
+        with patch('sys.stdout', io.StringIO()), patch('sys.stderr', io.StringIO()):
+            return main(['--batch', self.path, '--no-button'])
+    
+    def test_selection_kept_after_batch(self):
+        """Test the last antenna stays energized when the batch ends"""
+        sigint = signal.getsignal(signal.SIGINT)
+        self.assertEqual(self.batch("A2\n"), 0)
+        self.assertEqual(self.chip.levels, {27: False, 22: True, 4: False})
+        self.assertIs(signal.getsignal(signal.SIGINT), sigint)
+    
+    def test_interrupt_exits_130(self):
+        """Test Ctrl+C ends the batch with status 130 and one cleanup"""
+        self.hw.cleanup = Mock()
+        with patch('antenna_cli.AntennaControllerCLI.run_batch', side_effect=KeyboardInterrupt):
+            self.assertEqual(self.batch("A2\n"), 130)
+        self.hw.cleanup.assert_called_once_with(hold=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
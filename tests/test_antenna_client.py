@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Unit tests for antenna_client.py
+Loopback tests against a daemon, and the cold-start import budget
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import unittest
+from unittest.mock import MagicMock, Mock, patch
+
+# Mock gpiozero before any imports
+sys.modules['gpiozero'] = Mock()
+sys.modules['gpiozero.pins'] = Mock()
+sys.modules['gpiozero.pins.lgpio'] = Mock()
+
+import antenna_client
+import antenna_daemon
+from antenna_daemon import AntennaDaemon
+from antenna_hardware import AntennaHardware
+from gpio_backend import FakeChip, LineGroupBackend
+from ssh_command_handler import SSHCommandHandler
+
+SRC_DIR = os.path.dirname(os.path.abspath(antenna_client.__file__))
+
+# Modules a thin client must never load
+HARDWARE_MODULES = ('gpiozero', 'gpiod', 'lgpio', 'asyncio', 'antenna_hardware', 'button_handler',
+                    'command_actor', 'numpy')
+
+# Cumulative import time allowed for antenna_client (generous: CI runners
+# and a Pi Zero 2W are far slower than a desktop)
+IMPORT_BUDGET_US = 100000
+
+
+def import_times(statement):
+    """
+    Run statement in a fresh interpreter with -X importtime
+    
+    Returns:
+        dict: {module: cumulative import time in us}
+    """
+    env = dict(os.environ, PYTHONPATH=SRC_DIR)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            capture_output=True, text=True, env=env, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        fields = line[len('import time:'):].split('|')
+        times[fields[2].strip()] = int(fields[1])
+    return times
+
+
+class TestAntennaClient(unittest.IsolatedAsyncioTestCase):
+    """Test the client against a daemon over loopback TCP"""
+    
+    async def asyncSetUp(self):
+        """Start a daemon on a free loopback port with fake-chip hardware"""
+        self.hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip()))
+        self.daemon = AntennaDaemon(SSHCommandHandler(self.hw), port=0)
+        await self.daemon.start()
+    
+    async def asyncTearDown(self):
+        """Stop the daemon"""
+        await self.daemon.stop()
+    
+    async def send(self, commands):
+        """Run the blocking client off the event loop"""
+        return await asyncio.to_thread(antenna_client.send, commands, port=self.daemon.port)
+    
+    async def test_commands_in_one_round_trip(self):
+        """Test every command gets its response, in order"""
+        responses = await self.send(['A2', 'STAT', 'A3;OFF'])
+        self.assertEqual(responses, ['Status: A2', 'Status: A2', 'Status: A3', 'Status: OFF'])
+        self.assertEqual(self.hw.get_current_antenna(), 0)
+    
+    async def test_exit_status(self):
+        """Test ERROR responses and unreachable daemons set the exit status"""
+        port = str(self.daemon.port)
+        self.assertEqual(await asyncio.to_thread(antenna_client.main, ['--port', port, 'A1']), 0)
+        self.assertEqual(await asyncio.to_thread(antenna_client.main, ['--port', port, 'A9']), 1)
+        await self.daemon.stop()
+        self.assertEqual(await asyncio.to_thread(antenna_client.main, ['--port', port]), 2)
+    
+    def test_failed_unix_connect_closes_socket(self):
+        """Test a Unix socket that cannot connect is closed, not leaked"""
+        sock = MagicMock()
+        sock.__enter__.return_value = sock
+        sock.connect.side_effect = FileNotFoundError('no socket')
+        with patch('antenna_client.socket.socket', return_value=sock):
+            with self.assertRaises(FileNotFoundError):
+                antenna_client.send(['STAT'], unix_path='/nonexistent/antenna.sock')
+        sock.__exit__.assert_called_once()
+    
+    def test_defaults_match_daemon(self):
+        """Test the client's defaults follow the daemon's"""
+        self.assertEqual(antenna_client.DEFAULT_HOST, antenna_daemon.DEFAULT_HOST)
+        self.assertEqual(antenna_client.DEFAULT_PORT, antenna_daemon.DEFAULT_PORT)
+
+
+class TestColdStart(unittest.TestCase):
+    """Test import cost in a fresh interpreter (real, not mocked, modules)"""
+    
+    def test_client_imports_no_hardware(self):
+        """Test the thin client stays inside its import budget"""
+        times = import_times('import antenna_client')
+        self.assertFalse([name for name in HARDWARE_MODULES if name in times])
+        self.assertLess(times['antenna_client'], IMPORT_BUDGET_US)
+    
+    def test_hardware_modules_import_without_gpiozero(self):
+        """Test gpiozero is loaded on first device use, not at import"""
+        times = import_times('import antenna_hardware, button_handler, antenna_cli')
+        self.assertNotIn('gpiozero', times)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Unit tests for antenna_daemon.py
+Loopback tests of the persistent TCP line protocol
+"""
+
+import asyncio
+import io
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import Mock, patch
+import sys
+
+# Mock gpiozero before any imports
+sys.modules['gpiozero'] = Mock()
+sys.modules['gpiozero.pins'] = Mock()
+sys.modules['gpiozero.pins.lgpio'] = Mock()
+
+from antenna_daemon import AntennaDaemon, main
+from antenna_hardware import AntennaHardware
+from command_actor import LoopActor, POLICY_LATEST
+from gpio_backend import FakeChip, LineGroupBackend
+from ssh_command_handler import SSHCommandHandler
+
+
+class TestAntennaDaemon(unittest.IsolatedAsyncioTestCase):
+    """Test AntennaDaemon over loopback TCP"""
+    
+    async def asyncSetUp(self):
+        """Start a daemon on a free loopback port with fake-chip hardware"""
+        self.hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip()))
+        self.daemon = AntennaDaemon(SSHCommandHandler(self.hw), port=0)
+        await self.daemon.start()
+    
+    async def asyncTearDown(self):
+        """Stop the daemon"""
+        await self.daemon.stop()
+    
+    async def _connect(self):
+        """Open a client connection"""
+        return await asyncio.open_connection('127.0.0.1', self.daemon.port)
+    
+    async def _request(self, reader, writer, command):
+        """Send one command line and read one response line"""
+        writer.write(command.encode() + b'\n')
+        await writer.drain()
+        return (await reader.readline()).decode().rstrip('\n')
+    
+    async def test_command_round_trip(self):
+        """Test a command switches the hardware and returns status"""
+        reader, writer = await self._connect()
+        self.assertEqual(await self._request(reader, writer, 'A2'), 'Status: A2')
+        self.assertEqual(self.hw.get_current_antenna(), 2)
+        writer.close()
+    
+    async def test_persistent_connection(self):
+        """Test many commands share one connection"""
+        reader, writer = await self._connect()
+        for command, expected in [('A3', 'Status: A3'), ('STAT', 'Status: A3'),
+                                  ('off', 'Status: OFF'), ('bogus', None)]:
+            response = await self._request(reader, writer, command)
+            if expected is None:
+                self.assertTrue(response.startswith('ERROR'))
+            else:
+                self.assertEqual(response, expected)
+        writer.close()
+    
+    async def test_concurrent_clients(self):
+        """Test several clients connected at once all get served"""
+        clients = [await self._connect() for _ in range(8)]
+        responses = await asyncio.gather(
+            *[self._request(reader, writer, 'STAT') for reader, writer in clients]
+        )
+        self.assertEqual(responses, ['Status: A1'] * 8)
+        self.assertEqual(len(self.daemon.clients), 8)
+        for _, writer in clients:
+            writer.close()
+    
+    async def test_line_too_long(self):
+        """Test a line over the 64 KiB stream limit is refused and the connection closed"""
+        reader, writer = await self._connect()
+        # One byte over the limit and no newline: the whole line is read
+        # before the overrun is detected, so the close is a clean FIN
+        writer.write(b'A' * (2 ** 16 + 1))
+        await writer.drain()
+        self.assertEqual(await reader.readline(), b'ERROR: line too long\n')
+        self.assertEqual(await reader.read(), b'')
+        writer.close()
+        await asyncio.sleep(0)
+        self.assertEqual(self.daemon.clients, set())
+        self.assertEqual(self.hw.get_current_antenna(), 1)
+    
+    async def test_batch_line(self):
+        """Test a ';' batch line returns one response line per command"""
+        reader, writer = await self._connect()
+        writer.write(b'A3;STAT;OFF\n')
+        await writer.drain()
+        responses = [(await reader.readline()).decode().rstrip('\n') for _ in range(3)]
+        self.assertEqual(responses, ['Status: A3', 'Status: A3', 'Status: OFF'])
+        writer.close()
+    
+    async def test_pipelined_lines(self):
+        """Test many lines sent without waiting are answered in order"""
+        reader, writer = await self._connect()
+        writer.write(b''.join(f'A{i % 3 + 1}\n'.encode() for i in range(50)))
+        await writer.drain()
+        responses = [(await reader.readline()).decode().rstrip('\n') for _ in range(50)]
+        self.assertEqual(responses, [f'Status: A{i % 3 + 1}' for i in range(50)])
+        writer.close()
+    
+    async def test_watch_pushes_network_change(self):
+        """Test a WATCH subscriber is pushed changes made by another client"""
+        watch_reader, watch_writer = await self._connect()
+        self.assertEqual(await self._request(watch_reader, watch_writer, 'WATCH'), 'Status: A1')
+        
+        reader, writer = await self._connect()
+        await self._request(reader, writer, 'A3')
+        
+        event = await asyncio.wait_for(watch_reader.readline(), 1)
+        self.assertEqual(event, b'EVENT 1 A3 network\n')
+        watch_writer.close()
+        writer.close()
+    
+    async def test_watch_pushes_button_change(self):
+        """Test changes from the button thread reach subscribers"""
+        reader, writer = await self._connect()
+        await self._request(reader, writer, 'WATCH')
+        
+        thread = threading.Thread(target=self.hw.set_antenna, args=(2,), kwargs={'source': 'button'})
+        thread.start()
+        thread.join()
+        
+        event = await asyncio.wait_for(reader.readline(), 1)
+        self.assertEqual(event, b'EVENT 1 A2 button\n')
+        writer.close()
+    
+    async def test_watch_fan_out(self):
+        """Test every subscriber receives the same event"""
+        clients = [await self._connect() for _ in range(20)]
+        for reader, writer in clients:
+            await self._request(reader, writer, 'WATCH')
+        
+        self.hw.set_antenna(0, source='schedule')
+        
+        for reader, writer in clients:
+            event = await asyncio.wait_for(reader.readline(), 1)
+            self.assertEqual(event, b'EVENT 1 OFF schedule\n')
+            writer.close()
+    
+    async def test_unwatch(self):
+        """Test UNWATCH stops the event stream"""
+        reader, writer = await self._connect()
+        await self._request(reader, writer, 'WATCH')
+        self.assertEqual(await self._request(reader, writer, 'UNWATCH'), 'OK')
+        
+        self.hw.set_antenna(2)
+        
+        self.assertEqual(await self._request(reader, writer, 'STAT'), 'Status: A2')
+        writer.close()
+    
+    async def test_slow_subscriber_events_dropped(self):
+        """Test a subscriber with a full send buffer is skipped, not awaited"""
+        slow = Mock()
+        slow.transport.get_write_buffer_size.return_value = self.daemon.WATCH_BUFFER_LIMIT + 1
+        fast = Mock()
+        fast.transport.get_write_buffer_size.return_value = 0
+        self.daemon.watchers.update([slow, fast])
+        
+        self.daemon._broadcast(2, 'network')
+        
+        slow.write.assert_not_called()
+        fast.write.assert_called_once_with(b'EVENT 1 A2 network\n')
+        self.assertEqual(self.daemon.dropped_events, 1)
+        self.daemon.watchers.clear()
+    
+    async def test_quit_closes_connection(self):
+        """Test QUIT closes only that client"""
+        reader, writer = await self._connect()
+        writer.write(b'QUIT\n')
+        await writer.drain()
+        self.assertEqual(await reader.read(), b'')
+        writer.close()
+    
+    async def test_hardware_initialized_once(self):
+        """Test reconnecting does not re-initialize the hardware"""
+        reader, writer = await self._connect()
+        await self._request(reader, writer, 'A3')
+        writer.close()
+        
+        reader, writer = await self._connect()
+        self.assertEqual(await self._request(reader, writer, 'STAT'), 'Status: A3')
+        writer.close()
+    
+    async def test_debounce_status(self):
+        """Test DEBOUNCE reports the button's debounce estimate"""
+        reader, writer = await self._connect()
+        self.assertEqual(await self._request(reader, writer, 'DEBOUNCE'), 'ERROR: No button handler')
+        self.daemon.button = Mock()
+        self.daemon.button.debounce_status.return_value = {
+            17: {'engine': 'adaptive', 'window_ns': 3000000, 'lockout_ns': 3000000,
+                 'tail_ns': 2000000, 'bursts': 41, 'rejected': 0},
+            23: {'engine': 'lockout', 'window_ns': 20000000},
+        }
+        writer.write(b'DEBOUNCE\n')
+        await writer.drain()
+        self.assertEqual((await reader.readline()).decode(),
+                         'Debounce: GPIO17 adaptive window=3.0ms tail=2.0ms bursts=41\n')
+        self.assertEqual((await reader.readline()).decode(), 'Debounce: GPIO23 lockout window=20.0ms\n')
+        writer.close()
+
+
+
+class TestAntennaDaemonCoalescing(unittest.IsolatedAsyncioTestCase):
+    """Test network bursts through the daemon's loop actor"""
+    
+    async def asyncSetUp(self):
+        """Daemon whose handler switches through a LoopActor with a 10ms settle"""
+        self.hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip()))
+        self.actor = LoopActor(self.hw, policy=POLICY_LATEST, settle_time=0.010)
+        self.actor.start()
+        self.daemon = AntennaDaemon(SSHCommandHandler(self.actor), port=0)
+        await self.daemon.start()
+    
+    async def asyncTearDown(self):
+        """Stop the daemon and the actor"""
+        await self.daemon.stop()
+        self.actor.stop()
+    
+    async def test_network_burst_coalesced(self):
+        """Test a burst of switch lines is folded while the relays settle"""
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.daemon.port)
+        commands = ['A2', 'A3'] * 10
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        writer.write(''.join(c + '\n' for c in commands).encode())
+        await writer.drain()
+        responses = [(await reader.readline()).decode().rstrip('\n') for _ in commands]
+        # Answered without waiting for the relays to settle (a blocking
+        # actor would hold the loop for 10ms on every command after the first)
+        self.assertLess(loop.time() - start, 0.1)
+        self.assertEqual(responses, [f'Status: {c}' for c in commands])
+        await asyncio.sleep(0.030)
+        self.assertEqual(self.hw.get_current_antenna(), 3)
+        self.assertEqual(self.actor.switches, 2)
+        self.assertEqual(self.actor.coalesced, 18)
+        writer.close()
+
+
+class TestAntennaDaemonUnixSocket(unittest.IsolatedAsyncioTestCase):
+    """Test the Unix domain socket endpoint"""
+    
+    async def asyncSetUp(self):
+        """Start a daemon with a Unix socket in a temporary directory"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'antenna.sock')
+        self.hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip()))
+        self.daemon = AntennaDaemon(SSHCommandHandler(self.hw), port=0, unix_path=self.path)
+        await self.daemon.start()
+    
+    async def asyncTearDown(self):
+        """Stop the daemon and remove the directory"""
+        await self.daemon.stop()
+        self.tmpdir.cleanup()
+    
+    async def _request(self, reader, writer, command):
+        """Send one command line and read one response line"""
+        writer.write(command.encode() + b'\n')
+        await writer.drain()
+        return (await reader.readline()).decode().rstrip('\n')
+    
+    async def test_command_round_trip(self):
+        """Test commands over the Unix socket switch the hardware"""
+        reader, writer = await asyncio.open_unix_connection(self.path)
+        self.assertEqual(await self._request(reader, writer, 'A3'), 'Status: A3')
+        self.assertEqual(await self._request(reader, writer, 'STAT'), 'Status: A3')
+        self.assertEqual(self.hw.get_current_antenna(), 3)
+        writer.close()
+    
+    async def test_socket_file_mode(self):
+        """Test the socket is restricted to owner and group"""
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o660)
+    
+    async def test_socket_created_restricted(self):
+        """Test the socket is never world-accessible, even before the chmod"""
+        await self.daemon.stop()
+        umask = os.umask(0o022)
+        self.addCleanup(os.umask, umask)
+        self.daemon = AntennaDaemon(SSHCommandHandler(self.hw), port=0, unix_path=self.path)
+        with patch('antenna_daemon.os.chmod'):
+            await self.daemon.start()
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o660)
+        self.assertEqual(os.umask(0o022), 0o022)
+    
+    async def test_event_source_is_peer_uid(self):
+        """Test changes are attributed to the connecting uid"""
+        watch_reader, watch_writer = await asyncio.open_connection('127.0.0.1', self.daemon.port)
+        await self._request(watch_reader, watch_writer, 'WATCH')
+        
+        reader, writer = await asyncio.open_unix_connection(self.path)
+        await self._request(reader, writer, 'A2')
+        
+        event = await asyncio.wait_for(watch_reader.readline(), 1)
+        self.assertEqual(event, f'EVENT 1 A2 unix:{os.getuid()}\n'.encode())
+        # The shared handler keeps its own source
+        self.assertEqual(self.daemon.handler.source, 'network')
+        watch_writer.close()
+        writer.close()
+    
+    async def test_disallowed_uid_rejected(self):
+        """Test a uid outside allowed_uids is refused without touching the relays"""
+        self.daemon.allowed_uids = {os.getuid() + 1}
+        reader, writer = await asyncio.open_unix_connection(self.path)
+        response = await reader.read()
+        self.assertTrue(response.startswith(b'ERROR: Permission denied'))
+        self.assertEqual(self.hw.get_current_antenna(), 1)
+        writer.close()
+    
+    async def test_stale_socket_replaced_and_removed(self):
+        """Test start() replaces a leftover socket file and stop() removes it"""
+        await self.daemon.stop()
+        self.assertFalse(os.path.exists(self.path))
+        
+        open(self.path, 'w').close()
+        self.daemon = AntennaDaemon(SSHCommandHandler(self.hw), port=0, unix_path=self.path)
+        await self.daemon.start()
+        reader, writer = await asyncio.open_unix_connection(self.path)
+        self.assertEqual(await self._request(reader, writer, 'STAT'), 'Status: A1')
+        writer.close()
+
+
+
+class TestMain(unittest.TestCase):
+    """Test command line validation"""
+    
+    @patch('antenna_hardware.AntennaHardware', DEFAULT_RELAY_PINS=AntennaHardware.DEFAULT_RELAY_PINS)
+    def test_bad_band_map_rejected_before_hardware(self, mock_hardware):
+        """Test a bad --band-map exits with a usage error and leaves the relays alone"""
+        argv = ['antenna_daemon.py', '--rig', '127.0.0.1:4532', '--band-map', '40m=2,11m=3']
+        with patch('sys.argv', argv), patch('sys.stderr'), self.assertRaises(SystemExit) as cm:
+            main()
+        self.assertEqual(cm.exception.code, 2)
+        mock_hardware.assert_not_called()
+    
+    def test_band_map_antenna_out_of_range(self):
+        """Test a band mapped to a missing antenna is a usage error"""
+        argv = ['antenna_daemon.py', '--rig', '127.0.0.1:4532', '--band-map', '40m=2,20m=9']
+        stderr = io.StringIO()
+        with patch('sys.argv', argv), patch('sys.stderr', stderr), self.assertRaises(SystemExit) as cm:
+            main()
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn('antenna 9', stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
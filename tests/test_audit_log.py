@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Unit tests for audit_log.py and audit_reader.py
+Tests ring buffer records, background flushing, rotation and decoding
+"""
+
+import io
+import os
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import Mock
+import sys
+
+# Mock gpiozero before any imports
+sys.modules['gpiozero'] = Mock()
+sys.modules['gpiozero.pins'] = Mock()
+sys.modules['gpiozero.pins.lgpio'] = Mock()
+
+from antenna_hardware import AntennaHardware
+from audit_log import AuditLog, AuditRing, RECORD, HEADER, encode_source, decode_source
+from audit_reader import read_records, filter_records, main as reader_main
+from gpio_backend import FakeChip, LineGroupBackend
+
+
+class TestAuditRing(unittest.TestCase):
+    """Test the in-memory ring"""
+    
+    def test_record_and_drain(self):
+        """Test records come out in order and are drained once"""
+        ring = AuditRing(capacity=8)
+        ring.record(1, 2, 'button')
+        ring.record(2, 0, 'network')
+        data = ring.drain()
+        self.assertEqual(len(data), 2 * RECORD.size)
+        first = RECORD.unpack_from(data, 0)
+        self.assertEqual(first[1:], (1, 0, 1, 2, 3))
+        self.assertEqual(ring.drain(), b'')
+    
+    def test_overrun_counts_dropped(self):
+        """Test records overwritten before a drain are counted, not misread"""
+        ring = AuditRing(capacity=4)
+        for i in range(10):
+            ring.record(i % 3, (i + 1) % 3, 'local')
+        data = ring.drain()
+        seqs = [RECORD.unpack_from(data, o)[1] for o in range(0, len(data), RECORD.size)]
+        self.assertEqual(seqs, [7, 8, 9, 10])
+        self.assertEqual(ring.dropped, 6)
+    
+    def test_concurrent_producers(self):
+        """Test records from several threads are all committed"""
+        ring = AuditRing(capacity=4096)
+        threads = [threading.Thread(target=lambda: [ring.record(1, 2, 'button') for _ in range(500)])
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(ring.drain()), 2000 * RECORD.size)
+    
+    def test_source_encoding(self):
+        """Test known, unix:<uid> and unknown sources round trip"""
+        for source in ('button', 'network', 'band', 'unix:1000'):
+            self.assertEqual(decode_source(*encode_source(source)), source)
+        self.assertEqual(decode_source(*encode_source('cron-job')), 'other')
+
+
+class TestAuditLog(unittest.TestCase):
+    """Test flushing to disk and reading back"""
+    
+    def setUp(self):
+        """Temporary directory for audit files"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'audit.bin')
+    
+    def tearDown(self):
+        """Remove audit files"""
+        self.tmpdir.cleanup()
+    
+    def test_hardware_changes_recorded(self):
+        """Test every hardware change reaches the file with its source"""
+        hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip()))
+        audit = AuditLog(self.path)
+        hw.add_listener(audit.record)
+        hw.set_antenna(2, source='button')
+        hw.set_antenna(2, source='button')  # no change, not recorded
+        hw.set_antenna(0, source='unix:1000')
+        audit.stop()
+        
+        records = list(read_records(self.path))
+        self.assertEqual([(r.previous, r.current, r.source) for r in records],
+                         [(1, 2, 'button'), (2, 0, 'unix:1000')])
+        self.assertLessEqual(records[0].mono_ns, records[1].mono_ns)
+        self.assertAlmostEqual(records[0].wall_ns / 1e9, time.time(), delta=5)
+    
+    def test_background_flush(self):
+        """Test the flusher thread writes without an explicit flush"""
+        audit = AuditLog(self.path, flush_interval=0.01)
+        audit.start()
+        audit.record(1, 3, 'band')
+        deadline = time.monotonic() + 2
+        while audit.records_written == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(audit.records_written, 1)
+        audit.stop()
+    
+    def test_rotation(self):
+        """Test files rotate at max_bytes and keep a header each"""
+        audit = AuditLog(self.path, max_bytes=HEADER.size + 4 * RECORD.size, backups=2)
+        for batch in range(4):
+            for _ in range(3):
+                audit.record(1, 2, 'local')
+            audit.flush()
+        audit.stop()
+        
+        self.assertTrue(os.path.exists(self.path + '.1'))
+        self.assertTrue(os.path.exists(self.path + '.2'))
+        self.assertFalse(os.path.exists(self.path + '.3'))
+        self.assertEqual([r.seq for r in read_records(self.path)], [10, 11, 12])
+    
+    def test_restart_starts_new_file(self):
+        """Test a new AuditLog rotates an existing file instead of appending"""
+        for _ in range(2):
+            audit = AuditLog(self.path)
+            audit.record(1, 2, 'local')
+            audit.stop()
+        self.assertEqual(len(list(read_records(self.path))), 1)
+        self.assertEqual(len(list(read_records(self.path + '.1'))), 1)
+    
+    def test_truncated_record_ignored(self):
+        """Test a partial trailing record is skipped"""
+        audit = AuditLog(self.path)
+        audit.record(1, 2, 'local')
+        audit.record(2, 3, 'local')
+        audit.stop()
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 5)
+        self.assertEqual(len(list(read_records(self.path))), 1)
+    
+    def test_not_an_audit_file(self):
+        """Test other files are rejected"""
+        with open(self.path, 'wb') as f:
+            f.write(b'x' * 64)
+        with self.assertRaises(ValueError):
+            list(read_records(self.path))
+    
+    def test_reader_filters(self):
+        """Test source and antenna filters, including unix:<uid> prefix"""
+        audit = AuditLog(self.path)
+        audit.record(1, 2, 'button')
+        audit.record(2, 3, 'network')
+        audit.record(3, 0, 'unix:1000')
+        audit.stop()
+        records = list(read_records(self.path))
+        
+        self.assertEqual([r.current for r in filter_records(records, source='network')], [3])
+        self.assertEqual([r.current for r in filter_records(records, source='unix')], [0])
+        self.assertEqual([r.current for r in filter_records(records, antenna=2)], [2, 3])
+        self.assertEqual(list(filter_records(records, since_ns=records[-1].wall_ns + 1)), [])
+    
+    def test_reader_tool_output(self):
+        """Test the command-line reader prints one line per record"""
+        audit = AuditLog(self.path)
+        audit.record(1, 2, 'button')
+        audit.record(2, 0, 'network')
+        audit.stop()
+        
+        out = io.StringIO()
+        with redirect_stdout(out):
+            status = reader_main([self.path, '--source', 'button'])
+        self.assertEqual(status, 0)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertIn('A1 -> A2', lines[0])
+        self.assertTrue(lines[0].endswith('button'))
+
+
+if __name__ == '__main__':
+    unittest.main()
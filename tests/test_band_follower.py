@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Unit tests for band_follower.py
+Tests band lookup table, frequency caching and rigctld polling
+"""
+
+import unittest
+from unittest.mock import Mock
+import sys
+
+# Mock gpiozero before any imports
+sys.modules['gpiozero'] = Mock()
+sys.modules['gpiozero.pins'] = Mock()
+sys.modules['gpiozero.pins.lgpio'] = Mock()
+
+from band_follower import BandTable, BandFollower, RigctldClient, FakeRigctld
+
+
+class TestBandTable(unittest.TestCase):
+    """Test interval table lookups"""
+    
+    def setUp(self):
+        """Set up a 3-antenna band map"""
+        self.table = BandTable.from_spec('160m=1,80m=1,40m=2,20m=3,10m=3')
+    
+    def test_lookup_in_band(self):
+        """Test frequencies inside bands map to their antenna"""
+        self.assertEqual(self.table.lookup(1840000), 1)
+        self.assertEqual(self.table.lookup(7074000), 2)
+        self.assertEqual(self.table.lookup(14074000), 3)
+    
+    def test_band_edges(self):
+        """Test low edge is inclusive and high edge exclusive"""
+        self.assertEqual(self.table.lookup(7000000), 2)
+        self.assertIsNone(self.table.lookup(7300000))
+    
+    def test_out_of_band(self):
+        """Test gaps between bands return None"""
+        self.assertIsNone(self.table.lookup(10000000))
+        self.assertIsNone(self.table.lookup(100))
+        self.assertIsNone(self.table.lookup(500000000))
+    
+    def test_table_sorted(self):
+        """Test entries are sorted regardless of input order"""
+        table = BandTable([(14000000, 14350000, 3), (7000000, 7300000, 2)])
+        self.assertEqual(table.starts, [7000000, 14000000])
+    
+    def test_overlap_rejected(self):
+        """Test overlapping intervals raise"""
+        with self.assertRaises(ValueError):
+            BandTable([(7000000, 7300000, 2), (7200000, 7400000, 3)])
+    
+    def test_bad_spec_rejected(self):
+        """Test unknown bands and malformed items raise a clear ValueError"""
+        with self.assertRaisesRegex(ValueError, r"unknown band '11m' \(valid: 160m, 80m"):
+            BandTable.from_spec('40m=2,11m=3')
+        for spec in ('40m', '40m=two', '40m=2,'):
+            with self.assertRaisesRegex(ValueError, 'malformed band map item'):
+                BandTable.from_spec(spec)
+    
+    def test_antenna_range_checked(self):
+        """Test antennas must exist when the antenna count is given"""
+        with self.assertRaisesRegex(ValueError, r"antenna 9 for band '20m' out of range \(0\.\.3\)"):
+            BandTable.from_spec('40m=2,20m=9', antenna_count=3)
+        self.assertEqual(BandTable.from_spec('40m=0,20m=3', antenna_count=3).antennas, [0, 3])
+
+
+class TestBandFollower(unittest.TestCase):
+    """Test switching only on band changes"""
+    
+    def setUp(self):
+        """Set up follower with mock hardware"""
+        self.mock_hw = Mock()
+        self.follower = BandFollower(self.mock_hw, BandTable.from_spec('40m=2,20m=3'))
+    
+    def test_switch_on_band_change(self):
+        """Test entering a band selects its antenna"""
+        self.assertTrue(self.follower.update(14074000))
+        self.mock_hw.set_antenna.assert_called_once_with(3, source='band')
+    
+    def test_repeated_frequency_cached(self):
+        """Test identical samples never switch again"""
+        for _ in range(50):
+            self.follower.update(14074000)
+        
+        self.mock_hw.set_antenna.assert_called_once()
+        self.assertEqual(self.follower.cache_hits, 49)
+    
+    def test_tuning_within_band(self):
+        """Test tuning around a band does not switch"""
+        for freq in range(14000000, 14350000, 5000):
+            self.follower.update(freq)
+        
+        self.mock_hw.set_antenna.assert_called_once()
+    
+    def test_band_hop(self):
+        """Test each band change switches once"""
+        for freq in [14074000, 7074000, 7030000, 14200000]:
+            self.follower.update(freq)
+        
+        applied = [c.args[0] for c in self.mock_hw.set_antenna.call_args_list]
+        self.assertEqual(applied, [3, 2, 3])
+    
+    def test_out_of_band_keeps_antenna(self):
+        """Test leaving all bands does not switch, returning re-selects"""
+        self.follower.update(7074000)
+        self.follower.update(10000000)
+        self.follower.update(10000500)
+        self.follower.update(7074000)
+        
+        applied = [c.args[0] for c in self.mock_hw.set_antenna.call_args_list]
+        self.assertEqual(applied, [2, 2])
+    
+    def test_poll_errors_counted(self):
+        """Test source errors are counted, not raised"""
+        self.follower.frequency_source = Mock()
+        self.follower.frequency_source.get_frequency.side_effect = OSError("refused")
+        
+        self.assertFalse(self.follower.poll_once())
+        self.assertEqual(self.follower.errors, 1)
+
+
+class TestRigctld(unittest.TestCase):
+    """Test polling a fake rigctld over TCP"""
+    
+    def setUp(self):
+        """Start fake rigctld"""
+        self.rig = FakeRigctld(frequency=7074000)
+        self.client = RigctldClient(self.rig.host, self.rig.port)
+    
+    def tearDown(self):
+        """Stop fake rigctld"""
+        self.client.close()
+        self.rig.close()
+    
+    def test_get_frequency(self):
+        """Test reading the VFO frequency"""
+        self.assertEqual(self.client.get_frequency(), 7074000)
+        self.rig.frequency = 21074000
+        self.assertEqual(self.client.get_frequency(), 21074000)
+    
+    def test_follower_polls_rig(self):
+        """Test the follower switches when the rig changes band"""
+        mock_hw = Mock()
+        follower = BandFollower(mock_hw, BandTable.from_spec('40m=2,15m=3'), self.client)
+        
+        follower.poll_once()
+        self.rig.frequency = 21074000
+        follower.poll_once()
+        follower.poll_once()
+        
+        applied = [c.args[0] for c in mock_hw.set_antenna.call_args_list]
+        self.assertEqual(applied, [2, 3])
+        self.assertEqual(self.rig.requests, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,6 +4,8 @@ Unit tests for button_handler.py (2-antenna baseline)
 Tests button cycling logic: A1 ↔ A2 toggle
 """
 
+import asyncio
+import time
 import unittest
 from unittest.mock import Mock, patch
 import sys
@@ -14,14 +16,15 @@ sys.modules['gpiozero.pins'] = Mock()
 sys.modules['gpiozero.pins.lgpio'] = Mock()
 
 from button_handler import ButtonHandler
+from debounce import StableDebouncer
+from edge_source import FakeEdgeSource
 
 
 class TestButtonHandler(unittest.TestCase):
     """Test ButtonHandler class"""
     
     @patch('button_handler.Button')
-    @patch('button_handler.Device')
-    def setUp(self, mock_device, mock_button):
+    def setUp(self, mock_button):
         """Set up test fixtures with mocked button"""
         from button_handler import ButtonHandler
         
@@ -42,7 +45,7 @@ class TestButtonHandler(unittest.TestCase):
         
         self.handler.cycle_antenna()
         
-        self.mock_hw.set_antenna.assert_called_with(2)
+        self.mock_hw.set_antenna.assert_called_with(2, source='button')
     
     def test_cycle_from_a2_to_a3(self):
         """Test cycling from A2 to A3"""
@@ -50,7 +53,7 @@ class TestButtonHandler(unittest.TestCase):
         
         self.handler.cycle_antenna()
         
-        self.mock_hw.set_antenna.assert_called_with(3)
+        self.mock_hw.set_antenna.assert_called_with(3, source='button')
     
     def test_cycle_from_a3_to_a1(self):
         """Test cycling from A3 back to A1 (rotation behavior)"""
@@ -58,7 +61,7 @@ class TestButtonHandler(unittest.TestCase):
         
         self.handler.cycle_antenna()
         
-        self.mock_hw.set_antenna.assert_called_with(1)
+        self.mock_hw.set_antenna.assert_called_with(1, source='button')
     
     def test_cycle_from_off_to_a1(self):
         """Test cycling from OFF state goes to A1"""
@@ -66,7 +69,7 @@ class TestButtonHandler(unittest.TestCase):
         
         self.handler.cycle_antenna()
         
-        self.mock_hw.set_antenna.assert_called_with(1)
+        self.mock_hw.set_antenna.assert_called_with(1, source='button')
     
     def test_button_press_triggers_cycle(self):
         """Test button press callback triggers cycle"""
@@ -76,7 +79,19 @@ class TestButtonHandler(unittest.TestCase):
         self.handler._on_button_press()
         
         # Should cycle from A2 to A3
-        self.mock_hw.set_antenna.assert_called_with(3)
+        self.mock_hw.set_antenna.assert_called_with(3, source='button')
+    
+    def test_cycle_submitted_to_actor(self):
+        """Test presses go through the actor as one read-modify-write"""
+        actor = Mock()
+        with patch('button_handler.Button'):
+            handler = ButtonHandler(self.mock_hw, actor=actor)
+        handler.cycle_antenna()
+        
+        self.mock_hw.set_antenna.assert_not_called()
+        func = actor.update.call_args[0][0]
+        self.assertEqual(actor.update.call_args[1], {'source': 'button'})
+        self.assertEqual([func(0), func(1), func(2), func(3)], [1, 2, 3, 1])
     
     def test_debounce_time_default(self):
         """Test default debounce time is 200ms"""
@@ -92,5 +107,184 @@ class TestButtonHandler(unittest.TestCase):
         self.mock_button_instance.close.assert_called()
 
 
+
+class TestButtonHandlerEdges(unittest.TestCase):
+    """Test the kernel-edge path with a fake edge source"""
+    
+    def setUp(self):
+        """Handler fed by a FakeEdgeSource"""
+        self.mock_hw = Mock()
+        self.mock_hw.get_current_antenna.return_value = 1
+        self.source = FakeEdgeSource()
+        with patch('button_handler.Button') as mock_button:
+            self.handler = ButtonHandler(self.mock_hw, edge_source=self.source)
+        self.mock_button = mock_button
+    
+    def tearDown(self):
+        """Stop the edge thread"""
+        self.handler.cleanup()
+    
+    def _wait_presses(self, count, timeout=2.0):
+        """Wait until the edge thread has dispatched count presses"""
+        deadline = time.monotonic() + timeout
+        while self.handler.presses < count and time.monotonic() < deadline:
+            time.sleep(0.005)
+        return self.handler.presses
+    
+    def test_no_gpiozero_button(self):
+        """Test the gpiozero Button is not created"""
+        self.mock_button.assert_not_called()
+        self.assertIsNone(self.handler.button)
+        self.assertEqual(self.handler.debouncer.name, 'lockout')
+    
+    def test_debounce_status(self):
+        """Test debounce_status reports the engine and its window"""
+        self.assertEqual(self.handler.debounce_status(),
+                         {17: {'engine': 'lockout', 'window_ns': 20000000}})
+    
+    def test_adaptive_mode(self):
+        """Test adaptive=True learns the bounce tail and reports it"""
+        # Twenty recorded presses, all read by the edge thread in one batch
+        source = FakeEdgeSource()
+        start_ns = time.monotonic_ns() - 5000000000
+        for i in range(20):
+            source.press(start_ns + i * 200000000, 80000000, bounces=3, bounce_ns=1000000)
+        handler = ButtonHandler(self.mock_hw, edge_source=source, adaptive=True)
+        self.addCleanup(handler.cleanup)
+        self.assertEqual(handler.debouncer.name, 'adaptive')
+        deadline = time.monotonic() + 2.0
+        while handler.presses < 20 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        status = handler.debounce_status()[17]
+        self.assertEqual(status['bursts'], 40)
+        self.assertLess(status['window_ns'], 20000000)
+        self.assertEqual(status['window_ns'], status['lockout_ns'])
+        self.assertEqual(handler.presses, 20)
+    
+    def test_bouncy_press_cycles_once(self):
+        """Test one bouncy press switches exactly one antenna"""
+        self.source.press(time.monotonic_ns(), 50000000)
+        self.assertEqual(self._wait_presses(1), 1)
+        time.sleep(0.05)
+        self.assertEqual(self.handler.presses, 1)
+        self.mock_hw.set_antenna.assert_called_once_with(2, source='button')
+    
+    def test_latency_measured(self):
+        """Test edge-to-action latency is recorded from the edge timestamp"""
+        self.assertEqual(self.handler.latency_stats()['count'], 0)
+        self.source.press(time.monotonic_ns(), 30000000)
+        self._wait_presses(1)
+        stats = self.handler.latency_stats()
+        self.assertEqual(stats['count'], 1)
+        self.assertGreater(stats['last'], 0)
+        self.assertLess(stats['last'], 1000000000)
+    
+    def test_timed_engine_decides_without_new_edge(self):
+        """Test a stable-for-N engine fires from its deadline, not a later edge"""
+        self.handler.cleanup()
+        self.source = FakeEdgeSource()
+        with patch('button_handler.Button'):
+            self.handler = ButtonHandler(self.mock_hw, edge_source=self.source,
+                                         debouncer=StableDebouncer(sample_ns=1000000, samples=5))
+        self.source.push(time.monotonic_ns(), True)
+        self.assertEqual(self._wait_presses(1), 1)
+        self.assertGreaterEqual(self.handler.latency_stats()['last'], 5000000)
+    
+    def test_cleanup_closes_source(self):
+        """Test cleanup stops the thread and closes the edge source"""
+        self.handler.cleanup()
+        self.assertTrue(self.source.closed)
+
+
+
+class TestButtonGestures(unittest.TestCase):
+    """Test gesture actions and the OFF/recall button"""
+    
+    def setUp(self):
+        """Handler with gestures and a second button on a FakeEdgeSource"""
+        self.mock_hw = Mock()
+        self.mock_hw.get_current_antenna.return_value = 2
+        self.source = FakeEdgeSource()
+        with patch('button_handler.Button'):
+            self.handler = ButtonHandler(self.mock_hw, edge_source=self.source, gestures=True,
+                                         long_press_time=0.05, double_press_time=0.05,
+                                         off_button_pin=23)
+    
+    def tearDown(self):
+        """Stop the edge thread"""
+        self.handler.cleanup()
+    
+    def _wait_gesture(self, timeout=2.0):
+        """Wait for the edge thread to recognize a gesture"""
+        deadline = time.monotonic() + timeout
+        while self.handler.last_gesture is None and time.monotonic() < deadline:
+            time.sleep(0.005)
+        return self.handler.last_gesture
+    
+    def test_long_press_turns_off(self):
+        """Test holding the cycle button switches OFF"""
+        self.source.push(time.monotonic_ns(), True)
+        self.assertEqual(self._wait_gesture(), (17, 'long'))
+        self.mock_hw.set_antenna.assert_called_once_with(0, source='button')
+    
+    def test_off_button_single_press(self):
+        """Test the second button toggles OFF on press"""
+        self.source.push(time.monotonic_ns(), True, pin=23)
+        self.assertEqual(self._wait_gesture(), (23, 'single'))
+        self.mock_hw.set_antenna.assert_called_once_with(0, source='button')
+    
+    def test_gesture_actions(self):
+        """Test single cycles, double selects A1"""
+        self.handler._on_gesture(17, 'single', 0, 0)
+        self.mock_hw.set_antenna.assert_called_with(3, source='button')
+        self.handler._on_gesture(17, 'double', 0, 0)
+        self.mock_hw.set_antenna.assert_called_with(1, source='button')
+    
+    def test_off_recall(self):
+        """Test the OFF toggle restores the antenna that was turned off"""
+        self.handler.toggle_off()
+        self.mock_hw.set_antenna.assert_called_with(0, source='button')
+        self.mock_hw.get_current_antenna.return_value = 0
+        self.handler.toggle_off()
+        self.mock_hw.set_antenna.assert_called_with(2, source='button')
+
+
+
+class TestButtonHandlerLoop(unittest.IsolatedAsyncioTestCase):
+    """Test the edge source registered in an asyncio loop"""
+    
+    async def asyncSetUp(self):
+        """Handler attached to the test loop (no edge thread)"""
+        self.mock_hw = Mock()
+        self.mock_hw.get_current_antenna.return_value = 1
+        self.source = FakeEdgeSource()
+        self.handler = ButtonHandler(self.mock_hw, edge_source=self.source,
+                                     debouncer=StableDebouncer(sample_ns=1000000, samples=5),
+                                     edge_thread=False)
+        self.handler.attach(asyncio.get_running_loop())
+    
+    async def asyncTearDown(self):
+        """Detach and close"""
+        self.handler.cleanup()
+    
+    async def test_no_edge_thread(self):
+        """Test no thread is started"""
+        self.assertIsNone(self.handler._thread)
+    
+    async def test_press_dispatched_on_loop(self):
+        """Test edges wake the loop and the stable deadline runs as a loop timer"""
+        self.source.press(time.monotonic_ns(), 30000000)
+        await asyncio.sleep(0.01)
+        self.assertEqual(self.handler.presses, 1)
+        self.mock_hw.set_antenna.assert_called_once_with(2, source='button')
+    
+    async def test_detach(self):
+        """Test edges are ignored once detached"""
+        self.handler.detach()
+        self.source.push(time.monotonic_ns(), True)
+        await asyncio.sleep(0.02)
+        self.assertEqual(self.handler.presses, 0)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Unit tests for command_actor.py
+Tests ordering, atomic read-modify-write and a multi-thread stress run
+"""
+
+import asyncio
+import queue
+import threading
+import unittest
+from unittest.mock import Mock
+import sys
+
+# Mock gpiozero before any imports
+sys.modules['gpiozero'] = Mock()
+sys.modules['gpiozero.pins'] = Mock()
+sys.modules['gpiozero.pins.lgpio'] = Mock()
+
+from antenna_hardware import AntennaHardware
+from command_actor import CommandActor, LoopActor, POLICY_LATEST
+from gpio_backend import FakeChip, LineGroupBackend
+from ssh_command_handler import SSHCommandHandler
+
+
+def next_antenna(current):
+    """3-antenna button cycle"""
+    return current % 3 + 1
+
+
+class TestCommandActor(unittest.TestCase):
+    """Test CommandActor on fake-chip hardware"""
+    
+    def setUp(self):
+        """Start an actor on fake-chip hardware"""
+        self.hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip()))
+        self.changes = []
+        self.hw.add_listener(lambda prev, cur, source: self.changes.append((prev, cur, source)))
+        self.actor = CommandActor(self.hw)
+        self.actor.start()
+    
+    def tearDown(self):
+        """Stop the actor"""
+        self.actor.stop()
+    
+    def test_initial_snapshot(self):
+        """Test the snapshot starts from the hardware state"""
+        self.assertEqual(self.actor.state.seq, 0)
+        self.assertEqual(self.actor.get_current_antenna(), 1)
+    
+    def test_submit_applies_and_returns_state(self):
+        """Test a submission resolves to the snapshot it produced"""
+        state = self.actor.submit(3, source='network').result()
+        self.assertEqual(state.antenna, 3)
+        self.assertEqual(state.source, 'network')
+        self.assertEqual(self.hw.get_current_antenna(), 3)
+    
+    def test_sequence_numbers_increase(self):
+        """Test sequence numbers are assigned in submission order"""
+        futures = [self.actor.submit(i % 3 + 1) for i in range(10)]
+        seqs = [f.seq for f in futures]
+        self.assertEqual(seqs, sorted(seqs))
+        self.assertEqual([f.result().seq for f in futures], seqs)
+    
+    def test_update_reads_current_state(self):
+        """Test update() computes from the state at apply time"""
+        self.actor.submit(2)
+        state = self.actor.update(next_antenna, source='button').result()
+        self.assertEqual(state.antenna, 3)
+        self.assertEqual(self.changes[-1], (2, 3, 'button'))
+    
+    def test_error_reaches_submitter(self):
+        """Test exceptions reach the submitter and the actor keeps running"""
+        def broken(current):
+            raise ValueError("no antenna")
+        
+        with self.assertRaises(ValueError):
+            self.actor.update(broken).result()
+        self.assertEqual(self.actor.errors, 1)
+        self.actor.set_antenna(2)
+        self.assertEqual(self.actor.get_current_antenna(), 2)
+    
+    def test_queue_full(self):
+        """Test submit() raises once the bounded queue is full"""
+        actor = CommandActor(self.hw, queue_size=2)  # not started
+        actor.submit(1)
+        actor.submit(2)
+        with self.assertRaises(queue.Full):
+            actor.submit(3, timeout=0.01)
+    
+    def test_drop_in_for_command_handler(self):
+        """Test SSHCommandHandler can drive the actor like the hardware"""
+        handler = SSHCommandHandler(self.actor)
+        self.assertEqual(handler.handle_command('A3'), 'Status: A3')
+        self.assertEqual(handler.handle_command('STAT'), 'Status: A3')
+        self.assertEqual(self.changes[-1], (1, 3, 'network'))
+    
+    def test_stress_no_lost_updates(self):
+        """Test concurrent cycles and absolute selects never lose an update"""
+        threads = 8
+        per_thread = 500
+        
+        def cycler():
+            for _ in range(per_thread):
+                self.actor.update(next_antenna, source='button')
+        
+        def selector():
+            for i in range(per_thread):
+                self.actor.submit(i % 3 + 1, source='network')
+        
+        workers = [threading.Thread(target=cycler if i % 2 else selector) for i in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.actor.stop()
+        
+        self.assertEqual(self.actor.applied, threads * per_thread)
+        self.assertEqual(self.actor.state.seq, threads * per_thread)
+        # Every cycle moves to a different antenna, so each one is a change
+        cycles = [c for c in self.changes if c[2] == 'button']
+        self.assertEqual(len(cycles), threads // 2 * per_thread)
+        self.assertTrue(all(cur == next_antenna(prev) for prev, cur, _ in cycles))
+        self.assertEqual(self.hw.check_consistency(), [])
+
+
+
+class TestSwitchCoalescing(unittest.TestCase):
+    """Test last-writer-wins coalescing while relays settle"""
+    
+    def setUp(self):
+        """Start a coalescing actor with a long settle time"""
+        self.hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip()))
+        self.changes = []
+        self.hw.add_listener(lambda prev, cur, source: self.changes.append((prev, cur, source)))
+        self.actor = CommandActor(self.hw, policy=POLICY_LATEST, settle_time=0.2)
+        self.actor.start()
+    
+    def tearDown(self):
+        """Stop the actor"""
+        self.actor.stop()
+    
+    def test_first_switch_immediate(self):
+        """Test a switch with settled relays is applied without waiting"""
+        self.actor.set_antenna(2)
+        self.assertEqual(self.changes, [(1, 2, 'local')])
+    
+    def test_burst_applies_only_latest(self):
+        """Test targets arriving during the settle window collapse to the last"""
+        self.actor.set_antenna(2)
+        futures = [self.actor.submit(3), self.actor.submit(0),
+                   self.actor.submit(1, source='network')]
+        states = [f.result() for f in futures]
+        
+        self.assertEqual(self.changes, [(1, 2, 'local'), (2, 1, 'network')])
+        self.assertEqual([s.antenna for s in states], [1, 1, 1])
+        self.assertEqual(self.actor.switches, 2)
+        self.assertEqual(self.actor.coalesced, 2)
+        self.assertEqual(self.actor.applied, 4)
+    
+    def test_updates_fold_in_order(self):
+        """Test update() functions see the folded target, not the relays"""
+        self.actor.set_antenna(2)
+        self.actor.submit(3)
+        state = self.actor.update(next_antenna, source='button').result()
+        self.assertEqual(state.antenna, 1)
+        self.assertEqual(self.changes[-1], (2, 1, 'button'))
+    
+    def test_burst_back_to_current_writes_nothing(self):
+        """Test a burst that ends on the current antenna never clicks a relay"""
+        self.actor.set_antenna(2)
+        self.actor.submit(3)
+        self.actor.submit(2).result()
+        self.assertEqual(self.changes, [(1, 2, 'local')])
+        # A3 and the return to A2 both stayed off the relays
+        self.assertEqual(self.actor.coalesced, 2)
+    
+    def test_invalid_target_ignored(self):
+        """Test an invalid target inside a burst doesn't drop the valid one"""
+        self.actor.set_antenna(2)
+        self.actor.submit(3)
+        self.actor.submit(9).result()
+        self.assertEqual(self.hw.get_current_antenna(), 3)
+    
+    def test_unknown_policy(self):
+        """Test unknown policies are rejected"""
+        with self.assertRaises(ValueError):
+            CommandActor(self.hw, policy='first')
+
+
+
+class TestLoopActor(unittest.IsolatedAsyncioTestCase):
+    """Test LoopActor applying commands on the event loop thread"""
+    
+    async def asyncSetUp(self):
+        """Bind a coalescing loop actor to the test loop"""
+        self.hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip()))
+        self.changes = []
+        self.hw.add_listener(lambda prev, cur, source: self.changes.append((prev, cur, source)))
+        self.actor = LoopActor(self.hw, policy=POLICY_LATEST, settle_time=0.05)
+        self.actor.start()
+    
+    async def asyncTearDown(self):
+        """Unbind the actor"""
+        self.actor.stop()
+    
+    async def test_applied_synchronously(self):
+        """Test a switch on the loop thread is applied before submit returns"""
+        future = self.actor.submit(3, source='network')
+        self.assertTrue(future.done())
+        self.assertEqual(future.result().antenna, 3)
+        self.assertEqual(self.changes, [(1, 3, 'network')])
+    
+    async def test_settle_burst_coalesced(self):
+        """Test a burst during the settle window becomes one timer-driven write"""
+        self.actor.set_antenna(2)
+        self.actor.set_antenna(3)
+        future = self.actor.update(next_antenna, source='button')
+        self.assertFalse(future.done())
+        await asyncio.sleep(0.1)
+        self.assertEqual(future.result().antenna, 1)
+        self.assertEqual(self.changes, [(1, 2, 'local'), (2, 1, 'button')])
+        self.assertEqual(self.actor.coalesced, 1)
+    
+    async def test_submit_from_thread(self):
+        """Test another thread hands its command to the loop and waits"""
+        thread = threading.Thread(target=self.actor.set_antenna, args=(3, 'band'))
+        thread.start()
+        while thread.is_alive():
+            await asyncio.sleep(0.001)
+        self.assertEqual(self.changes, [(1, 3, 'band')])
+    
+    async def test_unbound_rejected(self):
+        """Test commands before start() or after stop() never reach the hardware"""
+        actor = LoopActor(self.hw)
+        with self.assertRaises(RuntimeError):
+            actor.set_antenna(2)
+        actor.start()
+        actor.stop()
+        thread_errors = []
+        
+        def from_thread():
+            try:
+                actor.set_antenna(3, 'button')
+            except RuntimeError as e:
+                thread_errors.append(e)
+        
+        thread = threading.Thread(target=from_thread)
+        thread.start()
+        thread.join()
+        self.assertEqual(len(thread_errors), 1)
+        self.assertEqual(self.changes, [])
+    
+    async def test_stop_flushes_pending(self):
+        """Test stop() applies a switch still waiting for the relays"""
+        self.actor.set_antenna(2)
+        future = self.actor.submit(3)
+        self.actor.stop()
+        self.assertEqual(future.result().antenna, 3)
+        self.assertEqual(self.hw.get_current_antenna(), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Unit tests for dashboard.py
+Tests the live state, incremental field updates and key commands (no terminal)
+"""
+
+import os
+import select
+import unittest
+from unittest.mock import Mock, patch
+import sys
+
+# Mock gpiozero before any imports
+sys.modules['gpiozero'] = Mock()
+sys.modules['gpiozero.pins'] = Mock()
+sys.modules['gpiozero.pins.lgpio'] = Mock()
+
+from antenna_hardware import AntennaHardware
+from dashboard import WIDTH, Dashboard, Renderer, make_layout
+from gpio_backend import FakeChip, LineGroupBackend
+from ssh_command_handler import SSHCommandHandler
+
+SECOND = 1000000000
+
+
+class FakeClock:
+    """Settable monotonic clock"""
+    
+    def __init__(self):
+        self.now = 100 * SECOND
+    
+    def __call__(self):
+        return self.now
+
+
+class TestRenderer(unittest.TestCase):
+    """Test only changed fields are written"""
+    
+    def test_unchanged_fields_skipped(self):
+        """Test a second render of the same text writes nothing"""
+        renderer = Renderer({'a': (0, 0, 5), 'b': (1, 0, 5)})
+        self.assertEqual(renderer.changes({'a': 'x', 'b': 'y'}), [(0, 0, 'x    '), (1, 0, 'y    ')])
+        self.assertEqual(renderer.changes({'a': 'x', 'b': 'z'}), [(1, 0, 'z')])
+    
+    def test_only_changed_span_written(self):
+        """Test a changed field writes from its first to last changed character"""
+        renderer = Renderer({'a': (3, 10, 12)})
+        renderer.changes({'a': 'Active: A1'})
+        self.assertEqual(renderer.changes({'a': 'Active: A2'}), [(3, 19, '2')])
+        self.assertEqual(renderer.changes({'a': 'Active: OFF'}), [(3, 18, 'OFF')])
+        self.assertEqual(renderer.changes({'a': 'Active: A3'}), [(3, 18, 'A3 ')])
+    
+    def test_truncated_to_width(self):
+        """Test text never spills out of its field"""
+        renderer = Renderer({'a': (0, 0, 3)})
+        self.assertEqual(renderer.changes({'a': 'abcdef'}), [(0, 0, 'abc')])
+    
+    def test_invalidate(self):
+        """Test everything is rewritten after invalidate"""
+        renderer = Renderer({'a': (0, 0, 3)})
+        renderer.changes({'a': 'x'})
+        renderer.invalidate()
+        self.assertEqual(len(renderer.changes({'a': 'x'})), 1)
+
+
+class TestLayout(unittest.TestCase):
+    """Test field positions"""
+    
+    def test_fields_fit_and_do_not_overlap(self):
+        """Test every field ends inside WIDTH and fields on a row are disjoint"""
+        for antenna_count in (2, 3, 8, 64):
+            fields = sorted(make_layout(antenna_count).items(), key=lambda item: item[1])
+            for name, (row, col, width) in fields:
+                self.assertLessEqual(col + width, WIDTH, name)
+            for (name, (row, col, width)), (next_name, (next_row, next_col, _)) in zip(fields, fields[1:]):
+                if row == next_row:
+                    self.assertLessEqual(col + width, next_col, f'{name} overlaps {next_name}')
+
+
+class TestDashboard(unittest.TestCase):
+    """Test the dashboard model on fake-chip hardware"""
+    
+    def setUp(self):
+        """Dashboard over real hardware logic and a fake clock"""
+        self.hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip()))
+        self.clock = FakeClock()
+        self.dashboard = Dashboard(self.hw, SSHCommandHandler(self.hw, source='local'), clock=self.clock)
+        self.dashboard.start()
+        self.addCleanup(self.dashboard.stop)
+    
+    def frame(self):
+        """Names of the fields written by the next frame (clock excluded)"""
+        writes = self.dashboard.renderer.changes(self.dashboard.fields(self.clock()))
+        return {name for name, (row, col, width) in self.dashboard.renderer.layout.items()
+                for write_row, write_col, text in writes
+                if write_row == row and col <= write_col < col + width} - {'clock'}
+    
+    def test_switch_redraws_only_changed_fields(self):
+        """Test a button switch rewrites the affected fields only"""
+        self.frame()
+        self.hw.set_antenna(2, source='button')
+        self.assertEqual(self.frame(), {'active', 'port1', 'port2', 'last', 'switches', 'sources'})
+        self.assertEqual(self.frame(), set())
+    
+    def test_age_updates_once_a_second(self):
+        """Test the idle tick only touches the age of the last change"""
+        self.hw.set_antenna(3, source='network')
+        self.frame()
+        self.clock.now += SECOND // 2
+        self.assertEqual(self.frame(), set())
+        self.clock.now += SECOND
+        self.assertEqual(self.frame(), {'last'})
+        self.assertIn("A1 → A3 by network, 1s ago", self.dashboard.fields(self.clock())['last'])
+    
+    def test_switch_rate(self):
+        """Test the per-minute rate forgets old switches"""
+        for antenna in (2, 3, 1):
+            self.hw.set_antenna(antenna)
+        self.assertEqual(self.dashboard.state.rate_per_minute(self.clock()), 3)
+        self.clock.now += 61 * SECOND
+        self.assertEqual(self.dashboard.state.rate_per_minute(self.clock()), 0)
+    
+    def test_change_wakes_ui(self):
+        """Test a state change makes the wake-up pipe readable"""
+        self.assertEqual(select.select([self.dashboard._wake_r], [], [], 0)[0], [])
+        self.hw.set_antenna(2)
+        self.hw.set_antenna(3)
+        self.assertEqual(select.select([self.dashboard._wake_r], [], [], 0)[0], [self.dashboard._wake_r])
+        self.assertEqual(os.read(self.dashboard._wake_r, 16), b'x')
+    
+    def test_wake_during_drain(self):
+        """Test a change arriving while the pipe is drained still wakes the next time"""
+        self.hw.set_antenna(2)
+        real_read = os.read
+        
+        def read_racing_change(fd, size):
+            self.hw.set_antenna(3)  # listener thread fires mid-drain
+            return real_read(fd, size)
+        
+        with patch('dashboard.os.read', side_effect=read_racing_change):
+            self.dashboard._drain_wake()
+        self.hw.set_antenna(1)
+        self.assertEqual(select.select([self.dashboard._wake_r], [], [], 0)[0], [self.dashboard._wake_r])
+    
+    def test_keys(self):
+        """Test number keys select, o turns off and q quits"""
+        self.assertTrue(self.dashboard.key(ord('2')))
+        self.assertEqual(self.hw.get_current_antenna(), 2)
+        self.assertEqual(self.dashboard.message, 'Status: A2')
+        self.assertTrue(self.dashboard.key(ord('o')))
+        self.assertEqual(self.hw.get_current_antenna(), 0)
+        self.assertTrue(self.dashboard.key(ord('9')))
+        self.assertEqual(len(self.dashboard.state.command_ns), 2)
+        self.assertFalse(self.dashboard.key(ord('q')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Unit tests for debounce.py and edge_source.FakeEdgeSource
+Feeds scripted bouncy edges through each debounce engine
+"""
+
+import select
+import unittest
+
+from debounce import (LockoutDebouncer, IntegratorDebouncer, StableDebouncer,
+                      AdaptiveDebouncer, BounceHistogram, make_debouncer, DEBOUNCERS)
+from edge_source import Edge, FakeEdgeSource
+
+MS = 1000000
+
+
+def run(debouncer, edges, end_ns):
+    """Feed edges, then advance to end_ns; return all events"""
+    events = []
+    for edge in edges:
+        events.extend(debouncer.feed(edge))
+    events.extend(debouncer.advance(end_ns))
+    return events
+
+
+def bouncy_press(start_ns=0, duration_ns=80 * MS):
+    """Edges of one press with contact bounce on make and break"""
+    source = FakeEdgeSource()
+    source.press(start_ns, duration_ns, bounces=3, bounce_ns=300000)
+    return source.wait(0)
+
+
+class TestFakeEdgeSource(unittest.TestCase):
+    """Test the scripted edge source"""
+    
+    def test_press_edges(self):
+        """Test a bouncy press alternates levels and ends released"""
+        source = FakeEdgeSource()
+        source.press(0, 50 * MS, bounces=2)
+        edges = source.wait(0)
+        self.assertEqual(len(edges), 10)
+        self.assertTrue(edges[0].active)
+        self.assertFalse(edges[-1].active)
+        self.assertFalse(source.level())
+    
+    def test_wait_timeout(self):
+        """Test wait returns nothing when no edges are queued"""
+        self.assertEqual(FakeEdgeSource().wait(0.01), [])
+    
+    def test_fileno_readable(self):
+        """Test the event-loop fd turns readable on push and read drains it"""
+        source = FakeEdgeSource()
+        self.addCleanup(source.close)
+        fd = source.fileno()
+        self.assertEqual(select.select([fd], [], [], 0)[0], [])
+        source.push(5, True)
+        self.assertEqual(select.select([fd], [], [], 0)[0], [fd])
+        self.assertEqual(source.read(), [Edge(5, True)])
+        self.assertEqual(select.select([fd], [], [], 0)[0], [])
+
+
+class TestEngines(unittest.TestCase):
+    """Behaviour every engine must share"""
+    
+    def test_bouncy_press_is_one_press(self):
+        """Test each engine turns a bouncy press into one press and one release"""
+        for name in DEBOUNCERS:
+            with self.subTest(engine=name):
+                events = run(make_debouncer(name), bouncy_press(), 200 * MS)
+                self.assertEqual([e.pressed for e in events], [True, False])
+                self.assertEqual(events[0].edge_ns, 0)
+    
+    def test_deterministic(self):
+        """Test the same edges always give the same events"""
+        for name in DEBOUNCERS:
+            with self.subTest(engine=name):
+                first = run(make_debouncer(name), bouncy_press(), 200 * MS)
+                second = run(make_debouncer(name), bouncy_press(), 200 * MS)
+                self.assertEqual(first, second)
+    
+    def test_unknown_engine(self):
+        """Test unknown engine names are rejected"""
+        with self.assertRaises(ValueError) as cm:
+            make_debouncer('magic')
+        self.assertTrue(cm.exception.__suppress_context__)
+
+
+class TestLockout(unittest.TestCase):
+    """Test the time-lockout engine"""
+    
+    def test_first_edge_immediate(self):
+        """Test the press is decided at the first edge"""
+        events = LockoutDebouncer().feed(Edge(5 * MS, True))
+        self.assertEqual(events[0].decided_ns, 5 * MS)
+    
+    def test_short_press_caught_up(self):
+        """Test a release inside the lockout is reported when it ends"""
+        debouncer = LockoutDebouncer(lockout_ns=20 * MS)
+        debouncer.feed(Edge(0, True))
+        debouncer.feed(Edge(5 * MS, False))
+        self.assertEqual(debouncer.deadline(), 20 * MS)
+        events = debouncer.advance(20 * MS)
+        self.assertEqual([(e.decided_ns, e.pressed) for e in events], [(20 * MS, False)])
+
+
+class TestIntegrator(unittest.TestCase):
+    """Test the integrator engine"""
+    
+    def test_spike_rejected(self):
+        """Test a spike shorter than the threshold never presses"""
+        debouncer = IntegratorDebouncer(sample_ns=MS, threshold=5)
+        events = run(debouncer, [Edge(0, False), Edge(10 * MS, True), Edge(12 * MS, False)], 50 * MS)
+        self.assertEqual(events, [])
+    
+    def test_decision_time(self):
+        """Test a clean press is decided threshold samples after the edge"""
+        debouncer = IntegratorDebouncer(sample_ns=MS, threshold=5)
+        debouncer.feed(Edge(0, False))
+        debouncer.feed(Edge(10 * MS, True))
+        self.assertEqual(debouncer.deadline(), 15 * MS)
+        events = debouncer.advance(30 * MS)
+        self.assertEqual([(e.edge_ns, e.decided_ns) for e in events], [(10 * MS, 15 * MS)])
+    
+    def test_spike_not_press_origin(self):
+        """Test a rejected spike long before a press isn't its origin"""
+        debouncer = IntegratorDebouncer(sample_ns=MS, threshold=5)
+        edges = [Edge(0, False), Edge(10 * MS, True), Edge(11 * MS, False),
+                 Edge(100 * MS, True)]
+        events = run(debouncer, edges, 200 * MS)
+        self.assertEqual(events[0].edge_ns, 100 * MS)
+
+
+class TestStable(unittest.TestCase):
+    """Test the stable-for-N-samples engine"""
+    
+    def test_decided_after_last_bounce(self):
+        """Test the press is decided N samples after the last bounce"""
+        debouncer = StableDebouncer(sample_ns=MS, samples=5)
+        edges = [Edge(0, True), Edge(MS // 2, False), Edge(MS, True)]
+        events = run(debouncer, edges, 30 * MS)
+        self.assertEqual([(e.edge_ns, e.decided_ns) for e in events], [(0, 6 * MS)])
+
+
+
+class TestBounceHistogram(unittest.TestCase):
+    """Test the streaming burst-length histogram"""
+    
+    def test_quantile_upper_bound(self):
+        """Test the quantile is never below the true value and within one bin"""
+        histogram = BounceHistogram()
+        for value in (100, 2 * MS, 3 * MS, 7 * MS):
+            histogram.add(value)
+        tail = histogram.quantile(1.0)
+        self.assertGreaterEqual(tail, 7 * MS)
+        self.assertLess(tail, 7 * MS * 1.125)
+        self.assertLess(histogram.quantile(0.25), 2 * MS)
+    
+    def test_decay(self):
+        """Test old samples fade out once the window is full"""
+        histogram = BounceHistogram(window=8)
+        for _ in range(4):
+            histogram.add(10 * MS)
+        for _ in range(40):
+            histogram.add(MS)
+        self.assertLess(histogram.quantile(0.99), 2 * MS)
+        self.assertEqual(histogram.samples, 44)
+
+
+class TestAdaptive(unittest.TestCase):
+    """Test the self-tuning lockout engine"""
+    
+    def _presses(self, debouncer, count, bounce_ns, duration_ns=80 * MS, start_ns=0):
+        """Feed count bouncy presses (bounce tail = 3 * bounce_ns); return events"""
+        source = FakeEdgeSource()
+        for i in range(count):
+            source.press(start_ns + i * 200 * MS, duration_ns, bounces=3, bounce_ns=bounce_ns)
+        return run(debouncer, source.wait(0), start_ns + count * 200 * MS)
+    
+    def test_default_lockout_while_learning(self):
+        """Test the lockout stays at its initial value until min_bursts"""
+        debouncer = AdaptiveDebouncer(lockout_ns=20 * MS, min_bursts=16)
+        self._presses(debouncer, 4, MS)
+        self.assertEqual(debouncer.lockout_ns, 20 * MS)
+        self.assertIsNone(debouncer.estimate()['tail_ns'])
+        self.assertEqual(debouncer.estimate()['bursts'], 8)
+    
+    def test_lockout_follows_bounce_tail(self):
+        """Test the lockout shrinks to cover the measured bounce with margin"""
+        debouncer = AdaptiveDebouncer(lockout_ns=20 * MS, margin=1.5)
+        events = self._presses(debouncer, 20, MS)
+        self.assertEqual([e.pressed for e in events], [True, False] * 20)
+        self.assertGreaterEqual(debouncer.tail_ns, 3 * MS)
+        self.assertGreaterEqual(debouncer.lockout_ns, 4.5 * MS)
+        self.assertLess(debouncer.lockout_ns, 6 * MS)
+        self.assertEqual(debouncer.window_ns, debouncer.lockout_ns)
+    
+    def test_learned_lockout_rejects_bounce(self):
+        """Test presses after adapting are still single events"""
+        debouncer = AdaptiveDebouncer()
+        self._presses(debouncer, 20, 2 * MS)
+        events = self._presses(debouncer, 10, 2 * MS, start_ns=10 * 1000 * MS)
+        self.assertEqual([e.pressed for e in events], [True, False] * 10)
+    
+    def test_clamped_to_min(self):
+        """Test a clean switch doesn't get a lockout below min_ns"""
+        debouncer = AdaptiveDebouncer(min_ns=MS)
+        self._presses(debouncer, 20, 1000)
+        self.assertEqual(debouncer.lockout_ns, MS)
+    
+    def test_tap_not_counted_as_bounce(self):
+        """Test a tap shorter than max_ns is rejected, not measured"""
+        debouncer = AdaptiveDebouncer(max_ns=50 * MS)
+        self._presses(debouncer, 3, MS, duration_ns=30 * MS)
+        self.assertEqual(debouncer.estimate()['rejected'], 3)
+        self.assertEqual(debouncer.estimate()['bursts'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
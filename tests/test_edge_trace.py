@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Unit tests for edge_trace.py
+Records scripted edges to a trace file and replays them through ButtonHandler
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+import sys
+
+# Mock gpiozero before any imports
+sys.modules['gpiozero'] = Mock()
+sys.modules['gpiozero.pins'] = Mock()
+sys.modules['gpiozero.pins.lgpio'] = Mock()
+
+from debounce import LockoutDebouncer
+from edge_source import Edge, FakeEdgeSource
+from edge_trace import (RECORD, RecordingEdgeSource, TraceWriter, read_trace, replay, score,
+                        true_presses)
+
+MS = 1000000
+
+
+def trace_file(test, edges, levels=None):
+    """Write edges to a temporary trace file, return its path"""
+    fd, path = tempfile.mkstemp(suffix='.trace')
+    os.close(fd)
+    test.addCleanup(os.unlink, path)
+    writer = TraceWriter(path, levels if levels is not None else {17: False})
+    writer.write(edges)
+    writer.close()
+    return path
+
+
+def presses(count, bounce_ns=300000, spacing_ns=300 * MS, duration_ns=100 * MS, pin=17):
+    """Edges of count bouncy presses (bounce tail = 3 * bounce_ns)"""
+    source = FakeEdgeSource()
+    for i in range(count):
+        source.press(10 * MS + i * spacing_ns, duration_ns, bounces=3, bounce_ns=bounce_ns, pin=pin)
+    return source.wait(0)
+
+
+class TestTraceFile(unittest.TestCase):
+    """Test the binary trace format"""
+    
+    def test_round_trip(self):
+        """Test edges and the level snapshot survive write and read"""
+        edges = [Edge(5, True, 17), Edge(9, False, 17), Edge(12, True, 23)]
+        trace = read_trace(trace_file(self, edges, {17: False, 23: True}))
+        self.assertEqual(trace.edges, edges)
+        self.assertEqual(trace.levels, {17: False, 23: True})
+    
+    def test_default_pin(self):
+        """Test the source's default pin (None) round-trips"""
+        trace = read_trace(trace_file(self, [Edge(5, True)], {None: False}))
+        self.assertEqual(trace.edges, [Edge(5, True, None)])
+    
+    def test_partial_record_ignored(self):
+        """Test a torn final record is skipped"""
+        path = trace_file(self, [Edge(5, True, 17)])
+        with open(path, 'ab') as f:
+            f.write(RECORD.pack(9, 17, 0)[:4])
+        self.assertEqual(read_trace(path).edges, [Edge(5, True, 17)])
+    
+    def test_not_a_trace(self):
+        """Test other files are rejected"""
+        path = trace_file(self, [])
+        with open(path, 'r+b') as f:
+            f.write(b'NOTATRCE')
+        with self.assertRaises(ValueError):
+            read_trace(path)
+    
+    def test_recording_source(self):
+        """Test the wrapper passes edges through and records them"""
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.unlink, path)
+        inner = FakeEdgeSource()
+        source = RecordingEdgeSource(inner, path)
+        inner.press(0, 50 * MS, bounces=1)
+        edges = source.wait(0)
+        source.close()
+        self.assertTrue(inner.closed)
+        self.assertEqual(read_trace(path).edges, edges)
+
+
+class TestScoring(unittest.TestCase):
+    """Test reference press detection and matching"""
+    
+    def test_bouncy_press_is_one_press(self):
+        """Test bounce is bridged into one press"""
+        found = true_presses(presses(1, pin=17))
+        self.assertEqual(len(found), 1)
+        self.assertEqual(found[0][0], 10 * MS)
+    
+    def test_spike_is_not_a_press(self):
+        """Test a short active spike is noise"""
+        edges = [Edge(0, True, 17), Edge(MS, False, 17)]
+        self.assertEqual(true_presses(edges), [])
+    
+    def test_score(self):
+        """Test missed, double and spurious counting"""
+        found = [(0, 100, 17), (1000, 1100, 17), (5000, 5100, 17)]
+        missed, double, spurious, latencies = score(found, [10, 1005, 1020, 4000], max_latency_ns=500)
+        self.assertEqual((missed, double, spurious), (1, 1, 1))
+        self.assertEqual(latencies, [10, 5])
+
+
+class TestReplay(unittest.TestCase):
+    """Test replay through ButtonHandler and AntennaHardware"""
+    
+    def test_clean_replay(self):
+        """Test a suitable lockout presses once per press"""
+        trace = read_trace(trace_file(self, presses(20)))
+        report = replay(trace, LockoutDebouncer(lockout_ns=20 * MS))
+        self.assertEqual((report.presses, report.actions), (20, 20))
+        self.assertEqual((report.missed, report.double, report.spurious), (0, 0, 0))
+        self.assertEqual(max(report.latencies_ns), 0)
+    
+    def test_short_lockout_double_triggers(self):
+        """Test a lockout shorter than the bounce is caught as double triggers"""
+        trace = read_trace(trace_file(self, presses(10, bounce_ns=2 * MS)))
+        report = replay(trace, LockoutDebouncer(lockout_ns=MS))
+        self.assertEqual(report.double, 10)
+        self.assertEqual(report.missed, 0)
+    
+    def test_replay_repeatable(self):
+        """Test virtual replay gives identical results"""
+        trace = read_trace(trace_file(self, presses(5)))
+        first = replay(trace, LockoutDebouncer())
+        second = replay(trace, LockoutDebouncer())
+        self.assertEqual(first[:-1], second[:-1])
+    
+    def test_realtime(self):
+        """Test realtime replay through the edge thread"""
+        trace = read_trace(trace_file(self, presses(3, spacing_ns=100 * MS, duration_ns=40 * MS)))
+        report = replay(trace, LockoutDebouncer(), realtime=True, max_latency_ns=100 * MS)
+        self.assertEqual((report.presses, report.actions, report.missed), (3, 3, 0))
+        self.assertGreater(min(report.latencies_ns), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
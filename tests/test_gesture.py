@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Unit tests for gesture.py
+Tests single, double and long presses on a virtual clock
+"""
+
+import unittest
+
+from gesture import GestureEngine, GESTURE_SINGLE, GESTURE_DOUBLE, GESTURE_LONG
+from timer_wheel import TimerWheel, VirtualClock
+
+MS = 1000000
+
+
+class TestGestureEngine(unittest.TestCase):
+    """Test gesture recognition with a VirtualClock"""
+    
+    def setUp(self):
+        """Cycle button with long/double, plain OFF button, one wheel"""
+        self.wheel = TimerWheel(tick_ns=MS)
+        self.clock = VirtualClock(self.wheel)
+        self.gestures = []
+        self.engine = GestureEngine(self.wheel, lambda *g: self.gestures.append(g))
+        self.engine.add_button(17, long_press_ns=800 * MS, double_press_ns=300 * MS)
+        self.engine.add_button(23)
+    
+    def _at(self, t_ms, action, button=17):
+        """Advance to t_ms, then press or release"""
+        self.clock.advance_to(t_ms * MS)
+        getattr(self.engine, action)(button, t_ms * MS)
+    
+    def test_single_decided_after_window(self):
+        """Test a single press resolves exactly at release + double window"""
+        self._at(0, 'press')
+        self._at(100, 'release')
+        self.clock.advance_to(399 * MS)
+        self.assertEqual(self.gestures, [])
+        self.clock.advance_to(400 * MS)
+        self.assertEqual(self.gestures, [(17, GESTURE_SINGLE, 0, 400 * MS)])
+    
+    def test_double(self):
+        """Test a second press inside the window is a double, not two singles"""
+        self._at(0, 'press')
+        self._at(80, 'release')
+        self._at(250, 'press')
+        self._at(330, 'release')
+        self.clock.advance_to(2000 * MS)
+        self.assertEqual(self.gestures, [(17, GESTURE_DOUBLE, 0, 330 * MS)])
+    
+    def test_second_press_after_window(self):
+        """Test presses further apart than the window are two singles"""
+        self._at(0, 'press')
+        self._at(80, 'release')
+        self._at(500, 'press')
+        self._at(580, 'release')
+        self.clock.advance_to(2000 * MS)
+        self.assertEqual([g[1] for g in self.gestures], [GESTURE_SINGLE, GESTURE_SINGLE])
+    
+    def test_long_press_while_held(self):
+        """Test long press fires at press + long time, release adds nothing"""
+        self._at(10, 'press')
+        self.clock.advance_to(810 * MS)
+        self.assertEqual(self.gestures, [(17, GESTURE_LONG, 10 * MS, 810 * MS)])
+        self._at(1500, 'release')
+        self.clock.advance_to(3000 * MS)
+        self.assertEqual(len(self.gestures), 1)
+    
+    def test_plain_button_immediate(self):
+        """Test a button without long/double resolves on the press"""
+        self._at(5, 'press', 23)
+        self.assertEqual(self.gestures, [(23, GESTURE_SINGLE, 5 * MS, 5 * MS)])
+    
+    def test_buttons_share_wheel(self):
+        """Test both buttons' timeouts run on the same wheel independently"""
+        self._at(0, 'press')
+        self._at(100, 'press', 23)
+        self.clock.advance_to(900 * MS)
+        self.assertEqual([(g[0], g[1]) for g in self.gestures],
+                         [(23, GESTURE_SINGLE), (17, GESTURE_LONG)])
+        self.assertEqual(self.wheel.pending, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Unit tests for gpio_backend.py
+Tests grouped-line relay writes against the FakeChip test double
+"""
+
+import unittest
+from unittest.mock import Mock
+import sys
+
+# Mock gpiozero before any imports
+sys.modules['gpiozero'] = Mock()
+sys.modules['gpiozero.pins'] = Mock()
+sys.modules['gpiozero.pins.lgpio'] = Mock()
+
+from gpio_backend import FakeChip, LineGroupBackend, OutputDeviceBackend
+from antenna_hardware import AntennaHardware
+
+
+class TestLineGroupBackend(unittest.TestCase):
+    """Test LineGroupBackend on a fake chip"""
+    
+    def setUp(self):
+        """Set up fake chip and backend for the 3 relay pins"""
+        self.chip = FakeChip()
+        self.backend = LineGroupBackend([27, 22, 4], chip=self.chip)
+    
+    def test_lines_requested_as_one_group(self):
+        """Test all relay pins are requested together, initially low"""
+        self.assertEqual(len(self.chip.requests), 1)
+        self.assertEqual(self.chip.requests[0].pins, [27, 22, 4])
+        self.assertEqual(self.chip.levels, {27: False, 22: False, 4: False})
+    
+    def test_write_is_single_call(self):
+        """Test a multi-pin write is one set_values call"""
+        self.backend.write({27: True, 22: False, 4: False})
+        self.assertEqual(self.chip.set_calls, 1)
+        self.assertTrue(self.chip.levels[27])
+    
+    def test_empty_write_skipped(self):
+        """Test an empty write does not touch the chip"""
+        self.backend.write({})
+        self.assertEqual(self.chip.set_calls, 0)
+    
+    def test_read(self):
+        """Test reading levels back from the group"""
+        self.backend.write({22: True})
+        self.assertEqual(self.backend.read([27, 22]), {27: False, 22: True})
+    
+    def test_close_releases_request(self):
+        """Test close releases the line request"""
+        self.backend.close()
+        self.assertTrue(self.chip.requests[0].released)
+
+
+class TestOutputDeviceBackend(unittest.TestCase):
+    """Test per-device backend keeps the original gpiozero call pattern"""
+    
+    def test_write_calls_each_device(self):
+        """Test each pin maps to on()/off() on its own device"""
+        devices = {}
+        
+        def factory(pin, **kwargs):
+            devices[pin] = Mock()
+            return devices[pin]
+        
+        backend = OutputDeviceBackend([27, 22], device_factory=factory)
+        backend.write({27: True, 22: False})
+        
+        devices[27].on.assert_called_once()
+        devices[22].off.assert_called_once()
+    
+    def test_attach_leaves_pins_as_found(self):
+        """Test attach creates devices without an initial level"""
+        factory = Mock()
+        OutputDeviceBackend([27], device_factory=factory, attach=True)
+        factory.assert_called_once_with(27, active_high=True, initial_value=None)
+
+
+class TestAntennaHardwareLineGroup(unittest.TestCase):
+    """Test AntennaHardware driven through a grouped-line backend"""
+    
+    def setUp(self):
+        """Set up hardware on a fake chip"""
+        self.chip = FakeChip()
+        self.hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=self.chip))
+    
+    def test_initialization_defaults_to_a1(self):
+        """Test system initializes to A1 on the chip"""
+        self.assertEqual(self.hw.get_current_antenna(), 1)
+        self.assertEqual(self.chip.levels, {27: True, 22: False, 4: False})
+    
+    def test_switch_is_two_bulk_writes(self):
+        """Test a switch is break (one write) then make (one write)"""
+        calls_before = self.chip.set_calls
+        self.hw.set_antenna(3)
+        self.assertEqual(self.chip.set_calls - calls_before, 2)
+        self.assertEqual(self.chip.levels, {27: False, 22: False, 4: True})
+    
+    def test_never_two_relays_energized(self):
+        """Test break-before-make holds across every intermediate chip state"""
+        for antenna in [2, 3, 1, 0, 3, 2]:
+            self.hw.set_antenna(antenna)
+        for state in self.chip.history:
+            self.assertLessEqual(sum(state.values()), 1)
+    
+    def test_relay_state_matches_chip(self):
+        """Test relay state agrees with the line group without reading it"""
+        self.hw.set_antenna(2)
+        gets_before = self.chip.get_calls
+        self.assertTrue(self.hw.get_relay_state(2))
+        self.assertFalse(self.hw.get_relay_state(1))
+        self.assertEqual(self.chip.get_calls, gets_before)
+        self.assertEqual(self.hw.check_consistency(), [])
+    
+    def test_repeat_select_is_noop(self):
+        """Test re-selecting the current antenna does not touch the chip"""
+        calls_before = self.chip.set_calls
+        self.hw.set_antenna(1)
+        self.assertEqual(self.chip.set_calls, calls_before)
+    
+    def test_cleanup(self):
+        """Test cleanup drops all lines and releases the request"""
+        self.hw.cleanup()
+        self.assertEqual(self.chip.levels, {27: False, 22: False, 4: False})
+        self.assertTrue(self.chip.requests[0].released)
+
+
+class TestAttach(unittest.TestCase):
+    """Test a restarted controller takes the relays over without switching"""
+    
+    def setUp(self):
+        """First controller selects A2 and exits holding the lines"""
+        self.chip = FakeChip()
+        first = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=self.chip))
+        first.set_antenna(2)
+        first.cleanup(hold=True)
+        self.writes = self.chip.set_calls
+    
+    def restart(self, initial):
+        """Second controller attaching to the same chip"""
+        backend = LineGroupBackend([27, 22, 4], chip=self.chip, attach=True)
+        return AntennaHardware(backend=backend, attach=True, initial=initial)
+    
+    def test_hold_keeps_levels(self):
+        """Test cleanup(hold=True) leaves the relays energized"""
+        self.assertEqual(self.chip.levels, {27: False, 22: True, 4: False})
+    
+    def test_attach_keeps_live_state(self):
+        """Test attaching with no saved state writes nothing"""
+        hw = self.restart(None)
+        self.assertEqual(hw.get_current_antenna(), 2)
+        self.assertEqual(self.chip.set_calls, self.writes)
+        self.assertEqual(hw.check_consistency(), [])
+    
+    def test_restore_matching_state_writes_nothing(self):
+        """Test restoring the antenna already selected is glitch-free"""
+        hw = self.restart(2)
+        self.assertEqual(hw.get_current_antenna(), 2)
+        self.assertEqual(self.chip.set_calls, self.writes)
+    
+    def test_restore_after_power_loss(self):
+        """Test lines found low are switched to the saved antenna"""
+        self.chip.levels = {27: False, 22: False, 4: False}
+        hw = self.restart(3)
+        self.assertEqual(self.chip.levels, {27: False, 22: False, 4: True})
+        self.assertEqual(hw.get_current_antenna(), 3)
+    
+    def test_two_energized_relays_repaired(self):
+        """Test an impossible attached state is reduced to one relay"""
+        self.chip.levels[4] = True
+        hw = self.restart(None)
+        self.assertEqual(hw.get_current_antenna(), 2)
+        self.assertEqual(self.chip.levels, {27: False, 22: True, 4: False})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Unit tests for metrics.py
+Tests counters, histograms, the text exposition and the HTTP endpoint
+"""
+
+import time
+import unittest
+import urllib.error
+import urllib.request
+from unittest.mock import Mock
+import sys
+
+# Mock gpiozero before any imports
+sys.modules['gpiozero'] = Mock()
+sys.modules['gpiozero.pins'] = Mock()
+sys.modules['gpiozero.pins.lgpio'] = Mock()
+
+from antenna_hardware import AntennaHardware
+from button_handler import ButtonHandler
+from command_actor import CommandActor
+from edge_source import FakeEdgeSource
+from gpio_backend import FakeChip, LineGroupBackend
+from metrics import Counter, ControllerMetrics, Histogram, MetricsServer, Registry
+from ssh_command_handler import SSHCommandHandler
+
+
+def sample_lines(text):
+    """{name{labels}: value} of the non-comment exposition lines"""
+    return dict(line.rsplit(' ', 1) for line in text.splitlines() if not line.startswith('#'))
+
+
+class TestMetricTypes(unittest.TestCase):
+    """Test the metric types and their exposition"""
+    
+    def test_histogram_buckets_cumulative(self):
+        """Test buckets are cumulative, in seconds, with sum and count"""
+        registry = Registry()
+        histogram = registry.add(Histogram('op_seconds', 'Op time', (1000, 1000000)))
+        for ns in (500, 1000, 2000, 5000000):
+            histogram.observe(ns)
+        lines = sample_lines(registry.render())
+        self.assertEqual(lines['op_seconds_bucket{le="1e-06"}'], '2')
+        self.assertEqual(lines['op_seconds_bucket{le="0.001"}'], '3')
+        self.assertEqual(lines['op_seconds_bucket{le="+Inf"}'], '4')
+        self.assertEqual(lines['op_seconds_count'], '4')
+        self.assertAlmostEqual(float(lines['op_seconds_sum']), 0.0050035)
+        self.assertEqual(histogram.count, 4)
+    
+    def test_counter_labels(self):
+        """Test labelled counters render one line per label set"""
+        registry = Registry()
+        counter = registry.add(Counter('hits_total', 'Hits', ('path',)))
+        counter.inc('/a')
+        counter.inc('/a')
+        counter.inc('/b', amount=5)
+        text = registry.render()
+        self.assertIn('# TYPE hits_total counter\n', text)
+        self.assertEqual(sample_lines(text), {'hits_total{path="/a"}': '2', 'hits_total{path="/b"}': '5'})
+
+
+class TestControllerMetrics(unittest.TestCase):
+    """Test the hooks in the hardware, button and command handler"""
+    
+    def setUp(self):
+        """Instrumented fake-chip hardware, actor and handler"""
+        self.hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip()))
+        self.actor = CommandActor(self.hw, settle_time=0)
+        self.actor.start()
+        self.addCleanup(self.actor.stop)
+        self.handler = SSHCommandHandler(self.actor)
+        self.metrics = ControllerMetrics()
+        self.metrics.instrument(hardware=self.hw, handler=self.handler, actor=self.actor)
+    
+    def test_switches_and_set_time(self):
+        """Test every change is counted and every set_antenna timed"""
+        self.hw.set_antenna(2, source='button')
+        self.hw.set_antenna(2, source='button')
+        self.hw.set_antenna(0, source='network')
+        lines = sample_lines(self.metrics.registry.render())
+        self.assertEqual(lines['antenna_switches_total{antenna="A2",source="button"}'], '1')
+        self.assertEqual(lines['antenna_switches_total{antenna="OFF",source="network"}'], '1')
+        self.assertEqual(lines['antenna_set_seconds_count'], '3')
+        self.assertEqual(lines['antenna_selected'], '0')
+    
+    def test_scrape_does_not_read_back(self):
+        """Test the selected-antenna gauge never touches GPIO from the scrape thread"""
+        self.hw.readback_interval = 0
+        self.hw.check_consistency = Mock(return_value=[])
+        self.metrics.registry.render()
+        self.hw.check_consistency.assert_not_called()
+    
+    def test_commands(self):
+        """Test commands are counted by command and result, and timed"""
+        for command in ('a3', 'STAT', 'A9'):
+            self.handler.handle_command(command)
+        lines = sample_lines(self.metrics.registry.render())
+        self.assertEqual(lines['antenna_commands_total{command="A3",result="ok"}'], '1')
+        self.assertEqual(lines['antenna_commands_total{command="STAT",result="ok"}'], '1')
+        self.assertEqual(lines['antenna_commands_total{command="invalid",result="error"}'], '1')
+        self.assertEqual(lines['antenna_command_seconds_count'], '3')
+        self.assertEqual(lines['antenna_actor_applied'], '1')
+        self.assertEqual(lines['antenna_actor_pending'], '0')
+    
+    def test_button_presses(self):
+        """Test debounced presses and their latency are recorded"""
+        source = FakeEdgeSource()
+        button = ButtonHandler(self.hw, edge_source=source, edge_thread=False)
+        self.metrics.instrument(button=button)
+        start_ns = time.monotonic_ns() - 1000000000
+        source.press(start_ns, 100000000)
+        source.press(start_ns + 300000000, 100000000)
+        button.process_edges(source.read(), time.monotonic_ns())
+        lines = sample_lines(self.metrics.registry.render())
+        self.assertEqual(lines['antenna_button_presses_total'], '2')
+        self.assertIn('# TYPE antenna_button_presses_total counter', self.metrics.registry.render())
+        self.assertEqual(lines['antenna_button_latency_seconds_count'], '2')
+        self.assertEqual(lines['antenna_switches_total{antenna="A3",source="button"}'], '1')
+    
+    def test_uninstrumented(self):
+        """Test objects work without metrics attached"""
+        hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip()))
+        self.assertIsNone(hw.metrics)
+        self.assertEqual(SSHCommandHandler(hw).handle_command('A2'), 'Status: A2')
+
+
+class TestMetricsServer(unittest.TestCase):
+    """Test the HTTP endpoint"""
+    
+    def setUp(self):
+        """Serve a registry on a free loopback port"""
+        self.registry = Registry()
+        self.registry.add(Counter('up_total', 'Up')).inc()
+        self.server = MetricsServer(self.registry, port=0)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.url = f'http://127.0.0.1:{self.server.port}'
+    
+    def test_scrape(self):
+        """Test /metrics returns the exposition text"""
+        with urllib.request.urlopen(self.url + '/metrics', timeout=5) as response:
+            self.assertTrue(response.headers['Content-Type'].startswith('text/plain; version=0.0.4'))
+            self.assertEqual(response.read().decode(), self.registry.render())
+    
+    def test_unknown_path(self):
+        """Test other paths are 404"""
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            urllib.request.urlopen(self.url + '/', timeout=5)
+        self.assertEqual(ctx.exception.code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Unit tests for relay_wear.py and AntennaHardware's wear counters
+Tests cycle and on-time accounting, batched writes, restore and alerts
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+import sys
+
+# Mock gpiozero before any imports
+sys.modules['gpiozero'] = Mock()
+sys.modules['gpiozero.pins'] = Mock()
+sys.modules['gpiozero.pins.lgpio'] = Mock()
+
+from antenna_daemon import AntennaDaemon
+from antenna_hardware import AntennaHardware
+from gpio_backend import FakeChip, LineGroupBackend
+from relay_wear import HOUR_NS, WearMonitor
+from ssh_command_handler import SSHCommandHandler
+
+PINS = [27, 22, 4]
+
+
+def make_hardware(chip=None, attach=False, **kwargs):
+    """Fake-chip hardware (starts on A1 unless attached)"""
+    return AntennaHardware(backend=LineGroupBackend(PINS, chip=chip or FakeChip(), attach=attach),
+                           attach=attach, **kwargs)
+
+
+class TestRelayAccounting(unittest.TestCase):
+    """Test the counters kept by AntennaHardware"""
+    
+    def test_cycles_count_makes(self):
+        """Test every make is one cycle and re-selecting is free"""
+        hw = make_hardware()
+        for antenna in (2, 2, 3, 1, 0, 2):
+            hw.set_antenna(antenna)
+        self.assertEqual({num: wear['cycles'] for num, wear in hw.relay_wear().items()},
+                         {1: 2, 2: 2, 3: 1})
+    
+    def test_on_time(self):
+        """Test energized time adds up per relay, open period included"""
+        with patch('antenna_hardware.time.monotonic_ns') as clock:
+            clock.return_value = 0
+            hw = make_hardware()
+            clock.return_value = 5 * HOUR_NS
+            hw.set_antenna(2)
+            clock.return_value = 6 * HOUR_NS
+            hw.set_antenna(0)
+            clock.return_value = 7 * HOUR_NS
+            hw.set_antenna(3)
+            clock.return_value = 9 * HOUR_NS
+            wear = hw.relay_wear()
+        self.assertEqual({num: counts['on_ns'] // HOUR_NS for num, counts in wear.items()},
+                         {1: 5, 2: 1, 3: 2})
+    
+    def test_cleanup_closes_on_time(self):
+        """Test turning everything off at exit ends the on-time period"""
+        hw = make_hardware()
+        hw.cleanup()
+        on_ns = hw.relay_wear()[1]['on_ns']
+        self.assertEqual(hw.relay_wear()[1]['on_ns'], on_ns)
+    
+    def test_consistency_repair_breaks_before_make_and_counts(self):
+        """Test read-back repair writes breaks first and counts the re-make"""
+        chip = FakeChip()
+        hw = make_hardware(chip=chip)
+        hw.set_antenna(2)
+        chip.levels[22] = False  # A2 dropped out
+        chip.levels[4] = True    # A3 stuck on
+        del chip.history[:]
+        self.assertEqual(sorted(hw.check_consistency()), [4, 22])
+        self.assertEqual(chip.history, [{27: False, 22: False, 4: False}, {27: False, 22: True, 4: False}])
+        self.assertEqual(hw.relay_wear()[2]['cycles'], 2)
+    
+    def test_attach_counts_no_cycle(self):
+        """Test attaching to an energized relay starts its on-time, not a cycle"""
+        chip = FakeChip()
+        make_hardware(chip=chip).set_antenna(3)
+        hw = make_hardware(chip=chip, attach=True, initial=None)
+        wear = hw.relay_wear()
+        self.assertEqual(wear[3]['cycles'], 0)
+        self.assertGreater(wear[3]['on_ns'], 0)
+
+
+class TestWearMonitor(unittest.TestCase):
+    """Test batched persistence and alerts"""
+    
+    def setUp(self):
+        """Temporary counter file"""
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.path = os.path.join(tmpdir.name, 'wear.json')
+    
+    def test_storm_is_one_write(self):
+        """Test many switches between flushes cost one write"""
+        hw = make_hardware()
+        wear = WearMonitor(hw, self.path)
+        wear.restore()
+        for i in range(1000):
+            hw.set_antenna(i % 3 + 1)
+        self.assertTrue(wear.flush())
+        self.assertFalse(wear.flush())
+        self.assertEqual(wear.writes, 1)
+        with open(self.path) as f:
+            data = json.load(f)
+        self.assertEqual(data['relays']['2']['cycles'], 333)
+    
+    def test_counts_survive_restart(self):
+        """Test a restarted controller continues from the stored counts"""
+        hw = make_hardware()
+        wear = WearMonitor(hw, self.path)
+        wear.restore()
+        hw.set_antenna(2)
+        wear.stop()
+        
+        hw = make_hardware()
+        saved = WearMonitor(hw, self.path).restore()
+        self.assertEqual(saved[2]['cycles'], 1)
+        self.assertEqual({num: counts['cycles'] for num, counts in hw.relay_wear().items()},
+                         {1: 2, 2: 1, 3: 0})
+    
+    def test_unusable_file_ignored(self):
+        """Test a damaged or foreign file reads as no counts"""
+        with open(self.path, 'w') as f:
+            f.write('{"relays": ')
+        self.assertEqual(WearMonitor(make_hardware(), self.path).load(), {})
+        with open(self.path, 'w') as f:
+            json.dump({'version': 99, 'relays': {}}, f)
+        self.assertEqual(WearMonitor(make_hardware(), self.path).load(), {})
+    
+    def test_alert_once_per_relay(self):
+        """Test crossing a limit alerts once and shows in the status"""
+        alerts = []
+        hw = make_hardware()
+        wear = WearMonitor(hw, cycle_limit=3, on_alert=lambda *alert: alerts.append(alert))
+        wear.restore()
+        for antenna in (2, 1, 2, 1, 2, 1):
+            hw.set_antenna(antenna)
+            wear.flush()
+        self.assertEqual(alerts, [(1, 'cycles', 3, 3), (2, 'cycles', 3, 3)])
+        self.assertEqual(wear.status()[1]['alerts'], ['cycles'])
+        self.assertEqual(wear.status()[3]['alerts'], [])
+        self.assertEqual(wear.writes, 0)
+
+
+class TestWearCommand(unittest.IsolatedAsyncioTestCase):
+    """Test the daemon's WEAR command"""
+    
+    async def test_wear_lines(self):
+        """Test one line per relay with cycles, on-time and alerts"""
+        hw = make_hardware()
+        wear = WearMonitor(hw, cycle_limit=1)
+        daemon = AntennaDaemon(SSHCommandHandler(hw), port=0, wear=wear)
+        await daemon.start()
+        self.addAsyncCleanup(daemon.stop)
+        reader, writer = await asyncio.open_connection('127.0.0.1', daemon.port)
+        writer.write(b'A2\nWEAR\nQUIT\n')
+        await writer.drain()
+        lines = (await reader.read()).decode().splitlines()
+        writer.close()
+        self.assertEqual(lines[0], 'Status: A2')
+        self.assertRegex(lines[1], r'^Wear: A1 cycles=1 on=0\.0h ALERT cycles$')
+        self.assertRegex(lines[2], r'^Wear: A2 cycles=1 on=0\.0h ALERT cycles$')
+        self.assertEqual(lines[3], 'Wear: A3 cycles=0 on=0.0h')
+
+
+if __name__ == '__main__':
+    unittest.main()
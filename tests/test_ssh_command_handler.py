@@ -34,28 +34,28 @@ class TestSSHCommandHandler(unittest.TestCase):
         """Test A1 command selects antenna 1"""
         response = self.handler.handle_command("A1")
         
-        self.mock_hw.set_antenna.assert_called_with(1)
+        self.mock_hw.set_antenna.assert_called_with(1, source='network')
         self.assertEqual(response, "Status: A1")
     
     def test_command_a2(self):
         """Test A2 command selects antenna 2"""
         response = self.handler.handle_command("A2")
         
-        self.mock_hw.set_antenna.assert_called_with(2)
+        self.mock_hw.set_antenna.assert_called_with(2, source='network')
         self.assertEqual(response, "Status: A2")
     
     def test_command_a3(self):
         """Test A3 command selects antenna 3"""
         response = self.handler.handle_command("A3")
         
-        self.mock_hw.set_antenna.assert_called_with(3)
+        self.mock_hw.set_antenna.assert_called_with(3, source='network')
         self.assertEqual(response, "Status: A3")
     
     def test_command_off(self):
         """Test OFF command deactivates all antennas"""
         response = self.handler.handle_command("OFF")
         
-        self.mock_hw.set_antenna.assert_called_with(0)
+        self.mock_hw.set_antenna.assert_called_with(0, source='network')
         self.assertEqual(response, "Status: OFF")
     
     def test_command_stat(self):
@@ -79,15 +79,15 @@ class TestSSHCommandHandler(unittest.TestCase):
     def test_case_insensitive(self):
         """Test commands are case insensitive"""
         response = self.handler.handle_command("a1")
-        self.mock_hw.set_antenna.assert_called_with(1)
+        self.mock_hw.set_antenna.assert_called_with(1, source='network')
         
         response = self.handler.handle_command("oFf")
-        self.mock_hw.set_antenna.assert_called_with(0)
+        self.mock_hw.set_antenna.assert_called_with(0, source='network')
     
     def test_whitespace_handling(self):
         """Test commands with whitespace are handled"""
         response = self.handler.handle_command("  A2  ")
-        self.mock_hw.set_antenna.assert_called_with(2)
+        self.mock_hw.set_antenna.assert_called_with(2, source='network')
     
     def test_invalid_command(self):
         """Test invalid command returns error"""
@@ -108,6 +108,51 @@ class TestSSHCommandHandler(unittest.TestCase):
         """Test VALID_COMMANDS contains correct commands for 3-antenna system"""
         expected = ['A1', 'A2', 'A3', 'OFF', 'STAT']
         self.assertEqual(self.handler.VALID_COMMANDS, expected)
+        self.assertEqual(self.handler.valid_commands, expected)
+    
+    def test_two_antenna_count(self):
+        """Test A3 is rejected when configured for 2 antennas"""
+        handler = SSHCommandHandler(self.mock_hw, antenna_count=2)
+        
+        response = handler.handle_command("A3")
+        
+        self.assertIn("ERROR", response)
+        self.mock_hw.set_antenna.assert_not_called()
+    
+    
+    def test_batch_runs_in_order(self):
+        """Test a ';' batch yields one response per command in order"""
+        self.mock_hw.get_current_antenna.return_value = 2
+        
+        responses = list(self.handler.handle_batch("A2;STAT"))
+        
+        self.mock_hw.set_antenna.assert_called_once_with(2, source='network')
+        self.assertEqual(responses, ["Status: A2", "Status: A2"])
+    
+    def test_batch_newlines_and_blanks(self):
+        """Test newline-separated scripts skip blank entries"""
+        responses = list(self.handler.handle_batch("A1\n\nA3;\nbogus\n"))
+        
+        self.assertEqual(responses[:2], ["Status: A1", "Status: A3"])
+        self.assertIn("ERROR", responses[2])
+        self.assertEqual(len(responses), 3)
+    
+    def test_batch_collapse(self):
+        """Test collapse applies only the last switch of each run"""
+        responses = list(self.handler.handle_batch("A1;A2;A3;STAT;OFF;A2", collapse=True))
+        
+        applied = [c.args[0] for c in self.mock_hw.set_antenna.call_args_list]
+        self.assertEqual(applied, [3, 2])
+        self.assertEqual(len(responses), 6)
+        self.assertEqual(responses[0], "Status: A1 (collapsed)")
+        self.assertEqual(responses[2], "Status: A3")
+    
+    def test_batch_is_streamed(self):
+        """Test batch responses are produced lazily, one command at a time"""
+        batch = self.handler.handle_batch("A2;A3")
+        
+        next(batch)
+        self.mock_hw.set_antenna.assert_called_once_with(2, source='network')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Unit tests for state_file.py
+Tests the memory-mapped state record and restarts through AntennaHardware
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+import sys
+
+# Mock gpiozero before any imports
+sys.modules['gpiozero'] = Mock()
+sys.modules['gpiozero.pins'] = Mock()
+sys.modules['gpiozero.pins.lgpio'] = Mock()
+
+from antenna_hardware import AntennaHardware
+from gpio_backend import FakeChip, LineGroupBackend
+from state_file import FILE_SIZE, StateFile
+
+
+class TestStateFile(unittest.TestCase):
+    """Test storing and loading the selected antenna"""
+    
+    def setUp(self):
+        """Temporary state file path"""
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.unlink, self.path)
+    
+    def open(self):
+        """Open a StateFile closed at the end of the test"""
+        state = StateFile(self.path)
+        self.addCleanup(state.close)
+        return state
+    
+    def test_new_file_has_no_state(self):
+        """Test an empty file is sized and reads as no state"""
+        self.assertIsNone(self.open().load())
+        self.assertEqual(os.path.getsize(self.path), FILE_SIZE)
+    
+    def test_survives_reopen(self):
+        """Test a stored antenna is seen by the next process without a flush"""
+        first = self.open()
+        first.store(2)
+        first.store(3)
+        saved = self.open().load()
+        self.assertEqual((saved.antenna, saved.seq), (3, 2))
+    
+    def test_seq_continues(self):
+        """Test the store counter continues across restarts"""
+        self.open().store(1)
+        state = self.open()
+        state.store(0)
+        self.assertEqual(state.load(), (0, 2, state.load().wall_ns))
+    
+    def test_torn_record_rejected(self):
+        """Test a corrupted record reads as no state"""
+        self.open().store(2)
+        with open(self.path, 'r+b') as f:
+            f.seek(12)
+            f.write(b'\x03')
+        self.assertIsNone(self.open().load())
+    
+    def test_listener_restart(self):
+        """Test a controller restart restores the antenna without a relay write"""
+        chip = FakeChip()
+        state = self.open()
+        hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=chip))
+        hw.add_listener(state.record)
+        hw.set_antenna(3)
+        hw.cleanup(hold=True)
+        writes = chip.set_calls
+        
+        saved = self.open().load()
+        backend = LineGroupBackend([27, 22, 4], chip=chip, attach=True)
+        hw = AntennaHardware(backend=backend, attach=True, initial=saved.antenna)
+        self.assertEqual(hw.get_current_antenna(), 3)
+        self.assertEqual(chip.set_calls, writes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Unit tests for switch_matrix.py
+Tests port-state image writes on simulated, SPI and I2C buses
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+import sys
+
+# Mock gpiozero before any imports
+sys.modules['gpiozero'] = Mock()
+sys.modules['gpiozero.pins'] = Mock()
+sys.modules['gpiozero.pins.lgpio'] = Mock()
+
+from switch_matrix import SwitchMatrix, SimulatedBus, ShiftRegisterBus, MCP23017Bus
+from antenna_hardware import AntennaHardware
+from ssh_command_handler import SSHCommandHandler
+
+
+class TestSwitchMatrix(unittest.TestCase):
+    """Test SwitchMatrix on a simulated bus"""
+    
+    def setUp(self):
+        """Set up a 64-port matrix"""
+        self.bus = SimulatedBus()
+        self.matrix = SwitchMatrix(self.bus, port_count=64)
+    
+    def test_initial_image_all_off(self):
+        """Test the matrix latches an all-off image on creation"""
+        self.assertEqual(self.bus.image, bytes(8))
+        self.assertEqual(self.bus.transactions, 1)
+    
+    def test_port_map(self):
+        """Test antennas 1..N map to ports 0..N-1"""
+        port_map = self.matrix.port_map()
+        self.assertEqual(len(port_map), 64)
+        self.assertEqual(port_map[1], 0)
+        self.assertEqual(port_map[64], 63)
+    
+    def test_write_sets_bits(self):
+        """Test port bits land in the right byte and bit"""
+        self.matrix.write({0: True, 9: True, 63: True})
+        self.assertEqual(self.bus.image[0], 0x01)
+        self.assertEqual(self.bus.image[1], 0x02)
+        self.assertEqual(self.bus.image[7], 0x80)
+    
+    def test_write_is_one_transaction(self):
+        """Test a multi-port write is a single bus transaction"""
+        self.matrix.write({port: True for port in range(0, 64, 3)})
+        self.assertEqual(self.bus.transactions, 2)
+    
+    def test_clear_bit(self):
+        """Test clearing a port leaves its neighbours alone"""
+        self.matrix.write({4: True, 5: True})
+        self.matrix.write({4: False})
+        self.assertEqual(self.matrix.read([4, 5]), {4: False, 5: True})
+    
+    def test_out_of_range_port(self):
+        """Test writing past the last port raises"""
+        with self.assertRaises(ValueError):
+            self.matrix.write({64: True})
+
+
+class TestMatrixHardware(unittest.TestCase):
+    """Test AntennaHardware and SSHCommandHandler on a 64-port matrix"""
+    
+    def setUp(self):
+        """Set up hardware and handler for 64 antennas"""
+        self.bus = SimulatedBus()
+        matrix = SwitchMatrix(self.bus, port_count=64)
+        self.hw = AntennaHardware(backend=matrix, relay_pins=matrix.port_map())
+        self.handler = SSHCommandHandler(self.hw, antenna_count=64)
+    
+    def test_antenna_count(self):
+        """Test antenna count follows the port map"""
+        self.assertEqual(self.hw.antenna_count, 64)
+    
+    def test_switch_is_break_then_make(self):
+        """Test a switch costs two full-image transactions"""
+        before = self.bus.transactions
+        self.hw.set_antenna(40)
+        self.assertEqual(self.bus.transactions - before, 2)
+        self.assertTrue(self.hw.get_relay_state(40))
+        self.assertFalse(self.hw.get_relay_state(1))
+    
+    def test_ssh_high_port(self):
+        """Test SSH commands address ports beyond A3"""
+        self.assertEqual(self.handler.handle_command("a64"), "Status: A64")
+        self.assertEqual(self.hw.get_current_antenna(), 64)
+        self.assertEqual(self.handler.handle_command("STAT"), "Status: A64")
+    
+    def test_ssh_rejects_missing_port(self):
+        """Test SSH rejects antennas past the port count"""
+        response = self.handler.handle_command("A65")
+        self.assertIn("ERROR", response)
+        self.assertIn("A1..A64", response)
+    
+    def test_consistency_check_on_matrix(self):
+        """Test read-back compares against the latched bus image"""
+        self.hw.set_antenna(17)
+        self.assertEqual(self.hw.check_consistency(), [])
+
+
+class TestShiftRegisterBus(unittest.TestCase):
+    """Test 74HC595 chain over mocked spidev"""
+    
+    def test_image_sent_reversed_in_one_transfer(self):
+        """Test the image is shifted in reverse in a single xfer2"""
+        spidev = Mock()
+        with patch.dict(sys.modules, {'spidev': spidev}):
+            bus = ShiftRegisterBus()
+        bus.write_image(b'\x01\x02\x03')
+        spidev.SpiDev.return_value.xfer2.assert_called_once_with([3, 2, 1])
+        self.assertIsNone(bus.read_image(3))
+
+
+class TestMCP23017Bus(unittest.TestCase):
+    """Test MCP23017 expanders over mocked smbus2"""
+    
+    def setUp(self):
+        """Set up a 4-chip (64 port) expander bus"""
+        smbus2 = Mock()
+        with patch.dict(sys.modules, {'smbus2': smbus2}):
+            self.bus = MCP23017Bus(chip_count=4)
+        self.i2c = smbus2.SMBus.return_value
+    
+    def test_pins_configured_as_outputs(self):
+        """Test IODIRA/IODIRB cleared on every chip"""
+        for address in range(0x20, 0x24):
+            self.i2c.write_i2c_block_data.assert_any_call(address, 0x00, [0x00, 0x00])
+    
+    def test_only_changed_chips_written(self):
+        """Test each write touches only chips whose latch bytes changed"""
+        self.bus.write_image(bytes(8))
+        self.i2c.write_i2c_block_data.reset_mock()
+        
+        self.bus.write_image(b'\x00\x00\x00\x00\x10\x00\x00\x00')
+        
+        self.i2c.write_i2c_block_data.assert_called_once_with(0x22, 0x14, [0x10, 0x00])
+    
+    def test_port_count_limited_to_chips(self):
+        """Test a matrix cannot have more ports than the expanders provide"""
+        self.assertEqual(self.bus.port_capacity, 64)
+        SwitchMatrix(self.bus, port_count=64)
+        with self.assertRaises(ValueError):
+            SwitchMatrix(self.bus, port_count=65)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Unit tests for timer_wheel.py
+Tests exact firing ticks, cancellation and cascading across levels
+"""
+
+import random
+import unittest
+
+from timer_wheel import TimerWheel, VirtualClock
+
+MS = 1000000
+
+
+class TestTimerWheel(unittest.TestCase):
+    """Test TimerWheel driven by a VirtualClock"""
+    
+    def setUp(self):
+        """1ms wheel with small levels so cascades happen quickly"""
+        self.wheel = TimerWheel(tick_ns=MS, slots=8, levels=3)
+        self.clock = VirtualClock(self.wheel)
+        self.fired = []
+    
+    def _fire(self, name):
+        self.fired.append((name, self.clock.now_ns))
+    
+    def test_fires_on_deadline_not_before(self):
+        """Test a timer fires at its tick and never early"""
+        self.wheel.schedule(5 * MS, self._fire, 'a')
+        self.clock.advance_to(4 * MS)
+        self.assertEqual(self.fired, [])
+        self.clock.advance_to(5 * MS)
+        self.assertEqual(self.fired, [('a', 5 * MS)])
+    
+    def test_partial_tick_rounds_up(self):
+        """Test a deadline between ticks fires on the next tick"""
+        self.wheel.schedule(5 * MS + 1, self._fire, 'a')
+        self.clock.advance_to(5 * MS)
+        self.assertEqual(self.fired, [])
+        self.clock.advance_to(6 * MS)
+        self.assertEqual(len(self.fired), 1)
+    
+    def test_cancel(self):
+        """Test cancelled timers never fire"""
+        timer = self.wheel.schedule(3 * MS, self._fire, 'a')
+        self.wheel.cancel(timer)
+        self.wheel.cancel(timer)  # idempotent
+        self.clock.advance_to(10 * MS)
+        self.assertEqual(self.fired, [])
+        self.assertEqual(self.wheel.pending, 0)
+    
+    def test_cascade_levels(self):
+        """Test timers in higher levels and the overflow fire exactly"""
+        deadlines = [7, 8, 9, 63, 64, 65, 511, 512, 513, 2000]
+        for d in deadlines:
+            self.wheel.schedule(d * MS, self._fire, d)
+        for t in range(1, 2001):
+            self.clock.advance_to(t * MS)
+        self.assertEqual(self.fired, [(d, d * MS) for d in deadlines])
+    
+    def test_large_jump_fires_in_order(self):
+        """Test one advance over many timers fires them in deadline order"""
+        deadlines = random.Random(3).sample(range(1, 3000), 200)
+        for d in deadlines:
+            self.wheel.schedule(d * MS, self._fire, d)
+        self.clock.advance_to(3000 * MS)
+        self.assertEqual([name for name, _ in self.fired], sorted(deadlines))
+    
+    def test_next_deadline(self):
+        """Test the earliest pending deadline is reported"""
+        self.assertIsNone(self.wheel.next_deadline())
+        self.wheel.schedule(300 * MS, self._fire, 'late')
+        self.wheel.schedule(20 * MS, self._fire, 'early')
+        self.assertEqual(self.wheel.next_deadline(), 20 * MS)
+    
+    def test_idle_jump(self):
+        """Test an empty wheel jumps to now without stepping"""
+        self.clock.advance_to(10 ** 12)
+        self.assertEqual(self.wheel.current_tick, 10 ** 12 // MS)
+        self.wheel.schedule(10 ** 12 + 2 * MS, self._fire, 'a')
+        self.clock.advance(2 * MS)
+        self.assertEqual(len(self.fired), 1)
+    
+    def test_callback_can_schedule(self):
+        """Test a firing timer can schedule the next one"""
+        def chain(n, deadline_ns):
+            self.fired.append((n, self.wheel.current_tick * MS))
+            if n < 3:
+                self.wheel.schedule(deadline_ns + 10 * MS, chain, n + 1, deadline_ns + 10 * MS)
+        
+        self.wheel.schedule(10 * MS, chain, 1, 10 * MS)
+        self.clock.advance_to(100 * MS)
+        self.assertEqual(self.fired, [(1, 10 * MS), (2, 20 * MS), (3, 30 * MS)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Unit tests for trace_analyzer.py
+Vectorized statistics over synthetic edge traces (skipped without NumPy)
+"""
+
+import os
+import random
+import tempfile
+import unittest
+
+from edge_source import Edge, FakeEdgeSource
+from edge_trace import TraceWriter, read_trace, true_presses
+import trace_analyzer
+from trace_analyzer import MINUTE_NS, analyze, histogram, open_trace
+
+MS = 1000000
+
+
+def write_trace(test, edges, levels=None):
+    """Write edges to a temporary trace file, return its path"""
+    fd, path = tempfile.mkstemp(suffix='.trace')
+    os.close(fd)
+    test.addCleanup(os.unlink, path)
+    writer = TraceWriter(path, levels if levels is not None else {17: False, 24: False})
+    writer.write(sorted(edges))
+    writer.close()
+    return path
+
+
+def bouncy_presses(count, start_ns=0, spacing_ns=500 * MS, bounce_ns=MS, pin=17):
+    """count presses with 3 * bounce_ns of bounce on make and break"""
+    source = FakeEdgeSource()
+    for i in range(count):
+        source.press(start_ns + i * spacing_ns, 100 * MS, bounces=3, bounce_ns=bounce_ns, pin=pin)
+    return source.wait(0)
+
+
+def glitches(times_ns, width_ns=50000, pin=17):
+    """Short active spikes"""
+    edges = []
+    for t in times_ns:
+        edges += [Edge(t, True, pin), Edge(t + width_ns, False, pin)]
+    return edges
+
+
+@unittest.skipIf(trace_analyzer.np is None, "NumPy not installed")
+class TestTraceAnalyzer(unittest.TestCase):
+    """Test press, glitch and transmit statistics"""
+    
+    def test_memmap(self):
+        """Test the trace is mapped, not parsed"""
+        path = write_trace(self, bouncy_presses(2))
+        wall_ns, mono_ns, records = open_trace(path)
+        self.assertIsInstance(records, trace_analyzer.np.memmap)
+        self.assertEqual(len(records), 2 + 2 * 14)  # snapshots + two presses
+    
+    def test_presses_and_glitches(self):
+        """Test presses, intervals and glitch widths are separated"""
+        path = write_trace(self, bouncy_presses(4) + glitches([250 * MS, 1200 * MS]))
+        analysis = analyze(path)
+        self.assertEqual(len(analysis.press_starts), 4)
+        self.assertEqual(list(analysis.press_intervals_ns), [500 * MS] * 3)
+        self.assertEqual(list(analysis.glitch_widths_ns), [50000, 50000])
+        self.assertEqual(list(analysis.bounce_ns), [3 * MS] * 4)
+    
+    def test_matches_replay_reference(self):
+        """Test the vectorized press detection agrees with edge_trace.true_presses"""
+        rng = random.Random(3)
+        edges = bouncy_presses(50, bounce_ns=400000)
+        edges += glitches([rng.randrange(0, 25000 * MS) for _ in range(40)], width_ns=200000)
+        path = write_trace(self, edges)
+        reference = true_presses(read_trace(path).edges, {17: False})
+        self.assertEqual(list(analyze(path).press_starts), [start for start, end, pin in reference])
+    
+    def test_per_minute_failures(self):
+        """Test glitches and long-bounce presses count as failures per minute"""
+        edges = bouncy_presses(2, bounce_ns=10 * MS)  # 30ms tail > 20ms lockout
+        edges += glitches([MINUTE_NS + 5 * MS, MINUTE_NS + 900 * MS])
+        analysis = analyze(write_trace(self, edges), lockout_ns=20 * MS, max_bounce_ns=40 * MS)
+        self.assertEqual(list(analysis.minutes.presses), [2, 0])
+        self.assertEqual(list(analysis.minutes.glitches), [0, 2])
+        self.assertEqual(list(analysis.minutes.failures), [2, 2])
+    
+    def test_tx_pin_correlation(self):
+        """Test glitches while transmitting show up in the TX rates"""
+        edges = []
+        for minute in range(6):
+            base = minute * MINUTE_NS
+            if minute % 2:
+                # Transmit for 30s with glitches during it
+                edges += [Edge(base, True, 24), Edge(base + 30000 * MS, False, 24)]
+                edges += glitches([base + i * 1000 * MS for i in range(1, 11)])
+                edges += bouncy_presses(1, start_ns=base + 40000 * MS)
+            else:
+                edges += bouncy_presses(1, start_ns=base)
+        analysis = analyze(write_trace(self, edges), tx_pin=24)
+        tx = analysis.tx
+        self.assertEqual(tx.tx_ns, 3 * 30000 * MS)
+        self.assertAlmostEqual(tx.glitch_rate_tx, 20.0)
+        self.assertEqual(tx.glitch_rate_idle, 0.0)
+        self.assertGreater(tx.correlation, 0.9)
+        self.assertEqual(list(analysis.minutes.tx_fraction), [0.0, 0.5, 0.0, 0.5, 0.0, 0.5])
+    
+    def test_tx_file_periods(self):
+        """Test wall-clock transmit periods are mapped onto the trace clock"""
+        path = write_trace(self, glitches([10 * MS, 5000 * MS]) + bouncy_presses(1, start_ns=8000 * MS))
+        wall_ns, mono_ns, records = open_trace(path)
+        tx_start = wall_ns - mono_ns  # wall time of monotonic 0
+        analysis = analyze(path, tx_periods=[(tx_start + 10 * MS, tx_start + 1010 * MS)])
+        self.assertAlmostEqual(analysis.tx.glitch_rate_tx, 60.0)
+    
+    def test_histogram(self):
+        """Test log-spaced bins cover every value"""
+        counts, edges = histogram([1000, 10000, 100000, 1000000], bins=3, low_ns=1000, high_ns=1000000)
+        self.assertEqual(list(counts), [1, 1, 2])
+        self.assertEqual(len(edges), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
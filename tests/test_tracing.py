@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Unit tests for tracing.py
+Tests span nesting, stage marks, the exporters and the daemon hooks
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import Mock
+import sys
+
+# Mock gpiozero before any imports
+sys.modules['gpiozero'] = Mock()
+sys.modules['gpiozero.pins'] = Mock()
+sys.modules['gpiozero.pins.lgpio'] = Mock()
+
+from antenna_daemon import AntennaDaemon
+from antenna_hardware import AntennaHardware
+from command_actor import LoopActor, POLICY_LATEST
+from gpio_backend import FakeChip, LineGroupBackend
+from ssh_command_handler import SSHCommandHandler
+from tracing import ChromeTraceExporter, JsonLinesExporter, RingExporter, Tracer
+
+
+class FakeClock:
+    """Clock advancing 1000ns per reading"""
+    
+    def __init__(self):
+        self.now = 0
+    
+    def __call__(self):
+        self.now += 1000
+        return self.now
+
+
+def traced_handler(*exporters, clock=None):
+    """Fake-chip hardware and handler sharing one tracer"""
+    hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip()))
+    handler = SSHCommandHandler(hw)
+    tracer = Tracer(*exporters, clock=clock or FakeClock())
+    hw.tracer = handler.tracer = tracer
+    return hw, handler, tracer
+
+
+class TestTracer(unittest.TestCase):
+    """Test spans from the handler and hardware hooks"""
+    
+    def test_command_nests_set_antenna(self):
+        """Test a command span is the parent of its set_antenna span"""
+        ring = RingExporter()
+        hw, handler, tracer = traced_handler(ring)
+        handler.handle_command('A2')
+        set_span, command_span = ring.spans()
+        self.assertEqual(command_span.name, 'command')
+        self.assertEqual(command_span.args, {'command': 'A2', 'source': 'network', 'response': 'Status: A2'})
+        self.assertIsNone(command_span.parent_id)
+        self.assertEqual(set_span.parent_id, command_span.span_id)
+        self.assertEqual(set_span.args, {'antenna': 2, 'source': 'network', 'previous': 1})
+        self.assertEqual([stage for stage, ns in set_span.marks], ['written'])
+        self.assertTrue(command_span.start_ns < set_span.start_ns < set_span.end_ns < command_span.end_ns)
+    
+    def test_siblings_do_not_nest(self):
+        """Test finished spans stop being the parent of later ones"""
+        ring = RingExporter()
+        hw, handler, tracer = traced_handler(ring)
+        handler.handle_command('STAT')
+        handler.handle_command('A3')
+        stat, set_span, command = ring.spans()
+        self.assertIsNone(command.parent_id)
+        self.assertEqual(set_span.parent_id, command.span_id)
+    
+    def test_raising_listener_finishes_spans(self):
+        """Test spans are finished with the error when a listener raises"""
+        ring = RingExporter()
+        hw, handler, tracer = traced_handler(ring)
+        hw.add_listener(Mock(side_effect=RuntimeError('listener failed')))
+        with self.assertRaises(RuntimeError):
+            handler.handle_command('A2')
+        set_span, command = ring.spans()
+        self.assertEqual(set_span.args['error'], "RuntimeError('listener failed')")
+        self.assertEqual(command.args['error'], "RuntimeError('listener failed')")
+        self.assertEqual(set_span.parent_id, command.span_id)
+        
+        # The failed spans are no longer current
+        hw.listeners.clear()
+        handler.handle_command('STAT')
+        self.assertIsNone(ring.spans()[-1].parent_id)
+    
+    def test_ring_capacity(self):
+        """Test the ring keeps only the newest spans"""
+        ring = RingExporter(capacity=2)
+        hw, handler, tracer = traced_handler(ring)
+        for command in ('STAT', 'STAT', 'A9'):
+            handler.handle_command(command)
+        self.assertEqual([span.args['command'] for span in ring.spans()], ['STAT', 'A9'])
+    
+    def test_disabled_by_default(self):
+        """Test nothing is traced without a tracer"""
+        hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip()))
+        self.assertIsNone(hw.tracer)
+        self.assertIsNone(SSHCommandHandler(hw).tracer)
+
+
+class TestExporters(unittest.TestCase):
+    """Test the file exporters"""
+    
+    def setUp(self):
+        """Temporary directory for trace files"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+    
+    def test_json_lines(self):
+        """Test one JSON object per span with marks as offsets"""
+        path = os.path.join(self.tmpdir.name, 'trace.jsonl')
+        hw, handler, tracer = traced_handler(JsonLinesExporter(path))
+        handler.handle_command('A2')
+        tracer.close()
+        with open(path) as f:
+            spans = [json.loads(line) for line in f]
+        self.assertEqual([span['name'] for span in spans], ['set_antenna', 'command'])
+        self.assertEqual(spans[0]['parent'], spans[1]['id'])
+        self.assertEqual(spans[0]['marks'], {'written': 1000})
+        self.assertEqual(spans[0]['dur_ns'], 2000)
+    
+    def test_chrome_trace(self):
+        """Test a loadable trace-event array with complete and instant events"""
+        path = os.path.join(self.tmpdir.name, 'trace.json')
+        hw, handler, tracer = traced_handler(ChromeTraceExporter(path))
+        handler.handle_command('A2')
+        handler.handle_command('OFF')
+        tracer.close()
+        with open(path) as f:
+            events = json.load(f)
+        self.assertEqual([e['ph'] for e in events].count('M'), 1)
+        complete = [e for e in events if e['ph'] == 'X']
+        self.assertEqual([e['name'] for e in complete], ['set_antenna', 'command'] * 2)
+        self.assertEqual(complete[0]['args']['parent'], complete[1]['args']['id'])
+        self.assertEqual(complete[0]['dur'], 2.0)
+        instants = [e for e in events if e['ph'] == 'i']
+        self.assertEqual([e['name'] for e in instants], ['written', 'written'])
+
+
+class TestLoopActorTracing(unittest.IsolatedAsyncioTestCase):
+    """Test spans of switches applied by the LoopActor settle timer"""
+    
+    async def test_deferred_flush_is_root_span(self):
+        """Test a coalesced switch is not parented to a finished command span"""
+        ring = RingExporter()
+        hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip()))
+        actor = LoopActor(hw, policy=POLICY_LATEST, settle_time=0.02)
+        actor.start()
+        self.addCleanup(actor.stop)
+        handler = SSHCommandHandler(actor)
+        hw.tracer = handler.tracer = Tracer(ring)
+        handler.handle_command('A2')
+        handler.handle_command('A3')
+        await asyncio.sleep(0.05)
+        set_a2, command_a2, command_a3, set_a3 = ring.spans()
+        self.assertEqual(set_a2.parent_id, command_a2.span_id)
+        self.assertEqual(set_a3.args['antenna'], 3)
+        self.assertIsNone(set_a3.parent_id)
+
+
+class TestDaemonTracing(unittest.IsolatedAsyncioTestCase):
+    """Test request spans over a loopback connection"""
+    
+    async def test_request_span(self):
+        """Test request -> command -> set_antenna with receive and response stages"""
+        ring = RingExporter()
+        hw, handler, tracer = traced_handler(ring)
+        daemon = AntennaDaemon(handler, port=0, tracer=tracer)
+        await daemon.start()
+        self.addAsyncCleanup(daemon.stop)
+        reader, writer = await asyncio.open_connection('127.0.0.1', daemon.port)
+        writer.write(b'A3\nQUIT\n')
+        await writer.drain()
+        self.assertEqual(await reader.readline(), b'Status: A3\n')
+        await reader.read()
+        writer.close()
+        set_span, command, request = ring.spans()
+        self.assertEqual(request.name, 'request')
+        self.assertEqual(request.args, {'line': 'A3'})
+        self.assertEqual([stage for stage, ns in request.marks], ['handled'])
+        self.assertEqual(command.parent_id, request.span_id)
+        self.assertEqual(set_span.parent_id, command.span_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Unit tests for udp_protocol.py
+Tests binary datagram handling, idempotency and loopback serving
+"""
+
+import asyncio
+import unittest
+from unittest.mock import Mock
+import sys
+
+# Mock gpiozero before any imports
+sys.modules['gpiozero'] = Mock()
+sys.modules['gpiozero.pins'] = Mock()
+sys.modules['gpiozero.pins.lgpio'] = Mock()
+
+from udp_protocol import (
+    UDPCommandServer, UDPControlClient, encode_request, decode_reply, REQUEST,
+    OP_STAT, OP_OFF, OP_SELECT, STATUS_OK, STATUS_ERROR, STATUS_STALE, STATUS_BAD_REQUEST
+)
+from antenna_daemon import AntennaDaemon
+from antenna_hardware import AntennaHardware
+from command_actor import LoopActor, POLICY_LATEST
+from gpio_backend import FakeChip, LineGroupBackend
+from ssh_command_handler import SSHCommandHandler
+
+PEER = ('192.0.2.10', 50000)
+
+
+class TestUDPCommandServer(unittest.TestCase):
+    """Test datagram decoding and sequence handling"""
+    
+    def setUp(self):
+        """Set up server on fake-chip hardware"""
+        self.hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip()))
+        self.handler = SSHCommandHandler(self.hw)
+        self.server = UDPCommandServer(self.handler)
+    
+    def _send(self, opcode, seq, antenna=0, peer=PEER, session=0):
+        """Process one request and decode its reply"""
+        return decode_reply(self.server.handle_datagram(encode_request(opcode, seq, antenna, session), peer))
+    
+    def test_datagrams_are_fixed_size(self):
+        """Test requests and replies are 8 bytes"""
+        self.assertEqual(REQUEST.size, 8)
+        self.assertEqual(len(encode_request(OP_STAT, 1)), 8)
+    
+    def test_select(self):
+        """Test OP_SELECT switches and reports the new antenna"""
+        self.assertEqual(self._send(OP_SELECT, 1, 3), (OP_SELECT, STATUS_OK, 3, 1))
+        self.assertEqual(self.hw.get_current_antenna(), 3)
+    
+    def test_off_and_stat(self):
+        """Test OP_OFF and OP_STAT"""
+        self.assertEqual(self._send(OP_OFF, 1), (OP_OFF, STATUS_OK, 0, 1))
+        self.assertEqual(self._send(OP_STAT, 2), (OP_STAT, STATUS_OK, 0, 2))
+    
+    def test_invalid_antenna(self):
+        """Test selecting a missing antenna is an error and changes nothing"""
+        self.assertEqual(self._send(OP_SELECT, 1, 9), (OP_SELECT, STATUS_ERROR, 1, 1))
+    
+    def test_unknown_opcode(self):
+        """Test unknown opcodes get STATUS_BAD_REQUEST"""
+        self.assertEqual(self._send(0x7F, 1)[1], STATUS_BAD_REQUEST)
+    
+    def test_short_datagram_ignored(self):
+        """Test malformed datagrams get no reply"""
+        self.assertIsNone(self.server.handle_datagram(b'\x01\x02', PEER))
+        self.assertEqual(self.server.bad_requests, 1)
+    
+    def test_duplicate_not_re_executed(self):
+        """Test a retransmitted request returns the cached reply only"""
+        self._send(OP_SELECT, 5, 2)
+        self.hw.set_antenna(3)
+        
+        reply = self._send(OP_SELECT, 5, 2)
+        
+        self.assertEqual(reply, (OP_SELECT, STATUS_OK, 2, 5))
+        self.assertEqual(self.hw.get_current_antenna(), 3)
+        self.assertEqual(self.server.duplicates, 1)
+    
+    def test_out_of_order_is_stale(self):
+        """Test an older request arriving late does not undo a newer one"""
+        self._send(OP_SELECT, 10, 3)
+        
+        reply = self._send(OP_SELECT, 9, 2)
+        
+        self.assertEqual(reply, (OP_SELECT, STATUS_STALE, 3, 9))
+        self.assertEqual(self.hw.get_current_antenna(), 3)
+    
+    def test_sequence_wraps(self):
+        """Test seq 0 after 2**32-1 counts as newer"""
+        self._send(OP_SELECT, 2 ** 32 - 1, 2)
+        
+        self.assertEqual(self._send(OP_SELECT, 0, 3)[1], STATUS_OK)
+        self.assertEqual(self.hw.get_current_antenna(), 3)
+    
+    def test_client_restart_new_session(self):
+        """Test a restarted client on the same port is not answered STALE"""
+        self._send(OP_SELECT, 500, 2, session=7)
+        self.assertEqual(self._send(OP_SELECT, 1, 2, session=7)[1], STATUS_STALE)
+        
+        reply = self._send(OP_SELECT, 1, 3, session=8)
+        
+        self.assertEqual(reply, (OP_SELECT, STATUS_OK, 3, 1))
+        self.assertEqual(self.hw.get_current_antenna(), 3)
+        self.assertEqual(self.server.restarts, 1)
+        self.assertEqual(self._send(OP_SELECT, 2, 1, session=8)[1], STATUS_OK)
+    
+    def test_sequences_are_per_peer(self):
+        """Test each sender has its own sequence space"""
+        self._send(OP_SELECT, 100, 2)
+        
+        reply = self._send(OP_SELECT, 1, 3, peer=('192.0.2.11', 50000))
+        
+        self.assertEqual(reply[1], STATUS_OK)
+    
+    def test_peer_table_bounded(self):
+        """Test the sender table evicts the least recent peers"""
+        self.server.MAX_PEERS = 4
+        for port in range(10):
+            self._send(OP_STAT, 1, peer=('192.0.2.10', port))
+        self.assertEqual(len(self.server.peers), 4)
+
+
+class TestUDPCoalescing(unittest.IsolatedAsyncioTestCase):
+    """Test replies through a coalescing LoopActor"""
+    
+    async def test_reply_carries_target(self):
+        """Test a switch folded into the settle flush replies with its target"""
+        hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip()))
+        actor = LoopActor(hw, policy=POLICY_LATEST, settle_time=0.05)
+        actor.start()
+        self.addCleanup(actor.stop)
+        server = UDPCommandServer(SSHCommandHandler(actor))
+        server.handle_datagram(encode_request(OP_SELECT, 1, 2), PEER)
+        
+        reply = decode_reply(server.handle_datagram(encode_request(OP_SELECT, 2, 3), PEER))
+        
+        self.assertEqual(reply, (OP_SELECT, STATUS_OK, 3, 2))
+        self.assertEqual(hw.get_current_antenna(), 2)
+        await asyncio.sleep(0.08)
+        self.assertEqual(hw.get_current_antenna(), 3)
+
+
+class TestUDPLoopback(unittest.IsolatedAsyncioTestCase):
+    """Test the UDP endpoint served by AntennaDaemon"""
+    
+    async def asyncSetUp(self):
+        """Start a daemon with UDP enabled on free ports"""
+        self.hw = AntennaHardware(backend=LineGroupBackend([27, 22, 4], chip=FakeChip()))
+        self.daemon = AntennaDaemon(SSHCommandHandler(self.hw), port=0, udp_port=0)
+        await self.daemon.start()
+    
+    async def asyncTearDown(self):
+        """Stop the daemon"""
+        await self.daemon.stop()
+    
+    async def test_client_select(self):
+        """Test the blocking client switches antennas over loopback"""
+        client = UDPControlClient('127.0.0.1', self.daemon.udp_port, timeout=1)
+        loop = asyncio.get_running_loop()
+        
+        reply = await loop.run_in_executor(None, client.select, 2)
+        
+        self.assertEqual(reply[1:3], (STATUS_OK, 2))
+        self.assertEqual(self.hw.get_current_antenna(), 2)
+        client.close()
+
+
+if __name__ == '__main__':
+    unittest.main()